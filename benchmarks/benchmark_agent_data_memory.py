@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from simulariumio import (
+    DISPLAY_TYPE,
+    AgentData,
+    AgentTypes,
+    DimensionData,
+    DisplayData,
+    DTypePolicy,
+    MetaData,
+    TrajectoryData,
+)
+from simulariumio.writers import BinaryWriter
+
+###############################################################################
+
+FIELDS = [
+    "times",
+    "n_agents",
+    "viz_types",
+    "unique_ids",
+    "positions",
+    "radii",
+    "rotations",
+    "n_subpoints",
+    "subpoints",
+]
+
+
+def make_agent_data(
+    dimensions: DimensionData,
+    fiber_fraction: float,
+    dtype_policy: DTypePolicy,
+    seed: int = 0,
+) -> AgentData:
+    """
+    Fill AgentData from AgentData.from_dimensions with random spheres
+    and fibers, the way a converter fills it
+    """
+    rng = np.random.default_rng(seed)
+    total_steps = dimensions.total_steps
+    n_agents = dimensions.max_agents
+    n_fibers = int(fiber_fraction * n_agents)
+    result = AgentData.from_dimensions(dimensions, dtype_policy=dtype_policy)
+    result.times[:] = np.arange(total_steps)
+    result.n_agents[:] = n_agents
+    result.viz_types[:, :n_fibers] = 1001.0
+    result.unique_ids[:] = np.arange(n_agents)
+    result.types = AgentTypes(
+        [
+            ["fiber"] * n_fibers + ["sphere"] * (n_agents - n_fibers)
+            for _ in range(total_steps)
+        ]
+    )
+    result.positions[:] = rng.normal(size=result.positions.shape)
+    result.radii[:] = rng.random(result.radii.shape)
+    result.n_subpoints[:, :n_fibers] = dimensions.max_subpoints
+    result.subpoints[:, :n_fibers] = rng.normal(
+        size=(total_steps, n_fibers, dimensions.max_subpoints)
+    )
+    result.display_data = {
+        "fiber": DisplayData(name="fiber", display_type=DISPLAY_TYPE.FIBER),
+        "sphere": DisplayData(name="sphere", display_type=DISPLAY_TYPE.SPHERE),
+    }
+    return result
+
+
+def benchmark_memory(
+    dimensions: DimensionData, fiber_fraction: float, output_dir: str
+) -> None:
+    """
+    Compare the array memory, the peak traced memory of filling
+    and saving AgentData, and the saved binary files,
+    for full precision and compact dtypes
+    """
+    output_bytes = []
+    for name, dtype_policy in [
+        ("full precision", DTypePolicy.full_precision()),
+        ("compact", DTypePolicy()),
+    ]:
+        tracemalloc.start()
+        start_time = time.time()
+        agent_data = make_agent_data(dimensions, fiber_fraction, dtype_policy)
+        array_bytes = sum(getattr(agent_data, field).nbytes for field in FIELDS)
+        output_path = os.path.join(output_dir, name.replace(" ", "_"))
+        BinaryWriter.save(
+            TrajectoryData(
+                meta_data=MetaData(box_size=np.array([10.0, 10.0, 10.0])),
+                agent_data=agent_data,
+            ),
+            output_path,
+            validate_ids=False,
+        )
+        total_time = time.time() - start_time
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del agent_data
+        with open(output_path + ".simularium", "rb") as output_file:
+            output_bytes.append(output_file.read())
+        print(
+            f"{name}: arrays {array_bytes / 1e6:.1f} MB, "
+            f"peak {peak_bytes / 1e6:.1f} MB, {total_time:.2f} s"
+        )
+    if output_bytes[0] != output_bytes[1]:
+        raise Exception("Saved binary files do not match")
+    print("saved binary files match")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares AgentData memory with full precision and compact dtypes"
+    )
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--agents", type=int, default=20000)
+    parser.add_argument("--subpoints", type=int, default=30)
+    parser.add_argument("--fiber_fraction", type=float, default=0.1)
+    args = parser.parse_args()
+    dimensions = DimensionData(
+        total_steps=args.steps,
+        max_agents=args.agents,
+        max_subpoints=args.subpoints,
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        benchmark_memory(dimensions, args.fiber_fraction, output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from simulariumio import (
+    BINARY_COMPRESSION,
+    AgentData,
+    BinaryData,
+    BinaryWriter,
+    DisplayData,
+    DISPLAY_TYPE,
+    FileConverter,
+    InputFileData,
+    MetaData,
+    TrajectoryData,
+)
+
+###############################################################################
+
+TEST_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "simulariumio",
+    "tests",
+    "data",
+    "binary",
+)
+
+###############################################################################
+
+
+def random_walk_trajectory(total_steps: int, n_agents: int) -> TrajectoryData:
+    """
+    Make spheres that move a small random step each frame
+    """
+    rng = np.random.default_rng(0)
+    positions = np.cumsum(
+        0.01 * rng.normal(size=(total_steps, n_agents, 3)), axis=0
+    ) + 100.0 * rng.random((1, n_agents, 3))
+    return TrajectoryData(
+        meta_data=MetaData(box_size=np.array([200.0, 200.0, 200.0])),
+        agent_data=AgentData(
+            times=np.arange(total_steps, dtype=float),
+            n_agents=n_agents * np.ones(total_steps, dtype=int),
+            viz_types=1000.0 * np.ones((total_steps, n_agents)),
+            unique_ids=np.tile(np.arange(n_agents), (total_steps, 1)),
+            types=[["sphere"] * n_agents for _ in range(total_steps)],
+            positions=positions,
+            radii=np.ones((total_steps, n_agents)),
+            display_data={
+                "sphere": DisplayData(name="sphere", display_type=DISPLAY_TYPE.SPHERE),
+            },
+        ),
+    )
+
+
+def load_test_trajectory(file_name: str) -> TrajectoryData:
+    """
+    Load a .simularium binary test file
+    """
+    return FileConverter(
+        input_file=InputFileData(file_path=os.path.join(TEST_DATA_DIR, file_name))
+    )._data
+
+
+def benchmark_compression(
+    name: str, trajectory_data: TrajectoryData, keyframe_interval: int
+) -> None:
+    """
+    Save the trajectory with each codec, as float32 frames,
+    keyframe deltas, and quantized frames,
+    and time reading every frame back
+    """
+    print(f"\n{name}")
+    raw_n_bytes = 0
+    encodings = [
+        ("", {}),
+        (f" K={keyframe_interval}", {"keyframe_interval": keyframe_interval}),
+        (" quantized", {"quantize": True}),
+    ]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for suffix, encoding in encodings:
+            for compression in BINARY_COMPRESSION:
+                label = compression.name + suffix
+                output_path = os.path.join(temp_dir, label.replace(" ", "_"))
+                start_time = time.time()
+                BinaryWriter.save(
+                    trajectory_data,
+                    output_path,
+                    False,
+                    compression=compression,
+                    **encoding,
+                )
+                write_time = time.time() - start_time
+                with open(f"{output_path}.simularium", "rb") as saved_file:
+                    file_contents = saved_file.read()
+                start_time = time.time()
+                binary_data = BinaryData(file_contents)
+                for frame_index in range(binary_data.get_num_frames()):
+                    binary_data.get_frame_at_index(frame_index)
+                read_time = time.time() - start_time
+                n_bytes = len(file_contents)
+                if raw_n_bytes == 0:
+                    raw_n_bytes = n_bytes
+                raw_mb = raw_n_bytes / 1e6
+                print(
+                    f"{label:>15}: {n_bytes} bytes "
+                    f"({n_bytes / raw_n_bytes:.2f} of uncompressed), "
+                    f"write {raw_mb / write_time:.1f} MB/s, "
+                    f"read all frames {raw_mb / read_time:.1f} MB/s"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares size and speed of compressed spatial data blocks"
+    )
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--agents", type=int, default=5000)
+    parser.add_argument("--keyframe-interval", type=int, default=10)
+    args = parser.parse_args()
+    for file_name in ["binary_test.binary", "50filaments_motor_linker_binary.binary"]:
+        benchmark_compression(
+            file_name, load_test_trajectory(file_name), args.keyframe_interval
+        )
+    benchmark_compression(
+        f"random walk, {args.steps} steps X {args.agents} spheres",
+        random_walk_trajectory(args.steps, args.agents),
+        args.keyframe_interval,
+    )
+
+
+if __name__ == "__main__":
+    main()
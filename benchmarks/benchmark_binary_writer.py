@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import struct
+import time
+
+import numpy as np
+
+from simulariumio import DISPLAY_TYPE, AgentData, DisplayData
+from simulariumio.writers.writer import Writer
+
+###############################################################################
+
+
+def make_agent_data(
+    total_steps: int, n_agents: int, fiber_fraction: float, seed: int = 0
+) -> AgentData:
+    """
+    Make random AgentData with a mix of spheres and fibers
+    """
+    rng = np.random.default_rng(seed)
+    n_fibers = int(fiber_fraction * n_agents)
+    n_subpoints = np.zeros((total_steps, n_agents), dtype=int)
+    n_subpoints[:, :n_fibers] = 3 * rng.integers(2, 10, (total_steps, n_fibers))
+    viz_types = np.where(n_subpoints > 0, 1001.0, 1000.0)
+    type_names = ["fiber"] * n_fibers + ["sphere"] * (n_agents - n_fibers)
+    return AgentData(
+        times=np.arange(total_steps, dtype=float),
+        n_agents=n_agents * np.ones(total_steps, dtype=int),
+        viz_types=viz_types,
+        unique_ids=np.tile(np.arange(n_agents), (total_steps, 1)),
+        types=[list(type_names) for _ in range(total_steps)],
+        positions=rng.normal(size=(total_steps, n_agents, 3)),
+        radii=rng.random((total_steps, n_agents)),
+        rotations=rng.normal(size=(total_steps, n_agents, 3)),
+        n_subpoints=n_subpoints,
+        subpoints=rng.normal(size=(total_steps, n_agents, int(np.amax(n_subpoints)))),
+        display_data={
+            "fiber": DisplayData(name="fiber", display_type=DISPLAY_TYPE.FIBER),
+            "sphere": DisplayData(name="sphere", display_type=DISPLAY_TYPE.SPHERE),
+        },
+        draw_fiber_points=True,
+    )
+
+
+def benchmark_frame_packing(agent_data: AgentData) -> None:
+    """
+    Time packing every frame to float32 bytes
+    with the per agent loop and with the array packing engine
+    """
+    type_ids, _ = agent_data.get_type_ids_and_mapping()
+    total_steps = agent_data.total_timesteps()
+    start_time = time.time()
+    loop_frames = []
+    for time_index in range(total_steps):
+        buffer, _ = Writer._get_frame_buffer(time_index, agent_data, type_ids)
+        loop_frames.append(struct.pack(f"<{len(buffer)}f", *buffer))
+    loop_time = time.time() - start_time
+    start_time = time.time()
+    array_frames = []
+    for time_index in range(total_steps):
+        buffer = Writer._get_frame_buffer_array(time_index, agent_data, type_ids)
+        array_frames.append(buffer.tobytes())
+    array_time = time.time() - start_time
+    if loop_frames != array_frames:
+        raise Exception("Packed frames do not match")
+    print(f"per agent loop packed {total_steps} frames in {loop_time:.3f} s")
+    print(f"array engine packed {total_steps} frames in {array_time:.3f} s")
+    print(f"speedup = {loop_time / array_time:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares frame packing speed of the binary writer"
+    )
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--agents", type=int, default=20000)
+    parser.add_argument("--fiber_fraction", type=float, default=0.1)
+    args = parser.parse_args()
+    agent_data = make_agent_data(args.steps, args.agents, args.fiber_fraction)
+    benchmark_frame_packing(agent_data)
+
+
+if __name__ == "__main__":
+    main()
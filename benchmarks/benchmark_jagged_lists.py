@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from simulariumio import AgentData
+
+###############################################################################
+
+
+def make_jagged_lists(
+    total_steps: int,
+    max_agents: int,
+    fiber_fraction: float,
+    max_subpoints: int,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Make random jagged lists for AgentData, with a different number
+    of agents at each timestep and a different number of subpoints
+    for each fiber
+    """
+    rng = np.random.default_rng(seed)
+    result = {
+        "viz_types": [],
+        "unique_ids": [],
+        "positions": [],
+        "radii": [],
+        "rotations": [],
+        "n_subpoints": [],
+        "subpoints": [],
+    }
+    for _ in range(total_steps):
+        n_agents = int(rng.integers(max_agents // 2, max_agents + 1))
+        n_subpoints = np.where(
+            rng.random(n_agents) < fiber_fraction,
+            3 * rng.integers(2, max_subpoints // 3 + 1, n_agents),
+            0,
+        )
+        result["viz_types"].append(np.where(n_subpoints > 0, 1001.0, 1000.0).tolist())
+        result["unique_ids"].append(list(range(n_agents)))
+        result["positions"].append(rng.normal(size=(n_agents, 3)).tolist())
+        result["radii"].append(rng.random(n_agents).tolist())
+        result["rotations"].append(rng.normal(size=(n_agents, 3)).tolist())
+        result["n_subpoints"].append(n_subpoints.tolist())
+        result["subpoints"].append([rng.normal(size=n).tolist() for n in n_subpoints])
+    return result
+
+
+def pandas_fill_df(df: pd.DataFrame, fill: Any) -> pd.DataFrame:
+    """
+    Fill Nones in a DataFrame with a fill value,
+    the way AgentData did before the ragged list ingestion
+    """
+    fill_df = pd.DataFrame([[fill] * df.shape[1]] * df.shape[0])
+    df[df.isna()] = fill_df
+    return df
+
+
+def pandas_jagged_3d_list_to_numpy_array(jagged_3d_list: List) -> np.ndarray:
+    df = pandas_fill_df(pd.DataFrame(jagged_3d_list), [0, 0, 0])
+    df_t = df.transpose()
+    exploded = [df_t[col].explode() for col in list(df_t.columns)]
+    return np.array(exploded, dtype=float).reshape((df.shape[0], df.shape[1], 3))
+
+
+def pandas_subpoints_numpy_array(subpoints: List) -> np.ndarray:
+    frame_arrays = [
+        np.array(pandas_fill_df(pd.DataFrame(frame), 0.0), dtype=float)
+        for frame in subpoints
+    ]
+    max_agents = max(frame_array.shape[0] for frame_array in frame_arrays)
+    max_subpoints = max(frame_array.shape[1] for frame_array in frame_arrays)
+    result = np.zeros((len(subpoints), max_agents, max_subpoints))
+    for time_index, frame_array in enumerate(frame_arrays):
+        result[time_index, : frame_array.shape[0], : frame_array.shape[1]] = frame_array
+    return result
+
+
+def pandas_agent_arrays(jagged_lists: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Convert the jagged lists to padded arrays with the pandas path
+    """
+    return {
+        "viz_types": pandas_fill_df(
+            pd.DataFrame(jagged_lists["viz_types"]), 1000.0
+        ).to_numpy(dtype=float),
+        "unique_ids": pandas_fill_df(
+            pd.DataFrame(jagged_lists["unique_ids"]), 0
+        ).to_numpy(dtype=int),
+        "positions": pandas_jagged_3d_list_to_numpy_array(jagged_lists["positions"]),
+        "radii": pandas_fill_df(pd.DataFrame(jagged_lists["radii"]), 0.0).to_numpy(),
+        "rotations": pandas_jagged_3d_list_to_numpy_array(jagged_lists["rotations"]),
+        "n_subpoints": pandas_fill_df(
+            pd.DataFrame(jagged_lists["n_subpoints"]), 0.0
+        ).to_numpy(dtype=int),
+        "subpoints": pandas_subpoints_numpy_array(jagged_lists["subpoints"]),
+    }
+
+
+def benchmark_jagged_lists(jagged_lists: Dict[str, Any]) -> None:
+    """
+    Time converting jagged lists to padded arrays with the pandas path
+    and with AgentData's ragged list ingestion, and check they match
+    """
+    total_steps = len(jagged_lists["unique_ids"])
+    start_time = time.time()
+    expected_arrays = pandas_agent_arrays(jagged_lists)
+    pandas_time = time.time() - start_time
+    start_time = time.time()
+    agent_data = AgentData(
+        times=np.arange(total_steps, dtype=float),
+        n_agents=[len(unique_ids) for unique_ids in jagged_lists["unique_ids"]],
+        types=[["A"] * len(unique_ids) for unique_ids in jagged_lists["unique_ids"]],
+        **jagged_lists,
+    )
+    ragged_time = time.time() - start_time
+    for field, expected_array in expected_arrays.items():
+        if not np.array_equal(getattr(agent_data, field), expected_array):
+            raise Exception(f"{field} arrays do not match")
+    total_agents = sum(len(unique_ids) for unique_ids in jagged_lists["unique_ids"])
+    print(f"{total_steps} timesteps, {total_agents} agents")
+    print(f"pandas path converted the lists in {pandas_time:.3f} s")
+    print(f"ragged list ingestion converted the lists in {ragged_time:.3f} s")
+    print(f"speedup = {pandas_time / ragged_time:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares AgentData ingestion speed of jagged lists"
+    )
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--agents", type=int, default=5000)
+    parser.add_argument("--fiber_fraction", type=float, default=0.1)
+    parser.add_argument("--subpoints", type=int, default=30)
+    args = parser.parse_args()
+    benchmark_jagged_lists(
+        make_jagged_lists(args.steps, args.agents, args.fiber_fraction, args.subpoints)
+    )
+
+
+if __name__ == "__main__":
+    main()
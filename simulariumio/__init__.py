@@ -12,9 +12,13 @@ except PackageNotFoundError:
 
 from .data_objects import (  # noqa: F401
     AgentData,
+    AgentDataBuilder,
+    AgentTypes,
+    RaggedAgentData,
     DisplayData,
     CameraData,
     DimensionData,
+    DTypePolicy,
     HistogramPlotData,
     InputFileData,
     MetaData,
@@ -26,9 +30,16 @@ from .data_objects import (  # noqa: F401
     SimulariumFileData,
     JsonData,
     BinaryData,
+    ChunkedBinaryData,
+    UniqueIDAllocator,
 )
 # DO NOT ISORT DISPLAY_TYPE, CAUSES CIRCULAR DEP
-from .constants import BINARY_SETTINGS, DISPLAY_TYPE  # noqa: F401
+from .constants import (  # noqa: F401
+    BINARY_SETTINGS,
+    BINARY_COMPRESSION,
+    DISPLAY_TYPE,
+    VALIDATION_LEVEL,
+)
 from .file_converter import FileConverter  # noqa: F401
 from .trajectory_converter import TrajectoryConverter  # noqa: F401
 from .writers import BinaryWriter, JsonWriter  # noqa: F401
@@ -13,7 +13,7 @@ from ..constants import DISPLAY_TYPE, VIZ_TYPE, VALUES_PER_3D_POINT
 from ..data_objects.camera_data import CameraData
 from ..trajectory_converter import TrajectoryConverter
 from ..data_objects import TrajectoryData, AgentData, DimensionData
-from ..data_objects import MetaData, DisplayData
+from ..data_objects import MetaData, DisplayData, DTypePolicy
 from ..exceptions import InputDataError
 from .cellpack_data import HAND_TYPE, CellpackData
 
@@ -278,9 +278,10 @@ class CellpackConverter(TrajectoryConverter):
         geometry_url: str,
         display_data,
         scale_factor: float = None,
+        dtype_policy: DTypePolicy = None,
     ) -> Tuple[AgentData, float]:
         dimensions = CellpackConverter._parse_dimensions(all_ingredients)
-        spatial_data = AgentData.from_dimensions(dimensions)
+        spatial_data = AgentData.from_dimensions(dimensions, dtype_policy=dtype_policy)
         display_data = {} if display_data is None else display_data
         agent_id_counter = 0
         total_agents = 0
@@ -390,6 +391,7 @@ class CellpackConverter(TrajectoryConverter):
             input_data.geometry_url,
             input_data.display_data,
             input_data.meta_data.scale_factor,
+            input_data.dtype_policy,
         )
         # parse
         box_size = np.array(CellpackConverter._get_boxsize(recipe_data))
@@ -5,7 +5,13 @@ from enum import Enum
 import logging
 from typing import Any, Dict, List
 
-from ..data_objects import MetaData, UnitData, DisplayData, InputFileData
+from ..data_objects import (
+    MetaData,
+    UnitData,
+    DisplayData,
+    InputFileData,
+    DTypePolicy,
+)
 from ..constants import DISPLAY_TYPE
 
 ###############################################################################
@@ -31,6 +37,7 @@ class CellpackData:
     plots: List[Dict[str, Any]]
     handedness: HAND_TYPE
     geometry_url: str
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -44,6 +51,7 @@ class CellpackData:
         plots: List[Dict[str, Any]] = None,
         handedness: HAND_TYPE = HAND_TYPE.RIGHT,
         geometry_url: str = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -87,6 +95,11 @@ class CellpackData:
         geometry_url: str (optional)
             The base URL for all geometry files
             Default: https://raw.githubusercontent.com/mesoscope/cellPACK_data/master/cellPACK_database_1.1.0/geometries/  # noqa: E501
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.results_file = results_file
         self.recipe_file_path = recipe_file_path
@@ -100,3 +113,4 @@ class CellpackData:
         self.plots = plots if plots is not None else []
         self.handedness = handedness
         self.geometry_url = geometry_url
+        self.dtype_policy = dtype_policy
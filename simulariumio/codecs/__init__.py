@@ -0,0 +1,11 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from .binary_frame_codec import BinaryFrameCodec  # noqa: F401
+from .binary_plot_codec import BinaryPlotCodec  # noqa: F401
+from .keyframe_delta_codec import (  # noqa: F401
+    KeyframeDeltaCodec,
+    KeyframeDeltaEncoder,
+    KeyframeDeltaDecoder,
+)
+from .quantized_frame_codec import QuantizedFrameCodec  # noqa: F401
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import lzma
+import struct
+import zlib
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from ..constants import BINARY_SETTINGS, BINARY_COMPRESSION
+from ..exceptions import DataError
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class BinaryFrameCodec:
+    @staticmethod
+    def compress(
+        frame_buffer: bytes, compression: BINARY_COMPRESSION
+    ) -> Tuple[int, bytes]:
+        """
+        Compress a frame's float32 buffer with the requested codec.
+        Return the codec used and the compressed bytes,
+        the buffer is kept uncompressed if compressing doesn't shrink it
+        """
+        if compression == BINARY_COMPRESSION.ZLIB:
+            payload = zlib.compress(frame_buffer)
+        elif compression == BINARY_COMPRESSION.LZMA:
+            payload = lzma.compress(frame_buffer)
+        elif compression == BINARY_COMPRESSION.NONE:
+            return BINARY_COMPRESSION.NONE.value, frame_buffer
+        else:
+            raise DataError(f"Binary compression {compression} is not supported")
+        if len(payload) >= len(frame_buffer):
+            return BINARY_COMPRESSION.NONE.value, frame_buffer
+        return compression.value, payload
+
+    @staticmethod
+    def decompress(codec: int, payload: bytes) -> bytes:
+        """
+        Decompress a frame's float32 buffer
+        """
+        if codec == BINARY_COMPRESSION.NONE.value:
+            return bytes(payload)
+        if codec == BINARY_COMPRESSION.ZLIB.value:
+            return zlib.decompress(payload)
+        if codec == BINARY_COMPRESSION.LZMA.value:
+            return lzma.decompress(payload)
+        raise DataError(f"Binary frame codec = {codec} is not supported")
+
+    @staticmethod
+    def pack_payload(
+        header_values: List[Union[int, float]],
+        payload: bytes,
+        compression: BINARY_COMPRESSION,
+    ) -> bytes:
+        """
+        Compress a frame's payload and pack it after the frame header values
+        (frame number, time, number of agents, and any others),
+        followed by the codec and the number of compressed bytes
+        """
+        codec, payload = BinaryFrameCodec.compress(payload, compression)
+        # pad to 4 byte boundary with zeros
+        remainder = len(payload) % BINARY_SETTINGS.BLOCK_OFFSET_BYTE_ALIGNMENT
+        padding = (
+            BINARY_SETTINGS.BLOCK_OFFSET_BYTE_ALIGNMENT - remainder
+            if remainder > 0
+            else 0
+        )
+        header_format = "<IfI" + (len(header_values) - 3) * "I" + "II"
+        return (
+            struct.pack(header_format, *header_values, codec, len(payload))
+            + payload
+            + bytes(padding)
+        )
+
+    @staticmethod
+    def unpack_payload(
+        frame_bytes: Union[bytes, memoryview],
+        header_n_values: int = BINARY_SETTINGS.COMPRESSED_FRAME_HEADER_N_VALUES,
+    ) -> bytes:
+        """
+        Decompress the payload of a frame packed with pack_payload
+        """
+        header_n_bytes = header_n_values * BINARY_SETTINGS.BYTES_PER_VALUE
+        codec, payload_n_bytes = struct.unpack(
+            "<II", frame_bytes[header_n_bytes - 8 : header_n_bytes]
+        )
+        return BinaryFrameCodec.decompress(
+            codec, frame_bytes[header_n_bytes : header_n_bytes + payload_n_bytes]
+        )
+
+    @staticmethod
+    def encode_frame(
+        chunk_frame_index: int,
+        time: float,
+        n_agents: int,
+        frame_buffer: np.ndarray,
+        compression: BINARY_COMPRESSION,
+    ) -> bytes:
+        """
+        Pack a frame's header and float32 buffer into bytes,
+        for a SPATIAL_DATA_BINARY_COMPRESSED block
+        if compression is not BINARY_COMPRESSION.NONE
+        """
+        buffer_bytes = np.asarray(frame_buffer, dtype="<f4").tobytes()
+        if compression == BINARY_COMPRESSION.NONE:
+            return (
+                struct.pack("<IfI", int(chunk_frame_index), float(time), int(n_agents))
+                + buffer_bytes
+            )
+        return BinaryFrameCodec.pack_payload(
+            [int(chunk_frame_index), float(time), int(n_agents)],
+            buffer_bytes,
+            compression,
+        )
+
+    @staticmethod
+    def decode_frame(frame_bytes: Union[bytes, memoryview]) -> bytes:
+        """
+        Unpack a frame from a SPATIAL_DATA_BINARY_COMPRESSED block
+        into the bytes of an uncompressed frame:
+        frame number, time, number of agents, and the float32 buffer
+        """
+        frame_buffer = BinaryFrameCodec.unpack_payload(frame_bytes)
+        if len(frame_buffer) % BINARY_SETTINGS.BYTES_PER_VALUE != 0:
+            raise DataError(
+                f"Decompressed frame has {len(frame_buffer)} bytes, "
+                f"expected a multiple of {BINARY_SETTINGS.BYTES_PER_VALUE}"
+            )
+        frame_header_n_bytes = (
+            BINARY_SETTINGS.FRAME_HEADER_N_VALUES * BINARY_SETTINGS.BYTES_PER_VALUE
+        )
+        return bytes(frame_bytes[:frame_header_n_bytes]) + frame_buffer
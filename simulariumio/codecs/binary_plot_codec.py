@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import struct
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+
+from ..constants import BINARY_SETTINGS
+from ..exceptions import DataError
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class BinaryPlotCodec:
+    # Key of the placeholder for a typed array in the JSON header
+    ARRAY_KEY: str = "typedArray"
+    MAX_INT32: int = 2147483647
+
+    @staticmethod
+    def _padding(n_bytes: int) -> bytes:
+        """
+        Get zeros to pad a number of bytes to the block alignment
+        """
+        remainder = n_bytes % BINARY_SETTINGS.BLOCK_OFFSET_BYTE_ALIGNMENT
+        if remainder == 0:
+            return b""
+        return bytes(BINARY_SETTINGS.BLOCK_OFFSET_BYTE_ALIGNMENT - remainder)
+
+    @staticmethod
+    def _typed_array(value: List[Any]) -> np.ndarray:
+        """
+        Get a list of numbers as the smallest typed array
+        that holds the values exactly: int32 or int64 for integers,
+        float32 or float64 for floats.
+        Return None if the list isn't a flat list of numbers
+        """
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            return None
+        if array.ndim != 1:
+            return None
+        if array.dtype.kind in "iu":
+            if len(array) == 0 or (
+                np.min(array) >= -BinaryPlotCodec.MAX_INT32 - 1
+                and np.max(array) <= BinaryPlotCodec.MAX_INT32
+            ):
+                return array.astype("<i4")
+            return array.astype("<i8")
+        if array.dtype.kind == "f":
+            with np.errstate(over="ignore"):
+                array32 = array.astype("<f4")
+            if np.array_equal(array32, array, equal_nan=True):
+                return array32
+            return array.astype("<f8")
+        return None
+
+    @staticmethod
+    def _extract_arrays(value: Any, arrays: List[np.ndarray]) -> Any:
+        """
+        Replace each list of numbers in the plot data with a placeholder
+        holding its index in arrays
+        """
+        if isinstance(value, dict):
+            return {
+                key: BinaryPlotCodec._extract_arrays(item, arrays)
+                for key, item in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            array = BinaryPlotCodec._typed_array(value) if len(value) > 0 else None
+            if array is not None:
+                arrays.append(array)
+                return {BinaryPlotCodec.ARRAY_KEY: len(arrays) - 1}
+            return [BinaryPlotCodec._extract_arrays(item, arrays) for item in value]
+        return value
+
+    @staticmethod
+    def _insert_arrays(value: Any, arrays: List[List[Any]]) -> Any:
+        """
+        Replace each placeholder in the plot data with its list of numbers
+        """
+        if isinstance(value, dict):
+            if len(value) == 1 and BinaryPlotCodec.ARRAY_KEY in value:
+                return arrays[value[BinaryPlotCodec.ARRAY_KEY]]
+            return {
+                key: BinaryPlotCodec._insert_arrays(item, arrays)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [BinaryPlotCodec._insert_arrays(item, arrays) for item in value]
+        return value
+
+    @staticmethod
+    def encode(plot_data: Dict[str, Any]) -> bytes:
+        """
+        Encode plot data for a PLOT_DATA_BINARY block:
+        the number of bytes in a JSON header, the JSON header,
+        then each numeric trace as a typed array.
+        The header holds the plot data with each trace replaced
+        by a placeholder, and the dtype and length of each array.
+        Each part is padded to 4 bytes
+        """
+        arrays: List[np.ndarray] = []
+        header = BinaryPlotCodec._extract_arrays(plot_data, arrays)
+        header_bytes = json.dumps(
+            {
+                "plotData": header,
+                "arrays": [[array.dtype.str, len(array)] for array in arrays],
+            }
+        ).encode("utf-8")
+        result = [
+            struct.pack("<I", len(header_bytes)),
+            header_bytes,
+            BinaryPlotCodec._padding(len(header_bytes)),
+        ]
+        for array in arrays:
+            array_bytes = array.tobytes()
+            result += [array_bytes, BinaryPlotCodec._padding(len(array_bytes))]
+        return b"".join(result)
+
+    @staticmethod
+    def _array_layout(
+        header: Dict[str, Any], first_offset: int
+    ) -> List[Tuple[np.dtype, int, int]]:
+        """
+        Get the dtype, length and byte offset of each array in the block
+        """
+        result = []
+        offset = first_offset
+        for dtype, length in header["arrays"]:
+            dtype = np.dtype(dtype)
+            result.append((dtype, length, offset))
+            n_bytes = dtype.itemsize * length
+            offset += n_bytes + len(BinaryPlotCodec._padding(n_bytes))
+        return result
+
+    @staticmethod
+    def decode(block_bytes: Union[bytes, memoryview]) -> Dict[str, Any]:
+        """
+        Decode plot data from the contents of a PLOT_DATA_BINARY block
+        """
+        (header_n_bytes,) = struct.unpack("<I", block_bytes[:4])
+        header_end = 4 + header_n_bytes
+        header = json.loads(bytes(block_bytes[4:header_end]).decode("utf-8"))
+        first_offset = header_end + len(BinaryPlotCodec._padding(header_n_bytes))
+        arrays = []
+        for dtype, length, offset in BinaryPlotCodec._array_layout(
+            header, first_offset
+        ):
+            if offset + dtype.itemsize * length > len(block_bytes):
+                raise DataError("Binary plot data block is shorter than its arrays")
+            arrays.append(
+                np.frombuffer(
+                    block_bytes, dtype=dtype, count=length, offset=offset
+                ).tolist()
+            )
+        return BinaryPlotCodec._insert_arrays(header["plotData"], arrays)
@@ -0,0 +1,448 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import struct
+from typing import Callable, Tuple, Union
+
+import numpy as np
+
+from ..constants import BINARY_SETTINGS, BINARY_COMPRESSION, V1_SPATIAL_BUFFER_STRUCT
+from ..exceptions import DataError
+from .binary_frame_codec import BinaryFrameCodec
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class KeyframeDeltaCodec:
+    # Bits in the field mask of each agent in a delta frame
+    POSITION: int = 1
+    ROTATION: int = 2
+    RADIUS: int = 4
+    SUBPOINTS: int = 8
+    # the agent's changed values are stored as float32 instead of int16 deltas
+    ABSOLUTE: int = 16
+    # The largest quantized delta that fits in an int16
+    MAX_DELTA: int = 32767
+
+    @staticmethod
+    def _agent_layout(frame_buffer: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the offset and number of subpoints for each agent in a V1 buffer,
+        or None if the agents don't exactly fill the buffer
+        """
+        offsets = []
+        offset = 0
+        while offset + V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT <= len(
+            frame_buffer
+        ):
+            n_subpoints = int(frame_buffer[offset + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX])
+            if n_subpoints < 0:
+                return None
+            offsets.append(offset)
+            offset += V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT + n_subpoints
+        if offset != len(frame_buffer):
+            return None
+        offsets = np.array(offsets, dtype=np.int64)
+        n_subpoints = frame_buffer[offsets + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX].astype(
+            np.int64
+        )
+        return offsets, n_subpoints
+
+    @staticmethod
+    def _structure_indices(offsets: np.ndarray) -> np.ndarray:
+        """
+        Get the indices in a V1 buffer of the values that must match
+        for one frame to be a delta of another:
+        visualization type, unique ID, type ID, and number of subpoints
+        """
+        return np.concatenate(
+            [
+                offsets + V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.TID_INDEX,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX,
+            ]
+        )
+
+    @staticmethod
+    def _field_indices(
+        offsets: np.ndarray, n_subpoints: np.ndarray, masks: np.ndarray
+    ) -> np.ndarray:
+        """
+        Get the indices in a V1 buffer of the values in each agent's
+        masked fields, in buffer order
+        """
+        xyz = np.arange(3)
+        result = [
+            offsets[(masks & KeyframeDeltaCodec.POSITION) > 0][:, np.newaxis]
+            + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX
+            + xyz,
+            offsets[(masks & KeyframeDeltaCodec.ROTATION) > 0][:, np.newaxis]
+            + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX
+            + xyz,
+            offsets[(masks & KeyframeDeltaCodec.RADIUS) > 0]
+            + V1_SPATIAL_BUFFER_STRUCT.R_INDEX,
+        ]
+        has_subpoints = (masks & KeyframeDeltaCodec.SUBPOINTS) > 0
+        subpoint_counts = n_subpoints[has_subpoints]
+        subpoint_starts = offsets[has_subpoints] + V1_SPATIAL_BUFFER_STRUCT.SP_INDEX
+        # index of each subpoint within its agent
+        subpoint_ranks = np.arange(np.sum(subpoint_counts)) - np.repeat(
+            np.cumsum(subpoint_counts) - subpoint_counts, subpoint_counts
+        )
+        result.append(np.repeat(subpoint_starts, subpoint_counts) + subpoint_ranks)
+        return np.sort(np.concatenate([indices.ravel() for indices in result]))
+
+    @staticmethod
+    def _changed_field_masks(
+        offsets: np.ndarray, n_subpoints: np.ndarray, changed_values: np.ndarray
+    ) -> np.ndarray:
+        """
+        Get a mask for each agent of the fields that have any changed values
+        """
+        cumulative = np.concatenate([[0], np.cumsum(changed_values)])
+        masks = np.zeros(len(offsets), dtype=np.uint32)
+        for field, start, end in [
+            (
+                KeyframeDeltaCodec.POSITION,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX + 3,
+            ),
+            (
+                KeyframeDeltaCodec.ROTATION,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX + 3,
+            ),
+            (
+                KeyframeDeltaCodec.RADIUS,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.R_INDEX,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.R_INDEX + 1,
+            ),
+            (
+                KeyframeDeltaCodec.SUBPOINTS,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.SP_INDEX,
+                offsets + V1_SPATIAL_BUFFER_STRUCT.SP_INDEX + n_subpoints,
+            ),
+        ]:
+            masks[cumulative[end] > cumulative[start]] |= field
+        return masks
+
+    @staticmethod
+    def _apply_delta(
+        previous_buffer: np.ndarray,
+        quantized_indices: np.ndarray,
+        quantized_deltas: np.ndarray,
+        step: np.float32,
+        absolute_indices: np.ndarray,
+        absolute_values: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Reconstruct a frame's float32 buffer from the previous frame.
+        The encoder uses this too, so encoder and decoder
+        reconstruct exactly the same values
+        """
+        result = np.copy(previous_buffer)
+        result[quantized_indices] = previous_buffer[quantized_indices] + (
+            quantized_deltas.astype(np.float32) * step
+        )
+        result[absolute_indices] = absolute_values
+        return result
+
+
+class KeyframeDeltaEncoder:
+    def __init__(
+        self,
+        keyframe_interval: int,
+        precision: float = BINARY_SETTINGS.DEFAULT_DELTA_PRECISION,
+        compression: BINARY_COMPRESSION = BINARY_COMPRESSION.NONE,
+    ):
+        """
+        Encode consecutive frames of a chunk as keyframes
+        at multiples of keyframe_interval, and as quantized deltas
+        from the previous frame in between.
+        Deltas are taken from the reconstructed previous frame,
+        so errors don't accumulate along a chain of deltas.
+        A keyframe is written instead of a delta if the agents' structure
+        changes or if the delta wouldn't be smaller
+
+        Parameters
+        ----------
+        keyframe_interval: int
+            write a keyframe at least every keyframe_interval frames
+        precision: float (optional)
+            maximum error of values in delta frames, in spatial units
+            Default: BINARY_SETTINGS.DEFAULT_DELTA_PRECISION
+        compression: BINARY_COMPRESSION (optional)
+            codec to compress each frame's payload with
+            Default: BINARY_COMPRESSION.NONE
+        """
+        if keyframe_interval < 1:
+            raise DataError("keyframe_interval must be at least 1")
+        if precision <= 0:
+            raise DataError("delta precision must be greater than 0")
+        self.keyframe_interval = keyframe_interval
+        self.compression = compression
+        self.step = np.float32(2.0 * precision)
+        self.precision = precision
+        self.keyframe_index = -1
+        self.layout = None
+        self.structure_indices = None
+        self.duplicate_uids = None
+        self.previous_buffer = None
+
+    def _keyframe(self, chunk_frame_index: int, frame_buffer: np.ndarray) -> bytes:
+        """
+        Start a new chain of deltas at this frame
+        """
+        self.keyframe_index = chunk_frame_index
+        self.previous_buffer = frame_buffer
+        self.layout = KeyframeDeltaCodec._agent_layout(frame_buffer)
+        if self.layout is not None:
+            offsets = self.layout[0]
+            self.structure_indices = KeyframeDeltaCodec._structure_indices(offsets)
+            uids, counts = np.unique(
+                frame_buffer[offsets + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX],
+                return_counts=True,
+            )
+            self.duplicate_uids = uids[counts > 1]
+        return frame_buffer.tobytes()
+
+    def _delta(self, frame_buffer: np.ndarray) -> Union[bytes, None]:
+        """
+        Get the delta payload from the previous frame,
+        or None if the frame can't be a delta
+        """
+        if self.layout is None or len(frame_buffer) != len(self.previous_buffer):
+            return None
+        if not np.array_equal(
+            frame_buffer[self.structure_indices].view(np.uint32),
+            self.previous_buffer[self.structure_indices].view(np.uint32),
+        ):
+            return None
+        offsets, n_subpoints = self.layout
+        difference = frame_buffer.astype(np.float64) - self.previous_buffer
+        masks = KeyframeDeltaCodec._changed_field_masks(
+            offsets, n_subpoints, np.abs(difference) > self.precision
+        )
+        changed = masks > 0
+        offsets = offsets[changed]
+        n_subpoints = n_subpoints[changed]
+        masks = masks[changed]
+        uids = frame_buffer[offsets + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX]
+        if np.any(np.isin(uids, self.duplicate_uids)):
+            return None
+        # agents with deltas too large for an int16 store float32 values
+        indices = KeyframeDeltaCodec._field_indices(offsets, n_subpoints, masks)
+        deltas = np.round(difference[indices] / self.step)
+        too_large = np.abs(deltas) > KeyframeDeltaCodec.MAX_DELTA
+        if np.any(too_large):
+            agent_indices = np.searchsorted(offsets, indices[too_large], side="right")
+            masks[np.unique(agent_indices - 1)] |= KeyframeDeltaCodec.ABSOLUTE
+        absolute = (masks & KeyframeDeltaCodec.ABSOLUTE) > 0
+        absolute_indices = KeyframeDeltaCodec._field_indices(
+            offsets[absolute], n_subpoints[absolute], masks[absolute]
+        )
+        quantized_indices = KeyframeDeltaCodec._field_indices(
+            offsets[~absolute], n_subpoints[~absolute], masks[~absolute]
+        )
+        quantized_deltas = np.round(difference[quantized_indices] / self.step).astype(
+            "<i2"
+        )
+        absolute_values = frame_buffer[absolute_indices]
+        self.previous_buffer = KeyframeDeltaCodec._apply_delta(
+            self.previous_buffer,
+            quantized_indices,
+            quantized_deltas,
+            self.step,
+            absolute_indices,
+            absolute_values,
+        )
+        return b"".join(
+            [
+                struct.pack("<If", len(uids), self.step),
+                uids.astype("<f4").tobytes(),
+                masks.astype("<u4").tobytes(),
+                absolute_values.astype("<f4").tobytes(),
+                quantized_deltas.tobytes(),
+            ]
+        )
+
+    def encode_frame(
+        self,
+        chunk_frame_index: int,
+        time: float,
+        n_agents: int,
+        frame_buffer: np.ndarray,
+    ) -> bytes:
+        """
+        Pack a frame's header and either its float32 buffer for a keyframe,
+        or the delta from the previous frame, into bytes
+        """
+        frame_buffer = np.asarray(frame_buffer, dtype="<f4")
+        payload = None
+        # keyframes are always at multiples of keyframe_interval,
+        # so encoding can start from any of them
+        if chunk_frame_index % self.keyframe_interval > 0:
+            payload = self._delta(frame_buffer)
+            if payload is not None and len(payload) >= frame_buffer.nbytes:
+                # the keyframe is smaller
+                payload = None
+        if payload is None:
+            payload = self._keyframe(chunk_frame_index, frame_buffer)
+        return BinaryFrameCodec.pack_payload(
+            [
+                int(chunk_frame_index),
+                float(time),
+                int(n_agents),
+                self.keyframe_index,
+            ],
+            payload,
+            self.compression,
+        )
+
+
+class KeyframeDeltaDecoder:
+    def __init__(self):
+        """
+        Decode frames written by a KeyframeDeltaEncoder
+        back into uncompressed frames.
+        Frames must be decoded in order starting from a keyframe
+        """
+        self.frame_index = -1
+        self.keyframe_index = -1
+        self.layout = None
+        self.uid_agent_indices = {}
+        self.frame_header = None
+        self.frame_buffer = None
+
+    @staticmethod
+    def keyframe_index_for_frame(frame_bytes: Union[bytes, memoryview]) -> int:
+        """
+        Get the index of the keyframe a frame's delta chain starts from
+        """
+        return struct.unpack("<I", frame_bytes[12:16])[0]
+
+    def decode_frame(self, frame_bytes: Union[bytes, memoryview]) -> bytes:
+        """
+        Decode the next frame into the bytes of an uncompressed frame:
+        frame number, time, number of agents, and the float32 buffer
+        """
+        frame_index, keyframe_index = struct.unpack("<I8xI", frame_bytes[:16])
+        payload = BinaryFrameCodec.unpack_payload(
+            frame_bytes, BINARY_SETTINGS.DELTA_FRAME_HEADER_N_VALUES
+        )
+        if keyframe_index == frame_index:
+            self.keyframe_index = keyframe_index
+            self.layout = None
+            self.frame_buffer = np.frombuffer(payload, dtype="<f4")
+        else:
+            if (
+                keyframe_index != self.keyframe_index
+                or frame_index != self.frame_index + 1
+            ):
+                raise DataError(
+                    f"Frame {frame_index} is a delta in the chain from "
+                    f"keyframe {keyframe_index}, but the last decoded frame "
+                    f"was {self.frame_index}. Decode frames in order "
+                    "from the keyframe"
+                )
+            self.frame_buffer = self._apply_delta_payload(payload)
+        self.frame_index = frame_index
+        self.frame_header = bytes(
+            frame_bytes[
+                : BINARY_SETTINGS.FRAME_HEADER_N_VALUES
+                * BINARY_SETTINGS.BYTES_PER_VALUE
+            ]
+        )
+        return self.frame_header + self.frame_buffer.tobytes()
+
+    def decode_frame_at(
+        self,
+        frame_index: int,
+        get_frame_bytes: Callable[[int], Union[bytes, memoryview]],
+    ) -> bytes:
+        """
+        Decode the frame at an index in the block, in any order,
+        by applying the deltas from its keyframe,
+        continuing from the last decoded frame if it is in the same chain
+
+        Parameters
+        ----------
+        frame_index: int
+            index of the frame in the spatial data block
+        get_frame_bytes: Callable[[int], Union[bytes, memoryview]]
+            function to get the encoded bytes of a frame given its index
+        """
+        if self.frame_index == frame_index:
+            return self.frame_header + self.frame_buffer.tobytes()
+        keyframe_index = KeyframeDeltaDecoder.keyframe_index_for_frame(
+            get_frame_bytes(frame_index)
+        )
+        first_index = keyframe_index
+        if keyframe_index <= self.frame_index < frame_index:
+            first_index = self.frame_index + 1
+        for index in range(first_index, frame_index + 1):
+            result = self.decode_frame(get_frame_bytes(index))
+        return result
+
+    def _apply_delta_payload(self, payload: bytes) -> np.ndarray:
+        """
+        Reconstruct a frame's float32 buffer
+        from a delta payload and the previous frame
+        """
+        if self.layout is None:
+            self.layout = KeyframeDeltaCodec._agent_layout(self.frame_buffer)
+            if self.layout is None:
+                raise DataError(
+                    f"Keyframe {self.keyframe_index} can't be parsed into agents"
+                )
+            offsets = self.layout[0]
+            self.uid_agent_indices = dict(
+                zip(
+                    self.frame_buffer[
+                        offsets + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX
+                    ].tolist(),
+                    range(len(offsets)),
+                )
+            )
+        offsets, n_subpoints = self.layout
+        n_changed, step = struct.unpack("<If", payload[:8])
+        position = 8
+        uids = np.frombuffer(payload, dtype="<f4", count=n_changed, offset=position)
+        position += 4 * n_changed
+        masks = np.frombuffer(payload, dtype="<u4", count=n_changed, offset=position)
+        position += 4 * n_changed
+        agent_indices = np.array(
+            [self.uid_agent_indices[uid] for uid in uids.tolist()], dtype=np.int64
+        )
+        absolute = (masks & KeyframeDeltaCodec.ABSOLUTE) > 0
+        absolute_indices = KeyframeDeltaCodec._field_indices(
+            offsets[agent_indices[absolute]],
+            n_subpoints[agent_indices[absolute]],
+            masks[absolute],
+        )
+        quantized_indices = KeyframeDeltaCodec._field_indices(
+            offsets[agent_indices[~absolute]],
+            n_subpoints[agent_indices[~absolute]],
+            masks[~absolute],
+        )
+        absolute_values = np.frombuffer(
+            payload, dtype="<f4", count=len(absolute_indices), offset=position
+        )
+        position += 4 * len(absolute_indices)
+        quantized_deltas = np.frombuffer(
+            payload, dtype="<i2", count=len(quantized_indices), offset=position
+        )
+        return KeyframeDeltaCodec._apply_delta(
+            self.frame_buffer,
+            quantized_indices,
+            quantized_deltas,
+            np.float32(step),
+            absolute_indices,
+            absolute_values,
+        )
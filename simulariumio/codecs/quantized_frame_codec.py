@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Union
+
+import numpy as np
+
+from ..constants import BINARY_SETTINGS, BINARY_COMPRESSION, V1_SPATIAL_BUFFER_STRUCT
+from ..exceptions import DataError
+from .binary_frame_codec import BinaryFrameCodec
+from .keyframe_delta_codec import KeyframeDeltaCodec
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class QuantizedFrameCodec:
+    # The largest magnitude of a quantized position or subpoint value
+    MAX_QUANTIZED: int = 32767
+    # The largest unsigned 16 bit value, for viz types, type IDs
+    # and numbers of subpoints
+    MAX_UINT16: int = 65535
+
+    @staticmethod
+    def quantization_scale(
+        frame_buffer: np.ndarray,
+        positions: np.ndarray,
+        subpoints: np.ndarray,
+        box_size: np.ndarray,
+    ) -> float:
+        """
+        Get the size of one fixed point step for a frame, so that the box
+        and every position and subpoint value fit in 16 bits.
+        The box is centered at the origin
+        """
+        box_size = np.asarray(box_size, dtype=float)
+        box_size = box_size[np.isfinite(box_size)]
+        extent = max(
+            0.5 * float(np.max(box_size)) if len(box_size) > 0 else 0.0,
+            float(np.max(np.abs(frame_buffer[positions]))) if len(positions) else 0.0,
+            float(np.max(np.abs(frame_buffer[subpoints]))) if len(subpoints) else 0.0,
+        )
+        if extent == 0:
+            return 1.0
+        return float(np.float32(extent / QuantizedFrameCodec.MAX_QUANTIZED))
+
+    @staticmethod
+    def _subpoint_indices(offsets: np.ndarray, n_subpoints: np.ndarray) -> np.ndarray:
+        """
+        Get the indices in a V1 buffer of every agent's subpoint values
+        """
+        subpoint_ranks = np.arange(np.sum(n_subpoints)) - np.repeat(
+            np.cumsum(n_subpoints) - n_subpoints, n_subpoints
+        )
+        return (
+            np.repeat(offsets + V1_SPATIAL_BUFFER_STRUCT.SP_INDEX, n_subpoints)
+            + subpoint_ranks
+        )
+
+    @staticmethod
+    def quantize(
+        frame_buffer: np.ndarray,
+        n_agents: int,
+        box_size: np.ndarray,
+        precision: float = None,
+    ) -> bytes:
+        """
+        Pack a frame's V1 float32 buffer into the quantized layout:
+        the number of agents in the buffer as a uint32
+        (which includes any spheres drawn at fiber points),
+        the fixed point scale as a float32, then for all agents
+        unique IDs as uint32; viz types, type IDs and numbers of subpoints
+        as uint16; positions as int16 fixed point; rotations and radii
+        as float16; and subpoint values as int16 fixed point
+
+        Parameters
+        ----------
+        frame_buffer: np.ndarray
+            the frame's values in the V1 layout
+        n_agents: int
+            the number of agents in the frame
+        box_size: np.ndarray
+            the size of the trajectory's bounding box
+        precision: float (optional)
+            the maximum error of positions and subpoints, in spatial units.
+            A DataError is raised if 16 bits can't store the frame's
+            values this precisely
+            Default: None (no bound)
+        """
+        frame_buffer = np.asarray(frame_buffer, dtype=np.float32)
+        if len(frame_buffer) == 0:
+            return b""
+        layout = KeyframeDeltaCodec._agent_layout(frame_buffer)
+        if layout is None:
+            raise DataError(
+                f"Frame buffer for {n_agents} agents "
+                "is not in the V1 layout, can't quantize it"
+            )
+        offsets, n_subpoints = layout
+        positions = (
+            offsets[:, np.newaxis] + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX + np.arange(3)
+        ).ravel()
+        rotations = (
+            offsets[:, np.newaxis] + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX + np.arange(3)
+        ).ravel()
+        subpoints = QuantizedFrameCodec._subpoint_indices(offsets, n_subpoints)
+        for name, indices in [("positions", positions), ("subpoints", subpoints)]:
+            if not np.all(np.isfinite(frame_buffer[indices])):
+                raise DataError(f"Can't quantize {name} that are NaN or infinite")
+        scale = QuantizedFrameCodec.quantization_scale(
+            frame_buffer, positions, subpoints, box_size
+        )
+        if precision is not None and 0.5 * scale > precision:
+            raise DataError(
+                f"Quantizing to 16 bits has error up to {0.5 * scale}, "
+                f"more than the requested precision of {precision}"
+            )
+        integer_fields = {
+            "viz types": frame_buffer[
+                offsets + V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX
+            ],
+            "type IDs": frame_buffer[offsets + V1_SPATIAL_BUFFER_STRUCT.TID_INDEX],
+            "numbers of subpoints": n_subpoints,
+        }
+        for name, values in integer_fields.items():
+            if np.any(values < 0) or np.any(values > QuantizedFrameCodec.MAX_UINT16):
+                raise DataError(
+                    f"Quantized frames store {name} in 16 bits, "
+                    f"found values outside 0 to {QuantizedFrameCodec.MAX_UINT16}"
+                )
+        float16_indices = np.concatenate(
+            [rotations, offsets + V1_SPATIAL_BUFFER_STRUCT.R_INDEX]
+        )
+        float16_values = frame_buffer[float16_indices].astype("<f2")
+        if np.any(
+            np.isinf(float16_values) & np.isfinite(frame_buffer[float16_indices])
+        ):
+            raise DataError("Rotations and radii are too large to store as float16")
+        step = np.float32(scale)
+        return b"".join(
+            [
+                np.array([len(offsets)], dtype="<u4").tobytes(),
+                np.array([step], dtype="<f4").tobytes(),
+                frame_buffer[offsets + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX]
+                .astype("<u4")
+                .tobytes(),
+                integer_fields["viz types"].astype("<u2").tobytes(),
+                integer_fields["type IDs"].astype("<u2").tobytes(),
+                n_subpoints.astype("<u2").tobytes(),
+                np.rint(frame_buffer[positions] / step).astype("<i2").tobytes(),
+                float16_values.tobytes(),
+                np.rint(frame_buffer[subpoints] / step).astype("<i2").tobytes(),
+            ]
+        )
+
+    @staticmethod
+    def dequantize(payload: Union[bytes, memoryview]) -> np.ndarray:
+        """
+        Unpack a frame's quantized payload into a V1 float32 buffer
+        """
+        if len(payload) == 0:
+            return np.zeros(0, dtype=np.float32)
+        n_agents = int(np.frombuffer(payload, dtype="<u4", count=1)[0])
+        values = {}
+        offset = BINARY_SETTINGS.BYTES_PER_VALUE
+        for name, dtype, n_values in [
+            ("scale", "<f4", 1),
+            ("uids", "<u4", n_agents),
+            ("viz_types", "<u2", n_agents),
+            ("type_ids", "<u2", n_agents),
+            ("n_subpoints", "<u2", n_agents),
+            ("positions", "<i2", 3 * n_agents),
+            ("rotations", "<f2", 3 * n_agents),
+            ("radii", "<f2", n_agents),
+        ]:
+            values[name] = np.frombuffer(
+                payload, dtype=dtype, count=n_values, offset=offset
+            )
+            offset += n_values * np.dtype(dtype).itemsize
+        n_subpoints = values["n_subpoints"].astype(np.int64)
+        values["subpoints"] = np.frombuffer(
+            payload, dtype="<i2", count=int(np.sum(n_subpoints)), offset=offset
+        )
+        step = values["scale"][0]
+        offsets = (
+            V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT * np.arange(n_agents)
+            + np.cumsum(n_subpoints)
+            - n_subpoints
+        )
+        result = np.zeros(
+            V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT * n_agents
+            + int(np.sum(n_subpoints)),
+            dtype=np.float32,
+        )
+        result[offsets + V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX] = values["viz_types"]
+        result[offsets + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX] = values["uids"]
+        result[offsets + V1_SPATIAL_BUFFER_STRUCT.TID_INDEX] = values["type_ids"]
+        xyz = np.arange(3)
+        result[
+            (offsets[:, np.newaxis] + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX + xyz).ravel()
+        ] = (values["positions"].astype(np.float32) * step)
+        result[
+            (offsets[:, np.newaxis] + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX + xyz).ravel()
+        ] = values["rotations"]
+        result[offsets + V1_SPATIAL_BUFFER_STRUCT.R_INDEX] = values["radii"]
+        result[offsets + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX] = n_subpoints
+        result[QuantizedFrameCodec._subpoint_indices(offsets, n_subpoints)] = (
+            values["subpoints"].astype(np.float32) * step
+        )
+        return result
+
+    @staticmethod
+    def encode_frame(
+        chunk_frame_index: int,
+        time: float,
+        n_agents: int,
+        frame_buffer: np.ndarray,
+        box_size: np.ndarray,
+        precision: float = None,
+        compression: BINARY_COMPRESSION = BINARY_COMPRESSION.NONE,
+    ) -> bytes:
+        """
+        Quantize a frame's float32 buffer and pack it with its header
+        for a SPATIAL_DATA_BINARY_COMPRESSED block
+        """
+        return BinaryFrameCodec.pack_payload(
+            [int(chunk_frame_index), float(time), int(n_agents)],
+            QuantizedFrameCodec.quantize(frame_buffer, n_agents, box_size, precision),
+            compression,
+        )
+
+    @staticmethod
+    def decode_frame(frame_bytes: Union[bytes, memoryview]) -> bytes:
+        """
+        Unpack a quantized frame from a SPATIAL_DATA_BINARY_COMPRESSED block
+        into the bytes of an uncompressed frame:
+        frame number, time, number of agents, and the float32 buffer
+        """
+        frame_header_n_bytes = (
+            BINARY_SETTINGS.FRAME_HEADER_N_VALUES * BINARY_SETTINGS.BYTES_PER_VALUE
+        )
+        frame_buffer = QuantizedFrameCodec.dequantize(
+            BinaryFrameCodec.unpack_payload(frame_bytes)
+        )
+        return bytes(frame_bytes[:frame_header_n_bytes]) + frame_buffer.tobytes()
@@ -106,7 +106,34 @@ class BINARY_BLOCK_TYPE(Enum):
     PLOT_DATA_JSON = 2
     SPATIAL_DATA_BINARY = 3
     # TRAJ_INFO_BINARY = 4  # coming soon
-    # PLOT_DATA_BINARY = 5  # coming soon
+    PLOT_DATA_BINARY = 5
+    SPATIAL_DATA_BINARY_COMPRESSED = 6
+
+
+class BINARY_COMPRESSION(Enum):
+    """
+    The codecs used to compress frames of spatial data
+    in a SPATIAL_DATA_BINARY_COMPRESSED block
+    """
+
+    NONE = 0
+    ZLIB = 1
+    LZMA = 2
+
+
+class VALIDATION_LEVEL(Enum):
+    """
+    How much to check trajectory data before saving it.
+    OFF skips all checks, SUBPOINTS checks that numbers of subpoints
+    match display types, FAST also checks that agent IDs fit in 32 bits,
+    and FULL also checks that agent IDs are unique in each frame
+    and that viz types and display types agree with subpoints
+    """
+
+    OFF = "off"
+    SUBPOINTS = "subpoints"
+    FAST = "fast"
+    FULL = "full"
 
 
 class BINARY_SETTINGS:
@@ -122,6 +149,16 @@ class BINARY_SETTINGS:
     )
     SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME: int = 2  # frame offsets and lengths
     FRAME_HEADER_N_VALUES: int = 3  # frame number, time stamp, number of agents
+    # frame number, time stamp, number of agents, codec, number of compressed bytes
+    COMPRESSED_FRAME_HEADER_N_VALUES: int = 5
+    # compressed frame header values and the index of the frame's keyframe
+    DELTA_FRAME_HEADER_N_VALUES: int = 6
+    # spatial data version for blocks of keyframes and quantized deltas
+    KEYFRAME_DELTA_SPATIAL_DATA_VERSION: int = 2
+    # default maximum error of values in delta frames, in spatial units
+    DEFAULT_DELTA_PRECISION: float = 1e-4
+    # spatial data version for blocks of frames in the quantized layout
+    QUANTIZED_SPATIAL_DATA_VERSION: int = 3
     BYTES_PER_VALUE: int = 4
     BLOCK_OFFSET_BYTE_ALIGNMENT: int = 4
 
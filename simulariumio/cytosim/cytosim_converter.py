@@ -12,6 +12,7 @@ from ..data_objects import (
     UnitData,
     DimensionData,
     DisplayData,
+    UniqueIDAllocator,
 )
 from ..constants import VIZ_TYPE, DISPLAY_TYPE, SUBPOINT_VALUES_PER_ITEM
 from ..exceptions import InputDataError
@@ -142,9 +143,8 @@ class CytosimConverter(TrajectoryConverter):
         time_index: int,
         object_info: CytosimObjectInfo,
         result: AgentData,
-        uids: Dict[int, int],
-        used_unique_IDs: List[int],
-    ) -> Tuple[AgentData, Dict[int, int], List[int], float]:
+        unique_id_allocator: UniqueIDAllocator,
+    ) -> AgentData:
         """
         Parse an object from Cytosim
         """
@@ -160,13 +160,9 @@ class CytosimConverter(TrajectoryConverter):
             raw_uid = int(data_columns[1].strip("+,"))
             raw_tid = int(data_columns[0].strip("+,"))
         # unique instance ID
-        if raw_uid not in uids:
-            uid = raw_uid
-            while uid in used_unique_IDs:
-                uid += 1
-            uids[raw_uid] = uid
-            used_unique_IDs.append(uid)
-        result.unique_ids[time_index][agent_index] = uids[raw_uid]
+        result.unique_ids[time_index][agent_index] = unique_id_allocator.allocate(
+            raw_uid
+        )
         # type name
         result.types[time_index].append(
             CytosimConverter._get_display_type_name_from_raw(
@@ -180,7 +176,7 @@ class CytosimConverter(TrajectoryConverter):
             and object_info.display_data[raw_tid].radius is not None
             else 1.0
         )
-        return (result, uids, used_unique_IDs)
+        return result
 
     def _parse_objects(
         self,
@@ -188,16 +184,17 @@ class CytosimConverter(TrajectoryConverter):
         data_lines: List[str],
         object_info: CytosimObjectInfo,
         result: AgentData,
-        used_unique_IDs: List[int],
+        unique_id_allocator: UniqueIDAllocator,
         overall_line: int,
         total_lines: int,
-    ) -> Tuple[Dict[str, Any], List[int], int]:
+    ) -> Tuple[Dict[str, Any], UniqueIDAllocator, int]:
         """
         Parse a Cytosim output file containing objects
         (fibers, solids, singles, or couples) to get agents
         """
         time_index = -1
-        uids = {}
+        # raw IDs are only unique within each object type
+        unique_id_allocator.clear_mapping()
         is_fiber = "fiber" in object_type
         for line in data_lines:
             overall_line += 1
@@ -213,18 +210,13 @@ class CytosimConverter(TrajectoryConverter):
                     result.times[time_index] = float(columns[2])
                 elif "fiber" in columns[1]:
                     # start of fiber object
-                    (
-                        result,
-                        uids,
-                        used_unique_IDs,
-                    ) = CytosimConverter._parse_object(
+                    result = CytosimConverter._parse_object(
                         object_type,
                         columns,
                         time_index,
                         object_info,
                         result,
-                        uids,
-                        used_unique_IDs,
+                        unique_id_allocator,
                     )
                     result.n_agents[time_index] += 1
                 continue
@@ -248,18 +240,13 @@ class CytosimConverter(TrajectoryConverter):
                 )
             else:
                 # each non-fiber object
-                (
-                    result,
-                    uids,
-                    used_unique_IDs,
-                ) = CytosimConverter._parse_object(
+                result = CytosimConverter._parse_object(
                     object_type,
                     columns,
                     time_index,
                     object_info,
                     result,
-                    uids,
-                    used_unique_IDs,
+                    unique_id_allocator,
                 )
                 # position
                 result.positions[time_index][
@@ -275,7 +262,7 @@ class CytosimConverter(TrajectoryConverter):
             self.check_report_progress(overall_line / total_lines)
         result = TrajectoryConverter.center_fiber_positions(result)
         result.n_timesteps = time_index + 1
-        return (result, used_unique_IDs, overall_line)
+        return (result, unique_id_allocator, overall_line)
 
     def _read(self, input_data: CytosimData) -> TrajectoryData:
         """
@@ -296,22 +283,24 @@ class CytosimConverter(TrajectoryConverter):
 
         # parse
         dimensions = CytosimConverter._parse_dimensions(cytosim_data)
-        agent_data = AgentData.from_dimensions(dimensions)
+        agent_data = AgentData.from_dimensions(
+            dimensions, dtype_policy=input_data.dtype_policy
+        )
         agent_data.draw_fiber_points = input_data.draw_fiber_points
         overall_line = 0
         total_lines = sum(
             len(cytosim_data[object_type]) for object_type in input_data.object_info
         )
 
-        uids = []
+        unique_id_allocator = UniqueIDAllocator()
         for object_type in input_data.object_info:
             try:
-                (agent_data, uids, overall_line) = self._parse_objects(
+                (agent_data, unique_id_allocator, overall_line) = self._parse_objects(
                     object_type,
                     cytosim_data[object_type],
                     input_data.object_info[object_type],
                     agent_data,
-                    uids,
+                    unique_id_allocator,
                     overall_line,
                     total_lines,
                 )
@@ -5,7 +5,7 @@ import logging
 from typing import Any, Dict, List
 
 from .cytosim_object_info import CytosimObjectInfo
-from ..data_objects import MetaData
+from ..data_objects import MetaData, DTypePolicy
 
 ###############################################################################
 
@@ -19,6 +19,7 @@ class CytosimData:
     meta_data: MetaData
     draw_fiber_points: bool
     plots: List[Dict[str, Any]]
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -26,6 +27,7 @@ class CytosimData:
         meta_data: MetaData = None,
         draw_fiber_points: bool = False,
         plots: List[Dict[str, Any]] = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -50,8 +52,14 @@ class CytosimData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.object_info = object_info
         self.meta_data = meta_data if meta_data is not None else MetaData()
         self.draw_fiber_points = draw_fiber_points
         self.plots = plots if plots is not None else []
+        self.dtype_policy = dtype_policy
@@ -2,17 +2,23 @@
 # -*- coding: utf-8 -*-
 
 from .agent_data import AgentData  # noqa: F401
+from .agent_data_builder import AgentDataBuilder  # noqa: F401
+from .agent_types import AgentTypes  # noqa: F401
+from .ragged_agent_data import RaggedAgentData  # noqa: F401
 from .display_data import DisplayData  # noqa: F401
 from .trajectory_data import TrajectoryData  # noqa: F401
 from .meta_data import MetaData  # noqa: F401
 from .unit_data import UnitData  # noqa: F401
 from .camera_data import CameraData  # noqa: F401
 from .dimension_data import DimensionData  # noqa: F401
+from .dtype_policy import DTypePolicy  # noqa: F401
 from .input_file_data import InputFileData  # noqa: F401
+from .unique_id_allocator import UniqueIDAllocator  # noqa: F401
 from .model_meta_data import ModelMetaData  # noqa: F401
 from .histogram_plot_data import HistogramPlotData  # noqa: F401
 from .scatter_plot_data import ScatterPlotData  # noqa: F401
 from .json_data import JsonData  # noqa: F401
 from .binary_data import BinaryData  # noqa: F401
+from .chunked_binary_data import ChunkedBinaryData  # noqa: F401
 from .simularium_file_data import SimulariumFileData  # noqa: F401
 from .frame_data import FrameData  # noqa: F401
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import copy
+import itertools
 import logging
 from typing import List, Tuple, Dict, Any, Union
 
@@ -18,8 +19,10 @@ from ..constants import (
     SUBPOINT_VALUES_PER_ITEM,
 )
 from ..exceptions import DataError
+from .agent_types import AgentTypes
 from .dimension_data import DimensionData
 from .display_data import DisplayData
+from .dtype_policy import DTypePolicy
 
 ###############################################################################
 
@@ -29,12 +32,23 @@ log = logging.getLogger(__name__)
 
 
 class AgentData:
+    # required and optional columns for from_dataframe()
+    DATAFRAME_COLUMNS: List[str] = [
+        "time",
+        "unique_id",
+        "type",
+        "positionX",
+        "positionY",
+        "positionZ",
+        "radius",
+    ]
+    DATAFRAME_ROTATION_COLUMNS: List[str] = ["rotationX", "rotationY", "rotationZ"]
     n_timesteps: int
     times: Union[np.ndarray, List[float]]
     n_agents: Union[np.ndarray, List[int]]
     viz_types: Union[np.ndarray, List[List[float]]]
     unique_ids: Union[np.ndarray, List[List[int]]]
-    types: List[List[str]]
+    types: AgentTypes
     positions: Union[np.ndarray, List[List[List[float]]]]
     radii: Union[np.ndarray, List[List[float]]]
     rotations: Union[np.ndarray, List[List[List[float]]]]
@@ -42,6 +56,7 @@ class AgentData:
     subpoints: Union[np.ndarray, List[List[List[float]]]]
     display_data: Dict[str, DisplayData]
     draw_fiber_points: bool
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -49,7 +64,7 @@ class AgentData:
         n_agents: Union[np.ndarray, List[int]],
         viz_types: Union[np.ndarray, List[List[float]]],
         unique_ids: Union[np.ndarray, List[List[int]]],
-        types: List[List[str]],
+        types: Union[AgentTypes, List[List[str]]],
         positions: Union[np.ndarray, List[List[List[float]]]],
         radii: Union[np.ndarray, List[List[float]]],
         rotations: Union[np.ndarray, List[List[List[float]]]] = None,
@@ -58,6 +73,7 @@ class AgentData:
         display_data: Dict[str, DisplayData] = None,
         draw_fiber_points: bool = False,
         n_timesteps: int = -1,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object contains spatial simulation data
@@ -79,9 +95,13 @@ class AgentData:
         unique_ids : np.ndarray or List[List[int]] (shape = [timesteps, agents])
             A numpy ndarray or list containing the unique ID
             for each agent at each timestep
-        types : List[List[str]] (list of shape [timesteps, agents])
+        types : AgentTypes or List[List[str]] (list of shape [timesteps, agents])
             A list containing timesteps, for each a list of
-            the string name for the type of each agent
+            the string name for the type of each agent.
+            Lists are stored as AgentTypes, which can still
+            be used like the lists for indexing, iterating,
+            appending and adding; use types.tolist() where
+            a list is needed, e.g. for json.dumps
         positions : np.ndarray or List[List[List[float]]]
         (shape = [timesteps, agents, 3])
             A numpy ndarray or list containing the XYZ position
@@ -117,40 +137,52 @@ class AgentData:
         n_timesteps : int (optional)
             Use the first n_timesteps frames of data
             Default: -1 (use the full length of the buffer)
+        dtype_policy: DTypePolicy (optional)
+            The dtypes to store the arrays in
+            Default: None (keep the arrays' dtypes)
         """
         self.times = np.array(times)
         self.n_agents = np.array(n_agents)
         self.viz_types = (
-            AgentData._fill_df(pd.DataFrame(viz_types), 1000.0).to_numpy(dtype=float)
+            AgentData._jagged_list_to_numpy_array(viz_types, 1000.0)
             if type(viz_types) is list
             else viz_types
         )
         self.unique_ids = (
-            AgentData._fill_df(pd.DataFrame(unique_ids), 0).to_numpy(dtype=int)
+            AgentData._jagged_list_to_numpy_array(unique_ids, 0, dtype=int)
             if type(unique_ids) is list
             else unique_ids
         )
-        self.types = types
+        self.types = types if isinstance(types, AgentTypes) else AgentTypes(types)
         self.positions = (
-            AgentData._jagged_3d_list_to_numpy_array(positions)
+            AgentData._jagged_list_to_numpy_array(
+                positions, 0.0, values_per_item=VALUES_PER_3D_POINT
+            )
             if type(positions) is list
             else positions
         )
         self.radii = (
-            AgentData._fill_df(pd.DataFrame(radii), 0.0).to_numpy()
+            AgentData._jagged_list_to_numpy_array(radii, 0.0)
             if type(radii) is list
             else radii
         )
         self.rotations = (
-            AgentData._jagged_3d_list_to_numpy_array(rotations)
+            AgentData._jagged_list_to_numpy_array(
+                rotations, 0.0, values_per_item=VALUES_PER_3D_POINT
+            )
             if rotations is not None
             else np.zeros_like(self.positions)
         )
-        self.n_subpoints = (
-            AgentData._fill_df(pd.DataFrame(n_subpoints), 0.0).to_numpy(dtype=int)
-            if n_subpoints is not None
-            else np.zeros_like(self.radii)
-        )
+        if n_subpoints is None:
+            self.n_subpoints = np.zeros_like(self.radii)
+        elif type(n_subpoints) is list:
+            self.n_subpoints = AgentData._jagged_list_to_numpy_array(
+                n_subpoints, 0, dtype=int
+            )
+        else:
+            self.n_subpoints = np.nan_to_num(
+                np.asarray(n_subpoints, dtype=float)
+            ).astype(int)
         self.subpoints = (
             AgentData._get_subpoints_numpy_array(subpoints)
             if subpoints is not None
@@ -159,71 +191,206 @@ class AgentData:
         self.display_data = display_data if display_data is not None else {}
         self.draw_fiber_points = draw_fiber_points
         self.n_timesteps = n_timesteps
+        self.dtype_policy = dtype_policy
+        if dtype_policy is not None:
+            for field in DTypePolicy.FIELD_KINDS:
+                setattr(self, field, dtype_policy.cast(field, getattr(self, field)))
+
+    def get_dtype_policy(self) -> DTypePolicy:
+        """
+        Get the dtypes to use for arrays made from this data,
+        full precision if this data wasn't given a policy
+        """
+        return (
+            self.dtype_policy
+            if self.dtype_policy is not None
+            else DTypePolicy.full_precision()
+        )
 
     @staticmethod
-    def _get_buffer_data_dimensions(buffer_data: Dict[str, Any]) -> DimensionData:
+    def _frame_has_subpoints(frame_data: Union[np.ndarray, List[float]]) -> bool:
         """
-        Get dimensions of a simularium JSON dict containing buffers
+        Does a frame's V1 buffer have any agents with subpoints?
+        If not, the buffer is a whole number of agents
+        with zero in every NSP field
         """
-        bundle_data = buffer_data["spatialData"]["bundleData"]
-        result = DimensionData(total_steps=len(bundle_data), max_agents=0)
-        for time_index in range(result.total_steps):
-            # buffer = packed agent data as a list of numbers
-            buffer = bundle_data[time_index]["data"]
-            buffer_index = 0
-            agents = 0
-            while buffer_index < len(buffer):
-                # a new agent should start at this index
-                agents += 1
-                buffer_index += V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                # get the number of subpoints
-                subpoints = buffer[buffer_index]
-                if subpoints > result.max_subpoints:
-                    result.max_subpoints = int(subpoints)
-                buffer_index += int(
-                    buffer[buffer_index]
-                    + (
-                        V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
-                        - V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                    )
+        return len(frame_data) % V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT != 0 or (
+            bool(
+                np.any(
+                    frame_data[
+                        V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX :: (
+                            V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
+                        )
+                    ]
                 )
-            if agents > result.max_agents:
-                result.max_agents = agents
-        return result
+            )
+        )
+
+    @staticmethod
+    def _get_subpoint_ranks(n_subpoints: np.ndarray) -> np.ndarray:
+        """
+        Get the index of each subpoint value within its agent's subpoints,
+        for all agents' subpoint values in order
+        """
+        return np.arange(np.sum(n_subpoints)) - np.repeat(
+            np.cumsum(n_subpoints) - n_subpoints, n_subpoints
+        )
+
+    @staticmethod
+    def _get_frame_agent_starts(
+        buffer: np.ndarray, frame_start: int, frame_end: int
+    ) -> np.ndarray:
+        """
+        Get the index where each agent starts in one V1 frame of a buffer.
+        An agent starting at an index takes up MIN_VALUES_PER_AGENT
+        plus its NSP field values, so every index in the frame
+        gets the start of the agent after it, and the agents are found
+        by following those links from the frame start,
+        doubling the number of links followed at each step
+        """
+        frame_start = int(frame_start)
+        frame_end = int(frame_end)
+        if frame_start == frame_end:
+            return np.zeros(0, dtype=np.int64)
+        n_values = frame_end - frame_start
+        # link targets after the last agent, and from indices
+        # where no agent can start
+        end = n_values
+        invalid = n_values + 1
+        room = np.arange(
+            n_values - V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT, -1, -1
+        )
+        n_subpoints = np.asarray(
+            buffer[
+                frame_start
+                + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX : frame_start
+                + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
+                + len(room)
+            ],
+            dtype=float,
+        )
+        has_n_subpoints = np.isfinite(n_subpoints) & (n_subpoints >= 0)
+        fits = np.nonzero(has_n_subpoints & (n_subpoints <= room))[0]
+        links = np.full(n_values + 2, invalid, dtype=np.int64)
+        links[end] = end
+        links[fits] = (
+            fits
+            + V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
+            + n_subpoints[fits].astype(np.int64)
+        )
+        # agents 2**step or more links from the frame start are the ones
+        # 2**step links from the agents found so far
+        agent_starts = np.zeros(1, dtype=np.int64)
+        step_links = links
+        while True:
+            new_starts = step_links[agent_starts]
+            new_starts = new_starts[new_starts < end]
+            if len(new_starts) == 0:
+                break
+            agent_starts = np.union1d(agent_starts, new_starts)
+            step_links = step_links[step_links]
+        unlinked = links[agent_starts] == invalid
+        invalid_n_subpoints = np.zeros(n_values, dtype=bool)
+        invalid_n_subpoints[: len(room)] = ~has_n_subpoints
+        if np.any(unlinked & invalid_n_subpoints[agent_starts]):
+            raise DataError("Spatial buffer has an invalid number of subpoints")
+        if np.any(unlinked):
+            raise DataError(
+                "Spatial buffer values don't match the number of agents and subpoints"
+            )
+        return frame_start + agent_starts
+
+    @staticmethod
+    def _get_buffer_agent_starts(
+        buffer: np.ndarray, frame_starts: np.ndarray, frame_ends: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the index where each agent starts in a buffer of concatenated
+        V1 frames. One frame is read with _get_frame_agent_starts().
+        Several frames are scanned together, each step reading the next
+        agent's number of subpoints in every frame that has more agents,
+        which shares each step's overhead between the frames.
+        Returns the frame (as an index into frame_starts),
+        index in the frame, and start index in the buffer of each agent
+        """
+        if len(frame_starts) == 1:
+            agent_starts = AgentData._get_frame_agent_starts(
+                buffer, frame_starts[0], frame_ends[0]
+            )
+            return (
+                np.zeros(len(agent_starts), dtype=np.int64),
+                np.arange(len(agent_starts)),
+                agent_starts,
+            )
+        frame_rows = []
+        agent_starts = []
+        offsets = np.array(frame_starts, dtype=np.int64)
+        active = np.arange(len(offsets))
+        while True:
+            active = active[
+                offsets[active] + V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
+                <= frame_ends[active]
+            ]
+            if len(active) == 0:
+                break
+            starts = offsets[active]
+            n_subpoints = buffer[starts + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX]
+            if not np.all(np.isfinite(n_subpoints) & (n_subpoints >= 0)):
+                raise DataError("Spatial buffer has an invalid number of subpoints")
+            frame_rows.append(active)
+            agent_starts.append(starts)
+            offsets[active] = (
+                starts
+                + V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
+                + n_subpoints.astype(np.int64)
+            )
+        if np.any(offsets != frame_ends):
+            raise DataError(
+                "Spatial buffer values don't match the number of agents and subpoints"
+            )
+        if len(frame_rows) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        agent_indices = np.concatenate(
+            [np.full(len(rows), index) for index, rows in enumerate(frame_rows)]
+        )
+        return np.concatenate(frame_rows), agent_indices, np.concatenate(agent_starts)
 
     def get_type_ids_and_mapping(self) -> Tuple[np.ndarray, Dict[str, Any]]:
         """
-        Generate a type_ids array from the type_names list
+        Generate a type_ids array from the type codes,
+        numbering the types in the order they first appear
+        """
+        type_names = self.types.names
+        max_agents = int(np.max(self.types.lengths, initial=0))
+        codes = self.types.codes[:, :max_agents]
+        # index -1 (no agent) is the last entry
+        has_name = np.array([len(type_name) > 0 for type_name in type_names] + [False])
+        named = self.types.get_mask()[:, :max_agents] & has_name[codes]
+        used_codes, first_indices = np.unique(codes[named], return_index=True)
+        used_codes = used_codes[np.argsort(first_indices)]
+        code_tids = np.zeros(len(type_names) + 1)
+        code_tids[used_codes] = np.arange(len(used_codes))
+        type_ids = np.where(named, code_tids[codes], 0.0)
+        return type_ids, self._get_type_mapping(
+            [type_names[code] for code in used_codes.tolist()]
+        )
+
+    def _get_type_mapping(self, used_type_names: List[str]) -> Dict[str, Any]:
+        """
+        Generate the type mapping for type names numbered in order
         """
-        total_steps = len(self.types)
-        max_agents = 0
-        for time_index in range(len(self.types)):
-            agent_index = len(self.types[time_index])
-            if agent_index > max_agents:
-                max_agents = agent_index
-        type_ids = np.zeros((len(self.types), max_agents))
         type_name_mapping = {}
-        type_id_mapping = {}
-        last_tid = 0
-        for time_index in range(total_steps):
-            for agent_index in range(len(self.types[time_index])):
-                type_name = self.types[time_index][agent_index]
-                if len(type_name) == 0:
-                    continue
-                if type_name not in type_id_mapping:
-                    tid = last_tid
-                    last_tid += 1
-                    type_id_mapping[type_name] = tid
-                    if type_name not in self.display_data:
-                        raise DataError(
-                            f"Please provide DisplayData for agent type {type_name}"
-                        )
-                    type_name_mapping[str(tid)] = {
-                        "name": self.display_data[type_name].name,
-                        "geometry" : dict(self.display_data[type_name])
-                    }
-                type_ids[time_index][agent_index] = type_id_mapping[type_name]
-        return type_ids, type_name_mapping
+        for tid, type_name in enumerate(used_type_names):
+            if type_name not in self.display_data:
+                raise DataError(
+                    f"Please provide DisplayData for agent type {type_name}"
+                )
+            type_name_mapping[str(tid)] = {
+                "name": self.display_data[type_name].name,
+                "geometry" : dict(self.display_data[type_name])
+            }
+        return type_name_mapping
 
     @staticmethod
     def get_type_names(
@@ -232,14 +399,14 @@ class AgentData:
         """
         Generate the type_names list from a type_ids array and a type_mapping
         """
-        result = []
-        for time_index in range(type_ids.shape[0]):
-            result.append([])
-            for agent_index in range(int(len(type_ids[time_index]))):
-                result[time_index].append(
-                    type_mapping[str(int(type_ids[time_index][agent_index]))]["name"]
-                )
-        return result
+        unique_type_ids, type_indices = np.unique(
+            type_ids.astype(int), return_inverse=True
+        )
+        names = np.array(
+            [type_mapping[str(type_id)]["name"] for type_id in unique_type_ids],
+            dtype=object,
+        )
+        return names[type_indices].reshape(type_ids.shape).tolist()
 
     @staticmethod
     def get_display_data(
@@ -272,82 +439,175 @@ class AgentData:
 
     @classmethod
     def from_buffer_data(
-        cls, buffer_data: Dict[str, Any], display_data: Dict[int, DisplayData] = None
+        cls,
+        buffer_data: Dict[str, Any],
+        display_data: Dict[int, DisplayData] = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
-        Create AgentData from a simularium JSON dict containing buffers
+        Create AgentData from a simularium JSON dict containing buffers.
+        The JSON values have double precision, so they are kept
+        at full precision unless a dtype_policy is given
         """
         bundle_data = buffer_data["spatialData"]["bundleData"]
-        dimensions = AgentData._get_buffer_data_dimensions(buffer_data)
-        print(f"original dim = {dimensions}")
-        agent_data = AgentData.from_dimensions(dimensions)
-        type_ids = np.zeros((dimensions.total_steps, dimensions.max_agents))
-        for time_index in range(dimensions.total_steps):
-            agent_data.times[time_index] = bundle_data[time_index]["time"]
-            frame_data = bundle_data[time_index]["data"]
-            agent_index = 0
-            buffer_index = 0
-            while buffer_index + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX < len(frame_data):
-                # a new agent should start at this index
-                agent_data.viz_types[time_index][agent_index] = frame_data[
-                    buffer_index + V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX
-                ]
-                agent_data.unique_ids[time_index][agent_index] = frame_data[
-                    buffer_index + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX
-                ]
-                type_ids[time_index][agent_index] = frame_data[
-                    buffer_index + V1_SPATIAL_BUFFER_STRUCT.TID_INDEX
-                ]
-                agent_data.positions[time_index][agent_index] = [
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX],
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.POSY_INDEX],
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.POSZ_INDEX],
-                ]
-                agent_data.rotations[time_index][agent_index] = [
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX],
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.ROTY_INDEX],
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.ROTZ_INDEX],
-                ]
-                agent_data.radii[time_index][agent_index] = frame_data[
-                    buffer_index + V1_SPATIAL_BUFFER_STRUCT.R_INDEX
-                ]
-                buffer_index += V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                # get the subpoints
-                if dimensions.max_subpoints < 1:
-                    buffer_index += int(
-                        V1_SPATIAL_BUFFER_STRUCT.SP_INDEX
-                        - V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                    )
-                    agent_index += 1
-                    continue
-                agent_data.n_subpoints[time_index][agent_index] = int(
-                    frame_data[buffer_index]
+        if dtype_policy is None:
+            dtype_policy = DTypePolicy.full_precision()
+        return cls.from_frame_buffers(
+            times=[frame["time"] for frame in bundle_data],
+            frame_buffers=[frame["data"] for frame in bundle_data],
+            type_mapping=buffer_data["trajectoryInfo"]["typeMapping"],
+            display_data=display_data,
+            dtype_policy=dtype_policy,
+        )
+
+    @classmethod
+    def from_frame_buffers(
+        cls,
+        times: Union[np.ndarray, List[float]],
+        frame_buffers: List[Union[np.ndarray, List[float]]],
+        type_mapping: Dict[str, Any],
+        display_data: Dict[int, DisplayData] = None,
+        dtype_policy: DTypePolicy = None,
+    ):
+        """
+        Create AgentData from each frame's values in the V1 buffer layout
+
+        Parameters
+        ----------
+        times: np.ndarray or List[float]
+            the time of each frame
+        frame_buffers: List[np.ndarray or List[float]]
+            the values of each frame's agents in the V1 buffer layout,
+            as numpy arrays (which may be views of a file's contents)
+            or lists
+        type_mapping: Dict[str, Any]
+            the type mapping from the trajectory info,
+            mapping each type ID to its name and geometry
+        display_data: Dict[int, DisplayData] (optional)
+            Display data for each agent type ID
+            Default: use the geometry in the type mapping
+        dtype_policy: DTypePolicy (optional)
+            The dtypes to store the arrays in
+            Default: DTypePolicy() (compact)
+        """
+        total_steps = len(frame_buffers)
+        n_agents = np.zeros(total_steps, dtype=int)
+        # frames without subpoints are a whole number of fixed size agents
+        simple_frames = []
+        subpoint_frames = []
+        for time_index in range(total_steps):
+            frame_data = frame_buffers[time_index]
+            if AgentData._frame_has_subpoints(frame_data):
+                subpoint_frames.append(time_index)
+            else:
+                simple_frames.append(time_index)
+                n_agents[time_index] = (
+                    len(frame_data) // V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
                 )
-                for i in range(int(frame_data[buffer_index])):
-                    agent_data.subpoints[time_index][agent_index][i] = frame_data[
-                        buffer_index + 1 + i
-                    ]
-                buffer_index += int(
-                    frame_data[buffer_index]
-                    + (
-                        V1_SPATIAL_BUFFER_STRUCT.SP_INDEX
-                        - V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                    )
+        # frames with subpoints are concatenated and scanned together
+        subpoint_buffers = [
+            np.asarray(frame_buffers[time_index], dtype=float)
+            for time_index in subpoint_frames
+        ]
+        frame_ends = np.cumsum([len(frame) for frame in subpoint_buffers], dtype=int)
+        subpoint_buffer = (
+            np.concatenate(subpoint_buffers)
+            if len(subpoint_buffers) > 0
+            else np.zeros(0)
+        )
+        del subpoint_buffers
+        frame_rows, agent_indices, agent_starts = AgentData._get_buffer_agent_starts(
+            subpoint_buffer,
+            frame_ends - np.diff(frame_ends, prepend=0),
+            frame_ends,
+        )
+        time_indices = np.array(subpoint_frames, dtype=int)[frame_rows]
+        np.add.at(n_agents, time_indices, 1)
+        agent_n_subpoints = subpoint_buffer[
+            agent_starts + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
+        ].astype(int)
+        dimensions = DimensionData(
+            total_steps=total_steps,
+            max_agents=int(np.max(n_agents)) if total_steps > 0 else 0,
+            max_subpoints=int(np.max(agent_n_subpoints))
+            if len(agent_n_subpoints) > 0
+            else 0,
+        )
+        log.debug(f"original dim = {dimensions}")
+        agent_data = AgentData.from_dimensions(dimensions, dtype_policy=dtype_policy)
+        agent_data.times[:] = times
+        agent_data.n_agents[:] = n_agents
+        type_ids = np.zeros((dimensions.total_steps, dimensions.max_agents))
+        xyz = np.arange(VALUES_PER_3D_POINT)
+        for time_index in simple_frames:
+            frame_agents = np.asarray(frame_buffers[time_index], dtype=float).reshape(
+                -1, V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
+            )
+            n = frame_agents.shape[0]
+            agent_data.viz_types[time_index, :n] = frame_agents[
+                :, V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX
+            ]
+            agent_data.unique_ids[time_index, :n] = frame_agents[
+                :, V1_SPATIAL_BUFFER_STRUCT.UID_INDEX
+            ]
+            type_ids[time_index, :n] = frame_agents[
+                :, V1_SPATIAL_BUFFER_STRUCT.TID_INDEX
+            ]
+            agent_data.positions[time_index, :n] = frame_agents[
+                :, V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX + xyz
+            ]
+            agent_data.rotations[time_index, :n] = frame_agents[
+                :, V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX + xyz
+            ]
+            agent_data.radii[time_index, :n] = frame_agents[
+                :, V1_SPATIAL_BUFFER_STRUCT.R_INDEX
+            ]
+        if len(agent_starts) > 0:
+            agent_data.viz_types[time_indices, agent_indices] = subpoint_buffer[
+                agent_starts + V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX
+            ]
+            agent_data.unique_ids[time_indices, agent_indices] = subpoint_buffer[
+                agent_starts + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX
+            ]
+            type_ids[time_indices, agent_indices] = subpoint_buffer[
+                agent_starts + V1_SPATIAL_BUFFER_STRUCT.TID_INDEX
+            ]
+            agent_data.positions[time_indices, agent_indices] = subpoint_buffer[
+                agent_starts[:, np.newaxis] + V1_SPATIAL_BUFFER_STRUCT.POSX_INDEX + xyz
+            ]
+            agent_data.rotations[time_indices, agent_indices] = subpoint_buffer[
+                agent_starts[:, np.newaxis] + V1_SPATIAL_BUFFER_STRUCT.ROTX_INDEX + xyz
+            ]
+            agent_data.radii[time_indices, agent_indices] = subpoint_buffer[
+                agent_starts + V1_SPATIAL_BUFFER_STRUCT.R_INDEX
+            ]
+        if dimensions.max_subpoints > 0:
+            agent_data.n_subpoints[time_indices, agent_indices] = agent_n_subpoints
+            subpoint_ranks = AgentData._get_subpoint_ranks(agent_n_subpoints)
+            agent_data.subpoints[
+                np.repeat(time_indices, agent_n_subpoints),
+                np.repeat(agent_indices, agent_n_subpoints),
+                subpoint_ranks,
+            ] = subpoint_buffer[
+                np.repeat(
+                    agent_starts + V1_SPATIAL_BUFFER_STRUCT.SP_INDEX, agent_n_subpoints
                 )
-                agent_index += 1
-            agent_data.n_agents[time_index] = agent_index
-        type_names = AgentData.get_type_names(
-            type_ids, buffer_data["trajectoryInfo"]["typeMapping"]
+                + subpoint_ranks
+            ]
+        unique_type_ids, type_indices = np.unique(
+            type_ids.astype(int), return_inverse=True
         )
-        display_data = AgentData.get_display_data(
-            buffer_data["trajectoryInfo"]["typeMapping"], display_data
+        types = AgentTypes.from_codes(
+            type_indices.reshape(type_ids.shape),
+            [type_mapping[str(type_id)]["name"] for type_id in unique_type_ids],
         )
+        display_data = AgentData.get_display_data(type_mapping, display_data)
         return cls(
             times=agent_data.times,
             n_agents=agent_data.n_agents,
             viz_types=agent_data.viz_types,
             unique_ids=agent_data.unique_ids,
-            types=type_names,
+            types=types,
             positions=agent_data.positions,
             radii=agent_data.radii,
             rotations=agent_data.rotations,
@@ -355,160 +615,252 @@ class AgentData:
             subpoints=agent_data.subpoints,
             display_data=display_data,
             draw_fiber_points=False,
+            dtype_policy=agent_data.dtype_policy,
         )
 
     @staticmethod
-    def _fill_df(df: pd.DataFrame, fill: List[float]) -> pd.DataFrame:
-        """
-        Fill Nones in a DataFrame with a fill value
-        """
-        # Create a dataframe of fill values
-        fill_array = [[fill] * df.shape[1]] * df.shape[0]
-        fill_df = pd.DataFrame(fill_array)
-        # Replace all entries with None with the fill
-        df[df.isna()] = fill_df
-        return df
-
-    @staticmethod
-    def _jagged_3d_list_to_numpy_array(
-        jagged_3d_list: Union[np.ndarray, List]
+    def _jagged_list_to_numpy_array(
+        jagged_list: Union[np.ndarray, List],
+        fill: float,
+        values_per_item: int = 0,
+        dtype: Any = float,
     ) -> np.ndarray:
         """
-        Shape a jagged list with 3 dimensions to a numpy array
+        Shape a list with a list of items for each timestep into a numpy array,
+        padded with the fill value. The length of each timestep's list
+        is measured in one pass, then the items are concatenated into
+        one flat array that fills the preallocated array in one assignment.
+        Items are scalars, or lists of values_per_item values.
+        Missing values (None or NaN) are filled too
         """
-        if type(jagged_3d_list) is np.ndarray:
-            return jagged_3d_list
-
-        df = AgentData._fill_df(pd.DataFrame(jagged_3d_list), [0, 0, 0])
-        df_t = df.transpose()
-        exploded = [df_t[col].explode() for col in list(df_t.columns)]
-        x = np.array(exploded, dtype=float).reshape((df.shape[0], df.shape[1], 3))
-        print(x)
-        return x
+        if type(jagged_list) is np.ndarray:
+            return jagged_list
+        lengths = np.array([len(items) for items in jagged_list], dtype=int)
+        max_length = int(np.max(lengths, initial=0))
+        item_shape = (values_per_item,) if values_per_item > 0 else ()
+        values = np.array(
+            list(itertools.chain.from_iterable(jagged_list)), dtype=float
+        ).reshape((-1,) + item_shape)
+        values[np.isnan(values)] = fill
+        result = np.full((len(lengths), max_length) + item_shape, fill, dtype=float)
+        result[np.arange(max_length) < lengths[:, np.newaxis]] = values
+        return result.astype(dtype, copy=False)
 
     @staticmethod
     def _get_subpoints_numpy_array(subpoints: Union[np.ndarray, List]) -> np.ndarray:
         """
-        Shape a 3 dimensional jagged list for subpoints into a numpy array
+        Shape a 3 dimensional jagged list for subpoints into a numpy array,
+        padded with zeros. The lengths of the timesteps and agents
+        are measured in one pass, then all subpoint values are concatenated
+        and fill the preallocated array in one assignment
         """
         if type(subpoints) is np.ndarray:
             return subpoints
+        n_agents = np.array([len(frame) for frame in subpoints], dtype=int)
+        agent_subpoints = list(itertools.chain.from_iterable(subpoints))
+        n_subpoints = np.array([len(values) for values in agent_subpoints], dtype=int)
+        values = np.array(
+            list(itertools.chain.from_iterable(agent_subpoints)), dtype=float
+        )
+        values[np.isnan(values)] = 0.0
+        result = np.zeros(
+            (
+                len(n_agents),
+                int(np.max(n_agents, initial=0)),
+                int(np.max(n_subpoints, initial=0)),
+            )
+        )
+        time_indices = np.repeat(np.arange(len(n_agents)), n_agents)
+        agent_indices = np.arange(len(agent_subpoints)) - np.repeat(
+            np.cumsum(n_agents) - n_agents, n_agents
+        )
+        result[
+            np.repeat(time_indices, n_subpoints),
+            np.repeat(agent_indices, n_subpoints),
+            AgentData._get_subpoint_ranks(n_subpoints),
+        ] = values
+        return result
 
-        frame_arrays = []
-        max_agents = 0
-        max_subpoints = 0
-        total_steps = len(subpoints) if subpoints else 0
-        for time_index in range(total_steps):
-            filled_frame = AgentData._fill_df(pd.DataFrame(subpoints[time_index]), 0.0)
-            frame_array = np.array(filled_frame, dtype=float)
-            if frame_array.shape[0] > max_agents:
-                max_agents = frame_array.shape[0]
-            if frame_array.shape[1] > max_subpoints:
-                max_subpoints = frame_array.shape[1]
-            frame_arrays.append(frame_array)
-        values_per_frame = max_agents * max_subpoints
-        result = np.zeros(total_steps * values_per_frame)
-        for time_index, frame_array in enumerate(frame_arrays):
-            if frame_array.shape[1] < max_subpoints:
-                new_frame_array = np.zeros((frame_array.shape[0], max_subpoints, 3))
-                new_frame_array[:, : frame_array.shape[1]] = frame_array
-                frame_array = new_frame_array
-            flat_array = frame_array.flatten()
-            start_index = time_index * values_per_frame
-            result[start_index : start_index + flat_array.shape[0]] = flat_array
-        return result.reshape(total_steps, max_agents, max_subpoints)
+    @staticmethod
+    def _get_dataframe_columns(
+        traj: pd.DataFrame, subpoint_columns: List[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the values of a trajectory DataFrame as flat arrays
+        with the agents in time order, and the times and number of agents
+        at each timestep. Rows are only reordered if the times aren't sorted
+        """
+        missing_columns = [
+            column for column in AgentData.DATAFRAME_COLUMNS if column not in traj
+        ]
+        if missing_columns:
+            raise DataError(
+                f"Trajectory DataFrame is missing columns: {missing_columns}"
+            )
+        time_values = traj["time"].to_numpy()
+        order = None
+        if np.any(time_values[1:] < time_values[:-1]):
+            order = np.argsort(time_values, kind="stable")
+
+        def sorted_values(columns: Union[str, List[str]]) -> np.ndarray:
+            values = traj[columns].to_numpy()
+            return values if order is None else values[order]
+
+        times, n_agents = np.unique(time_values, return_counts=True)
+        total_agents = len(time_values)
+        type_codes, type_names = pd.factorize(sorted_values("type"))
+        result = {
+            "times": times,
+            "n_agents": n_agents,
+            "unique_ids": sorted_values("unique_id"),
+            "types": type_codes.astype(np.int32),
+            "type_names": list(type_names),
+            "positions": sorted_values(["positionX", "positionY", "positionZ"]),
+            "radii": sorted_values("radius"),
+            "rotations": (
+                sorted_values(AgentData.DATAFRAME_ROTATION_COLUMNS)
+                if all(
+                    column in traj
+                    for column in AgentData.DATAFRAME_ROTATION_COLUMNS
+                )
+                else np.zeros((total_agents, VALUES_PER_3D_POINT))
+            ),
+        }
+        if subpoint_columns:
+            subpoint_values = sorted_values(subpoint_columns).astype(float)
+            if "n_subpoints" in traj:
+                n_subpoints = sorted_values("n_subpoints").astype(int)
+                max_subpoints = int(np.max(n_subpoints, initial=0))
+                if max_subpoints > len(subpoint_columns):
+                    raise DataError(
+                        f"Trajectory DataFrame has agents with {max_subpoints} "
+                        f"subpoints but only {len(subpoint_columns)} subpoint "
+                        f"columns: {list(subpoint_columns)}"
+                    )
+                # each agent's subpoints are the first n_subpoints columns
+                has_subpoint = (
+                    np.arange(len(subpoint_columns)) < n_subpoints[:, np.newaxis]
+                )
+            else:
+                # each agent's subpoints are the columns that aren't NaN
+                has_subpoint = ~np.isnan(subpoint_values)
+                n_subpoints = np.sum(has_subpoint, axis=1)
+            result["n_subpoints"] = n_subpoints
+            result["subpoints"] = subpoint_values[has_subpoint]
+        else:
+            result["n_subpoints"] = np.zeros(total_agents, dtype=int)
+            result["subpoints"] = np.zeros(0)
+        result["viz_types"] = (
+            sorted_values("viz_type")
+            if "viz_type" in traj
+            else np.where(
+                result["n_subpoints"] > 0, VIZ_TYPE.FIBER, VIZ_TYPE.DEFAULT
+            )
+        )
+        return result
 
     @classmethod
-    def from_dataframe(cls, traj: pd.DataFrame):
-        """
-        Create AgentData from a pandas DataFrame with columns:
-        time, unique_id, type, positionX, positionY, positionZ, radius
-        (only for default agents, no fibers)
-        """
-        times = np.unique(traj.loc[0, "time"].to_numpy())
-        n_agents = np.squeeze(
-            traj.groupby("time").agg(["count"])["unique_id"].to_numpy()
-        )
-        grouped_traj = (
-            traj.set_index(["time", traj.groupby("time").cumcount()])
-            .unstack(fill_value=0)
-            .stack()
-        )
-        unique_ids = np.array(
-            grouped_traj["unique_id"]
-            .groupby(level=0)
-            .apply(lambda x: x.values.tolist())
-            .tolist()
-        )
-        positions = np.array(
-            grouped_traj[["positionX", "positionY", "positionZ"]]
-            .groupby(level=0)
-            .apply(lambda x: x.values.tolist())
-            .tolist()
-        )
-        rotations = np.array(
-            grouped_traj[["rotationX", "rotationY", "rotationZ"]]
-            .groupby(level=0)
-            .apply(lambda x: x.values.tolist())
-            .tolist()
-        )
-        radii = np.array(
-            grouped_traj["radius"]
-            .groupby(level=0)
-            .apply(lambda x: x.values.tolist())
-            .tolist()
-        )
-        grouped_traj = (
-            traj.set_index(["time", traj.groupby("time").cumcount()])
-            .unstack(fill_value="")
-            .stack()
-        )
-        type_names = (
-            grouped_traj["type"]
-            .groupby(level=0)
-            .apply(lambda x: x.values.tolist())
-            .tolist()
+    def from_dataframe(
+        cls,
+        traj: pd.DataFrame,
+        subpoint_columns: List[str] = None,
+        dtype_policy: DTypePolicy = None,
+    ):
+        """
+        Create AgentData from a pandas DataFrame with one row
+        for each agent at each timestep, and columns:
+        time, unique_id, type, positionX, positionY, positionZ, radius,
+        and optionally rotationX, rotationY, rotationZ (default: 0),
+        viz_type (default: VIZ_TYPE.FIBER for agents with subpoints,
+        otherwise VIZ_TYPE.DEFAULT), and n_subpoints
+
+        Parameters
+        ----------
+        traj : pd.DataFrame
+            The trajectory, rows for a timestep don't need to be adjacent
+            and stay in the order they're given
+        subpoint_columns : List[str] (optional)
+            Columns with the subpoint values for fibers or other agents
+            with subpoints, in order. Each agent uses the first n_subpoints
+            of them, or the ones that aren't NaN if there's
+            no n_subpoints column
+            Default: None (no subpoints)
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the arrays in
+            Default: DTypePolicy() (compact)
+        """
+        columns = AgentData._get_dataframe_columns(traj, subpoint_columns)
+        total_steps = len(columns["times"])
+        n_subpoints = columns["n_subpoints"]
+        result = cls.from_dimensions(
+            DimensionData(
+                total_steps=total_steps,
+                max_agents=int(np.max(columns["n_agents"], initial=0)),
+                max_subpoints=int(np.max(n_subpoints, initial=0)),
+            ),
+            dtype_policy=dtype_policy,
         )
-        return cls(
-            times=times,
-            n_agents=n_agents,
-            viz_types=VIZ_TYPE.DEFAULT * np.ones_like(unique_ids),
-            unique_ids=unique_ids,
-            types=type_names,
-            positions=positions,
-            radii=radii,
-            rotations=rotations,
+        result.times[:] = columns["times"]
+        result.n_agents[:] = columns["n_agents"]
+        time_indices, agent_indices = result._get_flat_agent_indices(total_steps)
+        for field in [
+            "viz_types",
+            "unique_ids",
+            "positions",
+            "radii",
+            "rotations",
+            "n_subpoints",
+        ]:
+            getattr(result, field)[time_indices, agent_indices] = (
+                result.get_dtype_policy().cast(field, columns[field])
+            )
+        result.subpoints[
+            np.repeat(time_indices, n_subpoints),
+            np.repeat(agent_indices, n_subpoints),
+            AgentData._get_subpoint_ranks(n_subpoints),
+        ] = columns["subpoints"]
+        type_codes = np.full(result.unique_ids.shape, -1, dtype=np.int32)
+        type_codes[time_indices, agent_indices] = columns["types"]
+        result.types = AgentTypes.from_codes(
+            type_codes, columns["type_names"], columns["n_agents"]
         )
+        return result
 
     @classmethod
     def from_dimensions(
-        cls, dimensions: DimensionData, default_viz_type: float = VIZ_TYPE.DEFAULT
+        cls,
+        dimensions: DimensionData,
+        default_viz_type: float = VIZ_TYPE.DEFAULT,
+        dtype_policy: DTypePolicy = None,
     ):
         """
-        Create AgentData with empty numpy arrays of the required dimensions
+        Create AgentData with empty numpy arrays of the required dimensions,
+        stored in the dtypes of the given policy
+        (default: DTypePolicy(), which is compact)
         """
+        if dtype_policy is None:
+            dtype_policy = DTypePolicy()
+        agents_shape = (dimensions.total_steps, dimensions.max_agents)
         return cls(
-            times=np.zeros(dimensions.total_steps),
-            n_agents=np.zeros(dimensions.total_steps),
-            viz_types=default_viz_type
-            * np.ones((dimensions.total_steps, dimensions.max_agents)),
-            unique_ids=np.zeros((dimensions.total_steps, dimensions.max_agents)),
+            times=np.zeros(dimensions.total_steps, dtype=dtype_policy.times),
+            n_agents=np.zeros(dimensions.total_steps, dtype=dtype_policy.counts),
+            viz_types=np.full(
+                agents_shape, default_viz_type, dtype=dtype_policy.viz_types
+            ),
+            unique_ids=np.zeros(agents_shape, dtype=dtype_policy.ids),
             types=[[] for t in range(dimensions.total_steps)],
             positions=np.zeros(
-                (dimensions.total_steps, dimensions.max_agents, VALUES_PER_3D_POINT)
+                agents_shape + (VALUES_PER_3D_POINT,), dtype=dtype_policy.spatial
             ),
-            radii=np.ones((dimensions.total_steps, dimensions.max_agents)),
+            radii=np.ones(agents_shape, dtype=dtype_policy.spatial),
             rotations=np.zeros(
-                (dimensions.total_steps, dimensions.max_agents, VALUES_PER_3D_POINT)
+                agents_shape + (VALUES_PER_3D_POINT,), dtype=dtype_policy.spatial
             ),
-            n_subpoints=np.zeros((dimensions.total_steps, dimensions.max_agents)),
+            n_subpoints=np.zeros(agents_shape, dtype=dtype_policy.counts),
             subpoints=np.zeros(
-                (
-                    dimensions.total_steps,
-                    dimensions.max_agents,
-                    dimensions.max_subpoints,
-                )
+                agents_shape + (dimensions.max_subpoints,), dtype=dtype_policy.spatial
             ),
+            dtype_policy=dtype_policy,
         )
 
     def total_timesteps(self) -> int:
@@ -537,11 +889,12 @@ class AgentData:
         Create a copy of this object with the size of the numpy arrays increased
         by the given added_dimensions
         """
-        print(f"increase buffer {axis}")
+        log.debug(f"increase buffer {axis}")
         current_dimensions = self.get_dimensions()
         new_dimensions = added_dimensions.add(current_dimensions, axis)
-        current_types = copy.deepcopy(self.types)
-        result = AgentData.from_dimensions(new_dimensions)
+        result = AgentData.from_dimensions(
+            new_dimensions, dtype_policy=self.get_dtype_policy()
+        )
         result.times[0 : current_dimensions.total_steps] = self.times[:]
         result.n_agents[0 : current_dimensions.total_steps] = self.n_agents[:]
         result.viz_types[
@@ -550,10 +903,10 @@ class AgentData:
         result.unique_ids[
             0 : current_dimensions.total_steps, 0 : current_dimensions.max_agents
         ] = self.unique_ids[:]
-        for time_index in range(current_dimensions.total_steps):
-            n_a = int(self.n_agents[time_index])
-            for agent_index in range(n_a):
-                result.types[time_index].append(current_types[time_index][agent_index])
+        result.types = self.types.get_copy(
+            new_dimensions.total_steps,
+            self.n_agents[0 : current_dimensions.total_steps].astype(int),
+        )
         result.positions[
             0 : current_dimensions.total_steps, 0 : current_dimensions.max_agents
         ] = self.positions[:]
@@ -622,7 +975,7 @@ class AgentData:
         Get the DISPLAY_TYPE for the agent
         at the given time and agent indices
         """
-        type_name = self.types[time_index][agent_index]
+        type_name = self._get_type_name(time_index, agent_index)
         if type_name not in self.display_data:
             self.display_data[type_name] = DisplayData(
                 name=type_name,
@@ -632,6 +985,9 @@ class AgentData:
             )
         return self.display_data[type_name].display_type
 
+    def _get_type_name(self, time_index: int, agent_index: int) -> str:
+        return self.types[time_index][agent_index]
+
     def _default_display_type_for_agent(
         self, time_index: int, agent_index: int
     ) -> DISPLAY_TYPE:
@@ -640,7 +996,16 @@ class AgentData:
         given the number of subpoints for the agent
         at the given time and agent indices
         """
-        n_subpoints = self.n_subpoints[time_index][agent_index]
+        return AgentData._default_display_type(
+            self.n_subpoints[time_index][agent_index]
+        )
+
+    @staticmethod
+    def _default_display_type(n_subpoints: float) -> DISPLAY_TYPE:
+        """
+        Get the default DISPLAY_TYPE to use
+        for an agent with the given number of subpoints
+        """
         if n_subpoints < 1:
             return DISPLAY_TYPE.SPHERE
         default_display_types = {
@@ -653,24 +1018,219 @@ class AgentData:
                 return default_display_types[values_per_item]
         return DISPLAY_TYPE.SPHERE
 
+    def _get_agent_mask(self, total_steps: int) -> np.ndarray:
+        """
+        Get a mask of the agent slots in the arrays
+        that hold an agent in each of the first total_steps frames
+        """
+        n_agents = np.asarray(self.n_agents[:total_steps]).astype(int)
+        max_agents = np.asarray(self.unique_ids).shape[1]
+        return np.arange(max_agents) < n_agents[:, np.newaxis]
+
+    def _get_flat_agent_indices(
+        self, total_steps: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the time index and agent index of each agent
+        in the first total_steps frames, in frame then agent order
+        """
+        return np.nonzero(self._get_agent_mask(total_steps))
+
+    def _get_flat_values(self, field: str, total_steps: int) -> np.ndarray:
+        """
+        Get the values of a per agent field, like "positions",
+        for each agent in the first total_steps frames,
+        in frame then agent order
+        """
+        mask = self._get_agent_mask(total_steps)
+        values = np.asarray(getattr(self, field))[:total_steps, : mask.shape[1]]
+        return values[mask[:, : values.shape[1]]]
+
+    def _get_flat_subpoints(self, total_steps: int) -> np.ndarray:
+        """
+        Get the subpoint values of each agent in the first total_steps frames,
+        concatenated in frame then agent order
+        """
+        time_indices, agent_indices = self._get_flat_agent_indices(total_steps)
+        n_subpoints = self._get_flat_values("n_subpoints", total_steps).astype(int)
+        if np.sum(n_subpoints) < 1:
+            return np.zeros(0)
+        return np.asarray(self.subpoints)[
+            np.repeat(time_indices, n_subpoints),
+            np.repeat(agent_indices, n_subpoints),
+            AgentData._get_subpoint_ranks(n_subpoints),
+        ]
+
+    def _get_frame_values(self, field: str, time_index: int) -> np.ndarray:
+        """
+        Get the values of a per agent field, like "positions",
+        for the agents in a frame
+        """
+        n_agents = int(self.n_agents[time_index])
+        return getattr(self, field)[time_index, :n_agents]
+
+    def _get_frame_type_ids(self, type_ids: np.ndarray, time_index: int) -> np.ndarray:
+        """
+        Get the type IDs of the agents in a frame
+        from the type_ids from get_type_ids_and_mapping()
+        """
+        return type_ids[time_index, : int(self.n_agents[time_index])]
+
+    def _get_flat_type_ids(self, type_ids: np.ndarray, total_steps: int) -> np.ndarray:
+        """
+        Get the type ID of each agent in the first total_steps frames,
+        in frame then agent order, from the type_ids
+        from get_type_ids_and_mapping()
+        """
+        return type_ids[self._get_flat_agent_indices(total_steps)]
+
+    def _get_frame_subpoints(self, time_index: int) -> np.ndarray:
+        """
+        Get the subpoint values of the agents in a frame, concatenated
+        """
+        n_subpoints = self._get_frame_values("n_subpoints", time_index).astype(int)
+        if np.sum(n_subpoints) < 1:
+            return np.zeros(0)
+        return self.subpoints[time_index][
+            np.repeat(np.arange(len(n_subpoints)), n_subpoints),
+            AgentData._get_subpoint_ranks(n_subpoints),
+        ]
+
+    def _get_type_name_table(self) -> List[str]:
+        """
+        Get the type names that type codes index into
+        """
+        return self.types.names
+
+    def _get_type_codes(self, total_steps: int) -> np.ndarray:
+        """
+        Get the type code of each agent slot in the first total_steps frames,
+        with -1 for slots without an agent or without a type name
+        """
+        mask = self._get_agent_mask(total_steps)
+        result = np.full(mask.shape, -1, dtype=np.int32)
+        n_steps = min(total_steps, len(self.types))
+        n_agents = min(mask.shape[1], self.types.codes.shape[1])
+        result[:n_steps, :n_agents] = self.types.codes[:n_steps, :n_agents]
+        result[~mask] = -1
+        return result
+
+    def _get_flat_type_codes(self, total_steps: int) -> np.ndarray:
+        """
+        Get the type code of each agent in the first total_steps frames,
+        in frame then agent order, with -1 for agents without a type name
+        """
+        return self._get_type_codes(total_steps)[self._get_agent_mask(total_steps)]
+
+    def _get_frame_type_codes(self, time_index: int, n_agents: int) -> np.ndarray:
+        """
+        Get the type codes of the first n_agents agents in a frame,
+        with -1 for agents without a type name
+        """
+        return self.types.get_row_codes(time_index, n_agents)
+
+    def _get_flat_type_name_codes(
+        self, total_steps: int
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Get the distinct type names of the agents in the first total_steps
+        frames, the index of each agent's type name in the distinct names
+        in frame then agent order, and the index of the first agent
+        with each type name, so names can be visited in the order
+        a loop over frames and agents would first see them
+        """
+        type_codes = self._get_flat_type_codes(total_steps)
+        if len(type_codes) == 0:
+            return [], np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        if np.any(type_codes < 0):
+            time_indices, agent_indices = self._get_flat_agent_indices(total_steps)
+            index = np.argmax(type_codes < 0)
+            raise DataError(
+                "No type name for agent "
+                f"at index Time = {time_indices[index]}, Agent = {agent_indices[index]}"
+            )
+        used_codes, first_indices, inverse = np.unique(
+            type_codes, return_index=True, return_inverse=True
+        )
+        type_name_table = self._get_type_name_table()
+        type_names = [type_name_table[code] for code in used_codes.tolist()]
+        return type_names, inverse.ravel(), first_indices
+
+    def _get_type_name_codes(
+        self, total_steps: int
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Get the distinct type names of the agents in the first total_steps
+        frames, an array of the index of each agent's type name
+        in the distinct names (-1 for slots without an agent),
+        and the index of the first agent with each type name
+        in the flattened agents, so names can be visited in the order
+        a loop over frames and agents would first see them
+        """
+        mask = self._get_agent_mask(total_steps)
+        type_names, flat_codes, first_indices = self._get_flat_type_name_codes(
+            total_steps
+        )
+        codes = np.full(mask.shape, -1, dtype=int)
+        codes[mask] = flat_codes
+        return type_names, codes, first_indices
+
+    def _fill_default_display_data(self):
+        """
+        Give types without DisplayData a default display type
+        from the number of subpoints of the first agent with that type
+        """
+        total_steps = self.times.shape[0]
+        type_names, _, first_indices = self._get_flat_type_name_codes(total_steps)
+        missing = [
+            name_index
+            for name_index in np.argsort(first_indices)
+            if type_names[name_index] not in self.display_data
+        ]
+        if len(missing) == 0:
+            return
+        n_subpoints = self._get_flat_values("n_subpoints", total_steps)
+        for name_index in missing:
+            type_name = type_names[name_index]
+            self.display_data[type_name] = DisplayData(
+                name=type_name,
+                display_type=AgentData._default_display_type(
+                    n_subpoints[first_indices[name_index]]
+                ),
+            )
+
     def _check_subpoints_match_display_type(self):
         """
         Check that the number of subpoints is divisible
-        by the values per item for the agent's display type
-        """
-        for time_index in range(self.times.shape[0]):
-            for agent_index in range(int(self.n_agents[time_index])):
-                display_type = self.display_type_for_agent(time_index, agent_index)
-                values_per_item = SUBPOINT_VALUES_PER_ITEM(display_type)
-                n_subpoints = self.n_subpoints[time_index][agent_index]
-                if n_subpoints % values_per_item != 0:
-                    type_name = self.types[time_index][agent_index]
-                    raise Exception(
-                        f"T = {time_index} : {type_name} at index = "
-                        f"{agent_index} has n_subpoints = {n_subpoints} "
-                        f"but is display_type = {display_type}, which requires "
-                        f"subpoints in multiples of {values_per_item}"
-                    )
+        by the values per item for the agent's display type,
+        after filling in default DisplayData
+        """
+        self._fill_default_display_data()
+        total_steps = self.times.shape[0]
+        type_names, codes, _ = self._get_flat_type_name_codes(total_steps)
+        if len(type_names) == 0:
+            return
+        values_per_item = np.array(
+            [
+                SUBPOINT_VALUES_PER_ITEM(self.display_data[type_name].display_type)
+                for type_name in type_names
+            ]
+        )
+        n_subpoints = self._get_flat_values("n_subpoints", total_steps)
+        invalid = n_subpoints % values_per_item[codes] != 0
+        if np.any(invalid):
+            index = np.argmax(invalid)
+            time_indices, agent_indices = self._get_flat_agent_indices(total_steps)
+            type_name = type_names[codes[index]]
+            display_type = self.display_data[type_name].display_type
+            raise DataError(
+                f"T = {time_indices[index]} : {type_name} at index = "
+                f"{agent_indices[index]} has n_subpoints = "
+                f"{n_subpoints[index]} "
+                f"but is display_type = {display_type}, which requires "
+                f"subpoints in multiples of "
+                f"{SUBPOINT_VALUES_PER_ITEM(display_type)}"
+            )
 
     def __deepcopy__(self, memo):
         result = type(self)(
@@ -686,6 +1246,7 @@ class AgentData:
             subpoints=np.copy(self.subpoints),
             display_data=copy.deepcopy(self.display_data, memo),
             draw_fiber_points=self.draw_fiber_points,
+            dtype_policy=self.dtype_policy,
         )
         return result
 
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from ..constants import VIZ_TYPE, VALUES_PER_3D_POINT
+from ..exceptions import DataError
+from .agent_data import AgentData
+from .agent_types import AgentTypes
+from .display_data import DisplayData
+from .dtype_policy import DTypePolicy
+from .ragged_agent_data import RaggedAgentData
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class AgentDataBuilder:
+    # the shape of each agent's values in the per agent arrays
+    AGENT_FIELDS: Dict[str, Tuple[int, ...]] = {
+        "viz_types": (),
+        "unique_ids": (),
+        "positions": (VALUES_PER_3D_POINT,),
+        "radii": (),
+        "rotations": (VALUES_PER_3D_POINT,),
+        "n_subpoints": (),
+    }
+    MIN_CAPACITY: int = 16
+    dtype_policy: DTypePolicy
+    display_data: Dict[str, DisplayData]
+    draw_fiber_points: bool
+
+    def __init__(
+        self,
+        dtype_policy: DTypePolicy = None,
+        display_data: Dict[str, DisplayData] = None,
+        draw_fiber_points: bool = False,
+    ):
+        """
+        This object builds AgentData one frame at a time, without knowing
+        the number of timesteps, agents or subpoints ahead of time.
+        Agents are stored in flat arrays like RaggedAgentData,
+        and the arrays double in size when they're full,
+        so appending copies each value a constant number of times on average.
+        finalize() trims the arrays once at the end
+
+        Parameters
+        ----------
+        dtype_policy: DTypePolicy (optional)
+            The dtypes to store the arrays in
+            Default: DTypePolicy() (compact)
+        display_data: Dict[str,DisplayData] (optional)
+            A dictionary mapping agent type name to DisplayData
+            to use for that type
+            Default: None
+        draw_fiber_points: bool (optional)
+            Draw spheres at every other fiber point for fibers?
+            Default: False
+        """
+        self.dtype_policy = dtype_policy if dtype_policy is not None else DTypePolicy()
+        self.display_data = display_data if display_data is not None else {}
+        self.draw_fiber_points = draw_fiber_points
+        self._total_steps = 0
+        self._times = np.zeros(0, dtype=self.dtype_policy.times)
+        self._n_agents = np.zeros(0, dtype=self.dtype_policy.counts)
+        self._total_agents = 0
+        self._agent_arrays = {
+            field: np.zeros((0,) + shape, dtype=self.dtype_policy.get_dtype(field))
+            for field, shape in AgentDataBuilder.AGENT_FIELDS.items()
+        }
+        self._type_codes = np.zeros(0, dtype=np.int32)
+        self._agent_types = AgentTypes()
+        self._total_subpoints = 0
+        self._subpoints = np.zeros(0, dtype=self.dtype_policy.spatial)
+
+    @staticmethod
+    def _reserve(values: np.ndarray, size: int, needed: int) -> np.ndarray:
+        """
+        Get the first size values in an array with room for needed values,
+        at least doubling the capacity if the array has to grow
+        """
+        if needed <= len(values):
+            return values
+        capacity = max(needed, 2 * len(values), AgentDataBuilder.MIN_CAPACITY)
+        result = np.zeros((capacity,) + values.shape[1:], dtype=values.dtype)
+        result[:size] = values[:size]
+        return result
+
+    def total_steps(self) -> int:
+        """
+        Get the number of frames appended
+        """
+        return self._total_steps
+
+    def total_agents(self) -> int:
+        """
+        Get the number of agents appended in all frames
+        """
+        return self._total_agents
+
+    def append_frame(self, time: float) -> int:
+        """
+        Start a new frame at the given time, with no agents,
+        and return its time index
+        """
+        needed = self._total_steps + 1
+        self._times = AgentDataBuilder._reserve(self._times, self._total_steps, needed)
+        self._n_agents = AgentDataBuilder._reserve(
+            self._n_agents, self._total_steps, needed
+        )
+        self._times[self._total_steps] = time
+        self._n_agents[self._total_steps] = 0
+        self._total_steps = needed
+        return self._total_steps - 1
+
+    def append_agents(
+        self,
+        unique_ids: Union[np.ndarray, List[int]],
+        types: Union[List[str], str],
+        positions: Union[np.ndarray, List[List[float]]],
+        radii: Union[np.ndarray, List[float], float],
+        viz_types: Union[np.ndarray, List[float], float] = VIZ_TYPE.DEFAULT,
+        rotations: Union[np.ndarray, List[List[float]]] = None,
+        n_subpoints: Union[np.ndarray, List[int], int] = None,
+        subpoints: Union[np.ndarray, List[float]] = None,
+    ) -> None:
+        """
+        Add agents to the last frame
+
+        Parameters
+        ----------
+        unique_ids : np.ndarray or List[int] (shape = [agents])
+            The unique ID of each agent
+        types : List[str] (shape = [agents]) or str
+            The type name of each agent, or one type name for all of them
+        positions : np.ndarray or List[List[float]] (shape = [agents, 3])
+            The XYZ position of each agent
+        radii : np.ndarray or List[float] (shape = [agents]) or float
+            The radius of each agent, or one radius for all of them
+        viz_types : np.ndarray or List[float] (shape = [agents]) or float (optional)
+            The viz type of each agent, or one viz type for all of them
+            Default: VIZ_TYPE.DEFAULT
+        rotations : np.ndarray or List[List[float]] (shape = [agents, 3])
+        (optional)
+            The XYZ euler angles of each agent in degrees
+            Default: [0, 0, 0] for each agent
+        n_subpoints : np.ndarray or List[int] (shape = [agents]) or int
+        (optional)
+            The number of subpoint values of each agent.
+            Required if subpoints are provided
+            Default: 0 for each agent
+        subpoints : np.ndarray or List[float] (shape = [sum of n_subpoints])
+        (optional)
+            The subpoint values of the agents, concatenated
+            Default: None
+        """
+        if self._total_steps < 1:
+            raise DataError("AgentDataBuilder needs a frame before agents are added")
+        unique_ids = np.asarray(unique_ids).ravel()
+        n = len(unique_ids)
+        if isinstance(types, str):
+            types = [types] * n
+        if len(types) != n:
+            raise DataError(f"{len(types)} type names were given for {n} agents")
+        agent_n_subpoints = np.broadcast_to(
+            n_subpoints if n_subpoints is not None else 0, n
+        )
+        n_subpoint_values = int(np.sum(agent_n_subpoints))
+        subpoints = (
+            np.asarray(subpoints).ravel() if subpoints is not None else np.zeros(0)
+        )
+        if len(subpoints) != n_subpoint_values:
+            raise DataError(
+                f"{len(subpoints)} subpoint values were given "
+                f"but n_subpoints adds up to {n_subpoint_values}"
+            )
+        values = {
+            "viz_types": viz_types,
+            "unique_ids": unique_ids,
+            "positions": positions,
+            "radii": radii,
+            "rotations": rotations if rotations is not None else 0.0,
+            "n_subpoints": agent_n_subpoints,
+        }
+        start = self._total_agents
+        stop = start + n
+        for field in AgentDataBuilder.AGENT_FIELDS:
+            self._agent_arrays[field] = AgentDataBuilder._reserve(
+                self._agent_arrays[field], start, stop
+            )
+            self._agent_arrays[field][start:stop] = self.dtype_policy.cast(
+                field, values[field]
+            )
+        self._type_codes = AgentDataBuilder._reserve(self._type_codes, start, stop)
+        self._type_codes[start:stop] = self._agent_types.get_codes(list(types))
+        subpoints_stop = self._total_subpoints + n_subpoint_values
+        self._subpoints = AgentDataBuilder._reserve(
+            self._subpoints, self._total_subpoints, subpoints_stop
+        )
+        self._subpoints[self._total_subpoints : subpoints_stop] = subpoints
+        self._total_subpoints = subpoints_stop
+        self._total_agents = stop
+        self._n_agents[self._total_steps - 1] += n
+
+    def finalize(self, ragged: bool = False) -> AgentData:
+        """
+        Get the appended frames as AgentData with padded arrays,
+        or as RaggedAgentData if ragged is True
+        """
+        total_steps = self._total_steps
+        total_agents = self._total_agents
+        result = RaggedAgentData(
+            times=np.copy(self._times[:total_steps]),
+            n_agents=np.copy(self._n_agents[:total_steps]),
+            viz_types=np.copy(self._agent_arrays["viz_types"][:total_agents]),
+            unique_ids=np.copy(self._agent_arrays["unique_ids"][:total_agents]),
+            types=np.copy(self._type_codes[:total_agents]),
+            type_names=list(self._agent_types.names),
+            positions=np.copy(self._agent_arrays["positions"][:total_agents]),
+            radii=np.copy(self._agent_arrays["radii"][:total_agents]),
+            rotations=np.copy(self._agent_arrays["rotations"][:total_agents]),
+            n_subpoints=np.copy(self._agent_arrays["n_subpoints"][:total_agents]),
+            subpoints=np.copy(self._subpoints[: self._total_subpoints]),
+            display_data=self.display_data,
+            draw_fiber_points=self.draw_fiber_points,
+            dtype_policy=self.dtype_policy,
+        )
+        return result if ragged else result.to_agent_data()
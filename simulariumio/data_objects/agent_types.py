@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Union
+
+import numpy as np
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class AgentTypes:
+    codes: np.ndarray
+    names: List[str]
+    lengths: np.ndarray
+
+    def __init__(self, types: Iterable[Iterable[str]] = None):
+        """
+        This object holds the type name of each agent at each timestep
+        as a matrix of int32 codes into a table of names,
+        so per-type operations can use array masks.
+        It can still be used like the List[List[str]] of names
+        (indexing, iterating, len, append, and each timestep's
+        append, extend, + and +=), and changes made that way
+        are stored as codes. Use tolist() where a list is needed,
+        e.g. for json.dumps
+
+        Parameters
+        ----------
+        types : Iterable[Iterable[str]] (optional)
+            For each timestep, the type name of each agent
+            Default: no timesteps
+        """
+        self.names = []
+        self._name_codes: Dict[str, int] = {}
+        rows = list(types) if types is not None else []
+        self.lengths = np.array([len(row) for row in rows], dtype=int)
+        self.codes = np.full(
+            (len(rows), int(np.max(self.lengths, initial=0))), -1, dtype=np.int32
+        )
+        self.codes[self.get_mask()] = self.get_codes(
+            [type_name for row in rows for type_name in row]
+        )
+
+    @classmethod
+    def from_codes(
+        cls,
+        codes: np.ndarray,
+        names: List[str],
+        lengths: Union[np.ndarray, List[int]] = None,
+    ) -> AgentTypes:
+        """
+        Create AgentTypes from a matrix of indices into a list of names
+
+        Parameters
+        ----------
+        codes : np.ndarray (shape = [timesteps, agents])
+            The index in names of each agent's type name,
+            or -1 where there is no agent
+        names : List[str]
+            The type names, which don't need to be distinct
+        lengths : np.ndarray or List[int] (shape = [timesteps]) (optional)
+            The number of agents with a type name at each timestep
+            Default: every agent slot in codes
+        """
+        result = cls()
+        codes = np.asarray(codes, dtype=int)
+        # index -1 in the lookup keeps -1
+        lookup = np.append(result.get_codes(list(names)), np.int32(-1))
+        result.codes = lookup[codes].astype(np.int32)
+        result.lengths = (
+            np.full(codes.shape[0], codes.shape[1], dtype=int)
+            if lengths is None
+            else np.array(lengths, dtype=int)
+        )
+        result.codes[~result.get_mask()] = -1
+        return result
+
+    def get_code(self, type_name: str) -> int:
+        """
+        Get the code for a type name, adding it to the names if it's new
+        """
+        code = self._name_codes.get(type_name)
+        if code is None:
+            code = len(self.names)
+            self._name_codes[type_name] = code
+            self.names.append(type_name)
+        return code
+
+    def get_codes(self, type_names: List[str]) -> np.ndarray:
+        """
+        Get the code for each of a list of type names,
+        adding new names in the order they first appear
+        """
+        name_codes = self._name_codes
+        n_names = len(name_codes)
+        codes = [
+            name_codes.setdefault(type_name, len(name_codes))
+            for type_name in type_names
+        ]
+        self.names += list(name_codes)[n_names:]
+        return np.array(codes, dtype=np.int32)
+
+    def get_mask(self) -> np.ndarray:
+        """
+        Get a mask of the slots in codes that hold a type name
+        """
+        return np.arange(self.codes.shape[1]) < self.lengths[:, np.newaxis]
+
+    def get_row_codes(self, time_index: int, n_agents: int) -> np.ndarray:
+        """
+        Get the codes of the first n_agents agents at a timestep,
+        with -1 for agents without a type name
+        """
+        result = np.full(n_agents, -1, dtype=np.int32)
+        n_codes = min(n_agents, self.codes.shape[1])
+        result[:n_codes] = self.codes[time_index, :n_codes]
+        return result
+
+    def _check_width(self, width: int) -> None:
+        """
+        Widen the codes, at least doubling them, if needed to fit width agents
+        """
+        if width <= self.codes.shape[1]:
+            return
+        codes = np.full(
+            (self.codes.shape[0], max(width, 2 * self.codes.shape[1])),
+            -1,
+            dtype=np.int32,
+        )
+        codes[:, : self.codes.shape[1]] = self.codes
+        self.codes = codes
+
+    def _set_row(self, time_index: int, type_names: List[str]) -> None:
+        self._check_width(len(type_names))
+        self.codes[time_index] = -1
+        self.codes[time_index, : len(type_names)] = self.get_codes(type_names)
+        self.lengths[time_index] = len(type_names)
+
+    def append_to_rows(self, other: AgentTypes, n_agents: np.ndarray) -> None:
+        """
+        Append the first n_agents[t] type names of each timestep in other
+        to the end of each of the first len(n_agents) timesteps
+        """
+        total_steps = len(n_agents)
+        n_agents = np.minimum(
+            np.asarray(n_agents, dtype=int), other.lengths[:total_steps]
+        )
+        if total_steps == 0:
+            return
+        # index -1 in the lookup keeps -1
+        lookup = np.append(self.get_codes(other.names), np.int32(-1))
+        time_indices, agent_indices = np.nonzero(
+            np.arange(np.max(n_agents)) < n_agents[:, np.newaxis]
+        )
+        self._check_width(int(np.max(self.lengths[:total_steps] + n_agents)))
+        self.codes[
+            time_indices, self.lengths[time_indices] + agent_indices
+        ] = lookup[other.codes[time_indices, agent_indices]]
+        self.lengths[:total_steps] += n_agents
+
+    def append(self, type_names: Iterable[str]) -> None:
+        """
+        Add a timestep with the given type names after the last timestep
+        """
+        if not self.lengths.flags.writeable:
+            raise ValueError("assignment destination is read-only")
+        self.codes = np.append(
+            self.codes, np.full((1, self.codes.shape[1]), -1, dtype=np.int32), axis=0
+        )
+        self.lengths = np.append(self.lengths, 0)
+        self._set_row(len(self) - 1, list(type_names))
+
+    def get_copy(self, total_steps: int, lengths: np.ndarray) -> AgentTypes:
+        """
+        Copy the timesteps, each cut to at most the given length,
+        and add timesteps with no agents to make total_steps timesteps
+        """
+        n_copied = min(len(lengths), len(self), total_steps)
+        lengths = np.minimum(
+            np.asarray(lengths[:n_copied], dtype=int), self.lengths[:n_copied]
+        )
+        result = AgentTypes()
+        result.names = list(self.names)
+        result._name_codes = dict(self._name_codes)
+        result.lengths = np.zeros(total_steps, dtype=int)
+        result.lengths[:n_copied] = lengths
+        result.codes = np.full(
+            (total_steps, int(np.max(result.lengths, initial=0))), -1, dtype=np.int32
+        )
+        mask = result.get_mask()[:n_copied]
+        result.codes[:n_copied][mask] = self.codes[:n_copied, : mask.shape[1]][mask]
+        return result
+
+    def tolist(self) -> List[List[str]]:
+        """
+        Get the type names as a list of lists
+        """
+        names = np.array(self.names + [""], dtype=object)[self.codes]
+        return [
+            names[time_index, :length].tolist()
+            for time_index, length in enumerate(self.lengths.tolist())
+        ]
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [
+                AgentTypesRow(self, time_index)
+                for time_index in range(len(self))[index]
+            ]
+        return AgentTypesRow(self, range(len(self))[index])
+
+    def __setitem__(self, index: int, type_names: Iterable[str]) -> None:
+        time_index = range(len(self))[index]
+        if isinstance(type_names, AgentTypesRow) and (
+            type_names.agent_types is self and type_names.time_index == time_index
+        ):
+            # the row was changed in place, e.g. by +=
+            return
+        self._set_row(time_index, list(type_names))
+
+    def __iter__(self) -> Iterator[AgentTypesRow]:
+        for time_index in range(len(self)):
+            yield AgentTypesRow(self, time_index)
+
+    def __eq__(self, other):
+        try:
+            return self.tolist() == [list(row) for row in other]
+        except TypeError:
+            return False
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
+
+    def __deepcopy__(self, memo):
+        return self.get_copy(len(self), self.lengths)
+
+
+class AgentTypesRow:
+    agent_types: AgentTypes
+    time_index: int
+
+    def __init__(self, agent_types: AgentTypes, time_index: int):
+        """
+        The type names of the agents at one timestep of an AgentTypes,
+        which can be used like a List[str]
+
+        Parameters
+        ----------
+        agent_types : AgentTypes
+            The type names of all timesteps
+        time_index : int
+            The index of this timestep
+        """
+        self.agent_types = agent_types
+        self.time_index = time_index
+
+    def _get_codes(self) -> np.ndarray:
+        return self.agent_types.codes[self.time_index, : len(self)]
+
+    def tolist(self) -> List[str]:
+        names = self.agent_types.names
+        return [names[code] for code in self._get_codes().tolist()]
+
+    def append(self, type_name: str) -> None:
+        agent_types = self.agent_types
+        length = len(self)
+        agent_types._check_width(length + 1)
+        agent_types.codes[self.time_index, length] = agent_types.get_code(type_name)
+        agent_types.lengths[self.time_index] += 1
+
+    def extend(self, type_names: Iterable[str]) -> None:
+        type_names = list(type_names)
+        agent_types = self.agent_types
+        length = len(self)
+        agent_types._check_width(length + len(type_names))
+        agent_types.codes[
+            self.time_index, length : length + len(type_names)
+        ] = agent_types.get_codes(type_names)
+        agent_types.lengths[self.time_index] += len(type_names)
+
+    def __iadd__(self, type_names: Iterable[str]) -> AgentTypesRow:
+        self.extend(type_names)
+        return self
+
+    def __add__(self, type_names: Iterable[str]) -> List[str]:
+        return self.tolist() + list(type_names)
+
+    def __radd__(self, type_names: Iterable[str]) -> List[str]:
+        return list(type_names) + self.tolist()
+
+    def __len__(self) -> int:
+        return int(self.agent_types.lengths[self.time_index])
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return self.tolist()[index]
+        return self.agent_types.names[self._get_codes()[index]]
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        if isinstance(index, slice):
+            type_names = self.tolist()
+            type_names[index] = value
+            self.agent_types._set_row(self.time_index, type_names)
+            return
+        agent_index = range(len(self))[index]
+        self.agent_types.codes[
+            self.time_index, agent_index
+        ] = self.agent_types.get_code(value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tolist())
+
+    def __contains__(self, type_name: str) -> bool:
+        return type_name in self.tolist()
+
+    def __eq__(self, other):
+        try:
+            return self.tolist() == list(other)
+        except TypeError:
+            return False
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
@@ -6,21 +6,31 @@ from .input_file_data import InputFileData
 from .trajectory_data import TrajectoryData
 from .simularium_file_data import SimulariumFileData
 from ..constants import BINARY_BLOCK_TYPE, BINARY_SETTINGS
+from ..codecs import BinaryFrameCodec, KeyframeDeltaDecoder, QuantizedFrameCodec
 from ..readers import BinaryBlockInfo, SimulariumBinaryReader
 
 
 class BinaryData(SimulariumFileData):
-    def __init__(self, file_contents: bytes):
+    def __init__(self, file_contents: bytes = b"", file_path: str = ""):
         """
         This object holds binary encoded simulation trajectory file's
         data while staying close to the original file format
 
         Parameters
         ----------
-        file_contents : bytes
+        file_contents : bytes (optional)
             A byte array containing the data of an open .simularium file
-        """
-        self.file_contents = InputFileData(file_contents=file_contents)
+            Default: use file_path instead
+        file_path : str (optional)
+            A path to a .simularium binary file, which is memory mapped
+            so opening it only reads the header and the frame table,
+            and frames are read from disk when they're requested.
+            Use it in a with block, or call close(), to release the file
+            Default: use file_contents instead
+        """
+        self.file_contents = InputFileData(
+            file_path=file_path, file_contents=file_contents
+        )
         self.file_data = SimulariumBinaryReader._binary_data_from_source(
             self.file_contents
         )
@@ -28,6 +38,12 @@ class BinaryData(SimulariumFileData):
         self.block_info: BinaryBlockInfo = None
         # Maps block type id to block index
         self.block_indices: Dict[int, int] = {}
+        # Are frames in the spatial data block compressed?
+        self.compressed: bool = False
+        # Decodes delta frames, if frames are keyframes and deltas
+        self.delta_decoder: KeyframeDeltaDecoder = None
+        # Are frames stored in the quantized layout?
+        self.quantized: bool = False
         self._parse_file()
 
     def _parse_file(self):
@@ -42,46 +58,58 @@ class BinaryData(SimulariumFileData):
             self.block_indices[block_type_id] = block_index
 
         # Extract each frame's metadata
+        self.compressed = (
+            BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value
+            in self.block_indices
+        )
         spatial_block_index = self.block_indices[
-            BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value
+            BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value
+            if self.compressed
+            else BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value
         ]
         block_offset = self.block_info.block_offsets[spatial_block_index]
         spatial_block_offset = (
             int(block_offset / BINARY_SETTINGS.BYTES_PER_VALUE)
             + BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
         )
+        if (
+            self.compressed
+            and self.file_data.int_view[spatial_block_offset]
+            == BINARY_SETTINGS.KEYFRAME_DELTA_SPATIAL_DATA_VERSION
+        ):
+            self.delta_decoder = KeyframeDeltaDecoder()
+        self.quantized = (
+            self.compressed
+            and self.file_data.int_view[spatial_block_offset]
+            == BINARY_SETTINGS.QUANTIZED_SPATIAL_DATA_VERSION
+        )
         n_frames = self.file_data.int_view[spatial_block_offset + 1]
-        current_frame_offset = (
+        frame_table_offset = (
             spatial_block_offset
             + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES
-            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME * n_frames
         )
-        for i in range(n_frames):
-            offset = (
-                self.file_data.int_view[
-                    spatial_block_offset
-                    + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES
-                    + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME * i
-                ]
-                + block_offset
-            )
-            length = self.file_data.int_view[
-                spatial_block_offset
-                + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES
-                + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME * i
-                + 1
-            ]
-            frame_number = self.file_data.int_view[current_frame_offset]
-            time = self.file_data.float_view[current_frame_offset + 1]
-            self.frame_metadata.append(
-                FrameMetadata(offset, length, frame_number, time)
+        frame_table = self.file_data.int_view[
+            frame_table_offset : frame_table_offset
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME * n_frames
+        ].astype(np.int64)
+        offsets = frame_table[0::2] + block_offset
+        lengths = frame_table[1::2]
+        # each frame starts with its frame number and time
+        frame_value_indices = offsets // BINARY_SETTINGS.BYTES_PER_VALUE
+        frame_numbers = self.file_data.int_view[frame_value_indices]
+        times = self.file_data.float_view[frame_value_indices + 1]
+        self.frame_metadata = [
+            FrameMetadata(offset, length, frame_number, time)
+            for offset, length, frame_number, time in zip(
+                offsets, lengths, frame_numbers, times
             )
-            current_frame_offset += int(length / BINARY_SETTINGS.BYTES_PER_VALUE)
+        ]
 
     def get_frame_at_index(self, frame_number: int) -> FrameData:
         """
         Return frame data for frame at index. If there is no frame at the index,
-        return None.
+        return None. Compressed and quantized frames are decoded,
+        so the data always holds an uncompressed float32 frame.
         """
         if frame_number < 0 or frame_number >= len(self.frame_metadata):
             # invalid frame number requested
@@ -90,6 +118,12 @@ class BinaryData(SimulariumFileData):
         metadata: FrameMetadata = self.frame_metadata[frame_number]
         start, end = metadata.get_start_end_indices()
         data = self.file_data.byte_view[start:end]
+        if self.delta_decoder is not None:
+            data = self._decode_delta_frame(frame_number)
+        elif self.quantized:
+            data = QuantizedFrameCodec.decode_frame(data)
+        elif self.compressed:
+            data = BinaryFrameCodec.decode_frame(data)
         return FrameData(
             frame_number=frame_number,
             n_agents=self.file_data.int_view[
@@ -99,6 +133,20 @@ class BinaryData(SimulariumFileData):
             data=data,
         )
 
+    def _decode_delta_frame(self, frame_number: int) -> bytes:
+        """
+        Decode a frame by applying the deltas from its keyframe,
+        continuing from the last decoded frame if it is in the same chain
+        """
+        return self.delta_decoder.decode_frame_at(frame_number, self._frame_bytes)
+
+    def _frame_bytes(self, frame_number: int) -> bytes:
+        """
+        Get the encoded bytes of a frame
+        """
+        start, end = self.frame_metadata[frame_number].get_start_end_indices()
+        return self.file_data.byte_view[start:end]
+
     def get_index_for_time(self, time: float) -> int:
         """
         Return index for frame closest to a given timestamp
@@ -130,17 +178,28 @@ class BinaryData(SimulariumFileData):
         """
         Return plot data block for trajectory, as dict
         """
+        if BINARY_BLOCK_TYPE.PLOT_DATA_BINARY.value in self.block_indices:
+            block_index = self.block_indices[BINARY_BLOCK_TYPE.PLOT_DATA_BINARY.value]
+            return SimulariumBinaryReader._binary_block_plot_data(
+                block_index, self.block_info, self.file_data.byte_view
+            )
         block_index = self.block_indices[BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value]
         return SimulariumBinaryReader._binary_block_json(
             block_index, self.block_info, self.file_data.byte_view
         )
 
-    def get_trajectory_data_object(self) -> TrajectoryData:
+    def get_trajectory_data_object(
+        self, start: int = None, stop: int = None, step: int = None
+    ) -> TrajectoryData:
         """
-        Return the data of the trajectory, as a TrajectoryData object
+        Return the data of the trajectory, as a TrajectoryData object.
+        If start, stop or step are given, only the frames
+        in range(start, stop, step) are read and included
         """
-        trajectory_dict = SimulariumBinaryReader.load_binary(self.file_contents)
-        return TrajectoryData.from_buffer_data(trajectory_dict)
+        buffer_data, agent_data = SimulariumBinaryReader._agent_data_from_binary_data(
+            self.file_data, start=start, stop=stop, step=step
+        )
+        return TrajectoryData.from_buffer_data(buffer_data, agent_data=agent_data)
 
     def get_file_contents(self) -> bytes:
         """
@@ -154,6 +213,14 @@ class BinaryData(SimulariumFileData):
         """
         return len(self.frame_metadata)
 
+    def close(self) -> None:
+        """
+        Release the memory mapped file, if the data was read from a path.
+        Frames can't be read after this, frames already read
+        and TrajectoryData are still valid
+        """
+        self.file_data.close()
+
 
 class FrameMetadata:
     def __init__(self, offset: int, length: int, frame_number: int, time: float):
@@ -0,0 +1,284 @@
+import itertools
+import os
+import struct
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from .agent_data import AgentData
+from .binary_data import BinaryData
+from .frame_data import FrameData
+from .trajectory_data import TrajectoryData
+from .simularium_file_data import SimulariumFileData
+from ..constants import BINARY_BLOCK_TYPE, BINARY_SETTINGS
+from ..exceptions import DataError
+from ..readers import SimulariumBinaryReader
+
+
+class ChunkedBinaryData(SimulariumFileData):
+    def __init__(self, file_paths: List[str]):
+        """
+        This object reads a trajectory saved as several .simularium
+        binary chunk files, as written by BinaryWriter.save
+        when the data is larger than the max file size,
+        as one trajectory with global frame indices.
+        Only the header and spatial data block header of each file
+        are read to index the frames, and each chunk file
+        is memory mapped the first time one of its frames is requested
+
+        Parameters
+        ----------
+        file_paths : List[str]
+            Paths to the chunk files, in frame order
+        """
+        if len(file_paths) == 0:
+            raise DataError("No chunk files were given")
+        self.file_paths = list(file_paths)
+        # BinaryData for each chunk that has been opened
+        self.chunks: Dict[int, BinaryData] = {}
+        chunk_headers = [
+            ChunkedBinaryData._read_chunk_header(file_path)
+            for file_path in self.file_paths
+        ]
+        n_frames = np.array([header[0] for header in chunk_headers], dtype=np.int64)
+        # global index of each chunk's first frame, and the total
+        self.chunk_starts = np.concatenate([[0], np.cumsum(n_frames)])
+        self.chunk_first_times = np.array([header[1] for header in chunk_headers])
+        self.chunk_last_times = np.array([header[2] for header in chunk_headers])
+
+    @classmethod
+    def from_output_path(cls, output_path: str):
+        """
+        Find the chunk files BinaryWriter.save wrote for an output path,
+        output_path_0.simularium, output_path_1.simularium and so on,
+        or output_path.simularium if the data fit in one file
+        """
+        file_paths = []
+        while os.path.isfile(f"{output_path}_{len(file_paths)}.simularium"):
+            file_paths.append(f"{output_path}_{len(file_paths)}.simularium")
+        if len(file_paths) == 0:
+            file_paths.append(f"{output_path}.simularium")
+        return cls(file_paths)
+
+    @staticmethod
+    def _read_chunk_header(file_path: str) -> Tuple[int, float, float]:
+        """
+        Read the number of frames and the times of the first and last frame
+        from a .simularium binary file's header and spatial data block header,
+        without reading the rest of the file
+        """
+        header_n_bytes = (
+            len(BINARY_SETTINGS.FILE_IDENTIFIER)
+            + BINARY_SETTINGS.HEADER_CONSTANT_N_VALUES * BINARY_SETTINGS.BYTES_PER_VALUE
+        )
+        with open(file_path, "rb") as chunk_file:
+            header = chunk_file.read(header_n_bytes)
+            (n_blocks,) = struct.unpack(
+                "<I", header[-BINARY_SETTINGS.BYTES_PER_VALUE :]
+            )
+            header += chunk_file.read(
+                BINARY_SETTINGS.HEADER_N_VALUES_PER_BLOCK
+                * BINARY_SETTINGS.BYTES_PER_VALUE
+                * n_blocks
+            )
+            block_info = SimulariumBinaryReader._parse_binary_header(header)
+            spatial_blocks = [
+                block_index
+                for block_index in range(block_info.n_blocks)
+                if block_info.block_types[block_index]
+                in [
+                    BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value,
+                    BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value,
+                ]
+            ]
+            if len(spatial_blocks) == 0:
+                raise DataError(f"{file_path} has no binary spatial data block")
+            block_offset = block_info.block_offsets[spatial_blocks[-1]]
+            chunk_file.seek(
+                block_offset
+                + BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
+                * BINARY_SETTINGS.BYTES_PER_VALUE
+            )
+            _, n_frames = struct.unpack("<II", chunk_file.read(8))
+            if n_frames == 0:
+                return 0, np.inf, -np.inf
+            frame_table = chunk_file.tell()
+            times = []
+            for frame_index in [0, n_frames - 1]:
+                # each frame table entry is the frame's offset and length
+                chunk_file.seek(frame_table + 8 * frame_index)
+                (frame_offset,) = struct.unpack("<I", chunk_file.read(4))
+                # each frame starts with its frame number and time
+                chunk_file.seek(
+                    block_offset + frame_offset + BINARY_SETTINGS.BYTES_PER_VALUE
+                )
+                times.append(struct.unpack("<f", chunk_file.read(4))[0])
+        return n_frames, times[0], times[1]
+
+    def _chunk_for_frame(self, frame_number: int) -> Tuple[int, int]:
+        """
+        Get the index of the chunk holding a global frame index,
+        and the frame's index within that chunk
+        """
+        chunk_index = (
+            int(np.searchsorted(self.chunk_starts, frame_number, side="right")) - 1
+        )
+        return chunk_index, frame_number - int(self.chunk_starts[chunk_index])
+
+    def get_chunk(self, chunk_index: int) -> BinaryData:
+        """
+        Get the BinaryData for a chunk file, memory mapping it
+        the first time it is requested
+        """
+        if chunk_index not in self.chunks:
+            self.chunks[chunk_index] = BinaryData(
+                file_path=self.file_paths[chunk_index]
+            )
+        return self.chunks[chunk_index]
+
+    def get_frame_at_index(self, frame_number: int) -> FrameData:
+        """
+        Return frame data for the frame at a global index.
+        If there is no frame at the index, return None.
+        The frame_number of the result is the global index
+        """
+        if frame_number < 0 or frame_number >= self.get_num_frames():
+            # invalid frame number requested
+            return None
+        chunk_index, chunk_frame_index = self._chunk_for_frame(frame_number)
+        frame = self.get_chunk(chunk_index).get_frame_at_index(chunk_frame_index)
+        frame.frame_number = frame_number
+        return frame
+
+    def iter_frames(
+        self, start: int = 0, stop: int = None, step: int = 1
+    ) -> Iterator[FrameData]:
+        """
+        Iterate over the frames in range(start, stop, step) across chunks,
+        opening each chunk when its first frame is reached
+
+        Parameters
+        ----------
+        start: int (optional)
+            global index of the first frame
+            Default: 0
+        stop: int (optional)
+            global index to stop before
+            Default: None (after the last frame)
+        step: int (optional)
+            yield every step-th frame
+            Default: 1
+        """
+        for frame_number in range(self.get_num_frames())[start:stop:step]:
+            yield self.get_frame_at_index(frame_number)
+
+    def __iter__(self) -> Iterator[FrameData]:
+        return self.iter_frames()
+
+    def get_index_for_time(self, time: float) -> int:
+        """
+        Return the global index for the frame closest to a given timestamp.
+        The chunk is found from the times of each chunk's first
+        and last frames, so only that chunk is opened
+        """
+        chunk_distances = np.maximum(
+            0.0,
+            np.maximum(self.chunk_first_times - time, time - self.chunk_last_times),
+        )
+        chunk_index = int(np.argmin(chunk_distances))
+        return int(self.chunk_starts[chunk_index]) + self.get_chunk(
+            chunk_index
+        ).get_index_for_time(time)
+
+    def get_trajectory_info(self) -> Dict:
+        """
+        Return trajectory info block for the whole trajectory, as dict
+        """
+        result = self.get_chunk(0).get_trajectory_info()
+        result["totalSteps"] = self.get_num_frames()
+        return result
+
+    def get_plot_data(self) -> Dict:
+        """
+        Return plot data block for trajectory, as dict
+        """
+        return self.get_chunk(0).get_plot_data()
+
+    def get_trajectory_data_object(
+        self, start: int = None, stop: int = None, step: int = None
+    ) -> TrajectoryData:
+        """
+        Return the data of the trajectory across all chunks,
+        as a TrajectoryData object.
+        If start, stop or step are given, only the frames
+        in range(start, stop, step) are read and included,
+        and chunks without any of those frames are not read
+        """
+        buffer_data = None
+        times = []
+        frame_buffers = []
+        frame_numbers = range(self.get_num_frames())[start:stop:step]
+        for chunk_index, chunk_frame_numbers in itertools.groupby(
+            frame_numbers,
+            key=lambda frame_number: self._chunk_for_frame(frame_number)[0],
+        ):
+            chunk_start = int(self.chunk_starts[chunk_index])
+            local_indices = [
+                frame_number - chunk_start for frame_number in chunk_frame_numbers
+            ]
+            (
+                chunk_buffer_data,
+                chunk_times,
+                chunk_frame_buffers,
+            ) = SimulariumBinaryReader._load_binary_frames(
+                self.get_chunk(chunk_index).file_data,
+                *ChunkedBinaryData._index_slice(local_indices),
+            )
+            if buffer_data is None:
+                buffer_data = chunk_buffer_data
+            times += chunk_times
+            frame_buffers += chunk_frame_buffers
+        if buffer_data is None:
+            buffer_data = {
+                "trajectoryInfo": self.get_trajectory_info(),
+                "plotData": self.get_plot_data(),
+            }
+        buffer_data["trajectoryInfo"]["totalSteps"] = len(frame_buffers)
+        agent_data = AgentData.from_frame_buffers(
+            times=times,
+            frame_buffers=frame_buffers,
+            type_mapping=buffer_data["trajectoryInfo"]["typeMapping"],
+        )
+        return TrajectoryData.from_buffer_data(buffer_data, agent_data=agent_data)
+
+    @staticmethod
+    def _index_slice(indices: List[int]) -> Tuple[int, int, int]:
+        """
+        Get start, stop and step for an evenly spaced list of indices
+        """
+        step = indices[1] - indices[0] if len(indices) > 1 else 1
+        stop = indices[-1] + (1 if step > 0 else -1)
+        return indices[0], stop if stop >= 0 else None, step
+
+    def get_file_contents(self) -> List[bytes]:
+        """
+        Return raw file data of each chunk, as bytes
+        """
+        return [
+            self.get_chunk(index).get_file_contents()
+            for index in range(len(self.file_paths))
+        ]
+
+    def get_num_frames(self) -> int:
+        """
+        Return number of frames in the whole trajectory
+        """
+        return int(self.chunk_starts[-1])
+
+    def close(self) -> None:
+        """
+        Release the memory mapped chunk files that have been opened
+        """
+        for chunk in self.chunks.values():
+            chunk.close()
+        self.chunks = {}
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+
+import numpy as np
+
+from ..exceptions import DataError
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class DTypePolicy:
+    times: np.dtype
+    spatial: np.dtype
+    ids: np.dtype
+    counts: np.dtype
+    viz_types: np.dtype
+
+    # the kind of values held in each AgentData array
+    FIELD_KINDS: Dict[str, str] = {
+        "times": "times",
+        "n_agents": "counts",
+        "viz_types": "viz_types",
+        "unique_ids": "ids",
+        "positions": "spatial",
+        "radii": "spatial",
+        "rotations": "spatial",
+        "n_subpoints": "counts",
+        "subpoints": "spatial",
+    }
+
+    def __init__(
+        self,
+        times: Any = np.float64,
+        spatial: Any = np.float32,
+        ids: Any = np.int64,
+        counts: Any = np.int32,
+        viz_types: Any = np.uint16,
+    ):
+        """
+        This object holds the numpy dtype to store each kind
+        of AgentData values in. The defaults are compact:
+        spatial values are float32 (the precision they are
+        written with in binary files), counts are int32,
+        and viz types are uint16, which holds the VIZ_TYPE values
+        without needing to decode them. IDs are int64, so IDs
+        past the 32 bit range are kept and rejected by validation
+        instead of wrapping around
+
+        Parameters
+        ----------
+        times : np.dtype (optional)
+            dtype for the time of each timestep
+            Default: np.float64
+        spatial : np.dtype (optional)
+            dtype for positions, radii, rotations, and subpoints
+            Default: np.float32
+        ids : np.dtype (optional)
+            dtype for unique IDs
+            Default: np.int64
+        counts : np.dtype (optional)
+            dtype for the number of agents and number of subpoints
+            Default: np.int32
+        viz_types : np.dtype (optional)
+            dtype for viz types
+            Default: np.uint16
+        """
+        self.times = np.dtype(times)
+        self.spatial = np.dtype(spatial)
+        self.ids = np.dtype(ids)
+        self.counts = np.dtype(counts)
+        self.viz_types = np.dtype(viz_types)
+        for kind in ["ids", "counts"]:
+            if getattr(self, kind).kind not in "iu":
+                raise DataError(
+                    f"dtype for {kind} must be an integer type, "
+                    f"not {getattr(self, kind)}"
+                )
+
+    @classmethod
+    def full_precision(cls) -> DTypePolicy:
+        """
+        Create a policy that stores floats as float64 and integers as int64
+        """
+        return cls(
+            times=np.float64,
+            spatial=np.float64,
+            ids=np.int64,
+            counts=np.int64,
+            viz_types=np.float64,
+        )
+
+    def get_dtype(self, field: str) -> np.dtype:
+        """
+        Get the dtype for the AgentData array with the given name
+        """
+        if field not in DTypePolicy.FIELD_KINDS:
+            raise DataError(f"{field} is not an AgentData array")
+        return getattr(self, DTypePolicy.FIELD_KINDS[field])
+
+    def cast(self, field: str, values: Any) -> np.ndarray:
+        """
+        Get the values as an array of the dtype for the AgentData array
+        with the given name, without copying if they already are.
+        Raise a DataError instead of narrowing values that don't fit
+        in an integer dtype
+        """
+        dtype = self.get_dtype(field)
+        values = np.asarray(values)
+        if (
+            dtype.kind in "iu"
+            and values.size > 0
+            and not np.can_cast(values.dtype, dtype)
+        ):
+            limits = np.iinfo(dtype)
+            min_value = np.min(values)
+            max_value = np.max(values)
+            if min_value < limits.min or max_value > limits.max:
+                raise DataError(
+                    f"{field} has values from {min_value} to {max_value}, "
+                    f"which don't fit in {dtype}"
+                )
+        return values.astype(dtype, copy=False)
+
+    def __str__(self):
+        return (
+            f"times: {self.times}, spatial: {self.spatial}, ids: {self.ids}, "
+            f"counts: {self.counts}, viz types: {self.viz_types}"
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, DTypePolicy):
+            return all(
+                getattr(self, kind) == getattr(other, kind)
+                for kind in set(DTypePolicy.FIELD_KINDS.values())
+            )
+        return False
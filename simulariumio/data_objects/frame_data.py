@@ -1,9 +1,18 @@
-from typing import Dict, Union
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from ..constants import BINARY_SETTINGS, V1_SPATIAL_BUFFER_STRUCT, VALUES_PER_3D_POINT
+from .agent_data import AgentData
 
 
 class FrameData:
     def __init__(
-        self, frame_number: int, n_agents: int, time: float, data: Union[bytes, Dict]
+        self,
+        frame_number: int,
+        n_agents: int,
+        time: float,
+        data: Union[bytes, List[float]],
     ):
         """
         This object holds frame data for a single frame of simularium data
@@ -16,11 +25,119 @@ class FrameData:
             Number of agents included in the frame
         time : float
             Elapsed simulation time of the frame
-        data : bytes or dict
+        data : bytes or List[float]
             Spatial data for the frame, as a byte array for binary encoded
-            .simularium files or as a dict for JSON .simularium files
+            .simularium files or as a list of values for JSON .simularium files
         """
         self.frame_number = frame_number
         self.n_agents = n_agents
         self.time = time
         self.data = data
+        self._buffer = None
+        self._has_subpoints = None
+        self._agent_starts = None
+        self._agents = None
+        self._subpoints = None
+
+    @staticmethod
+    def agent_dtype(value_dtype: np.dtype = np.dtype("<f4")) -> np.dtype:
+        """
+        Get the structured dtype of one agent's values in the V1 layout,
+        not including subpoints
+        """
+        return np.dtype(
+            [
+                ("viz_type", value_dtype),
+                ("unique_id", value_dtype),
+                ("type_id", value_dtype),
+                ("position", value_dtype, (VALUES_PER_3D_POINT,)),
+                ("rotation", value_dtype, (VALUES_PER_3D_POINT,)),
+                ("radius", value_dtype),
+                ("n_subpoints", value_dtype),
+            ]
+        )
+
+    def get_buffer(self) -> np.ndarray:
+        """
+        Get the frame's values in the V1 layout, without the frame header.
+        For binary frames this is a float32 view of the frame's bytes
+        """
+        if self._buffer is None:
+            if isinstance(self.data, (bytes, bytearray, memoryview)):
+                self._buffer = np.frombuffer(
+                    self.data,
+                    dtype="<f4",
+                    offset=BINARY_SETTINGS.FRAME_HEADER_N_VALUES
+                    * BINARY_SETTINGS.BYTES_PER_VALUE,
+                )
+            else:
+                self._buffer = np.asarray(self.data, dtype=float)
+        return self._buffer
+
+    def _get_agent_starts(self) -> np.ndarray:
+        """
+        Get the index where each agent starts in the frame's buffer,
+        or None if no agents have subpoints
+        """
+        if self._has_subpoints is None:
+            buffer = self.get_buffer()
+            self._has_subpoints = AgentData._frame_has_subpoints(buffer)
+            if self._has_subpoints:
+                _, _, self._agent_starts = AgentData._get_buffer_agent_starts(
+                    buffer, np.array([0]), np.array([len(buffer)])
+                )
+        return self._agent_starts
+
+    def get_agents(self) -> np.ndarray:
+        """
+        Get the frame's agents as a structured array with fields
+        viz_type, unique_id, type_id, position, rotation, radius
+        and n_subpoints. Each field is an array with a value per agent.
+        If no agents have subpoints, this is a strided view
+        of the frame's values, otherwise the agents' values are gathered
+        into a new array once per frame
+        """
+        if self._agents is None:
+            buffer = self.get_buffer()
+            agent_dtype = FrameData.agent_dtype(buffer.dtype)
+            agent_starts = self._get_agent_starts()
+            if agent_starts is None:
+                self._agents = buffer.view(agent_dtype)
+            else:
+                self._agents = (
+                    buffer[
+                        agent_starts[:, np.newaxis]
+                        + np.arange(V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT)
+                    ]
+                    .ravel()
+                    .view(agent_dtype)
+                )
+        return self._agents
+
+    def get_subpoints(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the frame's subpoints as a ragged pair of arrays:
+        the subpoint values of all agents in agent order,
+        and offsets with a value per agent plus one,
+        so agent i's subpoints are values[offsets[i] : offsets[i + 1]]
+        """
+        if self._subpoints is None:
+            buffer = self.get_buffer()
+            agent_starts = self._get_agent_starts()
+            if agent_starts is None:
+                values = buffer[:0]
+                n_subpoints = np.zeros(len(self.get_agents()), dtype=np.int64)
+            else:
+                n_subpoints = buffer[
+                    agent_starts + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
+                ].astype(np.int64)
+                values = buffer[
+                    np.repeat(
+                        agent_starts + V1_SPATIAL_BUFFER_STRUCT.SP_INDEX, n_subpoints
+                    )
+                    + AgentData._get_subpoint_ranks(n_subpoints)
+                ]
+            offsets = np.zeros(len(n_subpoints) + 1, dtype=np.int64)
+            np.cumsum(n_subpoints, out=offsets[1:])
+            self._subpoints = (values, offsets)
+        return self._subpoints
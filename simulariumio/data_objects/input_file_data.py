@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import mmap
+import os
 from typing import Union
 
 from ..exceptions import DataError
@@ -60,6 +62,22 @@ class InputFileData:
         with open(self.file_path, "r") as myfile:
             return myfile.read()
 
+    def get_mapped_contents(self) -> Union[bytes, mmap.mmap]:
+        """
+        Return the contents of a binary file.
+
+        If file_contents is not empty, return that.
+        Otherwise memory map the file at file_path read-only,
+        so only the parts that are accessed are read from disk,
+        and processes reading the same file share its pages.
+        """
+        if self.file_contents:
+            return self.file_contents
+        if os.path.getsize(self.file_path) == 0:
+            return b""
+        with open(self.file_path, "rb") as myfile:
+            return mmap.mmap(myfile.fileno(), 0, access=mmap.ACCESS_READ)
+
     def _is_binary(self):
         """
         Is this data in binary? (or JSON?)
@@ -1,108 +1,298 @@
-from typing import Dict, List
+from typing import Any, Dict, Tuple, Union
 import json
+import logging
+import mmap
+import os
+import re
 import numpy as np
 
+from .agent_data import AgentData
 from .frame_data import FrameData
+from .input_file_data import InputFileData
 from .simularium_file_data import SimulariumFileData
 from .trajectory_data import TrajectoryData
 from ..constants import V1_SPATIAL_BUFFER_STRUCT
+from ..exceptions import DataError
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Characters that open or close JSON objects, arrays and strings
+_STRUCTURE_PATTERN = re.compile(rb'[{}\[\]"]')
+_STRING_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"')
+_ARRAY_START_PATTERN = re.compile(rb"\s*:\s*\[")
+_TIME_PATTERN = re.compile(rb'"time"\s*:\s*([^,}\s]+)')
 
 
 class JsonData(SimulariumFileData):
-    def __init__(self, file_contents: str):
+    def __init__(
+        self,
+        file_contents: str = "",
+        file_path: str = "",
+        index_path: str = None,
+    ):
         """
         This object holds JSON encoded simulation trajectory file's
-        data while staying close to the original file format
+        data while staying close to the original file format.
+        The document is scanned once to index the byte span and time
+        of each frame in bundleData, and frames are only parsed
+        when they are requested
 
         Parameters
         ----------
-        file_contents : str
+        file_contents : str (optional)
             A string of the data of an open .simularium file
+            Default: use file_path instead
+        file_path : str (optional)
+            A path to a JSON .simularium file, which is memory mapped
+            so only the requested frames are read from disk
+            Default: use file_contents instead
+        index_path : str (optional)
+            A path to save the frame index to, and load it from
+            when the file is reopened, if the file hasn't changed since.
+            Only used with file_path
+            Default: None (file_path + ".index.npz")
+        """
+        input_file = InputFileData(file_path=file_path, file_contents=file_contents)
+        if file_contents:
+            self.contents = (
+                file_contents.encode("utf-8")
+                if isinstance(file_contents, str)
+                else file_contents
+            )
+        else:
+            self.contents = input_file.get_mapped_contents()
+        self._header: Dict[str, Any] = None
+        index = None
+        if file_path and not file_contents:
+            if index_path is None:
+                index_path = file_path + ".index.npz"
+            index = JsonData._load_index(file_path, index_path)
+        if index is None:
+            index = JsonData._index_bundle_data(self.contents)
+            if file_path and not file_contents:
+                JsonData._save_index(file_path, index_path, index)
+        self.bundle_span, self.frame_spans, self.times = index
+
+    @staticmethod
+    def _skip_string(contents: Union[bytes, mmap.mmap], position: int) -> int:
+        """
+        Get the position after the JSON string starting at a position
+        """
+        match = _STRING_PATTERN.match(contents, position)
+        if match is None:
+            raise DataError(f"Unterminated string at byte {position} in JSON")
+        return match.end()
+
+    @staticmethod
+    def _find_bundle_data(contents: Union[bytes, mmap.mmap]) -> int:
+        """
+        Get the position of the opening bracket of the bundleData array,
+        skipping over strings and numbers with regular expressions
+        """
+        depth = 0
+        position = 0
+        while True:
+            match = _STRUCTURE_PATTERN.search(contents, position)
+            if match is None:
+                raise DataError("No spatialData.bundleData array in JSON")
+            character = contents[match.start() : match.end()]
+            if character == b'"':
+                position = JsonData._skip_string(contents, match.start())
+                # bundleData is a key in spatialData, two objects deep
+                if depth == 2 and contents[match.start() : position] == b'"bundleData"':
+                    array_start = _ARRAY_START_PATTERN.match(contents, position)
+                    if array_start is not None:
+                        return array_start.end() - 1
+                continue
+            position = match.end()
+            depth += 1 if character in b"{[" else -1
+
+    @staticmethod
+    def _index_bundle_data(
+        contents: Union[bytes, mmap.mmap],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scan the bundleData array once to find the byte span of each frame
+        and read each frame's time without parsing its data.
+        Returns the span of the bundleData array including its brackets,
+        the span of each frame, and the time of each frame
+        """
+        bundle_start = JsonData._find_bundle_data(contents)
+        frame_spans = []
+        times = []
+        depth = 0
+        position = bundle_start + 1
+        while True:
+            match = _STRUCTURE_PATTERN.search(contents, position)
+            if match is None:
+                raise DataError("Unterminated bundleData array in JSON")
+            character = contents[match.start() : match.end()]
+            if character == b'"':
+                position = JsonData._skip_string(contents, match.start())
+                continue
+            position = match.end()
+            if character in b"{[":
+                if depth == 0:
+                    frame_start = match.start()
+                depth += 1
+                continue
+            if depth == 0:
+                # the end of bundleData
+                break
+            depth -= 1
+            if depth == 0:
+                frame_spans.append((frame_start, position))
+                time = _TIME_PATTERN.search(contents, frame_start, position)
+                if time is None:
+                    raise DataError(f"Frame {len(times)} in bundleData has no time")
+                times.append(float(time.group(1)))
+        return (
+            np.array([bundle_start, position], dtype=np.int64),
+            np.array(frame_spans, dtype=np.int64).reshape(-1, 2),
+            np.array(times, dtype=float),
+        )
+
+    @staticmethod
+    def _load_index(
+        file_path: str, index_path: str
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Load a saved frame index, or return None if there isn't one
+        or the file has changed since it was saved
+        """
+        if not os.path.isfile(index_path):
+            return None
+        stat = os.stat(file_path)
+        with np.load(index_path) as index:
+            if (
+                int(index["file_size"]) != stat.st_size
+                or int(index["file_mtime_ns"]) != stat.st_mtime_ns
+            ):
+                return None
+            return index["bundle_span"], index["frame_spans"], index["times"]
+
+    @staticmethod
+    def _save_index(
+        file_path: str,
+        index_path: str,
+        index: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    ) -> None:
+        """
+        Save a frame index next to the file it indexes,
+        with the file's size and modification time to check it's current
         """
-        self.data = json.loads(file_contents)
-        self.n_agents = JsonData._get_n_agents(self.data)
-
-    def _get_n_agents(data: Dict) -> List[int]:
-        # return number of agents in each timestamp as a list
-        n_agents = []
-        bundle_data = data["spatialData"]["bundleData"]
-        for time_index in range(data["trajectoryInfo"]["totalSteps"]):
-            frame_data = bundle_data[time_index]["data"]
-            agent_index = 0
-            buffer_index = 0
-            while buffer_index + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX < len(frame_data):
-                n_subpoints = int(
-                    frame_data[buffer_index + V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX]
+        stat = os.stat(file_path)
+        bundle_span, frame_spans, times = index
+        try:
+            with open(index_path, "wb") as index_file:
+                np.savez(
+                    index_file,
+                    file_size=stat.st_size,
+                    file_mtime_ns=stat.st_mtime_ns,
+                    bundle_span=bundle_span,
+                    frame_spans=frame_spans,
+                    times=times,
                 )
-                # length of one agents spatial data = SP_INDEX + n_subpoints
-                buffer_index += n_subpoints + V1_SPATIAL_BUFFER_STRUCT.SP_INDEX
-                agent_index += 1
-            n_agents.append(agent_index)
-        return n_agents
+        except OSError as error:
+            log.warning(f"Couldn't save JSON frame index to {index_path}: {error}")
+
+    def _get_header(self) -> Dict[str, Any]:
+        """
+        Parse everything in the document except the frames in bundleData
+        """
+        if self._header is None:
+            bundle_start, bundle_end = self.bundle_span
+            self._header = json.loads(
+                bytes(self.contents[: bundle_start + 1])
+                + bytes(self.contents[bundle_end - 1 :])
+            )
+        return self._header
+
+    def _get_frame(self, frame_number: int) -> Dict[str, Any]:
+        """
+        Parse one frame of bundleData
+        """
+        frame_start, frame_end = self.frame_spans[frame_number]
+        return json.loads(bytes(self.contents[frame_start:frame_end]))
+
+    @staticmethod
+    def _get_n_agents(frame_data: np.ndarray) -> int:
+        # return number of agents in a frame's buffer
+        if not AgentData._frame_has_subpoints(frame_data):
+            return len(frame_data) // V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
+        _, _, agent_starts = AgentData._get_buffer_agent_starts(
+            frame_data, np.array([0]), np.array([len(frame_data)])
+        )
+        return len(agent_starts)
 
     def get_frame_at_index(self, frame_number: int) -> FrameData:
         """
         Return frame data for frame at index. If there is no frame at the index,
         return None.
         """
-        if frame_number < 0 or frame_number >= len(
-            self.data["spatialData"]["bundleData"]
-        ):
+        if frame_number < 0 or frame_number >= self.get_num_frames():
             # invalid frame number requested
             return None
 
-        frame_data = self.data["spatialData"]["bundleData"][frame_number]
+        frame_data = self._get_frame(frame_number)
         return FrameData(
             frame_number=frame_number,
-            n_agents=self.n_agents[frame_number],
+            n_agents=JsonData._get_n_agents(np.asarray(frame_data["data"])),
             time=frame_data["time"],
             data=frame_data["data"],
         )
 
     def get_index_for_time(self, time: float) -> int:
         """
-        Return index for frame closest to a given timestamp
-        """
-        closest_frame = -1
-        min_dist = np.inf
-        for frame in self.data["spatialData"]["bundleData"]:
-            dist = abs(frame["time"] - time)
-            if dist < min_dist:
-                min_dist = dist
-                closest_frame = frame["frameNumber"]
-            else:
-                # if dist is increasing, we've passed the closest frame
-                break
-
-        # frame index must be <= self.get_num_frames() - 1
-        return min(closest_frame, self.get_num_frames() - 1)
+        Return index for frame closest to a given timestamp,
+        by binary search of the frame times
+        """
+        if self.get_num_frames() == 0:
+            return -1
+        index = int(np.searchsorted(self.times, time))
+        if index == self.get_num_frames() or (
+            index > 0 and time - self.times[index - 1] <= self.times[index] - time
+        ):
+            index -= 1
+        return index
 
     def get_trajectory_info(self) -> Dict:
         """
         Return trajectory info block for trajectory, as dict
         """
-        return self.data["trajectoryInfo"]
+        return self._get_header()["trajectoryInfo"]
 
     def get_plot_data(self) -> Dict:
         """
         Return plot data block for trajectory, as dict
         """
-        return self.data["plotData"]
+        return self._get_header()["plotData"]
 
     def get_trajectory_data_object(self) -> TrajectoryData:
         """
         Return the data of the trajectory, as a TrajectoryData object
         """
-        return TrajectoryData.from_buffer_data(self.data)
+        return TrajectoryData.from_buffer_data(self.get_file_contents())
 
     def get_file_contents(self) -> Dict:
         """
         Return raw file data, as a dict
         """
-        return self.data
+        return json.loads(bytes(self.contents))
 
     def get_num_frames(self) -> int:
         """
         Return number of frames in the trajectory
         """
-        return len(self.data["spatialData"]["bundleData"])
+        return len(self.frame_spans)
+
+    def close(self) -> None:
+        """
+        Release the memory mapped file, if the data was read from a path
+        """
+        if isinstance(self.contents, mmap.mmap):
+            self.contents.close()
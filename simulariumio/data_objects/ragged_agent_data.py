@@ -0,0 +1,713 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import copy
+import logging
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ..constants import VIZ_TYPE, VALUES_PER_3D_POINT, SUBPOINT_VALUES_PER_ITEM
+from ..exceptions import DataError
+from .agent_data import AgentData
+from .agent_types import AgentTypes
+from .dimension_data import DimensionData
+from .display_data import DisplayData
+from .dtype_policy import DTypePolicy
+from .unique_id_allocator import UniqueIDAllocator
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class RaggedAgentData(AgentData):
+    # padded AgentData fields, built on demand from the flat arrays,
+    # and the value of slots without an agent
+    PADDED_FIELDS: Dict[str, float] = {
+        "viz_types": VIZ_TYPE.DEFAULT,
+        "unique_ids": 0,
+        "types": None,
+        "positions": 0.0,
+        "radii": 1.0,
+        "rotations": 0.0,
+        "n_subpoints": 0,
+        "subpoints": 0.0,
+    }
+    # attributes other than the flat arrays that the padded fields are built from
+    PADDED_SOURCES: List[str] = ["times", "type_names", "subpoint_offsets"]
+    n_timesteps: int
+    times: np.ndarray
+    n_agents: np.ndarray
+    agent_offsets: np.ndarray
+    flat_viz_types: np.ndarray
+    flat_unique_ids: np.ndarray
+    flat_type_codes: np.ndarray
+    type_names: List[str]
+    flat_positions: np.ndarray
+    flat_radii: np.ndarray
+    flat_rotations: np.ndarray
+    flat_n_subpoints: np.ndarray
+    subpoint_offsets: np.ndarray
+    flat_subpoints: np.ndarray
+    display_data: Dict[str, DisplayData]
+    draw_fiber_points: bool
+    dtype_policy: DTypePolicy
+
+    def __init__(
+        self,
+        times: Union[np.ndarray, List[float]],
+        n_agents: Union[np.ndarray, List[int]],
+        viz_types: Union[np.ndarray, List[float]],
+        unique_ids: Union[np.ndarray, List[int]],
+        types: Union[np.ndarray, List[str], List[int]],
+        positions: Union[np.ndarray, List[List[float]]],
+        radii: Union[np.ndarray, List[float]],
+        rotations: Union[np.ndarray, List[List[float]]] = None,
+        n_subpoints: Union[np.ndarray, List[int]] = None,
+        subpoints: Union[np.ndarray, List[float]] = None,
+        display_data: Dict[str, DisplayData] = None,
+        draw_fiber_points: bool = False,
+        n_timesteps: int = -1,
+        type_names: List[str] = None,
+        dtype_policy: DTypePolicy = None,
+    ):
+        """
+        This object contains spatial simulation data stored ragged:
+        the agents of all timesteps are concatenated in flat per agent
+        arrays, with each timestep's agents starting at its offset,
+        and the subpoints of all agents are concatenated
+        in one flat array, with each agent's subpoints starting
+        at its offset. Memory is proportional to the number of agents
+        and subpoints, instead of to timesteps * max agents * max subpoints.
+        The padded AgentData arrays (viz_types, unique_ids, types,
+        positions, radii, rotations, n_subpoints and subpoints)
+        can still be read, and are built the first time they are read,
+        as read only copies that are kept until a flat array is set.
+        Call clear_padded_cache() after editing a flat array in place.
+        Use to_agent_data() for an AgentData that can be edited
+
+        Parameters
+        ----------
+        times : np.ndarray or List[float] (shape = [timesteps])
+            The elapsed simulated time at each timestep
+        n_agents : np.ndarray or List[int] (shape = [timesteps])
+            The number of agents that exist at each timestep
+        viz_types : np.ndarray or List[float] (shape = [agents])
+            The viz type of each agent at each timestep, in timestep order
+        unique_ids : np.ndarray or List[int] (shape = [agents])
+            The unique ID of each agent at each timestep, in timestep order
+        types : np.ndarray or List[str] (shape = [agents])
+            The type name of each agent at each timestep, in timestep order,
+            or the index of the type name in type_names if they're given
+        positions : np.ndarray or List[List[float]] (shape = [agents, 3])
+            The XYZ position of each agent at each timestep
+        radii : np.ndarray or List[float] (shape = [agents])
+            The radius of each agent at each timestep
+        rotations : np.ndarray or List[List[float]] (shape = [agents, 3]) (optional)
+            The XYZ euler angles of each agent at each timestep in degrees
+            Default: [0, 0, 0] for each agent
+        n_subpoints : np.ndarray or List[int] (shape = [agents]) (optional)
+            The number of subpoint values of each agent at each timestep.
+            Required if subpoints are provided
+            Default: 0 for each agent
+        subpoints : np.ndarray or List[float] (shape = [sum of n_subpoints])
+        (optional)
+            The subpoint values of each agent at each timestep, concatenated
+            Default: None
+        display_data: Dict[str,DisplayData] (optional)
+            A dictionary mapping agent type name to DisplayData
+            to use for that type
+            Default: None
+        draw_fiber_points: bool (optional)
+            Draw spheres at every other fiber point for fibers?
+            Default: False
+        n_timesteps : int (optional)
+            Use the first n_timesteps frames of data
+            Default: -1 (use the full length of the buffer)
+        type_names : List[str] (optional)
+            The type names that types index into
+            Default: None (types are type names)
+        dtype_policy: DTypePolicy (optional)
+            The dtypes to store the arrays in
+            Default: None (keep the arrays' dtypes)
+        """
+        object.__setattr__(self, "_padded_cache", {})
+        object.__setattr__(self, "times", np.asarray(times))
+        object.__setattr__(self, "n_agents", np.asarray(n_agents).astype(int))
+        object.__setattr__(
+            self,
+            "agent_offsets",
+            np.concatenate(([0], np.cumsum(self.n_agents))).astype(np.int64),
+        )
+        total_agents = int(self.agent_offsets[-1])
+        self.flat_viz_types = np.asarray(viz_types)
+        self.flat_unique_ids = np.asarray(unique_ids)
+        if type_names is None:
+            agent_types = AgentTypes()
+            self.flat_type_codes = agent_types.get_codes(list(types))
+            self.type_names = agent_types.names
+        else:
+            self.flat_type_codes = np.asarray(types, dtype=np.int32)
+            self.type_names = list(type_names)
+        self.flat_positions = np.asarray(positions, dtype=float).reshape(
+            -1, VALUES_PER_3D_POINT
+        )
+        self.flat_radii = np.asarray(radii)
+        self.flat_rotations = (
+            np.asarray(rotations, dtype=float).reshape(-1, VALUES_PER_3D_POINT)
+            if rotations is not None
+            else np.zeros_like(self.flat_positions)
+        )
+        self.flat_n_subpoints = (
+            np.asarray(n_subpoints).astype(int)
+            if n_subpoints is not None
+            else np.zeros(total_agents, dtype=int)
+        )
+        self.subpoint_offsets = np.concatenate(
+            ([0], np.cumsum(self.flat_n_subpoints))
+        ).astype(np.int64)
+        self.flat_subpoints = (
+            np.asarray(subpoints, dtype=float).ravel()
+            if subpoints is not None
+            else np.zeros(0)
+        )
+        self.display_data = display_data if display_data is not None else {}
+        self.draw_fiber_points = draw_fiber_points
+        self.n_timesteps = n_timesteps
+        self.dtype_policy = dtype_policy
+        if dtype_policy is not None:
+            for field in ["times", "n_agents"]:
+                object.__setattr__(
+                    self, field, dtype_policy.cast(field, getattr(self, field))
+                )
+            for field in [
+                "viz_types",
+                "unique_ids",
+                "positions",
+                "radii",
+                "rotations",
+                "n_subpoints",
+                "subpoints",
+            ]:
+                setattr(
+                    self,
+                    "flat_" + field,
+                    dtype_policy.cast(field, getattr(self, "flat_" + field)),
+                )
+        for field in [
+            "flat_viz_types",
+            "flat_unique_ids",
+            "flat_type_codes",
+            "flat_positions",
+            "flat_radii",
+            "flat_rotations",
+            "flat_n_subpoints",
+        ]:
+            if len(getattr(self, field)) != total_agents:
+                raise DataError(
+                    f"RaggedAgentData {field} has {len(getattr(self, field))} "
+                    f"values but there are {total_agents} agents"
+                )
+        if len(self.flat_subpoints) != self.subpoint_offsets[-1]:
+            raise DataError(
+                f"RaggedAgentData has {len(self.flat_subpoints)} subpoint values "
+                f"but n_subpoints adds up to {self.subpoint_offsets[-1]}"
+            )
+
+    @classmethod
+    def from_agent_data(cls, agent_data: AgentData) -> RaggedAgentData:
+        """
+        Create RaggedAgentData with the agents in padded AgentData
+        """
+        if isinstance(agent_data, RaggedAgentData):
+            return copy.deepcopy(agent_data)
+        total_steps = len(agent_data.times)
+        return cls(
+            times=np.copy(agent_data.times),
+            n_agents=np.asarray(agent_data.n_agents).astype(int),
+            viz_types=agent_data._get_flat_values("viz_types", total_steps),
+            unique_ids=agent_data._get_flat_values("unique_ids", total_steps),
+            types=agent_data._get_flat_type_codes(total_steps),
+            type_names=agent_data._get_type_name_table(),
+            positions=agent_data._get_flat_values("positions", total_steps),
+            radii=agent_data._get_flat_values("radii", total_steps),
+            rotations=agent_data._get_flat_values("rotations", total_steps),
+            n_subpoints=agent_data._get_flat_values("n_subpoints", total_steps),
+            subpoints=agent_data._get_flat_subpoints(total_steps),
+            display_data=copy.deepcopy(agent_data.display_data),
+            draw_fiber_points=agent_data.draw_fiber_points,
+            n_timesteps=agent_data.n_timesteps,
+            dtype_policy=agent_data.dtype_policy,
+        )
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        traj: pd.DataFrame,
+        subpoint_columns: List[str] = None,
+        dtype_policy: DTypePolicy = None,
+    ) -> RaggedAgentData:
+        """
+        Create RaggedAgentData from a pandas DataFrame with one row
+        for each agent at each timestep,
+        see AgentData.from_dataframe() for the columns
+        """
+        columns = AgentData._get_dataframe_columns(traj, subpoint_columns)
+        return cls(
+            times=columns["times"],
+            n_agents=columns["n_agents"],
+            viz_types=columns["viz_types"],
+            unique_ids=columns["unique_ids"],
+            types=columns["types"],
+            type_names=columns["type_names"],
+            positions=columns["positions"],
+            radii=columns["radii"],
+            rotations=columns["rotations"],
+            n_subpoints=columns["n_subpoints"],
+            subpoints=columns["subpoints"],
+            dtype_policy=dtype_policy if dtype_policy is not None else DTypePolicy(),
+        )
+
+    def to_agent_data(self) -> AgentData:
+        """
+        Get the data as AgentData with padded arrays
+        """
+        result = AgentData.from_dimensions(
+            self.get_padded_dimensions(), dtype_policy=self.get_dtype_policy()
+        )
+        result.times = np.copy(self.times)
+        result.n_agents = np.copy(self.n_agents)
+        for field in RaggedAgentData.PADDED_FIELDS:
+            setattr(result, field, copy.deepcopy(self._get_padded(field)))
+        result.display_data = copy.deepcopy(self.display_data)
+        result.draw_fiber_points = self.draw_fiber_points
+        result.n_timesteps = self.n_timesteps
+        result.dtype_policy = self.dtype_policy
+        return result
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes that aren't set
+        if name in RaggedAgentData.PADDED_FIELDS:
+            padded_cache = self.__dict__.get("_padded_cache")
+            if padded_cache is None:
+                return self._get_padded(name)
+            if name not in padded_cache:
+                padded_cache[name] = self._get_padded(name)
+            return padded_cache[name]
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in RaggedAgentData.PADDED_FIELDS or name in [
+            "n_agents",
+            "agent_offsets",
+        ]:
+            raise AttributeError(
+                f"Can't set {name} of RaggedAgentData, "
+                "set the flat arrays or use to_agent_data()"
+            )
+        object.__setattr__(self, name, value)
+        if name in RaggedAgentData.PADDED_SOURCES or name.startswith("flat_"):
+            self.clear_padded_cache()
+
+    def clear_padded_cache(self) -> None:
+        """
+        Drop the padded arrays built from the flat arrays,
+        so they're built again the next time they're read.
+        Needed after editing a flat array in place
+        """
+        self._padded_cache.clear()
+
+    def get_padded_dimensions(self) -> DimensionData:
+        """
+        Get the dimensions the padded arrays would have
+        """
+        return DimensionData(
+            total_steps=len(self.times),
+            max_agents=int(np.max(self.n_agents, initial=0)),
+            max_subpoints=int(np.max(self.flat_n_subpoints, initial=0)),
+        )
+
+    def get_dimensions(self) -> DimensionData:
+        """
+        Get the dimensions of the padded arrays, with total_steps
+        limited by n_timesteps
+        """
+        result = self.get_padded_dimensions()
+        result.total_steps = self.total_timesteps()
+        return result
+
+    def _get_padded(self, field: str) -> Any:
+        """
+        Build the padded array for a field from the flat arrays
+        """
+        dimensions = self.get_padded_dimensions()
+        time_indices, agent_indices = self._get_flat_agent_indices(
+            dimensions.total_steps
+        )
+        if field == "types":
+            codes = np.full(
+                (dimensions.total_steps, dimensions.max_agents), -1, dtype=np.int32
+            )
+            codes[time_indices, agent_indices] = self.flat_type_codes
+            result = AgentTypes.from_codes(codes, self.type_names, self.n_agents)
+            result.codes.flags.writeable = False
+            result.lengths.flags.writeable = False
+            return result
+        fill = RaggedAgentData.PADDED_FIELDS[field]
+        if field == "subpoints":
+            result = np.full(
+                (
+                    dimensions.total_steps,
+                    dimensions.max_agents,
+                    dimensions.max_subpoints,
+                ),
+                fill,
+                dtype=self.flat_subpoints.dtype,
+            )
+            result[
+                np.repeat(time_indices, self.flat_n_subpoints),
+                np.repeat(agent_indices, self.flat_n_subpoints),
+                AgentData._get_subpoint_ranks(self.flat_n_subpoints),
+            ] = self.flat_subpoints
+        else:
+            values = getattr(self, "flat_" + field)
+            result = np.full(
+                (dimensions.total_steps, dimensions.max_agents) + values.shape[1:],
+                fill,
+                dtype=values.dtype,
+            )
+            result[time_indices, agent_indices] = values
+        result.flags.writeable = False
+        return result
+
+    def _get_agent_mask(self, total_steps: int) -> np.ndarray:
+        return (
+            np.arange(int(np.max(self.n_agents, initial=0)))
+            < self.n_agents[:total_steps, np.newaxis]
+        )
+
+    def _get_flat_agent_indices(
+        self, total_steps: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        n_agents = self.n_agents[:total_steps]
+        time_indices = np.repeat(np.arange(len(n_agents)), n_agents)
+        agent_indices = np.arange(self.agent_offsets[len(n_agents)]) - np.repeat(
+            self.agent_offsets[: len(n_agents)], n_agents
+        )
+        return time_indices, agent_indices
+
+    def _get_flat_values(self, field: str, total_steps: int) -> np.ndarray:
+        return getattr(self, "flat_" + field)[: self.agent_offsets[total_steps]]
+
+    def _get_type_name_table(self) -> List[str]:
+        return self.type_names
+
+    def _get_type_codes(self, total_steps: int) -> np.ndarray:
+        result = np.full(self._get_agent_mask(total_steps).shape, -1, dtype=np.int32)
+        result[self._get_flat_agent_indices(total_steps)] = self._get_flat_type_codes(
+            total_steps
+        )
+        return result
+
+    def _get_flat_type_codes(self, total_steps: int) -> np.ndarray:
+        return self.flat_type_codes[: self.agent_offsets[total_steps]]
+
+    def _get_frame_type_codes(self, time_index: int, n_agents: int) -> np.ndarray:
+        start = self.agent_offsets[time_index]
+        return self.flat_type_codes[start : start + n_agents]
+
+    def _get_type_name(self, time_index: int, agent_index: int) -> str:
+        return self.type_names[
+            self.flat_type_codes[self.agent_offsets[time_index] + agent_index]
+        ]
+
+    def _default_display_type_for_agent(self, time_index: int, agent_index: int):
+        return AgentData._default_display_type(
+            self.flat_n_subpoints[self.agent_offsets[time_index] + agent_index]
+        )
+
+    def _get_flat_subpoints(self, total_steps: int) -> np.ndarray:
+        return self.flat_subpoints[
+            : self.subpoint_offsets[self.agent_offsets[total_steps]]
+        ]
+
+    def _get_frame_values(self, field: str, time_index: int) -> np.ndarray:
+        return getattr(self, "flat_" + field)[self.get_frame_slice(time_index)]
+
+    def _get_frame_type_ids(self, type_ids: np.ndarray, time_index: int) -> np.ndarray:
+        return type_ids[self.get_frame_slice(time_index)]
+
+    def _get_flat_type_ids(self, type_ids: np.ndarray, total_steps: int) -> np.ndarray:
+        return type_ids[: self.agent_offsets[total_steps]]
+
+    def _get_frame_subpoints(self, time_index: int) -> np.ndarray:
+        return self.flat_subpoints[
+            self.get_subpoint_slice(self.get_frame_slice(time_index))
+        ]
+
+    def get_frame_slice(self, time_index: int) -> slice:
+        """
+        Get the slice of the flat per agent arrays
+        for the agents at a timestep
+        """
+        return slice(
+            int(self.agent_offsets[time_index]),
+            int(self.agent_offsets[time_index + 1]),
+        )
+
+    def get_subpoint_slice(self, agents: slice) -> slice:
+        """
+        Get the slice of the flat subpoints for a slice of agents
+        """
+        return slice(
+            int(self.subpoint_offsets[agents.start]),
+            int(self.subpoint_offsets[agents.stop]),
+        )
+
+    def set_subpoints(self, n_subpoints: np.ndarray, subpoints: np.ndarray) -> None:
+        """
+        Replace the number of subpoint values of each agent
+        and the concatenated subpoint values
+        """
+        dtype_policy = self.get_dtype_policy()
+        n_subpoints = dtype_policy.cast("n_subpoints", n_subpoints)
+        subpoint_offsets = np.concatenate(([0], np.cumsum(n_subpoints))).astype(
+            np.int64
+        )
+        if len(n_subpoints) != len(self.flat_n_subpoints) or (
+            len(subpoints) != subpoint_offsets[-1]
+        ):
+            raise DataError(
+                f"RaggedAgentData has {len(self.flat_n_subpoints)} agents, "
+                f"can't set {len(n_subpoints)} numbers of subpoints "
+                f"for {len(subpoints)} subpoint values"
+            )
+        self.flat_n_subpoints = n_subpoints
+        self.subpoint_offsets = subpoint_offsets
+        self.flat_subpoints = dtype_policy.cast("subpoints", subpoints)
+
+    def get_values_per_item(self) -> np.ndarray:
+        """
+        Get the number of subpoint values per item, e.g. 3 for fiber points,
+        for each agent from the display type of its type, or 1 for agents
+        without subpoints. Types with subpoints and no DisplayData
+        get a default display type, like display_type_for_agent()
+        """
+        result = np.ones(len(self.flat_n_subpoints), dtype=int)
+        has_subpoints = np.nonzero(self.flat_n_subpoints > 0)[0]
+        if len(has_subpoints) == 0:
+            return result
+        codes = self.flat_type_codes[has_subpoints]
+        used_codes, first_indices = np.unique(codes, return_index=True)
+        time_indices, agent_indices = self._get_flat_agent_indices(len(self.times))
+        code_values = np.ones(len(self.type_names) + 1, dtype=int)
+        # visit the types in the order a loop over agents would
+        for index in np.argsort(first_indices):
+            agent = has_subpoints[first_indices[index]]
+            code_values[used_codes[index]] = SUBPOINT_VALUES_PER_ITEM(
+                self.display_type_for_agent(
+                    int(time_indices[agent]), int(agent_indices[agent])
+                )
+            )
+        result[has_subpoints] = code_values[codes]
+        return result
+
+    def get_type_ids_and_mapping(self) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Generate a flat type_ids array from the type codes,
+        numbering the types in the order they first appear
+        """
+        has_name = np.array(
+            [len(type_name) > 0 for type_name in self.type_names] + [False]
+        )
+        named = has_name[self.flat_type_codes]
+        used_codes, first_indices = np.unique(
+            self.flat_type_codes[named], return_index=True
+        )
+        used_codes = used_codes[np.argsort(first_indices)]
+        code_tids = np.zeros(len(self.type_names) + 1)
+        code_tids[used_codes] = np.arange(len(used_codes))
+        type_ids = np.where(named, code_tids[self.flat_type_codes], 0.0)
+        return type_ids, self._get_type_mapping(
+            [self.type_names[code] for code in used_codes.tolist()]
+        )
+
+    def take_agents(
+        self, agent_indices: np.ndarray, n_agents: np.ndarray
+    ) -> RaggedAgentData:
+        """
+        Create RaggedAgentData with the agents at the given indices
+        into the flat arrays, in order, and n_agents agents in each timestep
+        """
+        agent_indices = np.asarray(agent_indices, dtype=np.int64)
+        n_subpoints = self.flat_n_subpoints[agent_indices]
+        subpoint_indices = np.repeat(
+            self.subpoint_offsets[agent_indices], n_subpoints
+        ) + AgentData._get_subpoint_ranks(n_subpoints)
+        return RaggedAgentData(
+            times=np.copy(self.times),
+            n_agents=n_agents,
+            viz_types=self.flat_viz_types[agent_indices],
+            unique_ids=self.flat_unique_ids[agent_indices],
+            types=self.flat_type_codes[agent_indices],
+            type_names=self.type_names,
+            positions=self.flat_positions[agent_indices],
+            radii=self.flat_radii[agent_indices],
+            rotations=self.flat_rotations[agent_indices],
+            n_subpoints=n_subpoints,
+            subpoints=self.flat_subpoints[subpoint_indices],
+            display_data=self.display_data,
+            draw_fiber_points=self.draw_fiber_points,
+            n_timesteps=self.n_timesteps,
+            dtype_policy=self.dtype_policy,
+        )
+
+    def take_timesteps(self, time_indices: np.ndarray) -> RaggedAgentData:
+        """
+        Create RaggedAgentData with the timesteps at the given indices
+        """
+        time_indices = np.asarray(time_indices, dtype=np.int64)
+        n_agents = self.n_agents[time_indices]
+        agent_indices = np.repeat(
+            self.agent_offsets[time_indices], n_agents
+        ) + AgentData._get_subpoint_ranks(n_agents)
+        result = self.take_agents(agent_indices, n_agents)
+        object.__setattr__(result, "times", self.times[time_indices])
+        result.clear_padded_cache()
+        result.n_timesteps = -1
+        return result
+
+    def append_agents(self, new_agents: AgentData) -> RaggedAgentData:
+        """
+        Create RaggedAgentData with the new agents added
+        after the agents at each timestep, with new unique IDs
+        for the new agents so they don't overlap the current IDs
+        """
+        new_agents = RaggedAgentData.from_agent_data(new_agents)
+        total_steps = len(self.times)
+        new_n_agents = np.zeros(total_steps, dtype=int)
+        n_steps = min(total_steps, len(new_agents.n_agents))
+        new_n_agents[:n_steps] = new_agents.n_agents[:n_steps]
+        new_agent_count = int(np.sum(new_n_agents))
+        # the new agents go after the current agents in each timestep
+        time_indices = np.concatenate(
+            (
+                np.repeat(np.arange(total_steps), self.n_agents),
+                np.repeat(np.arange(total_steps), new_n_agents),
+            )
+        )
+        order = np.argsort(time_indices, kind="stable")
+        unique_id_allocator = UniqueIDAllocator(
+            np.unique(self.flat_unique_ids).astype(int)
+        )
+        type_codes = AgentTypes()
+        type_codes.get_codes(self.type_names)
+        new_type_codes = np.append(
+            type_codes.get_codes(new_agents.type_names), np.int32(-1)
+        )[new_agents.flat_type_codes[:new_agent_count]]
+        display_data = dict(self.display_data)
+        display_data.update(new_agents.display_data)
+        new_agent_slice = slice(0, new_agent_count)
+        new_subpoint_slice = new_agents.get_subpoint_slice(new_agent_slice)
+        n_subpoints = np.concatenate(
+            (self.flat_n_subpoints, new_agents.flat_n_subpoints[new_agent_slice])
+        )[order]
+        subpoint_offsets = np.concatenate(
+            (
+                self.subpoint_offsets[:-1],
+                self.subpoint_offsets[-1]
+                + new_agents.subpoint_offsets[:new_agent_count],
+            )
+        )[order]
+        subpoints = np.concatenate(
+            (self.flat_subpoints, new_agents.flat_subpoints[new_subpoint_slice])
+        )
+        return RaggedAgentData(
+            times=np.copy(self.times),
+            n_agents=self.n_agents + new_n_agents,
+            viz_types=np.concatenate(
+                (self.flat_viz_types, new_agents.flat_viz_types[new_agent_slice])
+            )[order],
+            unique_ids=np.concatenate(
+                (
+                    self.flat_unique_ids,
+                    unique_id_allocator.remap(
+                        new_agents.flat_unique_ids[new_agent_slice].astype(int)
+                    ),
+                )
+            )[order],
+            types=np.concatenate((self.flat_type_codes, new_type_codes))[order],
+            type_names=type_codes.names,
+            positions=np.concatenate(
+                (self.flat_positions, new_agents.flat_positions[new_agent_slice])
+            )[order],
+            radii=np.concatenate(
+                (self.flat_radii, new_agents.flat_radii[new_agent_slice])
+            )[order],
+            rotations=np.concatenate(
+                (self.flat_rotations, new_agents.flat_rotations[new_agent_slice])
+            )[order],
+            n_subpoints=n_subpoints,
+            subpoints=subpoints[
+                np.repeat(subpoint_offsets, n_subpoints)
+                + AgentData._get_subpoint_ranks(n_subpoints)
+            ],
+            display_data=display_data,
+            draw_fiber_points=self.draw_fiber_points,
+            n_timesteps=self.n_timesteps,
+            dtype_policy=self.dtype_policy,
+        )
+
+    def get_copy_with_increased_buffer_size(
+        self, added_dimensions: DimensionData, axis: int = 1
+    ) -> AgentData:
+        raise DataError(
+            "RaggedAgentData has no buffers to increase, "
+            "use to_agent_data() to get padded AgentData"
+        )
+
+    def __deepcopy__(self, memo):
+        return RaggedAgentData(
+            times=np.copy(self.times),
+            n_agents=np.copy(self.n_agents),
+            viz_types=np.copy(self.flat_viz_types),
+            unique_ids=np.copy(self.flat_unique_ids),
+            types=np.copy(self.flat_type_codes),
+            type_names=list(self.type_names),
+            positions=np.copy(self.flat_positions),
+            radii=np.copy(self.flat_radii),
+            rotations=np.copy(self.flat_rotations),
+            n_subpoints=np.copy(self.flat_n_subpoints),
+            subpoints=np.copy(self.flat_subpoints),
+            display_data=copy.deepcopy(self.display_data, memo),
+            draw_fiber_points=self.draw_fiber_points,
+            n_timesteps=self.n_timesteps,
+            dtype_policy=self.dtype_policy,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, RaggedAgentData):
+            return AgentData.__eq__(self, other)
+        return (
+            self.n_timesteps == other.n_timesteps
+            and np.array_equal(self.n_agents, other.n_agents)
+            and False not in np.isclose(self.times, other.times)
+            and False not in np.isclose(self.flat_viz_types, other.flat_viz_types)
+            and False not in np.isclose(self.flat_unique_ids, other.flat_unique_ids)
+            and [self.type_names[code] for code in self.flat_type_codes.tolist()]
+            == [other.type_names[code] for code in other.flat_type_codes.tolist()]
+            and False not in np.isclose(self.flat_positions, other.flat_positions)
+            and False not in np.isclose(self.flat_radii, other.flat_radii)
+            and False not in np.isclose(self.flat_rotations, other.flat_rotations)
+            and np.array_equal(self.flat_n_subpoints, other.flat_n_subpoints)
+            and False not in np.isclose(self.flat_subpoints, other.flat_subpoints)
+            and self.display_data == other.display_data
+            and self.draw_fiber_points == other.draw_fiber_points
+        )
@@ -35,3 +35,15 @@ class SimulariumFileData(ABC):
     @abstractmethod
     def get_num_frames(self) -> int:
         pass
+
+    def close(self) -> None:
+        """
+        Release the file if it is memory mapped
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -8,10 +8,12 @@ from typing import Any, Dict, List
 import numpy as np
 
 from .agent_data import AgentData
+from .ragged_agent_data import RaggedAgentData
 from .unit_data import UnitData
 from .meta_data import MetaData
 from .display_data import DisplayData
 from .dimension_data import DimensionData
+from .unique_id_allocator import UniqueIDAllocator
 
 ###############################################################################
 
@@ -73,16 +75,23 @@ class TrajectoryData:
 
     @classmethod
     def from_buffer_data(
-        cls, buffer_data: Dict[str, Any], display_data: Dict[int, DisplayData] = None
+        cls,
+        buffer_data: Dict[str, Any],
+        display_data: Dict[int, DisplayData] = None,
+        agent_data: AgentData = None,
     ):
         """
-        Create TrajectoryData from a simularium JSON dict containing buffers
+        Create TrajectoryData from a simularium JSON dict containing buffers.
+        If agent_data is given, it is used instead of
+        decoding the spatial data in the dict
         """
         if display_data is None:
             display_data = {}
+        if agent_data is None:
+            agent_data = AgentData.from_buffer_data(buffer_data, display_data)
         return cls(
             meta_data=MetaData.from_dict(buffer_data["trajectoryInfo"]),
-            agent_data=AgentData.from_buffer_data(buffer_data, display_data),
+            agent_data=agent_data,
             time_units=UnitData.from_dict(
                 buffer_data["trajectoryInfo"]["timeUnits"], default_mag=1.0
             ),
@@ -97,15 +106,26 @@ class TrajectoryData:
         Concatenate the new AgentData with the current data,
         generate new unique IDs and type IDs as needed
         """
+        if isinstance(self.agent_data, RaggedAgentData):
+            self.agent_data = self.agent_data.append_agents(new_agents)
+            return
         # create appropriate length buffer with current agents
         current_dimensions = self.agent_data.get_dimensions()
         added_dimensions = new_agents.get_dimensions()
         new_dimensions = current_dimensions.add(added_dimensions, axis=1)
+        # grow the agents dimension in one copy
         result = self.agent_data.check_increase_buffer_size(
-            new_dimensions.max_agents - 1, axis=1, buffer_size_inc=BUFFER_SIZE_INC
+            new_dimensions.max_agents - 1,
+            axis=1,
+            buffer_size_inc=DimensionData(
+                total_steps=0,
+                max_agents=max(added_dimensions.max_agents, 1),
+            ),
         )
         # add new agents
-        result.n_agents = np.add(result.n_agents, new_agents.n_agents)
+        result.n_agents = np.add(result.n_agents, new_agents.n_agents).astype(
+            result.n_agents.dtype
+        )
         start_i = current_dimensions.max_agents
         end_i = start_i + added_dimensions.max_agents
         result.viz_types[:, start_i:end_i] = new_agents.viz_types[:]
@@ -116,24 +136,22 @@ class TrajectoryData:
         if len(new_agents.subpoints.shape) > 2:
             result.subpoints[:, start_i:end_i] = new_agents.subpoints[:]
         # generate new unique IDs and type IDs so they don't overlap
-        used_uids = list(np.unique(self.agent_data.unique_ids).astype(int))
-        new_uids = {}
-        for time_index in range(new_dimensions.total_steps):
-            new_agent_index = int(self.agent_data.n_agents[time_index])
-            n_a = int(new_agents.n_agents[time_index])
-            for agent_index in range(n_a):
-                raw_uid = int(new_agents.unique_ids[time_index][agent_index])
-                if raw_uid not in new_uids:
-                    uid = raw_uid
-                    while uid in used_uids:
-                        uid += 1
-                    new_uids[raw_uid] = uid
-                    used_uids.append(uid)
-                result.unique_ids[time_index][new_agent_index] = new_uids[raw_uid]
-                result.types[time_index].append(
-                    new_agents.types[time_index][agent_index]
-                )
-                new_agent_index += 1
+        unique_id_allocator = UniqueIDAllocator(
+            np.unique(self.agent_data.unique_ids).astype(int)
+        )
+        total_steps = new_dimensions.total_steps
+        new_n_agents = new_agents.n_agents[:total_steps].astype(int)
+        time_indices, agent_indices = np.nonzero(
+            np.arange(added_dimensions.max_agents) < new_n_agents[:, np.newaxis]
+        )
+        result.unique_ids[
+            time_indices,
+            self.agent_data.n_agents[:total_steps].astype(int)[time_indices]
+            + agent_indices,
+        ] = unique_id_allocator.remap(
+            new_agents.unique_ids[time_indices, agent_indices].astype(int)
+        )
+        result.types.append_to_rows(new_agents.types, new_n_agents)
         result.display_data.update(new_agents.display_data)
         self.agent_data = result
 
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class UniqueIDAllocator:
+    used_next: Dict[float, float]
+    mapping: Dict[float, float]
+    step: int
+
+    def __init__(self, used_ids: Iterable[float] = (), step: int = 1):
+        """
+        This object allocates unique IDs that don't collide with
+        IDs that are already used, and remembers which new ID
+        each raw ID was given.
+        A raw ID seen for the first time gets the first unused ID
+        of raw_id, raw_id + step, raw_id + 2 * step, ...
+        Used IDs point to the next ID to check, and these pointers
+        are shortened as they're followed, so finding an unused ID
+        doesn't walk the same run of used IDs twice
+
+        Parameters
+        ----------
+        used_ids : Iterable[float] (optional)
+            IDs that are already used
+            Default: ()
+        step : int (optional)
+            How much to increase an ID by when it is already used
+            Default: 1
+        """
+        self.step = step
+        if not isinstance(used_ids, np.ndarray):
+            used_ids = np.array(list(used_ids))
+        used_ids = np.unique(used_ids)
+        # in 64 bits, so adding step can't overflow int32 IDs
+        used_ids = used_ids.astype(np.result_type(used_ids.dtype, np.int64))
+        self.used_next = dict(zip(used_ids.tolist(), (used_ids + step).tolist()))
+        self.mapping = {}
+
+    def is_used(self, uid: float) -> bool:
+        """
+        Has the ID been used or allocated?
+        """
+        return uid in self.used_next
+
+    def _find_unused(self, uid: float) -> float:
+        """
+        Get the first unused ID of uid, uid + step, uid + 2 * step, ...
+        """
+        used_next = self.used_next
+        while uid in used_next:
+            next_uid = used_next[uid]
+            after_next_uid = used_next.get(next_uid)
+            if after_next_uid is None:
+                return next_uid
+            # skip every other used ID on the way from now on
+            used_next[uid] = after_next_uid
+            uid = after_next_uid
+        return uid
+
+    def _use(self, uid: float) -> None:
+        self.used_next[uid] = uid + self.step
+
+    def allocate(self, raw_id: float) -> float:
+        """
+        Get the unique ID for a raw ID,
+        allocating a new one the first time the raw ID is seen
+        """
+        if raw_id not in self.mapping:
+            uid = self._find_unused(raw_id)
+            self._use(uid)
+            self.mapping[raw_id] = uid
+        return self.mapping[raw_id]
+
+    def allocate_many(self, n_ids: int, start: float = 0) -> np.ndarray:
+        """
+        Allocate n_ids unused IDs of start, start + step, start + 2 * step, ...
+        that aren't mapped to a raw ID
+        """
+        result: List[float] = []
+        uid = start
+        for _ in range(n_ids):
+            uid = self._find_unused(uid)
+            self._use(uid)
+            result.append(uid)
+        return np.array(result)
+
+    def remap(self, raw_ids: np.ndarray) -> np.ndarray:
+        """
+        Get the unique ID for each raw ID in an array, in the array's dtype.
+        New IDs are allocated for raw IDs seen for the first time,
+        in the order they first appear in the flattened array,
+        and every other raw ID is mapped once per distinct value
+        """
+        raw_ids = np.asarray(raw_ids)
+        if raw_ids.size == 0:
+            return raw_ids.copy()
+        unique_raw_ids, first_indices, inverse = np.unique(
+            raw_ids.ravel(), return_index=True, return_inverse=True
+        )
+        for raw_id in unique_raw_ids[np.argsort(first_indices)].tolist():
+            if raw_id not in self.mapping:
+                self.allocate(raw_id)
+        unique_ids = np.array(
+            [self.mapping[raw_id] for raw_id in unique_raw_ids.tolist()],
+            dtype=raw_ids.dtype,
+        )
+        return unique_ids[inverse.ravel()].reshape(raw_ids.shape)
+
+    def clear_mapping(self) -> None:
+        """
+        Forget which unique ID each raw ID was given,
+        but keep all allocated IDs used
+        """
+        self.mapping = {}
@@ -19,7 +19,12 @@ log = logging.getLogger(__name__)
 
 class FileConverter(TrajectoryConverter):
     def __init__(
-        self, input_file: InputFileData, display_data: Dict[int, DisplayData] = None
+        self,
+        input_file: InputFileData,
+        display_data: Dict[int, DisplayData] = None,
+        start: int = None,
+        stop: int = None,
+        step: int = None,
     ):
         """
         This object loads data from the input file in .simularium format.
@@ -28,21 +33,44 @@ class FileConverter(TrajectoryConverter):
         ----------
         input_file: InputFileData
             A InputFileData object containing .simularium data to load
+        display_data: Dict[int, DisplayData] (optional)
+            Display data for each agent type ID
+            Default: use the display data in the file
+        start: int (optional)
+            Index of the first frame to load
+            Default: None (the first frame)
+        stop: int (optional)
+            Index to stop loading frames before
+            Default: None (after the last frame)
+        step: int (optional)
+            Load every step-th frame from start
+            Default: None (every frame)
+
+        For binary files, only the frames in range(start, stop, step)
+        are read from the file
         """
         if display_data is None:
             display_data = {}
+        agent_data = None
         if input_file._is_binary():
             print("Reading Simularium binary -------------")
-            buffer_data = SimulariumBinaryReader.load_binary(input_file)
+            buffer_data, agent_data = SimulariumBinaryReader.load_binary_agent_data(
+                input_file, display_data, start=start, stop=stop, step=step
+            )
         else:
             print("Reading Simularium JSON -------------")
             buffer_data = json.loads(input_file.get_contents())
+            frames = buffer_data["spatialData"]["bundleData"][start:stop:step]
+            buffer_data["spatialData"]["bundleData"] = frames
+            buffer_data["spatialData"]["bundleSize"] = len(frames)
         if (
             int(buffer_data["trajectoryInfo"]["version"])
             < CURRENT_VERSION.TRAJECTORY_INFO
         ):
             buffer_data = FileConverter.update_trajectory_info_version(buffer_data)
-        self._data = TrajectoryData.from_buffer_data(buffer_data, display_data)
+        self._data = TrajectoryData.from_buffer_data(
+            buffer_data, display_data, agent_data
+        )
 
     @staticmethod
     def _update_trajectory_info_v1_to_v2(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -2,13 +2,14 @@
 # -*- coding: utf-8 -*-
 
 from simulariumio.data_objects.agent_data import AgentData
+from simulariumio.data_objects.agent_types import AgentTypes
 from typing import Dict
 import logging
 
 import numpy as np
 
 from .filter import Filter
-from ..data_objects import TrajectoryData
+from ..data_objects import TrajectoryData, RaggedAgentData
 
 ###############################################################################
 
@@ -38,59 +39,83 @@ class EveryNthAgentFilter(Filter):
         self.n_per_type = n_per_type
         self.default_n = default_n
 
+    def _filter_ragged_agents(self, agent_data: RaggedAgentData) -> RaggedAgentData:
+        """
+        Keep every nth agent of each type in each frame of RaggedAgentData,
+        counting agents of a type with a cumsum over the flat agents
+        """
+        total_steps = agent_data.total_timesteps()
+        type_names, codes, _ = agent_data._get_flat_type_name_codes(total_steps)
+        time_indices, _ = agent_data._get_flat_agent_indices(total_steps)
+        frame_starts = agent_data.agent_offsets[time_indices]
+        keep = np.zeros(len(codes), dtype=bool)
+        for name_index, type_name in enumerate(type_names):
+            inc = self.n_per_type.get(str(type_name), self.default_n)
+            if inc < 1:
+                continue
+            is_type = codes == name_index
+            n_before = np.concatenate(([0], np.cumsum(is_type)))
+            n_found = n_before[1:] - n_before[frame_starts] - 1
+            keep |= is_type & (n_found % inc == 0)
+        kept_agents = np.nonzero(keep)[0]
+        return agent_data.take_agents(
+            kept_agents,
+            np.bincount(time_indices[kept_agents], minlength=len(agent_data.times)),
+        )
+
     def apply(self, data: TrajectoryData) -> TrajectoryData:
         """
         Reduce the number of agents in each frame of the simularium
         data by filtering out all but every nth agent
         """
         print("Filtering: every Nth agent -------------")
+        if isinstance(data.agent_data, RaggedAgentData):
+            data.agent_data = self._filter_ragged_agents(data.agent_data)
+            print(
+                f"filtered dims = {data.agent_data.total_timesteps()} timesteps X "
+                f"{int(np.amax(data.agent_data.n_agents, initial=0))} agents X "
+                f"{int(np.amax(data.agent_data.flat_n_subpoints, initial=0))} "
+                "subpoints"
+            )
+            return data
         # get filtered data
         start_dimensions = data.agent_data.get_dimensions()
-        result = AgentData.from_dimensions(start_dimensions)
+        result = AgentData.from_dimensions(
+            start_dimensions, dtype_policy=data.agent_data.get_dtype_policy()
+        )
         result.times = data.agent_data.times
         result.draw_fiber_points = data.agent_data.draw_fiber_points
         result.display_data = data.agent_data.display_data
-        for time_index in range(start_dimensions.total_steps):
-            new_agent_index = 0
-            n_found = {}
-            n_a = int(data.agent_data.n_agents[time_index])
-            for agent_index in range(n_a):
-                type_name = str(data.agent_data.types[time_index][agent_index])
-                if type_name not in n_found:
-                    n_found[type_name] = -1
-                n_found[type_name] += 1
-                if type_name in self.n_per_type:
-                    inc = self.n_per_type[type_name]
-                else:
-                    inc = self.default_n
-                if inc < 1 or n_found[type_name] % inc != 0:
-                    continue
-                result.viz_types[time_index][
-                    new_agent_index
-                ] = data.agent_data.viz_types[time_index][agent_index]
-                result.unique_ids[time_index][
-                    new_agent_index
-                ] = data.agent_data.unique_ids[time_index][agent_index]
-                result.types[time_index].append(
-                    data.agent_data.types[time_index][agent_index]
-                )
-                result.positions[time_index][
-                    new_agent_index
-                ] = data.agent_data.positions[time_index][agent_index]
-                result.radii[time_index][new_agent_index] = data.agent_data.radii[
-                    time_index
-                ][agent_index]
-                result.rotations[time_index][
-                    new_agent_index
-                ] = data.agent_data.rotations[time_index][agent_index]
-                result.n_subpoints[time_index][
-                    new_agent_index
-                ] = data.agent_data.n_subpoints[time_index][agent_index]
-                result.subpoints[time_index][new_agent_index][
-                    : np.shape(data.agent_data.subpoints[time_index][agent_index])[0]
-                ] = data.agent_data.subpoints[time_index][agent_index]
-                new_agent_index += 1
-            result.n_agents[time_index] = new_agent_index
+        agent_data = data.agent_data
+        total_steps = start_dimensions.total_steps
+        type_names, codes, _ = agent_data._get_type_name_codes(total_steps)
+        # keep every nth agent of each type in each frame
+        keep = np.zeros(codes.shape, dtype=bool)
+        for name_index, type_name in enumerate(type_names):
+            inc = self.n_per_type.get(str(type_name), self.default_n)
+            if inc < 1:
+                continue
+            is_type = codes == name_index
+            n_found = np.cumsum(is_type, axis=1) - 1
+            keep |= is_type & (n_found % inc == 0)
+        time_indices, agent_indices = np.nonzero(keep)
+        new_agent_indices = np.cumsum(keep, axis=1)[keep] - 1
+        new_slots = (time_indices, new_agent_indices)
+        old_slots = (time_indices, agent_indices)
+        result.viz_types[new_slots] = agent_data.viz_types[old_slots]
+        result.unique_ids[new_slots] = agent_data.unique_ids[old_slots]
+        result.positions[new_slots] = agent_data.positions[old_slots]
+        result.radii[new_slots] = agent_data.radii[old_slots]
+        result.rotations[new_slots] = agent_data.rotations[old_slots]
+        result.n_subpoints[new_slots] = agent_data.n_subpoints[old_slots]
+        if len(agent_data.subpoints.shape) > 2:
+            result.subpoints[new_slots] = agent_data.subpoints[old_slots]
+        result.n_agents[:total_steps] = np.sum(keep, axis=1)
+        new_codes = np.full(codes.shape, -1, dtype=np.int32)
+        new_codes[new_slots] = codes[old_slots]
+        result.types = AgentTypes.from_codes(
+            new_codes, type_names, result.n_agents[:total_steps]
+        )
         data.agent_data = result
         print(
             f"filtered dims = {start_dimensions.total_steps} timesteps X "
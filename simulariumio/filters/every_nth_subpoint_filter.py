@@ -8,7 +8,7 @@ import logging
 import numpy as np
 
 from .filter import Filter
-from ..data_objects import TrajectoryData
+from ..data_objects import TrajectoryData, RaggedAgentData, AgentData
 
 ###############################################################################
 
@@ -39,19 +39,57 @@ class EveryNthSubpointFilter(Filter):
         self.n_per_type = n_per_type
         self.default_n = default_n
 
+    def _filter_ragged_subpoints(self, agent_data: RaggedAgentData) -> None:
+        """
+        Keep every nth subpoint item of each agent in RaggedAgentData,
+        with a mask over the flat subpoint values
+        """
+        values_per_item = agent_data.get_values_per_item()
+        code_incs = np.array(
+            [
+                self.n_per_type.get(type_name, self.default_n)
+                for type_name in agent_data.type_names
+            ]
+            + [self.default_n],
+            dtype=int,
+        )
+        incs = code_incs[agent_data.flat_type_codes]
+        n_subpoints = agent_data.flat_n_subpoints
+        item_indices = AgentData._get_subpoint_ranks(n_subpoints) // np.repeat(
+            values_per_item, n_subpoints
+        )
+        keep = item_indices % np.repeat(incs, n_subpoints) == 0
+        n_items = n_subpoints // values_per_item
+        agent_data.set_subpoints(
+            values_per_item * ((n_items + incs - 1) // incs),
+            agent_data.flat_subpoints[keep],
+        )
+
     def apply(self, data: TrajectoryData) -> TrajectoryData:
         """
         Reduce the number of subpoints in each frame of the simularium
         data by filtering out all but every nth subpoint
         """
         print("Filtering: every Nth subpoint -------------")
+        if isinstance(data.agent_data, RaggedAgentData):
+            self._filter_ragged_subpoints(data.agent_data)
+            print(
+                f"filtered dims = {len(data.agent_data.times)} timesteps X "
+                f"{int(np.amax(data.agent_data.n_agents, initial=0))} agents X "
+                f"{int(np.amax(data.agent_data.flat_n_subpoints, initial=0))} "
+                "subpoints"
+            )
+            return data
         # get dimensions
         total_steps = data.agent_data.times.size
         max_agents = int(np.amax(data.agent_data.n_agents))
         max_subpoints = int(np.amax(data.agent_data.n_subpoints))
         # get filtered data
-        new_n_subpoints = np.zeros((total_steps, max_agents))
-        new_subpoints = np.zeros((total_steps, max_agents, max_subpoints))
+        dtype_policy = data.agent_data.get_dtype_policy()
+        new_n_subpoints = np.zeros((total_steps, max_agents), dtype=dtype_policy.counts)
+        new_subpoints = np.zeros(
+            (total_steps, max_agents, max_subpoints), dtype=dtype_policy.spatial
+        )
         for time_index in range(total_steps):
             for agent_index in range(int(data.agent_data.n_agents[time_index])):
                 sp_items = self.get_items_from_subpoints(
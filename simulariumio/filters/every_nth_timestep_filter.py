@@ -5,10 +5,11 @@ import logging
 import math
 from simulariumio.data_objects.dimension_data import DimensionData
 from simulariumio.data_objects.agent_data import AgentData
+from simulariumio.data_objects.agent_types import AgentTypes
 
 import numpy as np
 
-from ..data_objects import TrajectoryData
+from ..data_objects import TrajectoryData, RaggedAgentData
 from .filter import Filter
 
 ###############################################################################
@@ -36,6 +37,21 @@ class EveryNthTimestepFilter(Filter):
         """
         self.n = n
 
+    def _filter_ragged_timesteps(self, agent_data: RaggedAgentData) -> RaggedAgentData:
+        """
+        Keep every nth timestep of RaggedAgentData,
+        and the DisplayData for the types that are left
+        """
+        result = agent_data.take_timesteps(
+            np.arange(0, len(agent_data.times), self.n)
+        )
+        result.display_data = {}
+        for code in np.unique(result.flat_type_codes[result.flat_type_codes >= 0]):
+            type_name = result.type_names[code]
+            if type_name in agent_data.display_data:
+                result.display_data[type_name] = agent_data.display_data[type_name]
+        return result
+
     def apply(self, data: TrajectoryData) -> TrajectoryData:
         """
         Reduce the number of timesteps in each frame of the simularium
@@ -44,51 +60,54 @@ class EveryNthTimestepFilter(Filter):
         print(f"Filtering: every {self.n}th timestep -------------")
         if self.n < 2:
             raise Exception("N < 2: no timesteps will be filtered")
+        if isinstance(data.agent_data, RaggedAgentData):
+            data.agent_data = self._filter_ragged_timesteps(data.agent_data)
+            print(
+                f"filtered dims = {len(data.agent_data.times)} timesteps X "
+                f"{int(np.amax(data.agent_data.n_agents, initial=0))} agents X "
+                f"{int(np.amax(data.agent_data.flat_n_subpoints, initial=0))} "
+                "subpoints"
+            )
+            return data
         # get filtered dimensions
         new_dimensions = DimensionData(
             total_steps=int(math.ceil(data.agent_data.times.size / float(self.n))),
             max_agents=int(np.amax(data.agent_data.n_agents)),
             max_subpoints=int(np.amax(data.agent_data.n_subpoints)),
         )
-        result = AgentData.from_dimensions(new_dimensions)
+        result = AgentData.from_dimensions(
+            new_dimensions, dtype_policy=data.agent_data.get_dtype_policy()
+        )
         # get filtered data
-        new_time_index = 0
-        for time_index in range(data.agent_data.times.size):
-            if time_index % self.n != 0:
-                continue
-            result.times[new_time_index] = data.agent_data.times[time_index]
-            n_a = int(data.agent_data.n_agents[time_index])
-            result.n_agents[new_time_index] = n_a
-            for agent_index in range(n_a):
-                result.viz_types[new_time_index][
-                    agent_index
-                ] = data.agent_data.viz_types[time_index][agent_index]
-                result.unique_ids[new_time_index][
-                    agent_index
-                ] = data.agent_data.unique_ids[time_index][agent_index]
-                result.types[new_time_index].append(
-                    data.agent_data.types[time_index][agent_index]
-                )
-                result.positions[new_time_index][
-                    agent_index
-                ] = data.agent_data.positions[time_index][agent_index]
-                result.radii[new_time_index][agent_index] = data.agent_data.radii[
-                    time_index
-                ][agent_index]
-                result.rotations[new_time_index][
-                    agent_index
-                ] = data.agent_data.rotations[time_index][agent_index]
-                result.n_subpoints[new_time_index][
-                    agent_index
-                ] = data.agent_data.n_subpoints[time_index][agent_index]
-                result.subpoints[new_time_index][agent_index][
-                    : np.shape(data.agent_data.subpoints[time_index][agent_index])[0]
-                ] = data.agent_data.subpoints[time_index][agent_index]
-            new_time_index += 1
-        unique_types = set([tn for frame in result.types for tn in frame])
-        for type_name in unique_types:
-            if type_name in data.agent_data.display_data:
-                result.display_data[type_name] = data.agent_data.display_data[type_name]
+        agent_data = data.agent_data
+        total_steps = agent_data.times.size
+        type_names, codes, _ = agent_data._get_type_name_codes(total_steps)
+        kept_steps = slice(0, total_steps, self.n)
+        n_agents = agent_data.n_agents[kept_steps].astype(int)
+        result.times[:] = agent_data.times[kept_steps]
+        result.n_agents[:] = n_agents
+        time_indices, agent_indices = np.nonzero(
+            np.arange(new_dimensions.max_agents) < n_agents[:, np.newaxis]
+        )
+        new_slots = (time_indices, agent_indices)
+        old_slots = (self.n * time_indices, agent_indices)
+        result.viz_types[new_slots] = agent_data.viz_types[old_slots]
+        result.unique_ids[new_slots] = agent_data.unique_ids[old_slots]
+        result.positions[new_slots] = agent_data.positions[old_slots]
+        result.radii[new_slots] = agent_data.radii[old_slots]
+        result.rotations[new_slots] = agent_data.rotations[old_slots]
+        result.n_subpoints[new_slots] = agent_data.n_subpoints[old_slots]
+        if len(agent_data.subpoints.shape) > 2:
+            result.subpoints[new_slots] = agent_data.subpoints[old_slots][
+                :, : new_dimensions.max_subpoints
+            ]
+        new_codes = np.full(result.viz_types.shape, -1, dtype=np.int32)
+        new_codes[new_slots] = codes[old_slots]
+        result.types = AgentTypes.from_codes(new_codes, type_names, n_agents)
+        for name_index in np.unique(new_codes[new_codes >= 0]):
+            type_name = type_names[name_index]
+            if type_name in agent_data.display_data:
+                result.display_data[type_name] = agent_data.display_data[type_name]
         data.agent_data = result
         print(
             f"filtered dims = {new_dimensions.total_steps} timesteps X "
@@ -3,7 +3,7 @@
 
 import logging
 
-from ..data_objects import TrajectoryData
+from ..data_objects import TrajectoryData, RaggedAgentData
 from .filter import Filter
 
 ###############################################################################
@@ -38,6 +38,13 @@ class MultiplySpaceFilter(Filter):
             f"Filtering: multiplying spatial scale by {self.multiplier} -------------"
         )
         data.meta_data.box_size = self.multiplier * data.meta_data.box_size
+        if isinstance(data.agent_data, RaggedAgentData):
+            agent_data = data.agent_data
+            agent_data.flat_positions = self.multiplier * agent_data.flat_positions
+            agent_data.flat_radii = self.multiplier * agent_data.flat_radii
+            agent_data.flat_subpoints = self.multiplier * agent_data.flat_subpoints
+            data.spatial_units.multiply(1.0 / self.multiplier)
+            return data
         data.agent_data.positions = self.multiplier * data.agent_data.positions
         data.agent_data.radii = self.multiplier * data.agent_data.radii
         data.agent_data.subpoints = self.multiplier * data.agent_data.subpoints
@@ -7,7 +7,7 @@ import logging
 import numpy as np
 
 from .filter import Filter
-from ..data_objects import TrajectoryData
+from ..data_objects import TrajectoryData, RaggedAgentData, AgentData
 from ..exceptions import DataError
 from ..constants import VALUES_PER_3D_POINT
 
@@ -62,6 +62,32 @@ class TransformSpatialAxesFilter(Filter):
                 result[d] *= -1.0
         return result
 
+    def _transform_ragged_agents(self, agent_data: RaggedAgentData) -> None:
+        """
+        Transform the positions and the XYZ of each subpoint item
+        of the agents in RaggedAgentData, all at once
+        """
+        n_agents = agent_data.agent_offsets[agent_data.total_timesteps()]
+        positions = agent_data.flat_positions[:n_agents]
+        agent_data.flat_positions[:n_agents] = self._transform_coordinate(
+            positions.T
+        ).T
+        values_per_item = agent_data.get_values_per_item()[:n_agents]
+        n_subpoints = np.where(
+            values_per_item >= VALUES_PER_3D_POINT,
+            agent_data.flat_n_subpoints[:n_agents],
+            0,
+        )
+        ranks = AgentData._get_subpoint_ranks(n_subpoints)
+        item_starts = (
+            np.repeat(agent_data.subpoint_offsets[:n_agents], n_subpoints) + ranks
+        )[ranks % np.repeat(values_per_item, n_subpoints) == 0]
+        xyz = item_starts[:, np.newaxis] + np.arange(VALUES_PER_3D_POINT)
+        agent_data.flat_subpoints[xyz] = self._transform_coordinate(
+            agent_data.flat_subpoints[xyz].T
+        ).T
+        agent_data.clear_padded_cache()
+
     def apply(self, data: TrajectoryData) -> TrajectoryData:
         """
         Transform spatial coordinates to rotate and/or reflect the scene
@@ -71,6 +97,9 @@ class TransformSpatialAxesFilter(Filter):
         data.meta_data.box_size = self._transform_coordinate(
             data.meta_data.box_size, False
         )
+        if isinstance(data.agent_data, RaggedAgentData):
+            self._transform_ragged_agents(data.agent_data)
+            return data
         # get dimensions
         start_dimensions = data.agent_data.get_dimensions()
         max_subpoints = int(np.amax(data.agent_data.n_subpoints))
@@ -313,7 +313,9 @@ class McellConverter(TrajectoryConverter):
         except Exception as e:
             raise InputDataError(f"Error reading Mcell binary files: {e}")
 
-        result = AgentData.from_dimensions(dimensions)
+        result = AgentData.from_dimensions(
+            dimensions, dtype_policy=input_data.dtype_policy
+        )
         # get metadata for each agent type
         molecule_info = {}
         total_steps = 0
@@ -4,7 +4,7 @@
 import logging
 from typing import Any, Dict, List
 
-from ..data_objects import MetaData, DisplayData
+from ..data_objects import MetaData, DisplayData, DTypePolicy
 
 ###############################################################################
 
@@ -21,6 +21,7 @@ class McellData:
     display_data: Dict[str, DisplayData]
     surface_mol_rotation_angle: float
     plots: List[Dict[str, Any]]
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -31,6 +32,7 @@ class McellData:
         display_data: Dict[str, DisplayData] = None,
         surface_mol_rotation_angle: float = None,
         plots: List[Dict[str, Any]] = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -66,6 +68,11 @@ class McellData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.path_to_data_model_json = path_to_data_model_json
         self.path_to_binary_files = path_to_binary_files
@@ -74,3 +81,4 @@ class McellData:
         self.display_data = display_data if display_data is not None else {}
         self.surface_mol_rotation_angle = surface_mol_rotation_angle
         self.plots = plots if plots is not None else []
+        self.dtype_policy = dtype_policy
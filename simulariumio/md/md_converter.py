@@ -183,7 +183,9 @@ class MdConverter(TrajectoryConverter):
             dimensions.max_agents + n_bonds, 
             n_max_subpoints,
         )
-        result = AgentData.from_dimensions(dimensions)
+        result = AgentData.from_dimensions(
+            dimensions, dtype_policy=input_data.dtype_policy
+        )
         get_type_name_func = np.frompyfunc(MdConverter._get_type_name, 2, 1)
         unique_raw_type_names = set([])
         time_index = 0
@@ -6,7 +6,7 @@ from typing import Any, Dict, List
 
 from MDAnalysis import Universe
 
-from ..data_objects import MetaData, UnitData, DisplayData
+from ..data_objects import MetaData, UnitData, DisplayData, DTypePolicy
 
 ###############################################################################
 
@@ -24,6 +24,7 @@ class MdData:
     spatial_units: UnitData
     draw_bonds: bool
     plots: List[Dict[str, Any]]
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -35,6 +36,7 @@ class MdData:
         spatial_units: UnitData = None,
         draw_bonds: bool = False,
         plots: List[Dict[str, Any]] = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -74,6 +76,11 @@ class MdData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.md_universe = md_universe
         self.nth_timestep_to_read = nth_timestep_to_read
@@ -85,3 +92,4 @@ class MdData:
         )
         self.draw_bonds = draw_bonds
         self.plots = plots if plots is not None else []
+        self.dtype_policy = dtype_policy
@@ -161,7 +161,9 @@ class MedyanConverter(TrajectoryConverter):
         except Exception as e:
             raise InputDataError(f"Error reading input medyan data: {e}")
 
-        result = AgentData.from_dimensions(dimensions)
+        result = AgentData.from_dimensions(
+            dimensions, dtype_policy=input_data.dtype_policy
+        )
         time_index = -1
         at_frame_start = True
         parsing_object = False
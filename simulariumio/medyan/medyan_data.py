@@ -4,7 +4,7 @@
 import logging
 from typing import Any, Dict, List
 
-from ..data_objects import MetaData, DisplayData, InputFileData
+from ..data_objects import MetaData, DisplayData, InputFileData, DTypePolicy
 
 ###############################################################################
 
@@ -21,6 +21,7 @@ class MedyanData:
     draw_fiber_points: bool
     plots: List[Dict[str, Any]]
     center: bool
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -33,6 +34,7 @@ class MedyanData:
         draw_fiber_points: bool = False,
         plots: List[Dict[str, Any]] = None,
         center: bool = True,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -84,6 +86,11 @@ class MedyanData:
             If true, the spatial values of the data are centered
             around the origin (0, 0, 0) during conversion
             Default: True
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.snapshot_file = snapshot_file
         self.meta_data = meta_data if meta_data is not None else MetaData()
@@ -100,3 +107,4 @@ class MedyanData:
         self.draw_fiber_points = draw_fiber_points
         self.plots = plots if plots is not None else []
         self.center = center
+        self.dtype_policy = dtype_policy
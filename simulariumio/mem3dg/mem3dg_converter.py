@@ -59,7 +59,9 @@ class Mem3dgConverter(TrajectoryConverter):
         # for now, we are representing converted Mem3DG trajectories as one
         # unique mesh agent per frame
         dimensions = DimensionData(total_steps=n_frames, max_agents=1)
-        agent_data = AgentData.from_dimensions(dimensions)
+        agent_data = AgentData.from_dimensions(
+            dimensions, dtype_policy=input_data.dtype_policy
+        )
         agent_data.n_timesteps = n_frames
 
         base_agent_name = input_data.agent_name or "object"
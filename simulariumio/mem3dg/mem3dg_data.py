@@ -1,4 +1,4 @@
-from ..data_objects import MetaData, UnitData
+from ..data_objects import MetaData, UnitData, DTypePolicy
 from typing import List, Dict, Any
 
 
@@ -11,6 +11,7 @@ class Mem3dgData:
     time_units: UnitData
     spatial_units: UnitData
     plots: List[Dict[str, Any]]
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -22,6 +23,7 @@ class Mem3dgData:
         time_units: UnitData = None,
         spatial_units: UnitData = None,
         plots: List[Dict[str, Any]] = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         Parameters
@@ -54,6 +56,11 @@ class Mem3dgData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.input_file_path = input_file_path
         self.output_obj_file_path = output_obj_file_path or "."
@@ -63,3 +70,4 @@ class Mem3dgData:
         self.time_units = time_units or UnitData("s")
         self.spatial_units = spatial_units or UnitData("m")
         self.plots = plots or []
+        self.dtype_policy = dtype_policy
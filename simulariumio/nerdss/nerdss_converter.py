@@ -52,7 +52,9 @@ class NerdssConverter(TrajectoryConverter):
                 )
             time_steps.append(file_name)
         time_steps.sort(key=int)
-        agent_data = AgentData.from_dimensions(dimensions)
+        agent_data = AgentData.from_dimensions(
+            dimensions, dtype_policy=input_data.dtype_policy
+        )
         agent_data.n_timesteps = n_timesteps
 
         # keep track of fiber positions for bonds as we go
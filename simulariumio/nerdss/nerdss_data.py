@@ -1,4 +1,4 @@
-from ..data_objects import MetaData, DisplayData, UnitData
+from ..data_objects import MetaData, DisplayData, UnitData, DTypePolicy
 from typing import List, Dict, Any
 
 
@@ -10,6 +10,7 @@ class NerdssData:
     spatial_units: UnitData
     plots: List[Dict[str, Any]]
     time_step: UnitData
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -20,6 +21,7 @@ class NerdssData:
         spatial_units: UnitData = None,
         plots: List[Dict[str, Any]] = None,
         time_step: UnitData = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         Parameters
@@ -52,6 +54,11 @@ class NerdssData:
             Time step between each frame, where the frame numbers are represented
             as the names of the .pdb files in path_to_pdb_files
             Default: 1.0 second
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.path_to_pdb_files = path_to_pdb_files
         self.meta_data = meta_data if meta_data is not None else MetaData()
@@ -62,3 +69,4 @@ class NerdssData:
         )
         self.plots = plots if plots is not None else []
         self.time_step = time_step if time_step is not None else self.time_units
+        self.dtype_policy = dtype_policy
@@ -180,7 +180,9 @@ class PhysicellConverter(TrajectoryConverter):
             raise InputDataError(f"Error reading from Physicell output directory: {e}")
 
         dimensions = PhysicellConverter._get_dimensions(discrete_cells)
-        result = AgentData.from_dimensions(dimensions)
+        result = AgentData.from_dimensions(
+            dimensions, dtype_policy=input_data.dtype_policy
+        )
         result.times = (
             input_data.nth_timestep_to_read
             * input_data.timestep
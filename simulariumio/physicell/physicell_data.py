@@ -4,7 +4,7 @@
 import logging
 from typing import Any, Dict, List
 
-from ..data_objects import UnitData, MetaData, DisplayData
+from ..data_objects import UnitData, MetaData, DisplayData, DTypePolicy
 
 ###############################################################################
 
@@ -24,6 +24,7 @@ class PhysicellData:
     owner_cell_display_name: str
     time_units: UnitData
     plots: List[Dict[str, Any]]
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -37,6 +38,7 @@ class PhysicellData:
         owner_cell_display_name: str = "cell",
         time_units: UnitData = None,
         plots: List[Dict[str, Any]] = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -83,6 +85,11 @@ class PhysicellData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.timestep = timestep
         self.path_to_output_dir = path_to_output_dir
@@ -94,3 +101,4 @@ class PhysicellData:
         self.owner_cell_display_name = owner_cell_display_name
         self.time_units = time_units if time_units is not None else UnitData("s")
         self.plots = plots if plots is not None else []
+        self.dtype_policy = dtype_policy
@@ -79,7 +79,9 @@ class ReaddyConverter(TrajectoryConverter):
             total_steps=n_agents.shape[0],
             max_agents=int(np.amax(n_agents)),
         )
-        result = AgentData.from_dimensions(data_dimensions)
+        result = AgentData.from_dimensions(
+            data_dimensions, dtype_policy=input_data.dtype_policy
+        )
         result.times = input_data.timestep * np.arange(data_dimensions.total_steps)
         result.viz_types = VIZ_TYPE.DEFAULT * np.ones(
             shape=(data_dimensions.total_steps, data_dimensions.max_agents)
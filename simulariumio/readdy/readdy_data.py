@@ -4,7 +4,7 @@
 import logging
 from typing import Any, Dict, List
 
-from ..data_objects import UnitData, MetaData, DisplayData
+from ..data_objects import UnitData, MetaData, DisplayData, DTypePolicy
 
 ###############################################################################
 
@@ -22,6 +22,7 @@ class ReaddyData:
     time_units: UnitData
     spatial_units: UnitData
     plots: List[Dict[str, Any]]
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -33,6 +34,7 @@ class ReaddyData:
         time_units: UnitData = None,
         spatial_units: UnitData = None,
         plots: List[Dict[str, Any]] = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -67,6 +69,11 @@ class ReaddyData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.timestep = timestep
         self.path_to_readdy_h5 = path_to_readdy_h5
@@ -76,3 +83,4 @@ class ReaddyData:
         self.time_units = time_units if time_units is not None else UnitData("s")
         self.spatial_units = spatial_units if time_units is not None else UnitData("m")
         self.plots = plots if plots is not None else []
+        self.dtype_policy = dtype_policy
@@ -3,3 +3,11 @@
 
 from .simularium_binary_reader import SimulariumBinaryReader  # noqa: F401
 from .binary_info import BinaryFileData, BinaryBlockInfo  # noqa: F401
+from ..codecs import (  # noqa: F401
+    BinaryFrameCodec,
+    BinaryPlotCodec,
+    KeyframeDeltaCodec,
+    KeyframeDeltaEncoder,
+    KeyframeDeltaDecoder,
+    QuantizedFrameCodec,
+)
@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from typing import List
+import mmap
+from typing import List, Union
 import numpy as np
 
 ###############################################################################
@@ -13,10 +14,24 @@ log = logging.getLogger(__name__)
 
 
 class BinaryFileData:
-    byte_view: bytes
+    byte_view: Union[bytes, mmap.mmap]
     int_view: np.ndarray
     float_view: np.ndarray
 
+    def close(self) -> None:
+        """
+        Release the memory map of the file, if the data is memory mapped.
+        The views are emptied, and arrays viewing the file's data
+        must be released before this is called
+        """
+        if not isinstance(self.byte_view, mmap.mmap):
+            return
+        byte_view = self.byte_view
+        self.byte_view = b""
+        self.int_view = self.int_view[:0].copy()
+        self.float_view = self.float_view[:0].copy()
+        byte_view.close()
+
 
 class BinaryBlockInfo:
     n_blocks: int
@@ -4,13 +4,19 @@
 import struct
 import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 import numpy as np
 
-from ..data_objects import InputFileData
+from ..data_objects import InputFileData, AgentData, DisplayData
 from ..constants import BINARY_SETTINGS, BINARY_BLOCK_TYPE
 from ..exceptions import DataError
 from .binary_info import BinaryFileData, BinaryBlockInfo
+from ..codecs import (
+    BinaryFrameCodec,
+    BinaryPlotCodec,
+    KeyframeDeltaDecoder,
+    QuantizedFrameCodec,
+)
 
 ###############################################################################
 
@@ -23,11 +29,11 @@ class SimulariumBinaryReader:
     @staticmethod
     def _binary_data_from_source(input_file: InputFileData) -> BinaryFileData:
         """
-        Read a .simularium binary file or take binary input bytes and return
-        multiple views of the data
+        Memory map a .simularium binary file or take binary input bytes
+        and return multiple views of the data
         """
         result = BinaryFileData()
-        result.byte_view = input_file.get_contents()
+        result.byte_view = input_file.get_mapped_contents()
         result.int_view = np.frombuffer(
             result.byte_view, dtype=np.dtype("I").newbyteorder("<")
         )
@@ -121,16 +127,26 @@ class SimulariumBinaryReader:
         return json.loads(traj_info_bytes.decode("utf-8").strip("\x00"))
 
     @staticmethod
-    def _binary_block_spatial_data(
+    def _binary_block_spatial_frames(
         block_index: int,
         block_info: BinaryBlockInfo,
         data_as_bytes: np.ndarray,
         data_as_ints: np.ndarray,
         data_as_floats: np.ndarray,
-        parse_data_as_binary: bool,
-    ) -> Dict[str, Any]:
+        compressed: bool = False,
+        frame_range: slice = None,
+    ) -> Tuple[int, List[Tuple[int, float, int, np.ndarray]]]:
         """
-        Parse spatial data binary block from a .simularium binary file
+        Parse the frames in a spatial data binary block
+        from a .simularium binary file, decompressing each frame
+        if the block is compressed, reconstructing delta frames
+        from their keyframes, and unpacking quantized frames to float32.
+        If a frame_range is given, only the frames in that slice
+        of the block are read, found from the block's frame offsets.
+        Returns the block's spatial data version and,
+        for each frame, its frame number, time, number of agents,
+        and float32 buffer in the V1 layout.
+        Uncompressed buffers are views of the file's data, not copies
         """
         block_offset = (
             int(block_info.block_offsets[block_index] / BINARY_SETTINGS.BYTES_PER_VALUE)
@@ -138,92 +154,226 @@ class SimulariumBinaryReader:
         )
         spatial_data_version = data_as_ints[block_offset]
         n_frames = data_as_ints[block_offset + 1]
-        current_frame_offset = block_offset + 2 + 2 * n_frames
-        frame_info = data_as_ints[block_offset + 2 : current_frame_offset]
+        frame_info = data_as_ints[block_offset + 2 : block_offset + 2 + 2 * n_frames]
+        # frame offsets in the table are in bytes from the start of the block
+        frame_offsets = (
+            frame_info[0::2].astype(np.int64) + block_info.block_offsets[block_index]
+        ) // BINARY_SETTINGS.BYTES_PER_VALUE
         frame_lengths = frame_info[1::2]
-        result = {
-            "version": spatial_data_version,
-            "msgType": 1,
-            "bundleStart": 0,
-            "bundleSize": n_frames,
-            "bundleData": [],
-        }
-        for index in range(n_frames):
-            frame_index = data_as_ints[current_frame_offset]
-            if index == 0:
-                result["bundleStart"] = frame_index
+        frame_indices = range(n_frames)
+        if frame_range is not None:
+            frame_indices = frame_indices[frame_range]
+        delta_decoder = (
+            KeyframeDeltaDecoder()
+            if compressed
+            and spatial_data_version
+            == BINARY_SETTINGS.KEYFRAME_DELTA_SPATIAL_DATA_VERSION
+            else None
+        )
+
+        def get_frame_bytes(index: int) -> bytes:
+            frame_start = BINARY_SETTINGS.BYTES_PER_VALUE * frame_offsets[index]
+            return data_as_bytes[frame_start : frame_start + frame_lengths[index]]
+
+        frames = []
+        for index in frame_indices:
+            current_frame_offset = frame_offsets[index]
             frame_n_values = int(frame_lengths[index] / BINARY_SETTINGS.BYTES_PER_VALUE)
-            if parse_data_as_binary:
-                data = data_as_bytes[
-                    4 * (current_frame_offset + 3) :
-                    4 * (current_frame_offset + frame_n_values)
-                ]
+            if compressed:
+                if delta_decoder is not None:
+                    frame_bytes = delta_decoder.decode_frame_at(index, get_frame_bytes)
+                elif (
+                    spatial_data_version
+                    == BINARY_SETTINGS.QUANTIZED_SPATIAL_DATA_VERSION
+                ):
+                    frame_bytes = QuantizedFrameCodec.decode_frame(
+                        get_frame_bytes(index)
+                    )
+                else:
+                    frame_bytes = BinaryFrameCodec.decode_frame(get_frame_bytes(index))
+                frame_buffer = np.frombuffer(
+                    frame_bytes,
+                    dtype=np.dtype("f").newbyteorder("<"),
+                    offset=4 * BINARY_SETTINGS.FRAME_HEADER_N_VALUES,
+                )
             else:
-                data = list(
-                    data_as_floats[
-                        current_frame_offset + 3 : current_frame_offset + frame_n_values
-                    ]
+                frame_buffer = data_as_floats[
+                    current_frame_offset
+                    + BINARY_SETTINGS.FRAME_HEADER_N_VALUES : current_frame_offset
+                    + frame_n_values
+                ]
+            frames.append(
+                (
+                    data_as_ints[current_frame_offset],
+                    data_as_floats[current_frame_offset + 1],
+                    data_as_ints[current_frame_offset + 2],
+                    frame_buffer,
                 )
-            result["bundleData"].append(
+            )
+        return spatial_data_version, frames
+
+    @staticmethod
+    def _binary_block_spatial_data(
+        block_index: int,
+        block_info: BinaryBlockInfo,
+        data_as_bytes: np.ndarray,
+        data_as_ints: np.ndarray,
+        data_as_floats: np.ndarray,
+        parse_data_as_binary: bool,
+        compressed: bool = False,
+        frame_range: slice = None,
+    ) -> Dict[str, Any]:
+        """
+        Parse spatial data binary block from a .simularium binary file
+        into a dict shaped like the JSON spatial data,
+        see _binary_block_spatial_frames
+        """
+        spatial_data_version, frames = (
+            SimulariumBinaryReader._binary_block_spatial_frames(
+                block_index,
+                block_info,
+                data_as_bytes,
+                data_as_ints,
+                data_as_floats,
+                compressed,
+                frame_range,
+            )
+        )
+        return {
+            "version": spatial_data_version,
+            "msgType": 1,
+            "bundleStart": frames[0][0] if len(frames) > 0 else 0,
+            "bundleSize": len(frames),
+            "bundleData": [
                 {
-                    "frameNumber": frame_index,
-                    "time": data_as_floats[current_frame_offset + 1],
-                    "nAgents": data_as_ints[current_frame_offset + 2],
-                    "data": data,
+                    "frameNumber": frame_number,
+                    "time": time,
+                    "nAgents": n_agents,
+                    "data": (
+                        frame_buffer.tobytes()
+                        if parse_data_as_binary
+                        else list(frame_buffer)
+                    ),
                 }
-            )
-            current_frame_offset += frame_n_values
-        return result
+                for frame_number, time, n_agents, frame_buffer in frames
+            ],
+        }
 
     @staticmethod
-    def load_binary(
-        input_file: InputFileData, parse_spatial_data_as_binary: bool = False
+    def _binary_block_plot_data(
+        block_index: int,
+        block_info: BinaryBlockInfo,
+        data_as_bytes: bytes,
     ) -> Dict[str, Any]:
         """
-        Load data from the input file in .simularium binary format and update it.
+        Parse binary plot data block from a .simularium binary file
+        """
+        block_header_n_bytes = (
+            BINARY_SETTINGS.BLOCK_HEADER_N_VALUES * BINARY_SETTINGS.BYTES_PER_VALUE
+        )
+        block_offset = block_info.block_offsets[block_index] + block_header_n_bytes
+        block_length = block_info.block_lengths[block_index] - block_header_n_bytes
+        return BinaryPlotCodec.decode(
+            data_as_bytes[block_offset : block_offset + block_length]
+        )
 
-        Parameters
-        ----------
-        input_file: InputFileData
-            A InputFileData object containing binary .simularium data to load
-        parse_spatial_data_as_binary: bool (optional)
-            Leave spatial data binary encoded in returned dict?
-            Default = False
+    @staticmethod
+    def _find_blocks(
+        block_info: BinaryBlockInfo, data_as_ints: np.ndarray
+    ) -> Dict[str, Tuple[int, int]]:
+        """
+        Find the index and type ID of the trajectory info, spatial data
+        and plot data blocks in a .simularium binary file.
+        If there is more than one block of a kind, the last one is used
         """
         result = {}
-        binary_data = SimulariumBinaryReader._binary_data_from_source(input_file)
-        block_info = SimulariumBinaryReader._parse_binary_header(binary_data.byte_view)
-        # parse blocks
-        found_blocks = []
         for block_index in range(block_info.n_blocks):
             block_type_id = SimulariumBinaryReader._binary_block_type(
-                block_index, block_info, binary_data.int_view
+                block_index, block_info, data_as_ints
             )
-            if block_type_id == BINARY_BLOCK_TYPE.SPATIAL_DATA_JSON.value:
+            if block_type_id in [
+                BINARY_BLOCK_TYPE.SPATIAL_DATA_JSON.value,
+                BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value,
+                BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value,
+            ]:
                 block_type = "spatialData"
-                data_type = "JSON"
             elif block_type_id == BINARY_BLOCK_TYPE.TRAJ_INFO_JSON.value:
                 block_type = "trajectoryInfo"
-                data_type = "JSON"
-            elif block_type_id == BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value:
+            elif block_type_id in [
+                BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value,
+                BINARY_BLOCK_TYPE.PLOT_DATA_BINARY.value,
+            ]:
                 block_type = "plotData"
-                data_type = "JSON"
-            elif block_type_id == BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value:
-                block_type = "spatialData"
-                data_type = "binary"
             else:
                 print(f"Binary block type ID = {block_type_id} is not supported")
                 continue
-            if block_type in found_blocks:
+            if block_type in result:
                 print(
                     f"WARNING: More than one {block_type} block found, "
                     "only using last one"
                 )
-            if data_type == "JSON":
-                result[block_type] = SimulariumBinaryReader._binary_block_json(
-                    block_index, block_info, binary_data.byte_view
-                )
-            elif block_type == "spatialData":
+            result[block_type] = (block_index, block_type_id)
+        return result
+
+    @staticmethod
+    def _binary_block_info_or_plots(
+        block_index: int,
+        block_type_id: int,
+        block_info: BinaryBlockInfo,
+        data_as_bytes: bytes,
+    ) -> Dict[str, Any]:
+        """
+        Parse a JSON block or a binary plot data block
+        from a .simularium binary file
+        """
+        if block_type_id == BINARY_BLOCK_TYPE.PLOT_DATA_BINARY.value:
+            return SimulariumBinaryReader._binary_block_plot_data(
+                block_index, block_info, data_as_bytes
+            )
+        return SimulariumBinaryReader._binary_block_json(
+            block_index, block_info, data_as_bytes
+        )
+
+    @staticmethod
+    def load_binary(
+        input_file: InputFileData,
+        parse_spatial_data_as_binary: bool = False,
+        start: int = None,
+        stop: int = None,
+        step: int = None,
+    ) -> Dict[str, Any]:
+        """
+        Load data from the input file in .simularium binary format and update it.
+
+        Parameters
+        ----------
+        input_file: InputFileData
+            A InputFileData object containing binary .simularium data to load
+        parse_spatial_data_as_binary: bool (optional)
+            Leave spatial data binary encoded in returned dict?
+            Default = False
+        start: int (optional)
+            index of the first frame to load
+            Default = None (the first frame)
+        stop: int (optional)
+            index to stop loading frames before
+            Default = None (after the last frame)
+        step: int (optional)
+            load every step-th frame from start
+            Default = None (every frame)
+
+        Only the frames in range(start, stop, step) are read from the file,
+        using the frame offsets in the spatial data block
+        """
+        result = {}
+        binary_data = SimulariumBinaryReader._binary_data_from_source(input_file)
+        block_info = SimulariumBinaryReader._parse_binary_header(binary_data.byte_view)
+        blocks = SimulariumBinaryReader._find_blocks(block_info, binary_data.int_view)
+        for block_type, (block_index, block_type_id) in blocks.items():
+            if block_type_id in [
+                BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value,
+                BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value,
+            ]:
                 result[block_type] = SimulariumBinaryReader._binary_block_spatial_data(
                     block_index,
                     block_info,
@@ -231,10 +381,124 @@ class SimulariumBinaryReader:
                     binary_data.int_view,
                     binary_data.float_view,
                     parse_spatial_data_as_binary,
+                    frame_range=slice(start, stop, step),
+                    compressed=(
+                        block_type_id
+                        == BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value
+                    ),
                 )
             else:
-                raise DataError(
-                    f"Binary {block_type} block reading is not yet supported"
+                result[block_type] = SimulariumBinaryReader._binary_block_info_or_plots(
+                    block_index, block_type_id, block_info, binary_data.byte_view
                 )
-            found_blocks.append(block_type)
         return result
+
+    @staticmethod
+    def _load_binary_frames(
+        binary_data: BinaryFileData,
+        start: int = None,
+        stop: int = None,
+        step: int = None,
+    ) -> Tuple[Dict[str, Any], List[float], List[np.ndarray]]:
+        """
+        Load the trajectory info and plot data from the views
+        of a .simularium binary file as a dict, and the time
+        and V1 buffer of each frame in range(start, stop, step).
+        Uncompressed buffers are views of the file's data
+        """
+        result = {}
+        block_info = SimulariumBinaryReader._parse_binary_header(binary_data.byte_view)
+        blocks = SimulariumBinaryReader._find_blocks(block_info, binary_data.int_view)
+        for block_type, (block_index, block_type_id) in blocks.items():
+            if block_type != "spatialData":
+                result[block_type] = SimulariumBinaryReader._binary_block_info_or_plots(
+                    block_index, block_type_id, block_info, binary_data.byte_view
+                )
+        if "spatialData" not in blocks:
+            raise DataError("Binary file has no spatial data block")
+        block_index, block_type_id = blocks["spatialData"]
+        if block_type_id == BINARY_BLOCK_TYPE.SPATIAL_DATA_JSON.value:
+            spatial_data = SimulariumBinaryReader._binary_block_json(
+                block_index, block_info, binary_data.byte_view
+            )
+            frames = spatial_data["bundleData"][start:stop:step]
+            return (
+                result,
+                [frame["time"] for frame in frames],
+                [frame["data"] for frame in frames],
+            )
+        _, frames = SimulariumBinaryReader._binary_block_spatial_frames(
+            block_index,
+            block_info,
+            binary_data.byte_view,
+            binary_data.int_view,
+            binary_data.float_view,
+            compressed=(
+                block_type_id == BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value
+            ),
+            frame_range=slice(start, stop, step),
+        )
+        return result, [frame[1] for frame in frames], [frame[3] for frame in frames]
+
+    @staticmethod
+    def load_binary_agent_data(
+        input_file: InputFileData,
+        display_data: Dict[int, DisplayData] = None,
+        start: int = None,
+        stop: int = None,
+        step: int = None,
+    ) -> Tuple[Dict[str, Any], AgentData]:
+        """
+        Load data from the input file in .simularium binary format,
+        decoding the spatial data straight from the file's float values
+        into AgentData, without the lists of a JSON shaped dict.
+        Returns a dict with the trajectory info and plot data,
+        and the AgentData
+
+        Parameters
+        ----------
+        input_file: InputFileData
+            A InputFileData object containing binary .simularium data to load
+        display_data: Dict[int, DisplayData] (optional)
+            Display data for each agent type ID
+            Default: use the display data in the file
+        start: int (optional)
+            index of the first frame to load
+            Default = None (the first frame)
+        stop: int (optional)
+            index to stop loading frames before
+            Default = None (after the last frame)
+        step: int (optional)
+            load every step-th frame from start
+            Default = None (every frame)
+        """
+        binary_data = SimulariumBinaryReader._binary_data_from_source(input_file)
+        result = SimulariumBinaryReader._agent_data_from_binary_data(
+            binary_data, display_data, start, stop, step
+        )
+        binary_data.close()
+        return result
+
+    @staticmethod
+    def _agent_data_from_binary_data(
+        binary_data: BinaryFileData,
+        display_data: Dict[int, DisplayData] = None,
+        start: int = None,
+        stop: int = None,
+        step: int = None,
+    ) -> Tuple[Dict[str, Any], AgentData]:
+        """
+        Load the data from the views of a .simularium binary file,
+        like load_binary_agent_data(), into AgentData
+        that doesn't view the file's data
+        """
+        result, times, frame_buffers = SimulariumBinaryReader._load_binary_frames(
+            binary_data, start, stop, step
+        )
+        agent_data = AgentData.from_frame_buffers(
+            times=times,
+            frame_buffers=frame_buffers,
+            type_mapping=result["trajectoryInfo"]["typeMapping"],
+            display_data=display_data,
+        )
+        return result, agent_data
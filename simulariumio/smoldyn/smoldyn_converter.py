@@ -3,10 +3,9 @@
 
 import logging
 from typing import List, Callable, Tuple
-import numpy as np
 
 from ..trajectory_converter import TrajectoryConverter
-from ..data_objects import TrajectoryData, AgentData, DimensionData
+from ..data_objects import TrajectoryData, AgentData, AgentDataBuilder
 from ..exceptions import InputDataError
 from .smoldyn_data import SmoldynData
 
@@ -48,27 +47,6 @@ class SmoldynConverter(TrajectoryConverter):
         super().__init__(input_data, progress_callback, callback_interval)
         self._data = self._read(input_data)
 
-    @staticmethod
-    def _parse_dimensions(smoldyn_data_lines: List[str]) -> DimensionData:
-        """
-        Parse Smoldyn output files to get the number of timesteps
-        and maximum agents per timestep
-        """
-        result = DimensionData(0, 0)
-        agents = 0
-        for line in smoldyn_data_lines:
-            cols = line.split()
-            if len(cols) == 2:
-                if agents > result.max_agents:
-                    result.max_agents = agents
-                agents = 0
-                result.total_steps += 1
-            else:
-                agents += 1
-        if agents > result.max_agents:
-            result.max_agents = agents
-        return result
-
     def _parse_objects(
         self,
         smoldyn_data_lines: List[str],
@@ -77,10 +55,11 @@ class SmoldynConverter(TrajectoryConverter):
         """
         Parse a Smoldyn output file to get AgentData
         """
-        dimensions = SmoldynConverter._parse_dimensions(smoldyn_data_lines)
-        result = AgentData.from_dimensions(dimensions)
-        time_index = -1
-        agent_index = 0
+        builder = AgentDataBuilder(dtype_policy=input_data.dtype_policy)
+        unique_ids = []
+        types = []
+        positions = []
+        radii = []
         line_count = 0
 
         for line in smoldyn_data_lines:
@@ -88,11 +67,10 @@ class SmoldynConverter(TrajectoryConverter):
                 continue
             cols = line.split()
             if len(cols) == 2:
-                if time_index >= 0:
-                    result.n_agents[time_index] = agent_index
-                agent_index = 0
-                time_index += 1
-                result.times[time_index] = float(cols[0])
+                if builder.total_steps() > 0:
+                    builder.append_agents(unique_ids, types, positions, radii)
+                unique_ids, types, positions, radii = [], [], [], []
+                builder.append_frame(float(cols[0]))
             else:
                 if len(cols) < 4:
                     raise InputDataError(
@@ -100,17 +78,14 @@ class SmoldynConverter(TrajectoryConverter):
                         "please use the Smoldyn `listmols` command for output"
                     )
                 is_3D = len(cols) > 4
-                result.unique_ids[time_index][agent_index] = int(
-                    cols[4] if is_3D else cols[3]
-                )
+                unique_ids.append(int(cols[4] if is_3D else cols[3]))
                 raw_type_name = str(cols[0])
-                result.types[time_index].append(
+                types.append(
                     TrajectoryConverter._get_display_type_name_from_raw(
                         raw_type_name, input_data.display_data
                     )
                 )
-
-                result.positions[time_index][agent_index] = np.array(
+                positions.append(
                     [
                         float(cols[1]),
                         float(cols[2]),
@@ -123,17 +98,17 @@ class SmoldynConverter(TrajectoryConverter):
                     raw_type_name, input_data.display_data
                 )
 
-                result.radii[time_index][agent_index] = (
+                radii.append(
                     input_display_data.radius
                     if input_display_data and input_display_data.radius is not None
                     else 1.0
                 )
-                agent_index += 1
             line_count += 1
             self.check_report_progress(line_count / len(smoldyn_data_lines))
 
-        result.n_agents[time_index] = agent_index
-        result.n_timesteps = time_index + 1
+        if builder.total_steps() > 0:
+            builder.append_agents(unique_ids, types, positions, radii)
+        result = builder.finalize()
 
         if input_data.center:
             return TrajectoryConverter.center_and_scale_agent_data(
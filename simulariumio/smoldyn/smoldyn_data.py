@@ -10,6 +10,7 @@ from ..data_objects import (
     UnitData,
     DisplayData,
     InputFileData,
+    DTypePolicy,
 )
 from ..utils import unpack_display_data
 from ..exceptions import DataError
@@ -29,6 +30,7 @@ class SmoldynData:
     spatial_units: UnitData
     plots: List[Dict[str, Any]]
     center: bool
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -39,6 +41,7 @@ class SmoldynData:
         spatial_units: UnitData = None,
         plots: List[Dict[str, Any]] = None,
         center: bool = True,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -76,6 +79,11 @@ class SmoldynData:
             If true, the spatial values of the data are centered
             around the origin (0, 0, 0) during conversion
             Default: True
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.smoldyn_file = smoldyn_file
         self.meta_data = meta_data if meta_data is not None else MetaData()
@@ -86,6 +94,7 @@ class SmoldynData:
         )
         self.plots = plots if plots is not None else []
         self.center = center
+        self.dtype_policy = dtype_policy
 
     @classmethod
     def from_dict(
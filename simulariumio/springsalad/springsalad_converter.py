@@ -2,15 +2,15 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from typing import List, Tuple, Callable
+from typing import Any, Callable, Dict, List, Tuple
 import numpy as np
 
 from ..trajectory_converter import TrajectoryConverter
 from ..data_objects import (
     TrajectoryData,
     AgentData,
+    AgentDataBuilder,
     UnitData,
-    DimensionData,
     DisplayData,
 )
 from .springsalad_data import SpringsaladData
@@ -61,30 +61,20 @@ class SpringsaladConverter(TrajectoryConverter):
         self._data = self._read(input_data)
 
     @staticmethod
-    def _parse_dimensions(
-        springsalad_data: List[str], draw_bonds: bool
-    ) -> DimensionData:
+    def _empty_frame_agents() -> Dict[str, List[Any]]:
         """
-        Parse SpringSaLaD SIM_VIEW txt file to get the number of timesteps
-        and maximum agents per timestep
+        Get lists to collect the agents in one SpringSaLaD scene
+        before they're added to the AgentDataBuilder
         """
-        result = DimensionData(
-            0, 0, 2 * SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER) if draw_bonds else 0
-        )
-        agents = 0
-        for line in springsalad_data:
-            if "CurrentTime" in line:  # beginning of a frame
-                if agents > result.max_agents:
-                    result.max_agents = agents
-                agents = 0
-                result.total_steps += 1
-            if "ID" in line:  # line has data for one agent
-                agents += 1
-            if draw_bonds and "Link" in line:  # line has data for a bond
-                agents += 1
-        if agents > result.max_agents:
-            result.max_agents = agents
-        return result
+        return {
+            "viz_types": [],
+            "unique_ids": [],
+            "types": [],
+            "positions": [],
+            "radii": [],
+            "n_subpoints": [],
+            "subpoints": [],
+        }
 
     def _parse_springsalad_data(
         self,
@@ -94,13 +84,9 @@ class SpringsaladConverter(TrajectoryConverter):
         """
         Parse SpringSaLaD SIM_VIEW txt file to get spatial data
         """
-        dimensions = SpringsaladConverter._parse_dimensions(
-            springsalad_data, input_data.draw_bonds
-        )
-        result = AgentData.from_dimensions(dimensions)
+        builder = AgentDataBuilder(dtype_policy=input_data.dtype_policy)
+        frame_agents = SpringsaladConverter._empty_frame_agents()
         box_size = np.zeros(VALUES_PER_3D_POINT)
-        time_index = -1
-        agent_index = 0
         max_uid = 0
         scene_agent_positions = {}
         line_count = 0
@@ -116,34 +102,33 @@ class SpringsaladConverter(TrajectoryConverter):
             if "z_inside" in line:
                 box_size[2] += 2 * float(cols[1])
             if "CurrentTime" in line:  # beginning of a scene (timepoint)
-                agent_index = 0
-                time_index += 1
-                result.times[time_index] = float(
-                    line.split("CurrentTime")[1].split()[0]
-                )
+                if builder.total_steps() > 0:
+                    builder.append_agents(**frame_agents)
+                frame_agents = SpringsaladConverter._empty_frame_agents()
+                builder.append_frame(float(line.split("CurrentTime")[1].split()[0]))
                 scene_agent_positions = {}
                 max_uid = 0
             if "ID" in line:  # line has data for one agent in scene
-                result.n_agents[time_index] += 1
-                result.unique_ids[time_index][agent_index] = int(cols[1])
+                frame_agents["viz_types"].append(VIZ_TYPE.DEFAULT)
+                frame_agents["unique_ids"].append(int(cols[1]))
                 raw_type_name = cols[3]
-                result.types[time_index].append(
+                frame_agents["types"].append(
                     TrajectoryConverter._get_display_type_name_from_raw(
                         raw_type_name, input_data.display_data
                     )
                 )
                 position = np.array([float(cols[4]), float(cols[5]), float(cols[6])])
                 scene_agent_positions[int(cols[1])] = position
-                result.positions[time_index][agent_index] = position
+                frame_agents["positions"].append(position)
                 input_display_data = TrajectoryConverter._get_display_data_for_agent(
                     raw_type_name, input_data.display_data
                 )
-                result.radii[time_index][agent_index] = (
+                frame_agents["radii"].append(
                     input_display_data.radius
                     if input_display_data and input_display_data.radius is not None
                     else float(cols[2])
                 )
-                agent_index += 1
+                frame_agents["n_subpoints"].append(0)
             if input_data.draw_bonds and "Link" in line:  # line has data for a bond
                 particle1_id = int(cols[1])
                 particle2_id = int(cols[3])
@@ -153,27 +138,27 @@ class SpringsaladConverter(TrajectoryConverter):
                 ):
                     raise InputDataError(
                         "Could not find particle ID connected by Link "
-                        f"at timepoint {time_index} in SpringSaLaD data, "
-                        "try converting without drawing bonds"
+                        f"at timepoint {builder.total_steps() - 1} "
+                        "in SpringSaLaD data, try converting without drawing bonds"
                     )
-                result.n_agents[time_index] += 1
-                result.viz_types[time_index][agent_index] = VIZ_TYPE.FIBER
-                result.unique_ids[time_index][agent_index] = max_uid
+                frame_agents["viz_types"].append(VIZ_TYPE.FIBER)
+                frame_agents["unique_ids"].append(max_uid)
                 max_uid += 1
-                result.types[time_index].append("Link")
-                result.n_subpoints[time_index][
-                    agent_index
-                ] = 2 * SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER)
-                result.subpoints[time_index][agent_index][
-                    0:VALUES_PER_3D_POINT
-                ] = scene_agent_positions[particle1_id]
-                result.subpoints[time_index][agent_index][
-                    VALUES_PER_3D_POINT : 2 * VALUES_PER_3D_POINT
-                ] = scene_agent_positions[particle2_id]
-                agent_index += 1
+                frame_agents["types"].append("Link")
+                frame_agents["positions"].append(np.zeros(VALUES_PER_3D_POINT))
+                frame_agents["radii"].append(1.0)
+                frame_agents["n_subpoints"].append(
+                    2 * SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER)
+                )
+                frame_agents["subpoints"] += [
+                    scene_agent_positions[particle1_id],
+                    scene_agent_positions[particle2_id],
+                ]
             line_count += 1
             self.check_report_progress(line_count / len(springsalad_data))
-        result.n_timesteps = time_index + 1
+        if builder.total_steps() > 0:
+            builder.append_agents(**frame_agents)
+        result = builder.finalize()
 
         result, scale_factor = TrajectoryConverter.scale_agent_data(
             result, input_data.meta_data.scale_factor
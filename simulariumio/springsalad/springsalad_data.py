@@ -4,7 +4,7 @@
 import logging
 from typing import Any, Dict, List
 
-from ..data_objects import DisplayData, MetaData, InputFileData
+from ..data_objects import DisplayData, MetaData, InputFileData, DTypePolicy
 
 ###############################################################################
 
@@ -19,6 +19,7 @@ class SpringsaladData:
     display_data: Dict[str, DisplayData]
     draw_bonds: bool
     plots: List[Dict[str, Any]]
+    dtype_policy: DTypePolicy
 
     def __init__(
         self,
@@ -27,6 +28,7 @@ class SpringsaladData:
         display_data: Dict[str, DisplayData] = None,
         draw_bonds: bool = True,
         plots: List[Dict[str, Any]] = None,
+        dtype_policy: DTypePolicy = None,
     ):
         """
         This object holds simulation trajectory outputs
@@ -54,9 +56,15 @@ class SpringsaladData:
         plots : List[Dict[str, Any]] (optional)
             An object containing plot data already
             in Simularium format
+        dtype_policy : DTypePolicy (optional)
+            The dtypes to store the converted agent data in
+            Default: DTypePolicy(), which stores spatial values
+                as float32, IDs as int64, counts as int32,
+                and viz types as uint16
         """
         self.sim_view_txt_file = sim_view_txt_file
         self.meta_data = meta_data if meta_data is not None else MetaData()
         self.display_data = display_data if display_data is not None else {}
         self.draw_bonds = draw_bonds
         self.plots = plots if plots is not None else []
+        self.dtype_policy = dtype_policy
@@ -1175,6 +1175,34 @@ def sphere_group_agents() -> TrajectoryData:
     )
 
 
+def random_walk_agents(total_steps: int = 12, n_agents: int = 20) -> TrajectoryData:
+    """
+    Spheres that each move a small random step per frame,
+    with one agent's radius changing halfway through
+    """
+    rng = np.random.default_rng(0)
+    positions = np.cumsum(
+        0.01 * rng.normal(size=(total_steps, n_agents, 3)), axis=0
+    ) + 10.0 * rng.random((1, n_agents, 3))
+    radii = np.ones((total_steps, n_agents))
+    radii[total_steps // 2 :, 0] = 2.0
+    return TrajectoryData(
+        meta_data=MetaData(box_size=np.array([20.0, 20.0, 20.0])),
+        agent_data=AgentData(
+            times=0.5 * np.arange(total_steps),
+            n_agents=n_agents * np.ones(total_steps, dtype=int),
+            viz_types=1000.0 * np.ones((total_steps, n_agents)),
+            unique_ids=np.tile(np.arange(n_agents), (total_steps, 1)),
+            types=[["A"] * n_agents for _ in range(total_steps)],
+            positions=positions,
+            radii=radii,
+            display_data={
+                "A": DisplayData(name="A", display_type=DISPLAY_TYPE.SPHERE),
+            },
+        ),
+    )
+
+
 # 2 default agents (radius 5-10) and 3 fiber agents
 # at given positions for 3 frames, no plots
 binary_test_data = TrajectoryData(
@@ -11,7 +11,7 @@ from simulariumio.cytosim import (
     CytosimData,
     CytosimObjectInfo,
 )
-from simulariumio import MetaData, DisplayData, InputFileData
+from simulariumio import MetaData, DisplayData, InputFileData, DTypePolicy
 from simulariumio.constants import (
     DISPLAY_TYPE,
     DEFAULT_BOX_SIZE,
@@ -144,6 +144,7 @@ data_with_display_data = CytosimData(
             },
         )
     },
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter_display_data = CytosimConverter(data_with_display_data)
 results_display_data = JsonWriter.format_trajectory_data(converter_display_data._data)
@@ -332,6 +333,7 @@ aster_pull3D_objects = CytosimData(
             ),
         ),
     },
+    dtype_policy=DTypePolicy.full_precision(),
 )
 # load the data from Cytosim output .txt files
 cytosim_data = {}
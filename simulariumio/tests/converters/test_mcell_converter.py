@@ -6,7 +6,7 @@ from unittest.mock import Mock
 import numpy as np
 
 from simulariumio.mcell import McellConverter, McellData
-from simulariumio import DisplayData, MetaData, JsonWriter
+from simulariumio import DisplayData, MetaData, JsonWriter, DTypePolicy
 from simulariumio.constants import (
     DEFAULT_CAMERA_SETTINGS,
     DISPLAY_TYPE,
@@ -19,6 +19,7 @@ data = McellData(
     path_to_data_model_json="simulariumio/tests/data/mcell/"
     "organelle_model_viz_output/Scene.data_model.00.json",
     path_to_binary_files="simulariumio/tests/data/mcell/" "organelle_model_viz_output",
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter = McellConverter(data)
 results = JsonWriter.format_trajectory_data(converter._data)
@@ -167,6 +168,7 @@ data_with_display_data = McellData(
         ),
     },
     surface_mol_rotation_angle=0.0,
+    dtype_policy=DTypePolicy.full_precision(),
 )
 
 converter_display_data = McellConverter(data_with_display_data)
@@ -6,7 +6,7 @@ import pytest
 from unittest.mock import Mock
 
 from simulariumio.medyan import MedyanConverter, MedyanData
-from simulariumio import MetaData, DisplayData, InputFileData, JsonWriter
+from simulariumio import MetaData, DisplayData, InputFileData, JsonWriter, DTypePolicy
 from simulariumio.constants import (
     DEFAULT_BOX_SIZE,
     DEFAULT_CAMERA_SETTINGS,
@@ -126,6 +126,7 @@ data_with_meta_data = MedyanData(
     ),
     snapshot_file=InputFileData(file_path="simulariumio/tests/data/medyan/test.traj"),
     center=False,
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter_meta_data = MedyanConverter(data_with_meta_data)
 results_meta_data = JsonWriter.format_trajectory_data(converter_meta_data._data)
@@ -175,6 +176,7 @@ data_with_display_data = MedyanData(
         ),
     },
     center=False,
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter_display_data = MedyanConverter(data_with_display_data)
 results_display_data = JsonWriter.format_trajectory_data(converter_display_data._data)
@@ -297,6 +299,7 @@ data_centered = MedyanData(
         ),
     },
     center=True,
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter_centered = MedyanConverter(data_centered)
 results_centered = JsonWriter.format_trajectory_data(converter_centered._data)
@@ -378,6 +381,7 @@ data_with_drawing_endpoints = MedyanData(
     },
     agents_with_endpoints=["Xlink"],
     center=False,
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter_drawing_endpoints = MedyanConverter(data_with_drawing_endpoints)
 results_drawing_endpoints = JsonWriter.format_trajectory_data(
@@ -6,7 +6,7 @@ import pytest
 from unittest.mock import Mock
 
 from simulariumio.physicell import PhysicellConverter, PhysicellData
-from simulariumio import MetaData, DisplayData, JsonWriter, UnitData
+from simulariumio import MetaData, DisplayData, JsonWriter, UnitData, DTypePolicy
 from simulariumio.constants import (
     DEFAULT_BOX_SIZE,
     DEFAULT_COLORS,
@@ -103,6 +103,7 @@ data_with_meta_data = PhysicellData(
     time_units=UnitData(
         name=time_unit,
     ),
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter_meta_data = PhysicellConverter(data_with_meta_data)
 results_meta_data = JsonWriter.format_trajectory_data(converter_meta_data._data)
@@ -9,7 +9,14 @@ from simulariumio.smoldyn import (
     SmoldynConverter,
     SmoldynData,
 )
-from simulariumio import MetaData, UnitData, DisplayData, InputFileData, JsonWriter
+from simulariumio import (
+    MetaData,
+    UnitData,
+    DisplayData,
+    InputFileData,
+    JsonWriter,
+    DTypePolicy,
+)
 from simulariumio.constants import (
     DEFAULT_BOX_SIZE,
     DEFAULT_CAMERA_SETTINGS,
@@ -160,6 +167,7 @@ data_with_meta_data = SmoldynData(
     smoldyn_file=InputFileData(
         file_path="simulariumio/tests/data/smoldyn/example_data.txt"
     ),
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter_meta_data = SmoldynConverter(data_with_meta_data)
 results_meta_data = JsonWriter.format_trajectory_data(converter_meta_data._data)
@@ -517,6 +525,7 @@ centered_data = SmoldynData(
     },
     spatial_units=UnitData("m"),
     center=True,
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter_centered = SmoldynConverter(centered_data)
 results_centered = JsonWriter.format_trajectory_data(converter_centered._data)
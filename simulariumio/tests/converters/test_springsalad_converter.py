@@ -7,7 +7,7 @@ from unittest.mock import Mock
 from unittest import mock
 
 from simulariumio.springsalad import SpringsaladConverter, SpringsaladData
-from simulariumio import DisplayData, MetaData, InputFileData, JsonWriter
+from simulariumio import DisplayData, MetaData, InputFileData, JsonWriter, DTypePolicy
 from simulariumio.constants import (
     DEFAULT_CAMERA_SETTINGS,
     DISPLAY_TYPE,
@@ -23,6 +23,7 @@ data = SpringsaladData(
         file_path=("simulariumio/tests/data/springsalad/test.txt"),
     ),
     draw_bonds=False,
+    dtype_policy=DTypePolicy.full_precision(),
 )
 converter = SpringsaladConverter(data)
 results = JsonWriter.format_trajectory_data(converter._data)
@@ -478,6 +479,7 @@ def test_scaling():
             file_path=("simulariumio/tests/data/springsalad/test.txt"),
         ),
         draw_bonds=False,
+        dtype_policy=DTypePolicy.full_precision(),
     )
     converter = SpringsaladConverter(data)
     results = JsonWriter.format_trajectory_data(converter._data)
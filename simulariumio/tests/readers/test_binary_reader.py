@@ -1,15 +1,29 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import mmap
+
+import numpy as np
 import pytest
 
 from simulariumio import (
+    AgentData,
+    BinaryData,
+    BinaryWriter,
+    ChunkedBinaryData,
     FileConverter,
     InputFileData,
     TrajectoryConverter,
     JsonWriter,
 )
-from simulariumio.tests.conftest import binary_test_data, assert_buffers_equal
+from simulariumio.constants import BINARY_BLOCK_TYPE, BINARY_COMPRESSION
+from simulariumio.readers import SimulariumBinaryReader
+from simulariumio.tests.conftest import (
+    binary_test_data,
+    fiber_agents,
+    random_walk_agents,
+    assert_buffers_equal,
+)
 
 
 @pytest.mark.parametrize(
@@ -56,3 +70,341 @@ def test_binary_parsing(
             expected_converter._data
         )
         assert_buffers_equal(test_buffer_data, expected_buffer_data)
+
+
+@pytest.mark.parametrize(
+    "compression",
+    [BINARY_COMPRESSION.ZLIB, BINARY_COMPRESSION.LZMA],
+)
+def test_compressed_binary_parsing(compression, tmp_path):
+    output_path = str(tmp_path / "compressed")
+    BinaryWriter.save(binary_test_data, output_path, False, compression=compression)
+    test_converter = FileConverter(
+        input_file=InputFileData(file_path=f"{output_path}.simularium")
+    )
+    test_buffer_data = JsonWriter.format_trajectory_data(test_converter._data)
+    expected_converter = TrajectoryConverter(binary_test_data)
+    expected_buffer_data = JsonWriter.format_trajectory_data(expected_converter._data)
+    assert_buffers_equal(test_buffer_data, expected_buffer_data)
+
+
+@pytest.mark.parametrize(
+    "compression",
+    [BINARY_COMPRESSION.ZLIB, BINARY_COMPRESSION.LZMA],
+)
+def test_compressed_binary_frames(compression, tmp_path):
+    BinaryWriter.save(binary_test_data, str(tmp_path / "raw"), False)
+    BinaryWriter.save(
+        binary_test_data, str(tmp_path / "compressed"), False, compression=compression
+    )
+    raw_data = BinaryData((tmp_path / "raw.simularium").read_bytes())
+    compressed_data = BinaryData((tmp_path / "compressed.simularium").read_bytes())
+    assert compressed_data.get_num_frames() == raw_data.get_num_frames()
+    for frame_index in range(raw_data.get_num_frames()):
+        raw_frame = raw_data.get_frame_at_index(frame_index)
+        compressed_frame = compressed_data.get_frame_at_index(frame_index)
+        assert compressed_frame.n_agents == raw_frame.n_agents
+        assert compressed_frame.time == raw_frame.time
+        assert bytes(compressed_frame.data) == bytes(raw_frame.data)
+
+
+@pytest.mark.parametrize(
+    "compression",
+    [BINARY_COMPRESSION.NONE, BINARY_COMPRESSION.ZLIB],
+)
+def test_keyframe_delta_binary_frames(compression, tmp_path):
+    precision = 1e-3
+    trajectory_data = random_walk_agents()
+    BinaryWriter.save(trajectory_data, str(tmp_path / "raw"), False)
+    BinaryWriter.save(
+        trajectory_data,
+        str(tmp_path / "keyframes"),
+        False,
+        compression=compression,
+        keyframe_interval=1,
+    )
+    BinaryWriter.save(
+        trajectory_data,
+        str(tmp_path / "deltas"),
+        False,
+        compression=compression,
+        keyframe_interval=5,
+        delta_precision=precision,
+    )
+    delta_bytes = (tmp_path / "deltas.simularium").read_bytes()
+    assert len(delta_bytes) < len((tmp_path / "keyframes.simularium").read_bytes())
+    raw_data = BinaryData((tmp_path / "raw.simularium").read_bytes())
+    delta_data = BinaryData(delta_bytes)
+    sequential_frames = SimulariumBinaryReader.load_binary(
+        InputFileData(file_contents=delta_bytes), True
+    )["spatialData"]["bundleData"]
+    n_frames = raw_data.get_num_frames()
+    assert delta_data.get_num_frames() == n_frames
+    # random access, then in order
+    for frame_index in [7, 2, 11, 3, 0] + list(range(n_frames)):
+        raw_frame = raw_data.get_frame_at_index(frame_index)
+        delta_frame = delta_data.get_frame_at_index(frame_index)
+        assert delta_frame.n_agents == raw_frame.n_agents
+        assert delta_frame.time == raw_frame.time
+        assert bytes(delta_frame.data)[12:] == bytes(
+            sequential_frames[frame_index]["data"]
+        )
+        raw_values = np.frombuffer(bytes(raw_frame.data), dtype="<f4")
+        delta_values = np.frombuffer(bytes(delta_frame.data), dtype="<f4")
+        assert delta_values.shape == raw_values.shape
+        assert np.max(np.abs(delta_values - raw_values)) <= 1.01 * precision
+
+
+@pytest.mark.parametrize(
+    "trajectory_data, compression",
+    [
+        (binary_test_data, BINARY_COMPRESSION.NONE),
+        (random_walk_agents(), BINARY_COMPRESSION.NONE),
+        (random_walk_agents(), BINARY_COMPRESSION.ZLIB),
+    ],
+)
+def test_quantized_binary_frames(trajectory_data, compression, tmp_path):
+    BinaryWriter.save(trajectory_data, str(tmp_path / "raw"), False)
+    BinaryWriter.save(
+        trajectory_data,
+        str(tmp_path / "quantized"),
+        False,
+        compression=compression,
+        quantize=True,
+    )
+    quantized_bytes = (tmp_path / "quantized.simularium").read_bytes()
+    raw_data = BinaryData((tmp_path / "raw.simularium").read_bytes())
+    quantized_data = BinaryData(quantized_bytes)
+    sequential_frames = SimulariumBinaryReader.load_binary(
+        InputFileData(file_contents=quantized_bytes), True
+    )["spatialData"]["bundleData"]
+    # half a fixed point step for a box centered at the origin
+    max_error = 0.5 * 0.5 * max(trajectory_data.meta_data.box_size) / 32767
+    assert quantized_data.get_num_frames() == raw_data.get_num_frames()
+    for frame_index in range(raw_data.get_num_frames()):
+        raw_frame = raw_data.get_frame_at_index(frame_index)
+        quantized_frame = quantized_data.get_frame_at_index(frame_index)
+        assert quantized_frame.n_agents == raw_frame.n_agents
+        assert quantized_frame.time == raw_frame.time
+        assert bytes(quantized_frame.data)[12:] == bytes(
+            sequential_frames[frame_index]["data"]
+        )
+        raw_values = np.frombuffer(bytes(raw_frame.data), dtype="<f4")
+        quantized_values = np.frombuffer(bytes(quantized_frame.data), dtype="<f4")
+        assert quantized_values.shape == raw_values.shape
+        # integer fields are exact, so the layout matches
+        assert np.array_equal(quantized_values[:3], raw_values[:3])
+        assert np.max(np.abs(quantized_values - raw_values)) <= 1.01 * max_error
+
+
+def test_binary_plot_data(tmp_path):
+    converter = TrajectoryConverter(random_walk_agents(total_steps=200))
+    converter.add_number_of_agents_plot()
+    converter.save(str(tmp_path / "json_plots"), validate_ids=False)
+    converter.save(
+        str(tmp_path / "binary_plots"), validate_ids=False, binary_plots=True
+    )
+    json_plots_bytes = (tmp_path / "json_plots.simularium").read_bytes()
+    binary_plots_bytes = (tmp_path / "binary_plots.simularium").read_bytes()
+    block_info = SimulariumBinaryReader._parse_binary_header(binary_plots_bytes)
+    assert block_info.block_types[2] == BINARY_BLOCK_TYPE.PLOT_DATA_BINARY.value
+    json_block_info = SimulariumBinaryReader._parse_binary_header(json_plots_bytes)
+    assert block_info.block_lengths[2] < json_block_info.block_lengths[2]
+    expected_plot_data = BinaryData(json_plots_bytes).get_plot_data()
+    assert BinaryData(binary_plots_bytes).get_plot_data() == expected_plot_data
+    binary_plots_data = SimulariumBinaryReader.load_binary(
+        InputFileData(file_contents=binary_plots_bytes)
+    )
+    assert binary_plots_data["plotData"] == expected_plot_data
+    expected_data = SimulariumBinaryReader.load_binary(
+        InputFileData(file_contents=json_plots_bytes)
+    )
+    assert binary_plots_data["trajectoryInfo"] == expected_data["trajectoryInfo"]
+
+
+def test_binary_data_from_file_path(tmp_path):
+    converter = TrajectoryConverter(binary_test_data)
+    converter.save(str(tmp_path / "test"), validate_ids=False)
+    file_path = str(tmp_path / "test.simularium")
+    expected_data = BinaryData((tmp_path / "test.simularium").read_bytes())
+    test_data = BinaryData(file_path=file_path)
+    assert isinstance(test_data.file_data.byte_view, mmap.mmap)
+    assert test_data.get_trajectory_info() == expected_data.get_trajectory_info()
+    assert test_data.get_plot_data() == expected_data.get_plot_data()
+    assert test_data.get_num_frames() == expected_data.get_num_frames()
+    for frame_index in range(expected_data.get_num_frames()):
+        test_frame = test_data.get_frame_at_index(frame_index)
+        expected_frame = expected_data.get_frame_at_index(frame_index)
+        assert test_frame.n_agents == expected_frame.n_agents
+        assert test_frame.time == expected_frame.time
+        assert bytes(test_frame.data) == bytes(expected_frame.data)
+    assert SimulariumBinaryReader.load_binary(
+        InputFileData(file_path=file_path)
+    ) == SimulariumBinaryReader.load_binary(
+        InputFileData(file_contents=expected_data.get_file_contents())
+    )
+    # the trajectory is read from the mapped file, and the map is released
+    # at the end of a with block
+    with BinaryData(file_path=file_path) as test_data:
+        byte_view = test_data.file_data.byte_view
+        trajectory_data = test_data.get_trajectory_data_object()
+    assert byte_view.closed
+    assert (
+        trajectory_data.agent_data
+        == expected_data.get_trajectory_data_object().agent_data
+    )
+    test_data.close()
+
+
+@pytest.mark.parametrize(
+    "start, stop, step",
+    [
+        (3, 9, None),
+        (None, None, 4),
+        (10, None, None),
+        (2, 11, 3),
+        (None, None, -2),
+    ],
+)
+@pytest.mark.parametrize("keyframe_interval", [0, 4])
+def test_binary_frame_range(start, stop, step, keyframe_interval, tmp_path):
+    trajectory_data = random_walk_agents()
+    BinaryWriter.save(
+        trajectory_data,
+        str(tmp_path / "test"),
+        False,
+        keyframe_interval=keyframe_interval,
+    )
+    file_path = str(tmp_path / "test.simularium")
+    all_frames = SimulariumBinaryReader.load_binary(InputFileData(file_path=file_path))
+    range_frames = SimulariumBinaryReader.load_binary(
+        InputFileData(file_path=file_path), start=start, stop=stop, step=step
+    )
+    expected_bundle = all_frames["spatialData"]["bundleData"][start:stop:step]
+    assert range_frames["spatialData"]["bundleSize"] == len(expected_bundle)
+    assert (
+        range_frames["spatialData"]["bundleStart"] == expected_bundle[0]["frameNumber"]
+    )
+    assert range_frames["spatialData"]["bundleData"] == expected_bundle
+    assert range_frames["trajectoryInfo"] == all_frames["trajectoryInfo"]
+    assert range_frames["plotData"] == all_frames["plotData"]
+    expected_times = trajectory_data.agent_data.times[start:stop:step]
+    converter = FileConverter(
+        input_file=InputFileData(file_path=file_path), start=start, stop=stop, step=step
+    )
+    assert np.allclose(converter._data.agent_data.times, expected_times)
+    test_data = BinaryData(file_path=file_path).get_trajectory_data_object(
+        start=start, stop=stop, step=step
+    )
+    assert np.allclose(test_data.agent_data.times, expected_times)
+    assert np.array_equal(
+        test_data.agent_data.positions, converter._data.agent_data.positions
+    )
+    # JSON files are sliced after loading
+    JsonWriter.save(
+        FileConverter(input_file=InputFileData(file_path=file_path))._data,
+        str(tmp_path / "test_json"),
+        False,
+    )
+    json_converter = FileConverter(
+        input_file=InputFileData(file_path=str(tmp_path / "test_json.simularium")),
+        start=start,
+        stop=stop,
+        step=step,
+    )
+    assert np.allclose(json_converter._data.agent_data.times, expected_times)
+    assert np.allclose(
+        json_converter._data.agent_data.positions,
+        converter._data.agent_data.positions,
+    )
+
+
+@pytest.mark.parametrize(
+    "save_kwargs",
+    [
+        {},
+        {"compression": BINARY_COMPRESSION.ZLIB},
+        {"keyframe_interval": 4},
+        {"quantize": True},
+    ],
+)
+@pytest.mark.parametrize("trajectory_data", [fiber_agents(), random_walk_agents()])
+def test_load_binary_agent_data(trajectory_data, save_kwargs, tmp_path):
+    BinaryWriter.save(trajectory_data, str(tmp_path / "test"), False, **save_kwargs)
+    input_file = InputFileData(file_path=str(tmp_path / "test.simularium"))
+    buffer_data = SimulariumBinaryReader.load_binary(input_file)
+    expected = AgentData.from_buffer_data(buffer_data)
+    result_dict, result = SimulariumBinaryReader.load_binary_agent_data(input_file)
+    assert "spatialData" not in result_dict
+    assert result_dict["trajectoryInfo"] == buffer_data["trajectoryInfo"]
+    assert result_dict["plotData"] == buffer_data["plotData"]
+    for field in [
+        "times",
+        "n_agents",
+        "viz_types",
+        "unique_ids",
+        "positions",
+        "rotations",
+        "radii",
+        "n_subpoints",
+        "subpoints",
+    ]:
+        assert np.array_equal(getattr(result, field), getattr(expected, field))
+    assert result.types == expected.types
+    _, every_other_frame = SimulariumBinaryReader.load_binary_agent_data(
+        input_file, start=1, step=2
+    )
+    assert np.array_equal(every_other_frame.times, expected.times[1::2])
+
+
+@pytest.mark.parametrize("keyframe_interval", [0, 4])
+def test_chunked_binary_data(keyframe_interval, tmp_path):
+    trajectory_data = random_walk_agents()
+    agent_data = trajectory_data.agent_data
+    output_path = str(tmp_path / "test")
+    BinaryWriter.save(
+        trajectory_data,
+        output_path,
+        False,
+        max_bytes=4000,
+        keyframe_interval=keyframe_interval,
+    )
+    assert not (tmp_path / "test.simularium").exists()
+    chunked_data = ChunkedBinaryData.from_output_path(output_path)
+    n_chunks = len(chunked_data.file_paths)
+    assert n_chunks > 2
+    assert chunked_data.get_num_frames() == 12
+    assert chunked_data.chunks == {}
+    # only the chunk holding the frame is opened
+    last_frame = chunked_data.get_frame_at_index(11)
+    assert list(chunked_data.chunks) == [n_chunks - 1]
+    assert last_frame.frame_number == 11
+    assert chunked_data.get_frame_at_index(12) is None
+    for index, frame in enumerate(chunked_data):
+        assert frame.frame_number == index
+        assert np.isclose(frame.time, agent_data.times[index])
+        assert np.allclose(
+            frame.get_agents()["position"], agent_data.positions[index], atol=1e-3
+        )
+        assert chunked_data.get_index_for_time(agent_data.times[index]) == index
+        assert chunked_data.get_index_for_time(agent_data.times[index] + 0.1) == index
+    assert chunked_data.get_index_for_time(100.0) == 11
+    every_fifth_frame = chunked_data.iter_frames(step=5)
+    assert [frame.frame_number for frame in every_fifth_frame] == [0, 5, 10]
+    assert chunked_data.get_trajectory_info()["totalSteps"] == 12
+    first_chunk = BinaryData(file_path=chunked_data.file_paths[0])
+    assert chunked_data.get_plot_data() == first_chunk.get_plot_data()
+    for frame_range in [slice(None), slice(2, 11, 3), slice(None, None, -2)]:
+        result = chunked_data.get_trajectory_data_object(
+            frame_range.start, frame_range.stop, frame_range.step
+        )
+        assert np.allclose(result.agent_data.times, agent_data.times[frame_range])
+        assert np.allclose(
+            result.agent_data.positions,
+            agent_data.positions[frame_range],
+            atol=1e-3,
+        )
+    chunk_files = [chunk.file_data.byte_view for chunk in chunked_data.chunks.values()]
+    chunked_data.close()
+    assert chunked_data.chunks == {}
+    assert all(chunk_file.closed for chunk_file in chunk_files)
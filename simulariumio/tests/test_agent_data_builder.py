@@ -0,0 +1,143 @@
+import copy
+
+import numpy as np
+import pytest
+
+from simulariumio import (
+    AgentData,
+    AgentDataBuilder,
+    AgentTypes,
+    DTypePolicy,
+    RaggedAgentData,
+)
+from simulariumio.exceptions import DataError
+from simulariumio.tests.conftest import (
+    fiber_agents,
+    mixed_agents,
+    sphere_group_agents,
+)
+
+TEST_DATA = [mixed_agents(), fiber_agents(), sphere_group_agents()]
+
+
+def test_agent_data_builder_frames():
+    builder = AgentDataBuilder()
+    assert builder.append_frame(0.0) == 0
+    builder.append_agents(
+        unique_ids=[0, 1],
+        types=["A", "B"],
+        positions=[[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]],
+        radii=[1.0, 0.5],
+        viz_types=[1000.0, 1001.0],
+        n_subpoints=[0, 6],
+        subpoints=[1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    )
+    assert builder.append_frame(1.0) == 1
+    builder.append_agents([0], "A", [[6.0, 7.0, 8.0]], 2.0)
+    # an empty frame
+    builder.append_frame(2.0)
+    assert builder.total_steps() == 3
+    assert builder.total_agents() == 3
+    expected_data = AgentData(
+        times=np.array([0.0, 1.0, 2.0]),
+        n_agents=np.array([2, 1, 0]),
+        viz_types=np.array([[1000.0, 1001.0], [1000.0, 1000.0], [1000.0, 1000.0]]),
+        unique_ids=np.array([[0, 1], [0, 0], [0, 0]]),
+        types=AgentTypes([["A", "B"], ["A"], []]),
+        positions=np.array(
+            [
+                [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]],
+                [[6.0, 7.0, 8.0], [0.0, 0.0, 0.0]],
+                np.zeros((2, 3)),
+            ]
+        ),
+        radii=np.array([[1.0, 0.5], [2.0, 1.0], [1.0, 1.0]]),
+        rotations=np.zeros((3, 2, 3)),
+        n_subpoints=np.array([[0, 6], [0, 0], [0, 0]]),
+        subpoints=np.array(
+            [
+                [np.zeros(6), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]],
+                np.zeros((2, 6)),
+                np.zeros((2, 6)),
+            ]
+        ),
+    )
+    agent_data = builder.finalize()
+    assert not isinstance(agent_data, RaggedAgentData)
+    assert agent_data == expected_data
+    ragged_agent_data = builder.finalize(ragged=True)
+    assert isinstance(ragged_agent_data, RaggedAgentData)
+    assert ragged_agent_data == RaggedAgentData.from_agent_data(expected_data)
+    assert ragged_agent_data.type_names == ["A", "B"]
+
+
+@pytest.mark.parametrize("trajectory_data", TEST_DATA)
+def test_agent_data_builder_round_trip(trajectory_data):
+    agent_data = RaggedAgentData.from_agent_data(trajectory_data.agent_data)
+    builder = AgentDataBuilder(
+        dtype_policy=DTypePolicy.full_precision(),
+        display_data=copy.deepcopy(agent_data.display_data),
+        draw_fiber_points=agent_data.draw_fiber_points,
+    )
+    for time_index in range(len(agent_data.times)):
+        builder.append_frame(agent_data.times[time_index])
+        agents = agent_data.get_frame_slice(time_index)
+        builder.append_agents(
+            unique_ids=agent_data.flat_unique_ids[agents],
+            types=[
+                agent_data.type_names[code]
+                for code in agent_data.flat_type_codes[agents]
+            ],
+            positions=agent_data.flat_positions[agents],
+            radii=agent_data.flat_radii[agents],
+            viz_types=agent_data.flat_viz_types[agents],
+            rotations=agent_data.flat_rotations[agents],
+            n_subpoints=agent_data.flat_n_subpoints[agents],
+            subpoints=agent_data.flat_subpoints[agent_data.get_subpoint_slice(agents)],
+        )
+    assert builder.finalize(ragged=True) == agent_data
+    assert builder.finalize() == agent_data.to_agent_data()
+
+
+def test_agent_data_builder_growth():
+    builder = AgentDataBuilder()
+    capacities = set()
+    for time_index in range(1000):
+        builder.append_frame(float(time_index))
+        builder.append_agents(
+            unique_ids=np.arange(time_index % 7),
+            types="A",
+            positions=np.zeros((time_index % 7, 3)),
+            radii=1.0,
+            n_subpoints=3,
+            subpoints=np.ones(3 * (time_index % 7)),
+        )
+        capacities.add(len(builder._agent_arrays["positions"]))
+    # the arrays double in size when they're full
+    assert builder.total_agents() == 2997
+    assert sorted(capacities) == [0] + [16 * 2**n for n in range(9)]
+    assert len(builder._times) == 1024
+    assert len(builder._subpoints) == 16384
+    agent_data = builder.finalize(ragged=True)
+    assert len(agent_data.flat_positions) == 2997
+    assert len(agent_data.flat_subpoints) == 3 * 2997
+    assert agent_data.flat_positions.dtype == np.float32
+    assert agent_data.flat_unique_ids.dtype == np.int64
+    assert agent_data.n_agents.dtype == np.int32
+    assert agent_data.get_dimensions().max_agents == 6
+
+
+def test_agent_data_builder_errors():
+    builder = AgentDataBuilder()
+    with pytest.raises(DataError, match="needs a frame"):
+        builder.append_agents([0], "A", [[0.0, 0.0, 0.0]], 1.0)
+    builder.append_frame(0.0)
+    with pytest.raises(DataError, match="2 type names were given for 1 agents"):
+        builder.append_agents([0], ["A", "B"], [[0.0, 0.0, 0.0]], 1.0)
+    with pytest.raises(DataError, match="adds up to 6"):
+        builder.append_agents(
+            [0], "A", [[0.0, 0.0, 0.0]], 1.0, n_subpoints=6, subpoints=[1.0, 2.0]
+        )
+    # nothing was added by the failed calls
+    assert builder.total_agents() == 0
+    assert builder.finalize(ragged=True).n_agents.tolist() == [0]
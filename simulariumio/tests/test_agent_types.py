@@ -0,0 +1,126 @@
+import copy
+import json
+
+import numpy as np
+import pytest
+
+from simulariumio import AgentTypes, DisplayData, DISPLAY_TYPE
+from simulariumio.tests.conftest import mixed_agents
+
+
+def test_agent_types_codes():
+    agent_types = AgentTypes([["A", "B", "A"], [], ["C", "B"]])
+    assert agent_types.names == ["A", "B", "C"]
+    assert agent_types.codes.dtype == np.int32
+    assert np.array_equal(
+        agent_types.codes, np.array([[0, 1, 0], [-1, -1, -1], [2, 1, -1]])
+    )
+    assert agent_types.lengths.tolist() == [3, 0, 2]
+    assert agent_types == [["A", "B", "A"], [], ["C", "B"]]
+
+
+def test_agent_types_list_view():
+    types = [["A", "B"], ["B"], []]
+    agent_types = AgentTypes(types)
+    for time_index in range(3):
+        agent_types[time_index].append("C")
+        types[time_index].append("C")
+    agent_types[1] += ["D", "A"]
+    types[1] += ["D", "A"]
+    agent_types[2][0] = "E"
+    types[2][0] = "E"
+    agent_types[0][1:] = ["F", "F", "F"]
+    types[0][1:] = ["F", "F", "F"]
+    agent_types[-1] = ["G"]
+    types[-1] = ["G"]
+    assert agent_types == types
+    assert agent_types.tolist() == types
+    assert agent_types[1][-1] == "A"
+    assert agent_types[1][1:3] == ["C", "D"]
+    assert len(agent_types[0]) == 4
+    assert "D" in agent_types[1]
+    assert [list(row) for row in agent_types] == types
+    agent_types_copy = copy.deepcopy(agent_types)
+    agent_types_copy[0][0] = "H"
+    assert agent_types == types
+    assert agent_types_copy[0][0] == "H"
+
+
+def test_agent_types_list_operations():
+    types = [["A", "B"], []]
+    agent_types = AgentTypes(types)
+    agent_types.append(["C", "A", "D"])
+    types.append(["C", "A", "D"])
+    agent_types.append([])
+    types.append([])
+    assert agent_types == types
+    assert agent_types.lengths.tolist() == [2, 0, 3, 0]
+    assert agent_types.codes.shape[0] == 4
+    assert agent_types[0] + ["E"] == ["A", "B", "E"]
+    assert ["E"] + agent_types[2] == ["E", "C", "A", "D"]
+    assert agent_types[0] + agent_types[2] == ["A", "B", "C", "A", "D"]
+    assert agent_types == types
+    assert json.dumps(agent_types.tolist()) == json.dumps(types)
+    read_only_types = AgentTypes(types)
+    read_only_types.lengths.flags.writeable = False
+    with pytest.raises(ValueError, match="read-only"):
+        read_only_types.append(["A"])
+
+
+def test_agent_types_from_codes():
+    agent_types = AgentTypes.from_codes(
+        np.array([[1, 0, 2], [2, 2, 0]]), ["A", "B", "A"], lengths=[3, 2]
+    )
+    assert agent_types.names == ["A", "B"]
+    assert agent_types == [["B", "A", "A"], ["A", "A"]]
+    assert agent_types.codes[1, 2] == -1
+
+
+def test_agent_types_append_to_rows():
+    agent_types = AgentTypes([["A"], ["A", "B"]])
+    agent_types.append_to_rows(AgentTypes([["C", "B"], ["D", "C"]]), [2, 1])
+    assert agent_types == [["A", "C", "B"], ["A", "B", "D"]]
+    assert agent_types.names == ["A", "B", "C", "D"]
+
+
+def test_agent_types_get_copy():
+    agent_types = AgentTypes([["A", "B", "C"], ["C", "A"]])
+    agent_types_copy = agent_types.get_copy(3, np.array([2, 2]))
+    assert agent_types_copy == [["A", "B"], ["C", "A"], []]
+    agent_types_copy[2].append("D")
+    assert agent_types == [["A", "B", "C"], ["C", "A"]]
+
+
+def type_ids_and_mapping_from_lists(agent_data):
+    # the loop over every type name that codes replace
+    type_ids = np.zeros((len(agent_data.types), max(map(len, agent_data.types))))
+    tids = {}
+    for time_index, row in enumerate(agent_data.types.tolist()):
+        for agent_index, type_name in enumerate(row):
+            if len(type_name) == 0:
+                continue
+            if type_name not in tids:
+                tids[type_name] = len(tids)
+            type_ids[time_index][agent_index] = tids[type_name]
+    return type_ids, {
+        str(tid): {
+            "name": agent_data.display_data[type_name].name,
+            "geometry": dict(agent_data.display_data[type_name]),
+        }
+        for type_name, tid in tids.items()
+    }
+
+
+def test_get_type_ids_and_mapping():
+    agent_data = mixed_agents().agent_data
+    agent_data.types[1][0] = ""
+    agent_data.types[2].append("Z")
+    agent_data.display_data["Z"] = DisplayData(
+        name="Z", display_type=DISPLAY_TYPE.SPHERE
+    )
+    type_ids, type_mapping = agent_data.get_type_ids_and_mapping()
+    expected_type_ids, expected_type_mapping = type_ids_and_mapping_from_lists(
+        agent_data
+    )
+    assert np.array_equal(type_ids, expected_type_ids)
+    assert type_mapping == expected_type_mapping
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from simulariumio import AgentData
+from simulariumio.exceptions import DataError
+
+
+def buffer_data(frames):
+    return {
+        "trajectoryInfo": {
+            "typeMapping": {
+                "0": {"name": "A"},
+                "1": {"name": "B"},
+            },
+        },
+        "spatialData": {
+            "bundleData": [
+                {"frameNumber": index, "time": 0.5 * index, "data": data}
+                for index, data in enumerate(frames)
+            ],
+        },
+    }
+
+
+def test_agent_data_from_buffer_data():
+    frames = [
+        # two spheres, no subpoints
+        [
+            [1000.0, 0.0, 0.0, 1.0, 2.0, 3.0, 0.0, 0.0, 90.0, 1.5, 0.0],
+            [1000.0, 1.0, 1.0, 4.0, 5.0, 6.0, 0.0, 0.0, 0.0, 2.5, 0.0],
+        ],
+        # a fiber between two spheres
+        [
+            [1000.0, 0.0, 0.0, 1.0, 2.0, 3.0, 0.0, 0.0, 0.0, 1.5, 0.0],
+            [1001.0, 2.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.5, 6.0]
+            + [1.0, 1.0, 1.0, 2.0, 2.0, 2.0],
+            [1000.0, 3.0, 1.0, 7.0, 8.0, 9.0, 0.0, 0.0, 0.0, 3.5, 0.0],
+        ],
+        # no agents
+        [],
+        # a sphere group
+        [
+            [1000.0, 4.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 4.0]
+            + [1.0, 2.0, 3.0, 0.5],
+        ],
+    ]
+    agent_data = AgentData.from_buffer_data(
+        buffer_data([sum(frame, []) for frame in frames])
+    )
+    assert np.array_equal(agent_data.times, [0.0, 0.5, 1.0, 1.5])
+    assert np.array_equal(agent_data.n_agents, [2, 3, 0, 1])
+    assert agent_data.viz_types.shape == (4, 3)
+    assert np.array_equal(agent_data.viz_types[1], [1000.0, 1001.0, 1000.0])
+    assert np.array_equal(agent_data.unique_ids[1], [0.0, 2.0, 3.0])
+    assert agent_data.types[0][:2] == ["A", "B"]
+    assert agent_data.types[1] == ["A", "B", "B"]
+    assert np.array_equal(agent_data.positions[0, :2], [[1, 2, 3], [4, 5, 6]])
+    assert np.array_equal(agent_data.positions[1, 2], [7, 8, 9])
+    assert np.array_equal(agent_data.rotations[0, 0], [0, 0, 90])
+    assert np.array_equal(agent_data.radii[1], [1.5, 0.5, 3.5])
+    assert agent_data.subpoints.shape == (4, 3, 6)
+    assert np.array_equal(agent_data.n_subpoints[1], [0, 6, 0])
+    assert np.array_equal(agent_data.subpoints[1, 1], [1, 1, 1, 2, 2, 2])
+    assert np.array_equal(agent_data.n_subpoints[3, 0], 4)
+    assert np.array_equal(agent_data.subpoints[3, 0], [1, 2, 3, 0.5, 0, 0])
+    assert not np.any(agent_data.subpoints[0])
+
+
+def test_agent_data_from_numpy_buffer_data():
+    frame = np.zeros((3, 11), dtype=np.float32)
+    frame[:, 3:6] = np.arange(9).reshape(3, 3)
+    frame = frame.ravel()
+    agent_data = AgentData.from_buffer_data(buffer_data([frame, frame[:11]]))
+    assert np.array_equal(agent_data.n_agents, [3, 1])
+    assert np.array_equal(agent_data.positions[0, 1], [3, 4, 5])
+    assert np.array_equal(agent_data.positions[1, 0], [0, 1, 2])
+
+
+@pytest.mark.parametrize(
+    "frame",
+    [
+        # too few values for the last agent
+        [1000.0, 0.0, 0.0, 1.0, 2.0, 3.0, 0.0, 0.0, 0.0, 1.5, 0.0, 1000.0],
+        # more subpoints than values
+        [1000.0, 0.0, 0.0, 1.0, 2.0, 3.0, 0.0, 0.0, 0.0, 1.5, 3.0, 1.0],
+        # negative number of subpoints
+        [1000.0, 0.0, 0.0, 1.0, 2.0, 3.0, 0.0, 0.0, 0.0, 1.5, -1.0],
+    ],
+)
+def test_agent_data_from_malformed_buffer_data(frame):
+    with pytest.raises(DataError):
+        AgentData.from_buffer_data(buffer_data([frame]))
+
+
+def test_buffer_agent_starts():
+    # frames of spheres and fibers, with an empty frame in the middle
+    rng = np.random.default_rng(0)
+    frames = []
+    expected_starts = []
+    frame_start = 0
+    for n_agents in [40, 0, 1, 25]:
+        n_subpoints = rng.choice([0, 3, 6, 30], size=n_agents)
+        frame = []
+        for agent_n_subpoints in n_subpoints:
+            expected_starts.append(frame_start + len(frame))
+            agent = rng.normal(size=11 + agent_n_subpoints)
+            agent[10] = agent_n_subpoints
+            frame += agent.tolist()
+        frames.append(frame)
+        frame_start += len(frame)
+    buffer = np.array([value for frame in frames for value in frame])
+    frame_ends = np.cumsum([len(frame) for frame in frames])
+    frame_rows, agent_indices, agent_starts = AgentData._get_buffer_agent_starts(
+        buffer, frame_ends - np.diff(frame_ends, prepend=0), frame_ends
+    )
+    order = np.lexsort((agent_indices, frame_rows))
+    assert agent_starts[order].tolist() == expected_starts
+    assert frame_rows[order].tolist() == [0] * 40 + [2] + [3] * 25
+    assert agent_indices[order].tolist() == list(range(40)) + [0] + list(range(25))
+    # one frame at a time
+    for frame_index, frame_end in enumerate(frame_ends):
+        frame_start = frame_end - len(frames[frame_index])
+        _, _, frame_agent_starts = AgentData._get_buffer_agent_starts(
+            buffer, np.array([frame_start]), np.array([frame_end])
+        )
+        assert np.array_equal(
+            frame_agent_starts, agent_starts[frame_rows == frame_index]
+        )
+    with pytest.raises(DataError, match="don't match"):
+        AgentData._get_buffer_agent_starts(
+            buffer, np.array([0]), np.array([frame_ends[0] - 1])
+        )
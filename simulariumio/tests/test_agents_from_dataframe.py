@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulariumio import AgentData, AgentTypes, DTypePolicy, RaggedAgentData
+from simulariumio.exceptions import DataError
+from simulariumio.tests.conftest import fiber_agents, mixed_agents
+
+SUBPOINT_COLUMNS = [f"subpoint{index}" for index in range(6)]
+
+
+def get_dataframe(agent_data: AgentData) -> pd.DataFrame:
+    """
+    Make a DataFrame with a row for each agent in AgentData,
+    with the rows for each time reversed
+    """
+    agent_data = RaggedAgentData.from_agent_data(agent_data)
+    max_subpoints = agent_data.get_dimensions().max_subpoints
+    subpoints = np.full((len(agent_data.flat_n_subpoints), max_subpoints), np.nan)
+    for index, n_subpoints in enumerate(agent_data.flat_n_subpoints):
+        subpoints[index, :n_subpoints] = agent_data.flat_subpoints[
+            agent_data.subpoint_offsets[index] : agent_data.subpoint_offsets[index + 1]
+        ]
+    columns = {
+        "time": np.repeat(agent_data.times, agent_data.n_agents),
+        "unique_id": agent_data.flat_unique_ids,
+        "type": [agent_data.type_names[code] for code in agent_data.flat_type_codes],
+        "positionX": agent_data.flat_positions[:, 0],
+        "positionY": agent_data.flat_positions[:, 1],
+        "positionZ": agent_data.flat_positions[:, 2],
+        "radius": agent_data.flat_radii,
+        "rotationX": agent_data.flat_rotations[:, 0],
+        "rotationY": agent_data.flat_rotations[:, 1],
+        "rotationZ": agent_data.flat_rotations[:, 2],
+        "viz_type": agent_data.flat_viz_types,
+        "n_subpoints": agent_data.flat_n_subpoints,
+    }
+    for index in range(max_subpoints):
+        columns[f"subpoint{index}"] = subpoints[:, index]
+    # later timesteps first, rows within a timestep stay in order
+    return pd.DataFrame(columns).sort_values("time", ascending=False, kind="stable")
+
+
+def test_agent_data_from_dataframe():
+    traj = pd.DataFrame(
+        {
+            "time": [1.0, 0.0, 0.0, 1.0, 2.0],
+            "unique_id": [5, 0, 1, 6, 7],
+            "type": ["B", "A", "B", "A", "A"],
+            "positionX": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "positionY": [0.0, 0.0, 0.0, 0.0, 0.0],
+            "positionZ": [0.0, 0.0, 0.0, 0.0, 0.0],
+            "radius": [1.0, 2.0, 3.0, 4.0, 5.0],
+        }
+    )
+    subpoints = np.full((5, 6), np.nan)
+    subpoints[1] = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    subpoints[3, :3] = [7.0, 8.0, 9.0]
+    for index, column in enumerate(SUBPOINT_COLUMNS):
+        traj[column] = subpoints[:, index]
+    expected_data = AgentData(
+        times=np.array([0.0, 1.0, 2.0]),
+        n_agents=np.array([2, 2, 1]),
+        viz_types=np.array([[1001.0, 1000.0], [1000.0, 1001.0], [1000.0, 1000.0]]),
+        unique_ids=np.array([[0, 1], [5, 6], [7, 0]]),
+        types=AgentTypes([["A", "B"], ["B", "A"], ["A"]]),
+        positions=np.array(
+            [
+                [[2.0, 0.0, 0.0], [3.0, 0.0, 0.0]],
+                [[1.0, 0.0, 0.0], [4.0, 0.0, 0.0]],
+                [[5.0, 0.0, 0.0], [0.0, 0.0, 0.0]],
+            ]
+        ),
+        radii=np.array([[2.0, 3.0], [1.0, 4.0], [5.0, 1.0]]),
+        rotations=np.zeros((3, 2, 3)),
+        n_subpoints=np.array([[6, 0], [0, 3], [0, 0]]),
+        subpoints=np.array(
+            [
+                [[1.0, 2.0, 3.0, 4.0, 5.0, 6.0], np.zeros(6)],
+                [np.zeros(6), [7.0, 8.0, 9.0, 0.0, 0.0, 0.0]],
+                np.zeros((2, 6)),
+            ]
+        ),
+    )
+    agent_data = AgentData.from_dataframe(traj, subpoint_columns=SUBPOINT_COLUMNS)
+    assert agent_data == expected_data
+    assert agent_data.positions.dtype == np.float32
+    ragged_agent_data = RaggedAgentData.from_dataframe(
+        traj, subpoint_columns=SUBPOINT_COLUMNS
+    )
+    assert ragged_agent_data == RaggedAgentData.from_agent_data(expected_data)
+    # without subpoint columns, every agent is a default agent
+    agent_data = AgentData.from_dataframe(traj)
+    assert agent_data.subpoints.shape == (3, 2, 0)
+    assert np.all(agent_data.viz_types == 1000.0)
+    with pytest.raises(DataError, match="missing columns: \\['radius'\\]"):
+        AgentData.from_dataframe(traj.drop(columns="radius"))
+    # without an n_subpoints column, NaNs between subpoints are skipped
+    traj.loc[3, SUBPOINT_COLUMNS[:4]] = [7.0, np.nan, 8.0, 9.0]
+    agent_data = AgentData.from_dataframe(traj, subpoint_columns=SUBPOINT_COLUMNS)
+    assert agent_data == expected_data
+    ragged_agent_data = RaggedAgentData.from_dataframe(
+        traj, subpoint_columns=SUBPOINT_COLUMNS
+    )
+    assert ragged_agent_data == RaggedAgentData.from_agent_data(expected_data)
+    # an n_subpoints column with more subpoints than subpoint columns
+    traj["n_subpoints"] = [0, 6, 0, 3, 7]
+    with pytest.raises(DataError, match="7 subpoints but only 6 subpoint columns"):
+        AgentData.from_dataframe(traj, subpoint_columns=SUBPOINT_COLUMNS)
+    with pytest.raises(DataError, match="subpoint0"):
+        RaggedAgentData.from_dataframe(traj, subpoint_columns=SUBPOINT_COLUMNS)
+
+
+@pytest.mark.parametrize("trajectory_data", [mixed_agents(), fiber_agents()])
+def test_agent_data_from_dataframe_round_trip(trajectory_data):
+    expected_data = trajectory_data.agent_data
+    traj = get_dataframe(expected_data)
+    subpoint_columns = [column for column in traj if column.startswith("subpoint")]
+    agent_data = AgentData.from_dataframe(
+        traj,
+        subpoint_columns=subpoint_columns,
+        dtype_policy=DTypePolicy.full_precision(),
+    )
+    agent_data.display_data = expected_data.display_data
+    agent_data.draw_fiber_points = expected_data.draw_fiber_points
+    assert RaggedAgentData.from_agent_data(
+        agent_data
+    ) == RaggedAgentData.from_agent_data(expected_data)
+    ragged_agent_data = RaggedAgentData.from_dataframe(
+        traj,
+        subpoint_columns=subpoint_columns,
+        dtype_policy=DTypePolicy.full_precision(),
+    )
+    ragged_agent_data.display_data = expected_data.display_data
+    ragged_agent_data.draw_fiber_points = expected_data.draw_fiber_points
+    assert ragged_agent_data == RaggedAgentData.from_agent_data(expected_data)
@@ -331,3 +331,52 @@ def test_jagged_data_subpoints():
     )
 
     assert expected_results == list_data
+
+
+def test_jagged_lists_with_empty_frames():
+    # the second timestep has no agents, missing values are filled
+    list_data = AgentData(
+        times=[0.0, 1.0, 2.0],
+        n_agents=[2, 0, 1],
+        viz_types=[[1000.0, 1001.0], [], [None]],
+        unique_ids=[[0, 1], [], [2]],
+        types=[["A", "B"], [], ["A"]],
+        positions=[[[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], [], [[7.0, 8.0, 9.0]]],
+        radii=[[1.0, np.nan], [], [2.0]],
+        rotations=[[[0.0, 0.0, 90.0], [0.0, 0.0, 0.0]], [], [[0.0, 45.0, 0.0]]],
+        n_subpoints=[[0, 6], [], [0]],
+        subpoints=[[[], [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]], [], [[]]],
+    )
+    expected_results = AgentData(
+        times=np.array([0.0, 1.0, 2.0]),
+        n_agents=np.array([2, 0, 1]),
+        viz_types=np.array([[1000.0, 1001.0], [1000.0, 1000.0], [1000.0, 1000.0]]),
+        unique_ids=np.array([[0, 1], [0, 0], [2, 0]]),
+        types=[["A", "B"], [], ["A"]],
+        positions=np.array(
+            [
+                [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]],
+                np.zeros((2, 3)),
+                [[7.0, 8.0, 9.0], [0.0, 0.0, 0.0]],
+            ]
+        ),
+        radii=np.array([[1.0, 0.0], [0.0, 0.0], [2.0, 0.0]]),
+        rotations=np.array(
+            [
+                [[0.0, 0.0, 90.0], [0.0, 0.0, 0.0]],
+                np.zeros((2, 3)),
+                [[0.0, 45.0, 0.0], [0.0, 0.0, 0.0]],
+            ]
+        ),
+        n_subpoints=np.array([[0, 6], [0, 0], [0, 0]]),
+        subpoints=np.array(
+            [
+                [np.zeros(6), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]],
+                np.zeros((2, 6)),
+                np.zeros((2, 6)),
+            ]
+        ),
+    )
+    assert list_data.unique_ids.dtype == int
+    assert list_data.n_subpoints.dtype == int
+    assert expected_results == list_data
@@ -0,0 +1,259 @@
+import copy
+import os
+
+import numpy as np
+import pytest
+
+from simulariumio import (
+    AgentData,
+    DimensionData,
+    DTypePolicy,
+    FileConverter,
+    InputFileData,
+    RaggedAgentData,
+    TrajectoryConverter,
+    TrajectoryData,
+)
+from simulariumio.exceptions import DataError
+from simulariumio.filters import (
+    AddAgentsFilter,
+    EveryNthAgentFilter,
+    EveryNthSubpointFilter,
+    EveryNthTimestepFilter,
+    MultiplySpaceFilter,
+    TransformSpatialAxesFilter,
+    TranslateFilter,
+)
+from simulariumio.smoldyn import SmoldynConverter, SmoldynData
+from simulariumio.tests.conftest import fiber_agents, mixed_agents
+from simulariumio.writers import JsonWriter
+
+TEST_DATA = [mixed_agents(), fiber_agents()]
+COMPACT_DTYPES = {
+    "times": np.float64,
+    "n_agents": np.int32,
+    "viz_types": np.uint16,
+    "unique_ids": np.int64,
+    "positions": np.float32,
+    "radii": np.float32,
+    "rotations": np.float32,
+    "n_subpoints": np.int32,
+    "subpoints": np.float32,
+}
+
+
+def get_dtypes(agent_data: AgentData):
+    if isinstance(agent_data, RaggedAgentData):
+        return {
+            field: (
+                getattr(agent_data, field)
+                if field in ["times", "n_agents"]
+                else getattr(agent_data, "flat_" + field)
+            ).dtype
+            for field in COMPACT_DTYPES
+        }
+    return {field: getattr(agent_data, field).dtype for field in COMPACT_DTYPES}
+
+
+def compact(trajectory_data: TrajectoryData, ragged: bool) -> TrajectoryData:
+    # copying UnitData is slow, so the copies share the units
+    result = copy.copy(trajectory_data)
+    result.meta_data = copy.deepcopy(trajectory_data.meta_data)
+    agent_data = copy.deepcopy(trajectory_data.agent_data)
+    agent_data = AgentData(
+        times=agent_data.times,
+        n_agents=agent_data.n_agents,
+        viz_types=agent_data.viz_types,
+        unique_ids=agent_data.unique_ids,
+        types=agent_data.types,
+        positions=agent_data.positions,
+        radii=agent_data.radii,
+        rotations=agent_data.rotations,
+        n_subpoints=agent_data.n_subpoints,
+        subpoints=agent_data.subpoints,
+        display_data=agent_data.display_data,
+        draw_fiber_points=agent_data.draw_fiber_points,
+        dtype_policy=DTypePolicy(),
+    )
+    result.agent_data = (
+        RaggedAgentData.from_agent_data(agent_data) if ragged else agent_data
+    )
+    return result
+
+
+def test_from_dimensions_dtypes():
+    dimensions = DimensionData(total_steps=3, max_agents=4, max_subpoints=6)
+    agent_data = AgentData.from_dimensions(dimensions)
+    assert agent_data.dtype_policy == DTypePolicy()
+    assert get_dtypes(agent_data) == COMPACT_DTYPES
+    assert np.all(agent_data.viz_types == 1000)
+    full_data = AgentData.from_dimensions(
+        dimensions, dtype_policy=DTypePolicy.full_precision()
+    )
+    assert get_dtypes(full_data) == {
+        field: (
+            np.int64
+            if DTypePolicy.FIELD_KINDS[field] in ["ids", "counts"]
+            else np.float64
+        )
+        for field in COMPACT_DTYPES
+    }
+    # spatial values take half the memory, viz types a quarter
+    assert agent_data.positions.nbytes == full_data.positions.nbytes // 2
+    assert agent_data.viz_types.nbytes == full_data.viz_types.nbytes // 4
+    # growing the buffers keeps the dtypes
+    grown_data = agent_data.check_increase_buffer_size(4, axis=1)
+    assert grown_data.get_dimensions().max_agents > 4
+    assert get_dtypes(grown_data) == COMPACT_DTYPES
+    assert get_dtypes(copy.deepcopy(agent_data)) == COMPACT_DTYPES
+    with pytest.raises(DataError):
+        DTypePolicy(ids=np.float32)
+
+
+def test_converter_dtype_policy():
+    smoldyn_file = InputFileData(
+        file_path="simulariumio/tests/data/smoldyn/example_3D.txt"
+    )
+    compact_data = SmoldynConverter(SmoldynData(smoldyn_file=smoldyn_file))._data
+    full_data = SmoldynConverter(
+        SmoldynData(
+            smoldyn_file=smoldyn_file, dtype_policy=DTypePolicy.full_precision()
+        )
+    )._data
+    assert get_dtypes(compact_data.agent_data) == COMPACT_DTYPES
+    assert full_data.agent_data.positions.dtype == np.float64
+    assert compact_data.agent_data == full_data.agent_data
+
+
+@pytest.mark.parametrize(
+    "make_filter",
+    [
+        lambda: EveryNthAgentFilter({"A": 2}, default_n=1),
+        lambda: EveryNthTimestepFilter(2),
+        lambda: EveryNthSubpointFilter({"A": 2}, default_n=3),
+        lambda: MultiplySpaceFilter(2.0),
+        lambda: TransformSpatialAxesFilter(["-Z", "+X", "+Y"]),
+        lambda: TranslateFilter(
+            translation_per_type={"A": np.array([1.0, 2.0, 3.0])},
+            default_translation=np.array([0.5, 0.0, -1.0]),
+        ),
+        lambda: AddAgentsFilter(copy.deepcopy(TEST_DATA[1].agent_data)),
+    ],
+)
+@pytest.mark.parametrize("ragged", [False, True])
+@pytest.mark.parametrize("trajectory_data", TEST_DATA)
+def test_filters_keep_compact_dtypes(trajectory_data, ragged, make_filter):
+    expected_data = make_filter().apply(compact(trajectory_data, ragged=False))
+    test_data = make_filter().apply(compact(trajectory_data, ragged))
+    assert get_dtypes(test_data.agent_data) == COMPACT_DTYPES
+    # the padded EveryNthTimestepFilter doesn't keep draw_fiber_points
+    expected_data.agent_data.draw_fiber_points = test_data.agent_data.draw_fiber_points
+    assert RaggedAgentData.from_agent_data(
+        test_data.agent_data
+    ) == RaggedAgentData.from_agent_data(expected_data.agent_data)
+
+
+@pytest.mark.parametrize("ragged", [False, True])
+@pytest.mark.parametrize("trajectory_data", TEST_DATA)
+def test_center_and_scale_compact(trajectory_data, ragged):
+    expected_data, expected_scale_factor = (
+        TrajectoryConverter.center_and_scale_agent_data(
+            TrajectoryConverter.center_fiber_positions(
+                copy.deepcopy(trajectory_data.agent_data)
+            )
+        )
+    )
+    test_data, scale_factor = TrajectoryConverter.center_and_scale_agent_data(
+        TrajectoryConverter.center_fiber_positions(
+            compact(trajectory_data, ragged).agent_data
+        )
+    )
+    assert get_dtypes(test_data) == COMPACT_DTYPES
+    assert np.isclose(scale_factor, expected_scale_factor)
+    assert RaggedAgentData.from_agent_data(
+        test_data
+    ) == RaggedAgentData.from_agent_data(expected_data)
+
+
+@pytest.mark.parametrize("ragged", [False, True])
+@pytest.mark.parametrize("trajectory_data", TEST_DATA)
+def test_compact_saves_same_binary(trajectory_data, ragged, tmp_path):
+    output_paths = []
+    for test_data in [
+        compact(trajectory_data, ragged=False),
+        compact(trajectory_data, ragged),
+    ]:
+        output_path = os.path.join(tmp_path, f"test{len(output_paths)}")
+        TrajectoryConverter(test_data).save(output_path, binary=True)
+        output_paths.append(output_path + ".simularium")
+    full_data = copy.copy(trajectory_data)
+    full_data.meta_data = copy.deepcopy(trajectory_data.meta_data)
+    output_path = os.path.join(tmp_path, "full")
+    TrajectoryConverter(full_data).save(output_path, binary=True)
+    output_paths.append(output_path + ".simularium")
+    output_files = []
+    for path in output_paths:
+        with open(path, "rb") as output_file:
+            output_files.append(output_file.read())
+    assert output_files[0] == output_files[1] == output_files[2]
+
+
+def test_read_dtypes():
+    # binary files have float32 values, JSON values have double precision
+    binary_data = FileConverter(
+        InputFileData(file_path="simulariumio/tests/data/binary/binary_test.binary")
+    )._data
+    assert get_dtypes(binary_data.agent_data) == COMPACT_DTYPES
+    json_data = FileConverter(
+        InputFileData(
+            file_path=(
+                "simulariumio/tests/data/cytosim/"
+                "aster_pull3D_couples_actin_solid_3_frames/"
+                "aster_pull3D_couples_actin_solid_3_frames_small.json"
+            )
+        )
+    )._data
+    assert json_data.agent_data.positions.dtype == np.float64
+
+
+def test_large_ids_are_not_narrowed(tmp_path):
+    large_id = 2**31 + 5
+    trajectory_data = compact(TEST_DATA[0], ragged=False)
+    unique_ids = np.copy(trajectory_data.agent_data.unique_ids)
+    unique_ids[0, 0] = large_id
+    agent_data = AgentData.from_dimensions(
+        trajectory_data.agent_data.get_dimensions()
+    )
+    agent_data.unique_ids[:] = DTypePolicy().cast("unique_ids", unique_ids)
+    assert agent_data.unique_ids[0, 0] == large_id
+    ragged_agent_data = RaggedAgentData(
+        times=[0.0],
+        n_agents=[1],
+        viz_types=[1000.0],
+        unique_ids=[large_id],
+        types=["A"],
+        positions=[[0.0, 0.0, 0.0]],
+        radii=[1.0],
+        dtype_policy=DTypePolicy(),
+    )
+    assert ragged_agent_data.flat_unique_ids[0] == large_id
+    # the writer rejects the ID instead of writing a wrapped negative ID
+    trajectory_data.agent_data.unique_ids = unique_ids
+    with pytest.raises(DataError, match="larger than a 32 bit integer"):
+        JsonWriter.save(
+            trajectory_data, os.path.join(tmp_path, "large_id"), validate_ids=True
+        )
+    # narrowing to a smaller dtype raises instead of wrapping
+    with pytest.raises(DataError, match="don't fit in int32"):
+        DTypePolicy(ids=np.int32).cast("unique_ids", unique_ids)
+    with pytest.raises(DataError, match="don't fit in int32"):
+        AgentData(
+            times=[0.0],
+            n_agents=[1],
+            viz_types=np.array([[1000.0]]),
+            unique_ids=np.array([[large_id]]),
+            types=[["A"]],
+            positions=np.zeros((1, 1, 3)),
+            radii=np.ones((1, 1)),
+            dtype_policy=DTypePolicy(ids=np.int32),
+        )
@@ -0,0 +1,241 @@
+import copy
+import os
+
+import numpy as np
+import pytest
+
+from simulariumio import (
+    DISPLAY_TYPE,
+    VALIDATION_LEVEL,
+    DisplayData,
+    RaggedAgentData,
+    TrajectoryConverter,
+    TrajectoryData,
+)
+from simulariumio.exceptions import DataError
+from simulariumio.filters import (
+    AddAgentsFilter,
+    EveryNthAgentFilter,
+    EveryNthSubpointFilter,
+    EveryNthTimestepFilter,
+    MultiplySpaceFilter,
+    TransformSpatialAxesFilter,
+    TranslateFilter,
+)
+from simulariumio.tests.conftest import (
+    fiber_agents,
+    mixed_agents,
+    sphere_group_agents,
+)
+from simulariumio.writers import TrajectoryValidator
+
+TEST_DATA = [mixed_agents(), fiber_agents(), sphere_group_agents()]
+
+
+def copy_data(trajectory_data: TrajectoryData) -> TrajectoryData:
+    # copying UnitData is slow, so the copies share the units
+    result = copy.copy(trajectory_data)
+    result.meta_data = copy.deepcopy(trajectory_data.meta_data)
+    result.agent_data = copy.deepcopy(trajectory_data.agent_data)
+    return result
+
+
+def ragged(trajectory_data: TrajectoryData) -> TrajectoryData:
+    trajectory_data = copy_data(trajectory_data)
+    trajectory_data.agent_data = RaggedAgentData.from_agent_data(
+        trajectory_data.agent_data
+    )
+    return trajectory_data
+
+
+def test_ragged_agent_data_flat_arrays():
+    agent_data = RaggedAgentData(
+        times=[0.0, 1.0],
+        n_agents=[2, 1],
+        viz_types=[1000.0, 1001.0, 1000.0],
+        unique_ids=[0, 1, 0],
+        types=["A", "B", "A"],
+        positions=[[0.0, 1.0, 2.0], [3.0, 4.0, 5.0], [6.0, 7.0, 8.0]],
+        radii=[1.0, 0.5, 2.0],
+        n_subpoints=[0, 6, 0],
+        subpoints=[1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    )
+    assert agent_data.agent_offsets.tolist() == [0, 2, 3]
+    assert agent_data.subpoint_offsets.tolist() == [0, 0, 6, 6]
+    assert agent_data.type_names == ["A", "B"]
+    assert agent_data.get_dimensions().max_subpoints == 6
+    # padded views
+    assert agent_data.radii.tolist() == [[1.0, 0.5], [2.0, 1.0]]
+    assert agent_data.subpoints.shape == (2, 2, 6)
+    assert agent_data.subpoints[0, 1].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert agent_data.types == [["A", "B"], ["A"]]
+    with pytest.raises(ValueError):
+        agent_data.positions[0, 0, 0] = 1.0
+    with pytest.raises(AttributeError):
+        agent_data.radii = np.zeros((2, 2))
+    with pytest.raises(DataError):
+        RaggedAgentData(
+            times=[0.0],
+            n_agents=[2],
+            viz_types=[1000.0],
+            unique_ids=[0],
+            types=["A"],
+            positions=[[0.0, 0.0, 0.0]],
+            radii=[1.0],
+        )
+
+
+def test_ragged_agent_data_padded_cache():
+    agent_data = RaggedAgentData.from_agent_data(mixed_agents().agent_data)
+    # the padded arrays are built once and kept
+    positions = agent_data.positions
+    types = agent_data.types
+    assert agent_data.positions is positions
+    assert agent_data.types is types
+    with pytest.raises(ValueError):
+        agent_data.types[0][0] = "B"
+    # setting a flat array drops them
+    agent_data.flat_radii = 2.0 * agent_data.flat_radii
+    assert agent_data.positions is not positions
+    radii = agent_data.radii
+    assert np.array_equal(
+        radii[0, : agent_data.n_agents[0]],
+        agent_data.flat_radii[agent_data.get_frame_slice(0)],
+    )
+    # editing a flat array in place needs the cache cleared
+    agent_data.flat_radii[0] = 5.0
+    assert agent_data.radii is radii
+    agent_data.clear_padded_cache()
+    assert agent_data.radii[0, 0] == 5.0
+    # copies can be edited without changing the cached arrays
+    padded_data = agent_data.to_agent_data()
+    padded_data.radii[0, 0] = 6.0
+    padded_data.types[0][0] = "B"
+    assert agent_data.radii[0, 0] == 5.0
+    assert agent_data.types == agent_data.to_agent_data().types
+
+
+@pytest.mark.parametrize("trajectory_data", TEST_DATA)
+def test_ragged_agent_data_round_trip(trajectory_data: TrajectoryData):
+    agent_data = trajectory_data.agent_data
+    ragged_agent_data = RaggedAgentData.from_agent_data(agent_data)
+    assert ragged_agent_data.to_agent_data() == agent_data
+    assert copy.deepcopy(ragged_agent_data) == ragged_agent_data
+    assert ragged_agent_data.get_dimensions() == agent_data.get_dimensions()
+    type_ids, type_mapping = agent_data.get_type_ids_and_mapping()
+    ragged_type_ids, ragged_type_mapping = ragged_agent_data.get_type_ids_and_mapping()
+    assert ragged_type_mapping == type_mapping
+    assert np.array_equal(
+        ragged_type_ids, type_ids[agent_data._get_agent_mask(len(agent_data.times))]
+    )
+
+
+@pytest.mark.parametrize("draw_fiber_points", [False, True])
+@pytest.mark.parametrize(
+    "save_args",
+    [{"binary": False}, {"binary": True}, {"binary": True, "workers": 2}],
+)
+@pytest.mark.parametrize("test_data", TEST_DATA)
+def test_ragged_agent_data_saves_same_file(
+    test_data, save_args, draw_fiber_points, tmp_path
+):
+    output_paths = []
+    for trajectory_data in [copy_data(test_data), ragged(test_data)]:
+        trajectory_data.agent_data.draw_fiber_points = draw_fiber_points
+        output_path = os.path.join(tmp_path, f"test{len(output_paths)}")
+        TrajectoryConverter(trajectory_data).save(output_path, **save_args)
+        output_paths.append(output_path + ".simularium")
+    with open(output_paths[0], "rb") as padded_file, open(
+        output_paths[1], "rb"
+    ) as ragged_file:
+        assert padded_file.read() == ragged_file.read()
+
+
+@pytest.mark.parametrize(
+    "make_filter",
+    [
+        lambda: EveryNthAgentFilter({"A": 2}, default_n=1),
+        lambda: EveryNthAgentFilter({}, default_n=2),
+        lambda: EveryNthTimestepFilter(2),
+        lambda: EveryNthSubpointFilter({"A": 2}, default_n=3),
+        lambda: MultiplySpaceFilter(2.0),
+        lambda: TransformSpatialAxesFilter(["-Z", "+X", "+Y"]),
+        lambda: TranslateFilter(
+            translation_per_type={"A": np.array([1.0, 2.0, 3.0])},
+            default_translation=np.array([0.5, 0.0, -1.0]),
+        ),
+        lambda: AddAgentsFilter(copy.deepcopy(TEST_DATA[1].agent_data)),
+    ],
+)
+@pytest.mark.parametrize("trajectory_data", TEST_DATA)
+def test_ragged_agent_data_filters(trajectory_data, make_filter):
+    expected_data = make_filter().apply(copy_data(trajectory_data))
+    test_data = make_filter().apply(ragged(trajectory_data))
+    assert isinstance(test_data.agent_data, RaggedAgentData)
+    # the padded EveryNthTimestepFilter doesn't keep draw_fiber_points
+    expected_data.agent_data.draw_fiber_points = test_data.agent_data.draw_fiber_points
+    assert test_data.agent_data == RaggedAgentData.from_agent_data(
+        expected_data.agent_data
+    )
+
+
+@pytest.mark.parametrize("trajectory_data", TEST_DATA[:2])
+def test_ragged_agent_data_center_and_scale(trajectory_data):
+    expected_data, expected_scale_factor = (
+        TrajectoryConverter.center_and_scale_agent_data(
+            TrajectoryConverter.center_fiber_positions(
+                copy.deepcopy(trajectory_data.agent_data)
+            )
+        )
+    )
+    test_data, scale_factor = TrajectoryConverter.center_and_scale_agent_data(
+        TrajectoryConverter.center_fiber_positions(ragged(trajectory_data).agent_data)
+    )
+    assert np.isclose(scale_factor, expected_scale_factor)
+    assert test_data == RaggedAgentData.from_agent_data(expected_data)
+
+
+def test_ragged_agent_data_validate():
+    trajectory_data = ragged(TEST_DATA[0])
+    TrajectoryValidator.validate(trajectory_data, VALIDATION_LEVEL.FULL)
+    trajectory_data.agent_data.flat_unique_ids[6] = (
+        trajectory_data.agent_data.flat_unique_ids[5]
+    )
+    with pytest.raises(DataError, match="at index Time = 1, Agent = 1"):
+        TrajectoryValidator.validate(trajectory_data, VALIDATION_LEVEL.FULL)
+
+
+def test_ragged_agent_data_long_fiber(tmp_path):
+    # padded, one long fiber would make every agent slot hold its subpoints
+    total_steps = 4
+    n_agents = 5000
+    n_subpoints = 30000
+    n_total = total_steps * n_agents
+    agent_n_subpoints = np.zeros(n_total, dtype=int)
+    agent_n_subpoints[::n_agents] = n_subpoints
+    types = np.full(n_total, "sphere", dtype=object)
+    types[::n_agents] = "fiber"
+    viz_types = np.full(n_total, 1000.0)
+    viz_types[::n_agents] = 1001.0
+    agent_data = RaggedAgentData(
+        times=np.arange(total_steps),
+        n_agents=np.full(total_steps, n_agents),
+        viz_types=viz_types,
+        unique_ids=np.tile(np.arange(n_agents), total_steps),
+        types=list(types),
+        positions=np.zeros((n_total, 3)),
+        radii=np.ones(n_total),
+        n_subpoints=agent_n_subpoints,
+        subpoints=np.ones(total_steps * n_subpoints),
+        display_data={
+            "fiber": DisplayData(name="fiber", display_type=DISPLAY_TYPE.FIBER),
+            "sphere": DisplayData(name="sphere", display_type=DISPLAY_TYPE.SPHERE),
+        },
+    )
+    assert agent_data.flat_subpoints.nbytes == 8 * total_steps * n_subpoints
+    trajectory_data = copy_data(TEST_DATA[0])
+    trajectory_data.agent_data = agent_data
+    TrajectoryValidator.validate(trajectory_data, VALIDATION_LEVEL.FULL)
+    output_path = os.path.join(tmp_path, "long_fiber")
+    TrajectoryConverter(trajectory_data).save(output_path)
+    assert os.path.isfile(output_path + ".simularium")
@@ -3,7 +3,8 @@ import pytest
 import random
 
 from simulariumio.data_objects import JsonData, BinaryData, SimulariumFileData
-from simulariumio import FileConverter, InputFileData, JsonWriter
+from simulariumio import BinaryWriter, FileConverter, InputFileData, JsonWriter
+from simulariumio.tests.conftest import random_walk_agents
 
 
 bin_path = "simulariumio/tests/data/binary/binary_test.binary"
@@ -89,3 +90,100 @@ def test_get_index_for_time(data_object: SimulariumFileData):
     random_frame = random.randint(0, expected_traj_info["totalSteps"] - 1)
     expected_time = random_frame * expected_traj_info["timeStepSize"]
     assert data_object.get_index_for_time(expected_time) == random_frame
+
+
+@pytest.mark.parametrize("data_object", test_data_objects)
+def test_frame_data_agents(data_object: SimulariumFileData):
+    agent_data = traj_data_obj.agent_data
+    for index in range(data_object.get_num_frames()):
+        frame = data_object.get_frame_at_index(index)
+        agents = frame.get_agents()
+        n_agents = int(agent_data.n_agents[index])
+        assert len(agents) == frame.n_agents == n_agents
+        assert np.array_equal(
+            agents["viz_type"], agent_data.viz_types[index, :n_agents]
+        )
+        assert np.array_equal(
+            agents["unique_id"], agent_data.unique_ids[index, :n_agents]
+        )
+        assert np.allclose(agents["position"], agent_data.positions[index, :n_agents])
+        assert np.allclose(agents["rotation"], agent_data.rotations[index, :n_agents])
+        assert np.allclose(agents["radius"], agent_data.radii[index, :n_agents])
+        n_subpoints = agent_data.n_subpoints[index, :n_agents]
+        assert np.array_equal(agents["n_subpoints"], n_subpoints)
+        values, offsets = frame.get_subpoints()
+        assert np.array_equal(np.diff(offsets), n_subpoints)
+        for agent_index in range(n_agents):
+            assert np.allclose(
+                values[offsets[agent_index] : offsets[agent_index + 1]],
+                agent_data.subpoints[index, agent_index, : n_subpoints[agent_index]],
+            )
+
+
+def test_frame_data_view_without_subpoints(tmp_path):
+    BinaryWriter.save(random_walk_agents(), str(tmp_path / "test"), False)
+    data_object = BinaryData((tmp_path / "test.simularium").read_bytes())
+    frame = data_object.get_frame_at_index(3)
+    agents = frame.get_agents()
+    assert len(agents) == frame.n_agents == 20
+    assert np.shares_memory(agents, np.frombuffer(frame.data, dtype=np.uint8))
+    assert agents["position"].strides == (44, 4)
+    values, offsets = frame.get_subpoints()
+    assert len(values) == 0
+    assert np.array_equal(offsets, np.zeros(21))
+    assert frame.get_agents() is agents
+
+
+def test_json_data_from_file_path(tmp_path):
+    index_path = str(tmp_path / "json_test.index.npz")
+    data_object = JsonData(file_path=json_path + ".simularium", index_path=index_path)
+    assert data_object.get_num_frames() == expected_traj_info["totalSteps"]
+    assert data_object.get_trajectory_info() == expected_traj_info
+    for index in range(data_object.get_num_frames()):
+        frame = data_object.get_frame_at_index(index)
+        expected_frame = json_data_object.get_frame_at_index(index)
+        assert frame.frame_number == index
+        assert frame.time == expected_frame.time
+        assert frame.n_agents == expected_frame.n_agents
+        assert frame.data == expected_frame.data
+    assert data_object.get_file_contents() == json_data_object.get_file_contents()
+    # reopening loads the saved index instead of scanning the file
+    reopened = JsonData(file_path=json_path + ".simularium", index_path=index_path)
+    assert np.array_equal(reopened.frame_spans, data_object.frame_spans)
+    assert np.array_equal(reopened.times, data_object.times)
+
+
+def test_json_data_index(tmp_path):
+    contents = (
+        '{"trajectoryInfo": {"totalSteps": 3, "note": "a \\"bundleData\\" ]}"}, '
+        '"spatialData": {"version": 1, "bundleData": ['
+        '{"frameNumber": 0, "time": 0.0, "data": []}, '
+        '{"data": [1000.0, 0.0, 0.0, 1.0, 2.0, 3.0, 0.0, 0.0, 0.0, 1.0, 0.0], '
+        '"frameNumber": 1, "time": 2.5}, '
+        '{"frameNumber": 2, "time": 5e0, "data": '
+        "[1001.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 6.0, "
+        "0.0, 0.0, 0.0, 1.0, 1.0, 1.0]}"
+        ']}, "plotData": {"data": ["x"]}}'
+    )
+    file_path = tmp_path / "index_test.simularium"
+    file_path.write_text(contents)
+    data_object = JsonData(file_path=str(file_path))
+    assert (tmp_path / "index_test.simularium.index.npz").is_file()
+    assert data_object.get_num_frames() == 3
+    assert np.array_equal(data_object.times, [0.0, 2.5, 5.0])
+    assert data_object.get_trajectory_info()["note"] == 'a "bundleData" ]}'
+    assert data_object.get_plot_data() == {"data": ["x"]}
+    assert [data_object.get_frame_at_index(index).n_agents for index in range(3)] == [
+        0,
+        1,
+        1,
+    ]
+    assert data_object.get_frame_at_index(3) is None
+    assert [
+        data_object.get_index_for_time(time)
+        for time in [-1.0, 1.0, 1.25, 1.5, 4.0, 10.0]
+    ] == [0, 0, 0, 1, 2, 2]
+    # a changed file is indexed again
+    file_path.write_text(contents.replace('"time": 2.5', '"time": 3.25'))
+    data_object = JsonData(file_path=str(file_path))
+    assert np.array_equal(data_object.times, [0.0, 3.25, 5.0])
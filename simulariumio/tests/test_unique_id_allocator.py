@@ -0,0 +1,57 @@
+import numpy as np
+
+from simulariumio import UniqueIDAllocator
+
+
+def allocate_with_list(used_ids, raw_ids, step=1):
+    # the linear search the allocator replaces
+    used_ids = list(used_ids)
+    uids = {}
+    result = []
+    for raw_id in raw_ids:
+        if raw_id not in uids:
+            uid = raw_id
+            while uid in used_ids:
+                uid += step
+            uids[raw_id] = uid
+            used_ids.append(uid)
+        result.append(uids[raw_id])
+    return result
+
+
+def test_unique_id_allocator_allocate():
+    unique_id_allocator = UniqueIDAllocator([0, 1, 2, 4])
+    assert unique_id_allocator.allocate(0) == 3
+    assert unique_id_allocator.allocate(1) == 5
+    assert unique_id_allocator.allocate(0) == 3
+    assert unique_id_allocator.allocate(7) == 7
+    assert unique_id_allocator.allocate(6) == 6
+    assert unique_id_allocator.allocate(2) == 8
+    assert unique_id_allocator.is_used(8)
+    unique_id_allocator.clear_mapping()
+    assert unique_id_allocator.allocate(0) == 9
+
+
+def test_unique_id_allocator_remap():
+    np.random.seed(0)
+    used_ids = np.random.randint(0, 500, 300)
+    raw_ids = np.random.randint(0, 500, (20, 30))
+    for step in [1, 100]:
+        unique_id_allocator = UniqueIDAllocator(used_ids, step=step)
+        result = unique_id_allocator.remap(raw_ids)
+        assert result.shape == raw_ids.shape
+        assert result.dtype == raw_ids.dtype
+        assert result.ravel().tolist() == allocate_with_list(
+            used_ids.tolist(), raw_ids.ravel().tolist(), step
+        )
+        # raw IDs seen before keep their unique IDs
+        assert np.array_equal(unique_id_allocator.remap(raw_ids[::-1]), result[::-1])
+
+
+def test_unique_id_allocator_allocate_many():
+    unique_id_allocator = UniqueIDAllocator([0, 1, 3, 10])
+    assert unique_id_allocator.allocate_many(4).tolist() == [2, 4, 5, 6]
+    assert unique_id_allocator.allocate_many(2, start=5).tolist() == [7, 8]
+    assert unique_id_allocator.allocate(0) == 9
+    assert unique_id_allocator.allocate(2) == 11
+    assert len(unique_id_allocator.remap(np.array([]))) == 0
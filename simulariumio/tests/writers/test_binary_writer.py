@@ -1,21 +1,29 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import numpy as np
 import pytest
 from typing import List, Any
 
 from simulariumio import (
     TrajectoryConverter,
     BinaryWriter,
+    InputFileData,
 )
 from simulariumio.writers.binary_values import BinaryValues
+from simulariumio.readers import SimulariumBinaryReader
 from simulariumio.constants import (
     BINARY_SETTINGS,
     BINARY_BLOCK_TYPE,
+    BINARY_COMPRESSION,
     CURRENT_VERSION,
     DEFAULT_CAMERA_SETTINGS,
 )
-from simulariumio.tests.conftest import binary_test_data
+from simulariumio.tests.conftest import (
+    binary_test_data,
+    fiber_agents,
+    random_walk_agents,
+)
 
 
 def assert_binary_format_equal(
@@ -38,7 +46,7 @@ def assert_binary_values_equal(
         for value in binary_values.values
     ]
     for index in range(len(data_buffer)):
-        if isinstance(data_buffer[index], float):
+        if isinstance(data_buffer[index], (float, np.floating)):
             assert data_buffer[index] == pytest.approx(
                 expected_data[chunk_index][index]
             )
@@ -984,3 +992,213 @@ def test_binary_writer(
         assert_binary_values_equal(
             chunk_index, binary_spatial_data, expected_spatial_data
         )
+
+
+@pytest.mark.parametrize("max_bytes", [1700, BINARY_SETTINGS.MAX_BYTES])
+def test_binary_writer_save(max_bytes, tmp_path):
+    converter = TrajectoryConverter(binary_test_data)
+    (
+        binary_headers,
+        trajectory_infos,
+        binary_spatial_data,
+    ) = BinaryWriter.format_trajectory_data(converter._data, max_bytes)
+    output_path = str(tmp_path / "test")
+    BinaryWriter.save(converter._data, output_path, False, max_bytes)
+    for chunk_index in range(len(binary_headers)):
+        if len(binary_headers) < 2:
+            output_name = f"{output_path}.simularium"
+        else:
+            output_name = f"{output_path}_{chunk_index}.simularium"
+        with open(output_name, "rb") as saved_file:
+            saved_bytes = saved_file.read()
+        # the streamed spatial data block matches the formatted spatial data
+        header_bytes = BinaryWriter._pack_binary_values(binary_headers[chunk_index])
+        spatial_data_bytes = BinaryWriter._pack_binary_values(
+            binary_spatial_data[chunk_index]
+        )
+        spatial_data_offset = SimulariumBinaryReader._parse_binary_header(
+            saved_bytes
+        ).block_offsets[1]
+        block_header_n_bytes = (
+            BINARY_SETTINGS.BLOCK_HEADER_N_VALUES * BINARY_SETTINGS.BYTES_PER_VALUE
+        )
+        assert saved_bytes[: len(header_bytes)] == header_bytes
+        assert (
+            saved_bytes[
+                spatial_data_offset
+                + block_header_n_bytes : spatial_data_offset
+                + block_header_n_bytes
+                + len(spatial_data_bytes)
+            ]
+            == spatial_data_bytes
+        )
+
+
+@pytest.mark.parametrize(
+    "trajectory_data, max_bytes",
+    [
+        (binary_test_data, 1700),
+        (fiber_agents(), BINARY_SETTINGS.MAX_BYTES),
+    ],
+)
+def test_binary_writer_save_workers(trajectory_data, max_bytes, tmp_path):
+    serial_path = str(tmp_path / "serial")
+    parallel_path = str(tmp_path / "parallel")
+    BinaryWriter.save(trajectory_data, serial_path, False, max_bytes)
+    BinaryWriter.save(trajectory_data, parallel_path, False, max_bytes, workers=2)
+    serial_files = sorted(tmp_path.glob("serial*.simularium"))
+    parallel_files = sorted(tmp_path.glob("parallel*.simularium"))
+    assert len(serial_files) == len(parallel_files)
+    for serial_file, parallel_file in zip(serial_files, parallel_files):
+        assert serial_file.read_bytes() == parallel_file.read_bytes()
+
+
+@pytest.mark.parametrize("max_bytes", [1700, 2000, 2300, BINARY_SETTINGS.MAX_BYTES])
+def test_binary_writer_chunk_files(max_bytes):
+    trajectory_data = binary_test_data
+    _, type_mapping = trajectory_data.agent_data.get_type_ids_and_mapping()
+    frame_buffers_n_values = BinaryWriter._frame_buffers_n_values(trajectory_data)
+    file_chunks, traj_info_n_bytes, plot_data_n_bytes = BinaryWriter._chunk_files(
+        trajectory_data, type_mapping, frame_buffers_n_values, max_bytes
+    )
+    other_n_bytes = (
+        BinaryWriter._header_n_bytes() + traj_info_n_bytes + plot_data_n_bytes
+    )
+    frame_index = 0
+    for chunk in file_chunks:
+        assert chunk.first_frame_index == frame_index
+        assert chunk.n_frames > 0
+        assert chunk.n_bytes + other_n_bytes <= max_bytes
+        # chunks are as large as possible
+        if chunk.first_frame_index + chunk.n_frames < len(frame_buffers_n_values):
+            next_frame_n_bytes = BINARY_SETTINGS.BYTES_PER_VALUE * (
+                BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME
+                + BINARY_SETTINGS.FRAME_HEADER_N_VALUES
+                + frame_buffers_n_values[chunk.first_frame_index + chunk.n_frames]
+            )
+            assert chunk.n_bytes + next_frame_n_bytes + other_n_bytes > max_bytes
+        frame_index += chunk.n_frames
+    assert frame_index == len(frame_buffers_n_values)
+
+
+def test_binary_writer_chunk_files_frame_too_large():
+    trajectory_data = binary_test_data
+    _, type_mapping = trajectory_data.agent_data.get_type_ids_and_mapping()
+    frame_buffers_n_values = BinaryWriter._frame_buffers_n_values(trajectory_data)
+    with pytest.raises(Exception, match="Frame 0 is too large"):
+        BinaryWriter._chunk_files(
+            trajectory_data, type_mapping, frame_buffers_n_values, 1000
+        )
+
+
+@pytest.mark.parametrize("max_bytes", [1700, BINARY_SETTINGS.MAX_BYTES])
+def test_binary_writer_save_compressed(max_bytes, tmp_path):
+    raw_path = str(tmp_path / "raw")
+    BinaryWriter.save(binary_test_data, raw_path, False, max_bytes)
+    for workers in [1, 2]:
+        compressed_path = str(tmp_path / f"compressed{workers}")
+        BinaryWriter.save(
+            binary_test_data,
+            compressed_path,
+            False,
+            max_bytes,
+            workers=workers,
+            compression=BINARY_COMPRESSION.ZLIB,
+        )
+        raw_files = sorted(tmp_path.glob("raw*.simularium"))
+        compressed_files = sorted(tmp_path.glob(f"compressed{workers}*.simularium"))
+        assert len(compressed_files) == len(raw_files)
+        for raw_file, compressed_file in zip(raw_files, compressed_files):
+            compressed_bytes = compressed_file.read_bytes()
+            assert len(compressed_bytes) <= max_bytes
+            block_info = SimulariumBinaryReader._parse_binary_header(compressed_bytes)
+            assert (
+                block_info.block_types[1]
+                == BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value
+            )
+            raw_data = SimulariumBinaryReader.load_binary(
+                InputFileData(file_contents=raw_file.read_bytes()), True
+            )
+            compressed_data = SimulariumBinaryReader.load_binary(
+                InputFileData(file_contents=compressed_bytes), True
+            )
+            assert compressed_data["trajectoryInfo"] == raw_data["trajectoryInfo"]
+            assert compressed_data["plotData"] == raw_data["plotData"]
+            for raw_frame, compressed_frame in zip(
+                raw_data["spatialData"]["bundleData"],
+                compressed_data["spatialData"]["bundleData"],
+            ):
+                assert compressed_frame["frameNumber"] == raw_frame["frameNumber"]
+                assert compressed_frame["nAgents"] == raw_frame["nAgents"]
+                assert bytes(compressed_frame["data"]) == bytes(raw_frame["data"])
+
+
+@pytest.mark.parametrize(
+    "trajectory_data, max_bytes",
+    [
+        (random_walk_agents(), BINARY_SETTINGS.MAX_BYTES),
+        (random_walk_agents(), 4000),
+        (fiber_agents(), BINARY_SETTINGS.MAX_BYTES),
+    ],
+)
+def test_binary_writer_save_keyframe_deltas(trajectory_data, max_bytes, tmp_path):
+    for workers in [1, 2]:
+        BinaryWriter.save(
+            trajectory_data,
+            str(tmp_path / f"deltas{workers}"),
+            False,
+            max_bytes,
+            workers=workers,
+            compression=BINARY_COMPRESSION.ZLIB,
+            keyframe_interval=3,
+        )
+    serial_files = sorted(tmp_path.glob("deltas1*.simularium"))
+    parallel_files = sorted(tmp_path.glob("deltas2*.simularium"))
+    assert len(parallel_files) == len(serial_files)
+    for serial_file, parallel_file in zip(serial_files, parallel_files):
+        serial_bytes = serial_file.read_bytes()
+        assert len(serial_bytes) <= max_bytes
+        assert parallel_file.read_bytes() == serial_bytes
+        block_info = SimulariumBinaryReader._parse_binary_header(serial_bytes)
+        assert (
+            block_info.block_types[1]
+            == BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value
+        )
+
+
+def test_binary_writer_save_quantized(tmp_path):
+    trajectory_data = random_walk_agents()
+    BinaryWriter.save(trajectory_data, str(tmp_path / "raw"), False)
+    BinaryWriter.save(
+        trajectory_data,
+        str(tmp_path / "quantized"),
+        False,
+        quantize=True,
+        quantize_precision=1e-3,
+    )
+    raw_bytes = (tmp_path / "raw.simularium").read_bytes()
+    quantized_bytes = (tmp_path / "quantized.simularium").read_bytes()
+    block_info = SimulariumBinaryReader._parse_binary_header(quantized_bytes)
+    assert (
+        block_info.block_types[1]
+        == BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value
+    )
+    raw_block_info = SimulariumBinaryReader._parse_binary_header(raw_bytes)
+    assert block_info.block_lengths[1] < 0.6 * raw_block_info.block_lengths[1]
+    # a 20 unit box can't be stored within 1e-4 in 16 bits
+    with pytest.raises(Exception, match="more than the requested precision"):
+        BinaryWriter.save(
+            trajectory_data,
+            str(tmp_path / "too_precise"),
+            False,
+            quantize=True,
+            quantize_precision=1e-4,
+        )
+    with pytest.raises(Exception, match="keyframes and deltas"):
+        BinaryWriter.save(
+            trajectory_data,
+            str(tmp_path / "deltas"),
+            False,
+            quantize=True,
+            keyframe_interval=5,
+        )
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import struct
+
+import numpy as np
+import pytest
+
+from simulariumio import TrajectoryData
+from simulariumio.constants import V1_SPATIAL_BUFFER_STRUCT
+from simulariumio.writers.writer import Writer
+from simulariumio.tests.conftest import (
+    fiber_agents,
+    mixed_agents,
+    sphere_group_agents,
+    binary_test_data,
+)
+
+
+@pytest.mark.parametrize(
+    "trajectory_data",
+    [
+        fiber_agents(),
+        mixed_agents(),
+        sphere_group_agents(),
+        copy.deepcopy(binary_test_data),
+    ],
+)
+def test_frame_buffer_array_matches_frame_buffer(trajectory_data: TrajectoryData):
+    agent_data = trajectory_data.agent_data
+    agent_data._fill_default_display_data()
+    type_ids, _ = agent_data.get_type_ids_and_mapping()
+    for time_index in range(agent_data.total_timesteps()):
+        expected_buffer, _ = Writer._get_frame_buffer(
+            time_index, agent_data, type_ids
+        )
+        test_buffer = Writer._get_frame_buffer_array(time_index, agent_data, type_ids)
+        assert test_buffer.tobytes() == struct.pack(
+            f"<{len(expected_buffer)}f", *expected_buffer
+        )
+
+
+def fiber_agents_with_colliding_ids() -> TrajectoryData:
+    # agent 2's ID is the ID of a sphere at agent 0's first fiber point
+    trajectory_data = fiber_agents()
+    trajectory_data.agent_data.unique_ids[:, 2] = 200.0
+    return trajectory_data
+
+
+@pytest.mark.parametrize(
+    "trajectory_data",
+    [
+        fiber_agents(),
+        fiber_agents_with_colliding_ids(),
+        mixed_agents(),
+        sphere_group_agents(),
+    ],
+)
+def test_frame_buffer_array_matches_frame_buffer_unique_ids(
+    trajectory_data: TrajectoryData,
+):
+    agent_data = trajectory_data.agent_data
+    agent_data._fill_default_display_data()
+    type_ids, _ = agent_data.get_type_ids_and_mapping()
+    expected_allocator = Writer._fiber_point_unique_id_allocator(agent_data)
+    unique_id_allocator = Writer._fiber_point_unique_id_allocator(agent_data)
+    for time_index in range(agent_data.total_timesteps()):
+        expected_buffer, expected_allocator = Writer._get_frame_buffer(
+            time_index,
+            agent_data,
+            type_ids,
+            unique_id_allocator=expected_allocator,
+        )
+        test_buffer = Writer._get_frame_buffer_array(
+            time_index,
+            agent_data,
+            type_ids,
+            dtype=np.float64,
+            unique_id_allocator=unique_id_allocator,
+        )
+        assert test_buffer.tolist() == expected_buffer
+    assert unique_id_allocator.mapping == expected_allocator.mapping
+
+
+def test_frame_buffer_large_fiber_ids():
+    # 100 * (ID + 1) overflows int32 for IDs above about 21.4 million
+    large_id = 30000000
+    trajectory_data = fiber_agents()
+    agent_data = trajectory_data.agent_data
+    agent_data.draw_fiber_points = True
+    agent_data.unique_ids[:] += large_id
+    agent_data._fill_default_display_data()
+    compact_data = copy.deepcopy(agent_data)
+    compact_data.unique_ids = compact_data.unique_ids.astype(np.int32)
+    type_ids, _ = agent_data.get_type_ids_and_mapping()
+    for time_index in range(agent_data.total_timesteps()):
+        expected_buffer, _ = Writer._get_frame_buffer(
+            time_index, agent_data, type_ids
+        )
+        test_buffer, _ = Writer._get_frame_buffer(time_index, compact_data, type_ids)
+        assert test_buffer == expected_buffer
+        test_buffer = Writer._get_frame_buffer_array(
+            time_index, compact_data, type_ids, dtype=np.float64
+        )
+        assert test_buffer.tolist() == expected_buffer
+    # the sphere at the first fiber point of the first fiber in the last frame
+    sphere_index = V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT + int(
+        agent_data.n_subpoints[-1, 0]
+    )
+    assert test_buffer[sphere_index + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX] == (
+        100 * (agent_data.unique_ids[-1, 0] + 1)
+    )
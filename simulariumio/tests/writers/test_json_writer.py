@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import json
+
+import numpy as np
+import pytest
+
+from simulariumio import JsonWriter, TrajectoryData
+from simulariumio.data_objects import JsonData
+from simulariumio.tests.conftest import (
+    fiber_agents,
+    random_walk_agents,
+)
+
+
+def with_non_finite_values(trajectory_data: TrajectoryData) -> TrajectoryData:
+    trajectory_data.agent_data.radii[0, 0] = np.nan
+    trajectory_data.agent_data.positions[1, 2] = [np.inf, -np.inf, 1e-7]
+    return trajectory_data
+
+
+@pytest.mark.parametrize(
+    "trajectory_data",
+    [
+        random_walk_agents(),
+        fiber_agents(),
+        with_non_finite_values(random_walk_agents()),
+    ],
+)
+def test_json_writer_write_trajectory_data(trajectory_data: TrajectoryData):
+    expected = json.dumps(JsonWriter.format_trajectory_data(trajectory_data))
+    outfile = io.StringIO()
+    JsonWriter.write_trajectory_data(trajectory_data, outfile)
+    assert outfile.getvalue() == expected
+
+
+def test_json_writer_save(tmp_path):
+    trajectory_data = fiber_agents()
+    JsonWriter.save(trajectory_data, str(tmp_path / "test"), False)
+    expected = JsonWriter.format_trajectory_data(trajectory_data)
+    data_object = JsonData(file_path=str(tmp_path / "test.simularium"))
+    assert data_object.get_file_contents() == expected
+    frames = expected["spatialData"]["bundleData"]
+    assert data_object.get_num_frames() == len(frames)
+    for frame in frames:
+        frame_data = data_object.get_frame_at_index(frame["frameNumber"])
+        assert frame_data.time == frame["time"]
+        assert frame_data.data == frame["data"]
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+import pytest
+
+from simulariumio import (
+    DISPLAY_TYPE,
+    AgentData,
+    VALIDATION_LEVEL,
+    TrajectoryConverter,
+    TrajectoryData,
+)
+from simulariumio.exceptions import DataError
+from simulariumio.tests.conftest import (
+    fiber_agents,
+    mixed_agents,
+    random_walk_agents,
+    sphere_group_agents,
+)
+from simulariumio.writers import TrajectoryValidator
+
+
+@pytest.mark.parametrize(
+    "validate_ids, validation_level, expected_level",
+    [
+        (True, None, VALIDATION_LEVEL.FAST),
+        (False, None, VALIDATION_LEVEL.SUBPOINTS),
+        (False, VALIDATION_LEVEL.FULL, VALIDATION_LEVEL.FULL),
+        (True, "off", VALIDATION_LEVEL.OFF),
+        (True, "Full", VALIDATION_LEVEL.FULL),
+    ],
+)
+def test_get_validation_level(validate_ids, validation_level, expected_level):
+    assert (
+        TrajectoryValidator.get_validation_level(validate_ids, validation_level)
+        == expected_level
+    )
+
+
+@pytest.mark.parametrize(
+    "trajectory_data",
+    [
+        random_walk_agents(),
+        fiber_agents(),
+        mixed_agents(),
+        sphere_group_agents(),
+    ],
+)
+def test_validate_full_valid_data(trajectory_data: TrajectoryData):
+    TrajectoryValidator.validate(trajectory_data, VALIDATION_LEVEL.FULL)
+
+
+def with_duplicate_id() -> TrajectoryData:
+    trajectory_data = random_walk_agents()
+    trajectory_data.agent_data.unique_ids[3, 7] = 2
+    trajectory_data.agent_data.unique_ids[5, 9] = 1
+    return trajectory_data
+
+
+def with_large_id() -> TrajectoryData:
+    trajectory_data = random_walk_agents()
+    trajectory_data.agent_data.unique_ids[4, 6] = 2**32
+    return trajectory_data
+
+
+def with_fiber_display_mismatch() -> TrajectoryData:
+    trajectory_data = fiber_agents()
+    trajectory_data.agent_data.display_data["A"].display_type = DISPLAY_TYPE.SPHERE
+    trajectory_data.agent_data.n_subpoints[:] = 0
+    return trajectory_data
+
+
+@pytest.mark.parametrize(
+    "trajectory_data, validation_level, message",
+    [
+        (
+            with_large_id(),
+            VALIDATION_LEVEL.FAST,
+            "at index Time = 4, Agent = 6",
+        ),
+        (
+            with_duplicate_id(),
+            VALIDATION_LEVEL.FULL,
+            "Found duplicate agent ID 2 at index Time = 3, Agent = 7",
+        ),
+        (
+            with_fiber_display_mismatch(),
+            VALIDATION_LEVEL.FULL,
+            "Agent at index Time = 0, Agent = 1",
+        ),
+    ],
+)
+def test_validate_invalid_data(
+    trajectory_data: TrajectoryData,
+    validation_level: VALIDATION_LEVEL,
+    message: str,
+):
+    with pytest.raises(DataError, match=message):
+        TrajectoryValidator.validate(trajectory_data, validation_level)
+
+
+@pytest.mark.parametrize(
+    "trajectory_data, validation_level",
+    [
+        (with_large_id(), VALIDATION_LEVEL.OFF),
+        (with_large_id(), VALIDATION_LEVEL.SUBPOINTS),
+        (with_duplicate_id(), VALIDATION_LEVEL.OFF),
+        (with_duplicate_id(), VALIDATION_LEVEL.FAST),
+        (with_fiber_display_mismatch(), VALIDATION_LEVEL.FAST),
+    ],
+)
+def test_validate_skips_checks_above_level(
+    trajectory_data: TrajectoryData, validation_level: VALIDATION_LEVEL
+):
+    TrajectoryValidator.validate(trajectory_data, validation_level)
+
+
+def test_save_validation_level(tmp_path):
+    converter = TrajectoryConverter(with_duplicate_id())
+    output_path = os.path.join(tmp_path, "duplicate_ids")
+    converter.save(output_path, binary=False, validation_level="fast")
+    assert os.path.isfile(output_path + ".simularium")
+    with pytest.raises(DataError, match="Found duplicate agent ID"):
+        converter.save(output_path, validation_level=VALIDATION_LEVEL.FULL)
+
+
+def test_save_skips_validation_when_off(tmp_path):
+    trajectory_data = random_walk_agents()
+    trajectory_data.agent_data.unique_ids = (
+        np.asarray(trajectory_data.agent_data.unique_ids) + 2**32
+    )
+    converter = TrajectoryConverter(trajectory_data)
+    output_path = os.path.join(tmp_path, "large_ids")
+    with pytest.raises(DataError):
+        converter.save(output_path, binary=False)
+    converter.save(output_path, binary=False, validation_level=VALIDATION_LEVEL.OFF)
+    assert os.path.isfile(output_path + ".simularium")
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_save_checks_subpoints_once(tmp_path, monkeypatch, binary: bool):
+    calls = []
+    check = AgentData._check_subpoints_match_display_type
+
+    def counted_check(agent_data):
+        calls.append(agent_data)
+        check(agent_data)
+
+    monkeypatch.setattr(AgentData, "_check_subpoints_match_display_type", counted_check)
+    converter = TrajectoryConverter(fiber_agents())
+    output_path = os.path.join(tmp_path, "fibers")
+    converter.save(output_path, binary=binary, validation_level=VALIDATION_LEVEL.FULL)
+    assert len(calls) == 1
+    calls.clear()
+    converter.save(output_path, binary=binary, validation_level=VALIDATION_LEVEL.OFF)
+    assert len(calls) == 0
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_save_checks_subpoints_without_validate_ids(tmp_path, binary: bool):
+    # 7 subpoint values aren't whole fiber points
+    trajectory_data = fiber_agents()
+    trajectory_data.agent_data.n_subpoints[0, 0] = 7
+    converter = TrajectoryConverter(trajectory_data)
+    output_path = os.path.join(tmp_path, "fibers")
+    with pytest.raises(DataError, match="n_subpoints = 7"):
+        converter.save(output_path, binary=binary, validate_ids=False)
+    converter.save(output_path, binary=binary, validation_level="off")
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import json
+import io
 import logging
 from typing import List, Dict, Callable, Tuple
 import copy
@@ -19,11 +19,18 @@ from .data_objects import (
     TrajectoryData,
     DisplayData,
     AgentData,
+    RaggedAgentData,
 )
 from .filters import Filter
 from .exceptions import UnsupportedPlotTypeError
 from .writers import JsonWriter, BinaryWriter
-from .constants import DISPLAY_TYPE, VIEWER_DIMENSION_RANGE
+from .constants import (
+    BINARY_COMPRESSION,
+    BINARY_SETTINGS,
+    DISPLAY_TYPE,
+    VIEWER_DIMENSION_RANGE,
+    VALIDATION_LEVEL,
+)
 from .utils import translate_agent_positions
 
 ###############################################################################
@@ -160,6 +167,8 @@ class TrajectoryConverter:
     def get_min_max_positions(
         agent_data: AgentData,
     ) -> Tuple[np.array, np.array]:
+        if isinstance(agent_data, RaggedAgentData):
+            return TrajectoryConverter._get_ragged_min_max_positions(agent_data)
         max_dimensions = TrajectoryConverter.get_xyz_max(
             agent_data.positions + agent_data.radii[:, :, np.newaxis],
             agent_data.n_agents,
@@ -183,6 +192,28 @@ class TrajectoryConverter:
             min_dimensions = np.amin([min_dimensions, min_subpoints], 0)
         return (min_dimensions, max_dimensions)
 
+    @staticmethod
+    def _get_ragged_min_max_positions(
+        agent_data: RaggedAgentData,
+    ) -> Tuple[np.array, np.array]:
+        """
+        Get the min and max XYZ extent of the agents in RaggedAgentData,
+        from the flat arrays
+        """
+        positions = agent_data.flat_positions[np.newaxis]
+        radii = agent_data.flat_radii[np.newaxis, :, np.newaxis]
+        max_dimensions = TrajectoryConverter.get_xyz_max(positions + radii)
+        min_dimensions = TrajectoryConverter.get_xyz_min(positions - radii)
+        if agent_data.flat_subpoints.size > 0:
+            xyz_subpoints = agent_data.flat_subpoints.reshape(1, -1, 3)
+            max_dimensions = np.amax(
+                [max_dimensions, TrajectoryConverter.get_xyz_max(xyz_subpoints)], 0
+            )
+            min_dimensions = np.amin(
+                [min_dimensions, TrajectoryConverter.get_xyz_min(xyz_subpoints)], 0
+            )
+        return (min_dimensions, max_dimensions)
+
     def _get_scale_factor_with_min_max(
         min_dimensions: np.array,
         max_dimensions: np.array,
@@ -229,6 +260,11 @@ class TrajectoryConverter:
             scale_factor = TrajectoryConverter.calculate_scale_factor(agent_data)
         else:
             scale_factor = input_scale_factor
+        if isinstance(agent_data, RaggedAgentData):
+            agent_data.flat_radii *= scale_factor
+            agent_data.flat_positions *= scale_factor
+            agent_data.flat_subpoints *= scale_factor
+            return agent_data, scale_factor
         agent_data.radii *= scale_factor
         agent_data.positions *= scale_factor
         agent_data.subpoints *= scale_factor
@@ -268,6 +304,8 @@ class TrajectoryConverter:
         the center. Adjust the subpoint positions accordingly. Returns
         an AgentData object with updates reflected.
         """
+        if isinstance(agent_data, RaggedAgentData):
+            return TrajectoryConverter._center_ragged_fiber_positions(agent_data)
         if (
             agent_data.subpoints is None
             or agent_data.n_subpoints is None
@@ -297,6 +335,35 @@ class TrajectoryConverter:
                     agent_data.subpoints[timestep][agent][0:n_subpoints] = subpoints
         return agent_data
 
+    @staticmethod
+    def _center_ragged_fiber_positions(
+        agent_data: RaggedAgentData,
+    ) -> RaggedAgentData:
+        """
+        Move each agent with subpoints in RaggedAgentData to the center
+        of its subpoints, with sums over the flat subpoints
+        """
+        n_subpoints = agent_data.flat_n_subpoints
+        subpoint_agents = np.repeat(np.arange(len(n_subpoints)), n_subpoints)
+        subpoint_bins = 3 * subpoint_agents + (
+            AgentData._get_subpoint_ranks(n_subpoints) % 3
+        )
+        sums = np.bincount(
+            subpoint_bins,
+            weights=agent_data.flat_subpoints,
+            minlength=3 * len(n_subpoints),
+        ).reshape(-1, 3)
+        counts = np.bincount(subpoint_bins, minlength=3 * len(n_subpoints)).reshape(
+            -1, 3
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            centers = sums / counts
+        has_subpoints = n_subpoints > 0
+        agent_data.flat_positions[has_subpoints] += centers[has_subpoints]
+        agent_data.flat_subpoints -= centers.ravel()[subpoint_bins]
+        agent_data.clear_padded_cache()
+        return agent_data
+
     @staticmethod
     def _get_display_type_name_from_raw(
         raw_type_name: str, display_data: Dict[str, DisplayData]
@@ -386,15 +453,25 @@ class TrajectoryConverter:
             The title for the y-axis of the plot
             Default: "Number of agents"
         """
+        total_steps = self._data.agent_data.times.size
+        agent_data = self._data.agent_data
+        type_names, codes, first_indices = agent_data._get_flat_type_name_codes(
+            total_steps
+        )
+        time_indices, _ = agent_data._get_flat_agent_indices(total_steps)
+        # count each type code in each frame
+        counts = np.bincount(
+            time_indices * len(type_names) + codes,
+            minlength=total_steps * len(type_names),
+        ).reshape(total_steps, len(type_names))
         n_agents = {}
-        for time_index in range(self._data.agent_data.times.size):
-            for agent_index in range(int(self._data.agent_data.n_agents[time_index])):
-                type_name = self._data.agent_data.types[time_index][agent_index]
-                if "#" in type_name:
-                    type_name = type_name.split("#")[0]
-                if type_name not in n_agents:
-                    n_agents[type_name] = np.zeros_like(self._data.agent_data.times)
-                n_agents[type_name][time_index] += 1
+        for name_index in np.argsort(first_indices):
+            type_name = type_names[name_index]
+            if "#" in type_name:
+                type_name = type_name.split("#")[0]
+            if type_name not in n_agents:
+                n_agents[type_name] = np.zeros_like(self._data.agent_data.times)
+            n_agents[type_name] += counts[:, name_index]
         self.add_plot(
             ScatterPlotData(
                 title=plot_title,
@@ -420,8 +497,9 @@ class TrajectoryConverter:
         Return the current simularium data in JSON format
 
         """
-        buffer_data = JsonWriter.format_trajectory_data(self._data)
-        return json.dumps(buffer_data)
+        json_data = io.StringIO()
+        JsonWriter.write_trajectory_data(self._data, json_data)
+        return json_data.getvalue()
 
     def save_plot_data(self, output_path: str):
         """
@@ -435,7 +513,20 @@ class TrajectoryConverter:
         """
         JsonWriter.save_plot_data(self._data.plots, output_path)
 
-    def save(self, output_path: str, binary: bool = True, validate_ids: bool = True):
+    def save(
+        self,
+        output_path: str,
+        binary: bool = True,
+        validate_ids: bool = True,
+        workers: int = 1,
+        compression: BINARY_COMPRESSION = BINARY_COMPRESSION.NONE,
+        keyframe_interval: int = 0,
+        delta_precision: float = BINARY_SETTINGS.DEFAULT_DELTA_PRECISION,
+        quantize: bool = False,
+        quantize_precision: float = None,
+        binary_plots: bool = False,
+        validation_level: VALIDATION_LEVEL = None,
+    ):
         """
         Save the current simularium data in .simularium JSON format
         at the output path
@@ -450,8 +541,64 @@ class TrajectoryConverter:
         validate_ids: bool
             additional validation to check agent ID size?
             Default = True
+        workers: int (optional)
+            number of processes to pack binary frames with
+            (only used when saving in binary format)
+            Default: 1
+        compression: BINARY_COMPRESSION (optional)
+            codec to compress each frame of spatial data with
+            (only used when saving in binary format)
+            Default: BINARY_COMPRESSION.NONE
+        keyframe_interval: int (optional)
+            if more than 0, save a full keyframe every keyframe_interval frames
+            and quantized deltas of changed agents in between
+            (only used when saving in binary format)
+            Default: 0
+        delta_precision: float (optional)
+            maximum error of values in delta frames, in spatial units
+            (only used when saving in binary format)
+            Default: BINARY_SETTINGS.DEFAULT_DELTA_PRECISION
+        quantize: bool (optional)
+            save frames in the quantized layout, with 16 bit positions
+            and subpoints relative to the box size
+            (only used when saving in binary format)
+            Default: False
+        quantize_precision: float (optional)
+            maximum error of quantized positions and subpoints,
+            in spatial units
+            (only used when saving in binary format)
+            Default: None (no bound)
+        binary_plots: bool (optional)
+            save plot data with numeric traces as typed arrays
+            instead of JSON text
+            (only used when saving in binary format)
+            Default: False
+        validation_level: VALIDATION_LEVEL (optional)
+            which checks to run before saving:
+            OFF, SUBPOINTS (subpoints matching display types),
+            FAST (also agent ID size) or FULL (also agent IDs unique in each frame
+            and fibers matching viz types and display types).
+            Accepts the level's name as a string too
+            Default: None (FAST if validate_ids, otherwise SUBPOINTS)
         """
         if binary:
-            BinaryWriter.save(self._data, output_path, validate_ids)
+            BinaryWriter.save(
+                self._data,
+                output_path,
+                validate_ids,
+                workers=workers,
+                compression=compression,
+                keyframe_interval=keyframe_interval,
+                delta_precision=delta_precision,
+                quantize=quantize,
+                quantize_precision=quantize_precision,
+                binary_plots=binary_plots,
+                validation_level=validation_level,
+            )
         else:
-            JsonWriter.save(self._data, output_path, validate_ids)
+            JsonWriter.save(
+                self._data,
+                output_path,
+                validate_ids,
+                validation_level=validation_level,
+            )
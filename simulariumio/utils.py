@@ -1,7 +1,7 @@
 import numpy as np
 from typing import Dict, Any
 
-from .data_objects import DisplayData, AgentData
+from .data_objects import DisplayData, AgentData, RaggedAgentData
 
 
 def unpack_position_vector(
@@ -70,16 +70,19 @@ def translate_agent_positions(
         Default: {}
     """
     total_steps = data.times.size
-    for time_index in range(total_steps):
-        for agent_index in range(int(data.n_agents[time_index])):
-            if (
-                data.types[time_index][agent_index]
-                in translation_per_type
-            ):
-                translation = translation_per_type[
-                    data.types[time_index][agent_index]
-                ]
-            else:
-                translation = default_translation
-            data.positions[time_index][agent_index] += translation
+    type_names, codes, _ = data._get_flat_type_name_codes(total_steps)
+    translations = np.array(
+        [
+            translation_per_type.get(type_name, default_translation)
+            for type_name in type_names
+        ],
+        dtype=float,
+    ).reshape(-1, 3)
+    if isinstance(data, RaggedAgentData):
+        data.flat_positions[: len(codes)] += translations[codes]
+        data.clear_padded_cache()
+        return data
+    data.positions[:total_steps][data._get_agent_mask(total_steps)] += translations[
+        codes
+    ]
     return data
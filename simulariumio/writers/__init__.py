@@ -3,3 +3,4 @@
 
 from .json_writer import JsonWriter  # noqa: F401
 from .binary_writer import BinaryWriter  # noqa: F401
+from .trajectory_validator import TrajectoryValidator  # noqa: F401
@@ -1,8 +1,9 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import contextlib
 import logging
-from typing import List, Tuple, Any, Dict, Union
+from typing import List, Tuple, Any, Dict, Union, BinaryIO
 import struct
 import json
 
@@ -12,10 +13,21 @@ from ..data_objects import (
     AgentData,
     TrajectoryData,
 )
-from ..constants import BINARY_SETTINGS, BINARY_BLOCK_TYPE, CURRENT_VERSION
+from ..constants import (
+    BINARY_SETTINGS,
+    BINARY_BLOCK_TYPE,
+    BINARY_COMPRESSION,
+    CURRENT_VERSION,
+    VALIDATION_LEVEL,
+)
+from ..exceptions import DataError
+from ..codecs import BinaryPlotCodec
+from .trajectory_validator import TrajectoryValidator
 from .writer import Writer
 from .binary_chunk import BinaryChunk
 from .binary_values import BinaryValues
+from .frame_encoder_pool import FrameEncoderPool
+from .frame_encoding import FrameEncoding
 
 ###############################################################################
 
@@ -41,13 +53,7 @@ class BinaryWriter(Writer):
         """
         Get the number of values in the bundle data buffer for each frame
         """
-        total_steps = trajectory_data.agent_data.total_timesteps()
-        result = []
-        for frame_index in range(total_steps):
-            result.append(
-                Writer._get_frame_buffer_size(frame_index, trajectory_data.agent_data)
-            )
-        return result
+        return Writer._get_frame_buffer_sizes(trajectory_data.agent_data).tolist()
 
     @staticmethod
     def _header_n_bytes() -> int:
@@ -79,23 +85,39 @@ class BinaryWriter(Writer):
         return traj_info_n_bytes + BinaryWriter._padding(traj_info_n_bytes)
 
     @staticmethod
-    def _plot_data_length(plots: List[Dict[str, Any]]) -> int:
+    def _plot_data_block(
+        plots: List[Dict[str, Any]], binary_plots: bool = False
+    ) -> Tuple[bytes, int]:
         """
-        Get length of plot data in JSON
+        Encode the contents of the plot data block, padded to 4 bytes,
+        as JSON or as binary with numeric traces in typed arrays.
+        Return the contents and the block type
+        """
+        plot_data = {
+            "version": CURRENT_VERSION.PLOT_DATA,
+            "data": plots,
+        }
+        if binary_plots:
+            return (
+                BinaryPlotCodec.encode(plot_data),
+                BINARY_BLOCK_TYPE.PLOT_DATA_BINARY.value,
+            )
+        plot_data_bytes = json.dumps(plot_data).encode("utf-8")
+        return (
+            plot_data_bytes + bytes(BinaryWriter._padding(len(plot_data_bytes))),
+            BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value,
+        )
+
+    @staticmethod
+    def _plot_data_length(plot_data: bytes) -> int:
+        """
+        Get length of the plot data block, given its padded contents
         (n_bytes = n_values)
         """
-        plot_data_n_bytes = (
+        return (
             BINARY_SETTINGS.BLOCK_HEADER_N_VALUES * BINARY_SETTINGS.BYTES_PER_VALUE
-            + len(
-                json.dumps(
-                    {
-                        "version": CURRENT_VERSION.PLOT_DATA,
-                        "data": plots,
-                    },
-                )
-            )
+            + len(plot_data)
         )
-        return plot_data_n_bytes + BinaryWriter._padding(plot_data_n_bytes)
 
     @staticmethod
     def _chunk_files(
@@ -103,50 +125,76 @@ class BinaryWriter(Writer):
         type_mapping: Dict[str, Any],
         frame_buffers_n_values: List[int],
         max_bytes: int,
+        frame_header_n_values: int = BINARY_SETTINGS.FRAME_HEADER_N_VALUES,
+        plot_data: bytes = None,
     ) -> Tuple[List[BinaryChunk], int, int]:
         """
         Get number of frames, number of bytes, and number of values
         for each file that will be written,
         multiple files if needed to satisfy file size limits
-        also return size of trajectory info and plot data
+        also return size of trajectory info and plot data.
+        For compressed frames the sizes are upper bounds,
+        since a frame is never stored larger than uncompressed.
+        The plot data is encoded as JSON if its block contents aren't given
         """
         header_n_bytes = BinaryWriter._header_n_bytes()
         traj_info_n_bytes = BinaryWriter._trajectory_info_length(
             trajectory_data, type_mapping
         )
-        plot_data_n_bytes = BinaryWriter._plot_data_length(trajectory_data.plots)
+        if plot_data is None:
+            plot_data, _ = BinaryWriter._plot_data_block(trajectory_data.plots)
+        plot_data_n_bytes = BinaryWriter._plot_data_length(plot_data)
         max_spatial_bytes = (
             max_bytes - header_n_bytes - traj_info_n_bytes - plot_data_n_bytes
         )
-        file_chunks = [BinaryChunk()]
-        current_chunk = 0
-        current_frames_bytes = 0
-        for frame_index, buffer_size in enumerate(frame_buffers_n_values):
-            spatial_header_n_values = (
-                BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
-                + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES
-                + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME
-                * (file_chunks[current_chunk].n_frames + 1)
+        spatial_header_n_bytes = BINARY_SETTINGS.BYTES_PER_VALUE * (
+            BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES
+        )
+        frames_n_values = frame_header_n_values + np.array(
+            frame_buffers_n_values, dtype=np.int64
+        )
+        # each frame also adds its offset and length to the spatial header
+        frames_n_bytes = BINARY_SETTINGS.BYTES_PER_VALUE * (
+            frames_n_values + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME
+        )
+        max_frames_n_bytes = max_spatial_bytes - spatial_header_n_bytes
+        too_large = np.flatnonzero(frames_n_bytes > max_frames_n_bytes)
+        if len(too_large) > 0:
+            frame_index = int(too_large[0])
+            frame_n_bytes = int(
+                BINARY_SETTINGS.BYTES_PER_VALUE * frames_n_values[frame_index]
             )
-            spatial_header_n_bytes = (
-                BINARY_SETTINGS.BYTES_PER_VALUE * spatial_header_n_values
+            raise Exception(
+                f"Frame {frame_index} is too large for a simularium file "
+                f"({frame_n_bytes} bytes), try filtering out some data."
             )
-            frame_n_values = BINARY_SETTINGS.FRAME_HEADER_N_VALUES + buffer_size
-            frame_n_bytes = BINARY_SETTINGS.BYTES_PER_VALUE * frame_n_values
-            if frame_n_bytes > max_spatial_bytes:
-                raise Exception(
-                    f"Frame {frame_index} is too large for a simularium file "
-                    f"({frame_n_bytes} bytes), try filtering out some data."
+        # each chunk ends at the last frame that fits
+        # within max_bytes of the chunk's first frame
+        cumulative_n_bytes = np.cumsum(frames_n_bytes)
+        file_chunks = []
+        first_frame_index = 0
+        while first_frame_index < len(frames_n_values) or not file_chunks:
+            previous_n_bytes = (
+                cumulative_n_bytes[first_frame_index - 1]
+                if first_frame_index > 0
+                else 0
+            )
+            end_frame_index = int(
+                np.searchsorted(
+                    cumulative_n_bytes,
+                    previous_n_bytes + max_frames_n_bytes,
+                    side="right",
                 )
-            new_bytes = spatial_header_n_bytes + current_frames_bytes + frame_n_bytes
-            if new_bytes > max_spatial_bytes:
-                file_chunks.append(BinaryChunk(frame_index))
-                current_chunk += 1
-                current_frames_bytes = 0
-            file_chunks[current_chunk].n_frames += 1
-            file_chunks[current_chunk].n_values += frame_n_values
-            file_chunks[current_chunk].frame_n_values.append(frame_n_values)
-            current_frames_bytes += frame_n_bytes
+            )
+            chunk = BinaryChunk(first_frame_index)
+            chunk.frame_n_values = frames_n_values[
+                first_frame_index:end_frame_index
+            ].tolist()
+            chunk.n_frames = len(chunk.frame_n_values)
+            chunk.n_values = int(sum(chunk.frame_n_values))
+            file_chunks.append(chunk)
+            first_frame_index = end_frame_index
         for chunk in file_chunks:
             chunk.n_bytes = BINARY_SETTINGS.BYTES_PER_VALUE * (
                 BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
@@ -161,6 +209,8 @@ class BinaryWriter(Writer):
         traj_info_n_bytes: int,
         spatial_data_n_bytes: int,
         plot_data_n_bytes: int,
+        spatial_data_block_type: int = BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value,
+        plot_data_block_type: int = BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value,
     ) -> BinaryValues:
         """
         Return the binary header values and format
@@ -170,7 +220,11 @@ class BinaryWriter(Writer):
             f"<{len(BINARY_SETTINGS.FILE_IDENTIFIER)}s"
             f"{BINARY_SETTINGS.HEADER_N_INT_VALUES}I"
         )
-        block_types = BINARY_SETTINGS.DEFAULT_BLOCK_TYPES
+        block_types = [
+            BINARY_BLOCK_TYPE.TRAJ_INFO_JSON.value,
+            spatial_data_block_type,
+            plot_data_block_type,
+        ]
         block_n_bytes = [traj_info_n_bytes, spatial_data_n_bytes, plot_data_n_bytes]
         block_offsets = [
             header_n_bytes,
@@ -230,7 +284,7 @@ class BinaryWriter(Writer):
         """
         Return the frame of data as a list of BinaryValues
         """
-        frame_buffer, _, _ = Writer._get_frame_buffer(
+        frame_buffer = Writer._get_frame_buffer_array(
             global_time_index, agent_data, type_ids, buffer_size
         )
         return [
@@ -284,7 +338,7 @@ class BinaryWriter(Writer):
             the data to format
         """
         print("Converting Trajectory Data to Binary -------------")
-        trajectory_data.agent_data._check_subpoints_match_display_type()
+        trajectory_data.agent_data._fill_default_display_data()
         frame_buffers_n_values = BinaryWriter._frame_buffers_n_values(trajectory_data)
         type_ids, type_mapping = trajectory_data.agent_data.get_type_ids_and_mapping()
         file_chunks, traj_info_n_bytes, plot_data_n_bytes = BinaryWriter._chunk_files(
@@ -323,31 +377,29 @@ class BinaryWriter(Writer):
         )
 
     @staticmethod
-    def _data_buffer_with_format(
-        index: int, binary_data: List[BinaryValues]
-    ) -> Tuple[List[float], str]:
+    def _pack_binary_values(binary_values: List[BinaryValues]) -> bytes:
         """
-        Return the buffer of data at index and its format string
+        Pack a list of BinaryValues into little-endian bytes,
+        values held in numpy arrays are packed without unpacking them to a list
         """
-        return (
-            [
-                value
-                for binary_values in binary_data[index]
-                for value in binary_values.values
-            ],
-            "".join(value.format_string for value in binary_data[index]),
-        )
+        result = bytearray()
+        for values in binary_values:
+            if isinstance(values.values, np.ndarray):
+                result += values.values.astype("<f4", copy=False).tobytes()
+            else:
+                result += struct.pack(
+                    "<" + values.format_string.lstrip("<"), *values.values
+                )
+        return bytes(result)
 
     @staticmethod
     def _write_block(
-        data: Union[str, List[float]],
+        data: Union[str, bytes],
         block_type: int,
-        file_name: str,
-        binary_format: str = "",
-        append: bool = True,
+        outfile: BinaryIO,
     ) -> int:
         """
-        Write a binary block to a file
+        Write a binary block to an open file
         Return number of bytes written
         """
         # pad to 4 byte boundary with zeros
@@ -360,29 +412,266 @@ class BinaryWriter(Writer):
                 padformat = f"{padding}x"
             databytes = struct.pack(f"{orig_len}s{padformat}", databytes)
         else:
-            databytes = struct.pack(binary_format, *data)
+            databytes = data
         if len(databytes) % 4 != 0:
             raise ValueError("Binary data must be a multiple of 4 bytes")
         block_header_length = (
             BINARY_SETTINGS.BYTES_PER_VALUE * BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
         )
-        mode = ("a" if append else "w") + "b"
-        with open(file_name, mode) as outfile:
-            # write block type
-            outfile.write(struct.pack("<i", block_type))
-            # write block size
-            outfile.write(struct.pack("<i", len(databytes) + block_header_length))
-            # write block data
-            outfile.write(databytes)
+        # write block type and block size
+        outfile.write(
+            struct.pack("<ii", block_type, len(databytes) + block_header_length)
+        )
+        # write block data
+        outfile.write(databytes)
         return len(databytes) + block_header_length
 
+    @staticmethod
+    def _write_spatial_data(
+        chunk: BinaryChunk,
+        trajectory_data: TrajectoryData,
+        type_ids: np.ndarray,
+        frame_buffers_n_values: List[int],
+        outfile: BinaryIO,
+        encoder_pool: FrameEncoderPool = None,
+    ) -> int:
+        """
+        Write the spatial data block for a chunk to an open file,
+        packing and writing one frame at a time
+        so only one frame's buffer is held in memory,
+        or ranges of frames packed in parallel if an encoder_pool is provided
+        Return number of bytes written
+        """
+        n_bytes = outfile.write(
+            struct.pack(
+                "<ii", BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value, chunk.n_bytes
+            )
+        )
+        # the frame offsets are known from the chunk
+        # so the header is written before the frames
+        n_bytes += outfile.write(
+            BinaryWriter._pack_binary_values([BinaryWriter._spatial_data_header(chunk)])
+        )
+        if encoder_pool is not None:
+            for encoded_frame in encoder_pool.encode_chunk(
+                chunk, frame_buffers_n_values
+            ):
+                n_bytes += outfile.write(encoded_frame)
+        else:
+            for chunk_frame_index in range(chunk.n_frames):
+                global_frame_index = chunk.get_global_index(chunk_frame_index)
+                frame_data = BinaryWriter._formatted_frame(
+                    global_frame_index,
+                    chunk_frame_index,
+                    trajectory_data.agent_data,
+                    type_ids,
+                    frame_buffers_n_values[global_frame_index],
+                )
+                n_bytes += outfile.write(BinaryWriter._pack_binary_values(frame_data))
+        if n_bytes != chunk.n_bytes:
+            raise DataError(
+                f"Wrote {n_bytes} bytes of spatial data, "
+                f"expected {chunk.n_bytes} bytes"
+            )
+        return n_bytes
+
+    @staticmethod
+    def _write_compressed_spatial_data(
+        chunk: BinaryChunk,
+        trajectory_data: TrajectoryData,
+        type_ids: np.ndarray,
+        frame_buffers_n_values: List[int],
+        outfile: BinaryIO,
+        frame_encoding: FrameEncoding,
+        encoder_pool: FrameEncoderPool = None,
+    ) -> int:
+        """
+        Write a compressed spatial data block for a chunk to an open file,
+        encoding each frame separately.
+        The frame offsets aren't known until the frames are compressed,
+        so the headers are written after the frames
+        Return number of bytes written
+        """
+        block_start = outfile.tell()
+        header_n_values = (
+            BINARY_SETTINGS.BLOCK_HEADER_N_VALUES
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_CONSTANT_N_VALUES
+            + BINARY_SETTINGS.SPATIAL_BLOCK_HEADER_N_VALUES_PER_FRAME * chunk.n_frames
+        )
+        n_bytes = outfile.write(
+            bytes(BINARY_SETTINGS.BYTES_PER_VALUE * header_n_values)
+        )
+        if encoder_pool is not None:
+            encoded_frames = encoder_pool.encode_chunk(
+                chunk, frame_buffers_n_values, frame_encoding
+            )
+        else:
+            encode_frame = frame_encoding.frame_encoder()
+            encoded_frames = (
+                encode_frame(
+                    chunk_frame_index,
+                    trajectory_data.agent_data.times[global_frame_index],
+                    trajectory_data.agent_data.n_agents[global_frame_index],
+                    Writer._get_frame_buffer_array(
+                        global_frame_index,
+                        trajectory_data.agent_data,
+                        type_ids,
+                        frame_buffers_n_values[global_frame_index],
+                    ),
+                )
+                for chunk_frame_index, global_frame_index in enumerate(
+                    range(
+                        chunk.first_frame_index,
+                        chunk.first_frame_index + chunk.n_frames,
+                    )
+                )
+            )
+        frame_offsets_and_lengths = []
+        for encoded_frame in encoded_frames:
+            frame_offsets_and_lengths += [n_bytes, len(encoded_frame)]
+            n_bytes += outfile.write(encoded_frame)
+        # go back to write the block header and frame offsets
+        block_end = outfile.tell()
+        outfile.seek(block_start)
+        outfile.write(
+            struct.pack(
+                f"<{header_n_values}I",
+                BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value,
+                n_bytes,
+                frame_encoding.spatial_data_version(),
+                chunk.n_frames,
+                *frame_offsets_and_lengths,
+            )
+        )
+        outfile.seek(block_end)
+        return n_bytes
+
+    @staticmethod
+    def _write_chunk_files(
+        trajectory_data: TrajectoryData,
+        output_path: str,
+        file_chunks: List[BinaryChunk],
+        type_ids: np.ndarray,
+        type_mapping: Dict[str, Any],
+        frame_buffers_n_values: List[int],
+        traj_info_n_bytes: int,
+        plot_data_n_bytes: int,
+        encoder_pool: FrameEncoderPool = None,
+        frame_encoding: FrameEncoding = None,
+        plot_data: bytes = None,
+        plot_data_block_type: int = BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value,
+    ) -> None:
+        """
+        Write each chunk of the data to its own .simularium file.
+        The plot data block contents are encoded once and written to every file,
+        as JSON if they aren't given
+        """
+        if frame_encoding is None:
+            frame_encoding = FrameEncoding()
+        if plot_data is None:
+            plot_data, plot_data_block_type = BinaryWriter._plot_data_block(
+                trajectory_data.plots
+            )
+        spatial_data_block_type = (
+            BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY_COMPRESSED.value
+            if frame_encoding.is_compressed()
+            else BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value
+        )
+        for chunk_index, file_chunk in enumerate(file_chunks):
+            # determine filename(s)
+            if len(file_chunks) < 2:
+                output_name = f"{output_path}.simularium"
+            else:
+                output_name = f"{output_path}_{chunk_index}.simularium"
+            with open(output_name, "wb") as outfile:
+                # binary header
+                outfile.write(
+                    BinaryWriter._pack_binary_values(
+                        [
+                            BinaryWriter._binary_header(
+                                traj_info_n_bytes,
+                                file_chunk.n_bytes,
+                                plot_data_n_bytes,
+                                spatial_data_block_type,
+                                plot_data_block_type,
+                            )
+                        ]
+                    )
+                )
+                # trajectory info
+                BinaryWriter._write_block(
+                    json.dumps(
+                        Writer._get_trajectory_info(
+                            trajectory_data, file_chunk.n_frames, type_mapping
+                        )
+                    ),
+                    BINARY_BLOCK_TYPE.TRAJ_INFO_JSON.value,
+                    outfile,
+                )
+                # spatial data
+                if not frame_encoding.is_compressed():
+                    BinaryWriter._write_spatial_data(
+                        file_chunk,
+                        trajectory_data,
+                        type_ids,
+                        frame_buffers_n_values,
+                        outfile,
+                        encoder_pool,
+                    )
+                else:
+                    spatial_data_n_bytes = BinaryWriter._write_compressed_spatial_data(
+                        file_chunk,
+                        trajectory_data,
+                        type_ids,
+                        frame_buffers_n_values,
+                        outfile,
+                        frame_encoding,
+                        encoder_pool,
+                    )
+                # plot data
+                BinaryWriter._write_block(
+                    plot_data,
+                    plot_data_block_type,
+                    outfile,
+                )
+                if frame_encoding.is_compressed():
+                    # update the binary header with the compressed size
+                    outfile.seek(0)
+                    outfile.write(
+                        BinaryWriter._pack_binary_values(
+                            [
+                                BinaryWriter._binary_header(
+                                    traj_info_n_bytes,
+                                    spatial_data_n_bytes,
+                                    plot_data_n_bytes,
+                                    spatial_data_block_type,
+                                    plot_data_block_type,
+                                )
+                            ]
+                        )
+                    )
+            print(f"saved to {output_name}")
+
     @staticmethod
     def save(
-        trajectory_data: TrajectoryData, output_path: str, validate_ids: bool
+        trajectory_data: TrajectoryData,
+        output_path: str,
+        validate_ids: bool,
+        max_bytes: int = BINARY_SETTINGS.MAX_BYTES,
+        workers: int = 1,
+        compression: BINARY_COMPRESSION = BINARY_COMPRESSION.NONE,
+        keyframe_interval: int = 0,
+        delta_precision: float = BINARY_SETTINGS.DEFAULT_DELTA_PRECISION,
+        quantize: bool = False,
+        quantize_precision: float = None,
+        binary_plots: bool = False,
+        validation_level: VALIDATION_LEVEL = None,
     ) -> None:
         """
         Save the simularium data in .simularium binary format
-        at the output path
+        at the output path. Frames are packed and written
+        to the file one at a time, so memory use is proportional
+        to the size of one frame rather than the size of the file
         Parameters
         ----------
         trajectory_data: TrajectoryData
@@ -391,53 +680,101 @@ class BinaryWriter(Writer):
             where to save the file
         validate_ids: bool
             additional validation to check agent ID size?
+        max_bytes: int (optional)
+            the maximum size of each file,
+            the data is split into multiple files if needed
+            Default: BINARY_SETTINGS.MAX_BYTES
+        workers: int (optional)
+            the number of processes to use for packing frames.
+            If more than 1, ranges of frames are packed in parallel
+            from AgentData arrays copied to shared memory
+            Default: 1
+        compression: BINARY_COMPRESSION (optional)
+            the codec to compress each frame with.
+            If not NONE, spatial data is saved in a
+            SPATIAL_DATA_BINARY_COMPRESSED block, where each frame
+            is compressed separately so frames can still be read
+            individually from their offsets
+            Default: BINARY_COMPRESSION.NONE
+        keyframe_interval: int (optional)
+            if more than 0, spatial data is saved in a
+            SPATIAL_DATA_BINARY_COMPRESSED block with a full keyframe
+            every keyframe_interval frames, and frames in between
+            store only the changed fields of each agent, keyed by unique ID,
+            as quantized deltas from the previous frame.
+            Reading any frame takes at most keyframe_interval steps
+            Default: 0
+        delta_precision: float (optional)
+            the maximum error of positions, rotations, radii,
+            and subpoints in delta frames, in spatial units
+            Default: BINARY_SETTINGS.DEFAULT_DELTA_PRECISION
+        quantize: bool (optional)
+            if True, spatial data is saved in a
+            SPATIAL_DATA_BINARY_COMPRESSED block in the quantized layout,
+            about half the size of float32 frames.
+            Unique IDs, viz types, type IDs and numbers of subpoints
+            are stored as integers, positions and subpoints as 16 bit
+            fixed point relative to the box size, and rotations and radii
+            as float16. Can't be combined with keyframe_interval
+            Default: False
+        quantize_precision: float (optional)
+            the maximum error of quantized positions and subpoints,
+            in spatial units. Raises a DataError if a frame's values
+            can't be stored this precisely in 16 bits
+            Default: None (no bound)
+        binary_plots: bool (optional)
+            if True, plot data is saved in a PLOT_DATA_BINARY block,
+            with numeric traces stored as typed arrays after a JSON header
+            of the plots' other data, instead of as JSON text
+            Default: False
+        validation_level: VALIDATION_LEVEL (optional)
+            which checks to run before saving, see TrajectoryValidator.validate
+            Default: None (FAST if validate_ids, otherwise SUBPOINTS)
         """
-        if validate_ids:
-            Writer._validate_ids(trajectory_data)
-        (
-            binary_headers,
-            trajectory_infos,
-            binary_spatial_data,
-        ) = BinaryWriter.format_trajectory_data(trajectory_data)
+        TrajectoryValidator.validate(
+            trajectory_data,
+            TrajectoryValidator.get_validation_level(validate_ids, validation_level),
+        )
+        print("Converting Trajectory Data to Binary -------------")
+        frame_encoding = FrameEncoding(
+            compression,
+            keyframe_interval,
+            delta_precision,
+            quantize,
+            quantize_precision,
+            trajectory_data.meta_data.box_size,
+        )
+        trajectory_data.agent_data._fill_default_display_data()
+        frame_buffers_n_values = BinaryWriter._frame_buffers_n_values(trajectory_data)
+        type_ids, type_mapping = trajectory_data.agent_data.get_type_ids_and_mapping()
+        plot_data, plot_data_block_type = BinaryWriter._plot_data_block(
+            trajectory_data.plots, binary_plots
+        )
+        file_chunks, traj_info_n_bytes, plot_data_n_bytes = BinaryWriter._chunk_files(
+            trajectory_data,
+            type_mapping,
+            frame_buffers_n_values,
+            max_bytes,
+            frame_encoding.frame_header_n_values(),
+            plot_data,
+        )
         print("Writing Binary -------------")
-        for chunk_index in range(len(binary_spatial_data)):
-            # determine filename(s)
-            if len(binary_headers) < 2:
-                output_name = f"{output_path}.simularium"
-            else:
-                output_name = f"{output_path}_{chunk_index}.simularium"
-            # binary header
-            header_buffer, header_format = BinaryWriter._data_buffer_with_format(
-                chunk_index, binary_headers
-            )
-            with open(output_name, "wb") as outfile:
-                outfile.write(struct.pack(header_format, *header_buffer))
-            # trajectory info
-            BinaryWriter._write_block(
-                json.dumps(trajectory_infos[chunk_index]),
-                BINARY_BLOCK_TYPE.TRAJ_INFO_JSON.value,
-                output_name,
-            )
-            # spatial data
-            (
-                spatial_data_buffer,
-                spatial_format,
-            ) = BinaryWriter._data_buffer_with_format(chunk_index, binary_spatial_data)
-            BinaryWriter._write_block(
-                spatial_data_buffer,
-                BINARY_BLOCK_TYPE.SPATIAL_DATA_BINARY.value,
-                output_name,
-                spatial_format,
-            )
-            # plot data
-            BinaryWriter._write_block(
-                json.dumps(
-                    {
-                        "version": CURRENT_VERSION.PLOT_DATA,
-                        "data": trajectory_data.plots,
-                    }
-                ),
-                BINARY_BLOCK_TYPE.PLOT_DATA_JSON.value,
-                output_name,
+        with (
+            FrameEncoderPool(trajectory_data, type_ids, workers)
+            if workers > 1
+            else contextlib.nullcontext()
+        ) as encoder_pool:
+            BinaryWriter._write_chunk_files(
+                trajectory_data,
+                output_path,
+                file_chunks,
+                type_ids,
+                type_mapping,
+                frame_buffers_n_values,
+                traj_info_n_bytes,
+                plot_data_n_bytes,
+                encoder_pool,
+                frame_encoding,
+                plot_data,
+                plot_data_block_type,
             )
-            print(f"saved to {output_name}")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+import math
+import multiprocessing
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from ..data_objects import TrajectoryData
+from ..constants import BINARY_SETTINGS
+from .binary_chunk import BinaryChunk
+from .frame_encoding import FrameEncoding
+from .writer import Writer
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+# Arrays attached from shared memory in each worker process
+_shared_arrays: Dict[str, np.ndarray] = {}
+_shared_memory_blocks: List[shared_memory.SharedMemory] = []
+
+
+def _attach_shared_arrays(array_specs: Dict[str, Tuple[str, Tuple, str]]) -> None:
+    """
+    Initialize a worker process by attaching to the shared AgentData arrays
+    """
+    for array_name, (block_name, shape, dtype) in array_specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _shared_memory_blocks.append(block)
+        _shared_arrays[array_name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _encode_frames(task: Tuple[int, int, int, List[int], FrameEncoding]) -> List[bytes]:
+    """
+    Pack a range of frames, including their frame headers,
+    from the shared AgentData arrays into bytes for each frame,
+    encoded as requested
+    """
+    (
+        first_frame_index,
+        first_chunk_frame_index,
+        n_frames,
+        buffer_sizes,
+        frame_encoding,
+    ) = task
+    encode_frame = frame_encoding.frame_encoder()
+    result = []
+    agent_offsets = _shared_arrays["agent_offsets"]
+    subpoint_offsets = _shared_arrays["subpoint_offsets"]
+    for frame in range(n_frames):
+        time_index = first_frame_index + frame
+        n_agents = int(_shared_arrays["n_agents"][time_index])
+        agents = slice(agent_offsets[time_index], agent_offsets[time_index + 1])
+        fiber_point_agents = (
+            _shared_arrays["fiber_point_agents"][agents]
+            if "fiber_point_agents" in _shared_arrays
+            else np.zeros(n_agents, dtype=bool)
+        )
+        frame_buffer = Writer._pack_frame_buffer(
+            buffer_sizes[frame],
+            _shared_arrays["viz_types"][agents],
+            _shared_arrays["unique_ids"][agents],
+            _shared_arrays["type_ids"][agents],
+            _shared_arrays["positions"][agents],
+            _shared_arrays["rotations"][agents],
+            _shared_arrays["radii"][agents],
+            _shared_arrays["n_subpoints"][agents],
+            _shared_arrays["subpoints"][
+                subpoint_offsets[agents.start] : subpoint_offsets[agents.stop]
+            ],
+            fiber_point_agents,
+        )
+        result.append(
+            encode_frame(
+                first_chunk_frame_index + frame,
+                _shared_arrays["times"][time_index],
+                n_agents,
+                frame_buffer,
+            )
+        )
+    return result
+
+
+class FrameEncoderPool:
+    # Approximate number of bytes of frames to encode in each task
+    TASK_N_BYTES: int = 8000000
+
+    def __init__(
+        self,
+        trajectory_data: TrajectoryData,
+        type_ids: np.ndarray,
+        workers: int,
+    ):
+        """
+        A pool of processes that pack binary frames in parallel.
+        The AgentData arrays are copied once to shared memory
+        so they are not pickled for each task,
+        and encoded frames are returned in order.
+        Use as a context manager so the processes and
+        shared memory are cleaned up
+
+        Parameters
+        ----------
+        trajectory_data: TrajectoryData
+            the data to encode
+        type_ids: np.ndarray
+            type IDs for each agent at each timestep,
+            from AgentData.get_type_ids_and_mapping()
+        workers: int
+            the number of processes to use
+        """
+        self.workers = workers
+        self._shared_memory_blocks: List[shared_memory.SharedMemory] = []
+        self._array_specs: Dict[str, Tuple[str, Tuple, str]] = {}
+        agent_data = trajectory_data.agent_data
+        total_steps = agent_data.total_timesteps()
+        n_agents = np.asarray(agent_data.n_agents[:total_steps]).astype(int)
+        n_subpoints = agent_data._get_flat_values("n_subpoints", total_steps).astype(
+            int
+        )
+        # agents and subpoints are shared flat, with offsets for each frame
+        # and agent, so padded and ragged AgentData are encoded the same way
+        arrays = {
+            "times": agent_data.times[:total_steps],
+            "n_agents": n_agents,
+            "agent_offsets": np.concatenate(([0], np.cumsum(n_agents))),
+            "viz_types": agent_data._get_flat_values("viz_types", total_steps),
+            "unique_ids": agent_data._get_flat_values("unique_ids", total_steps),
+            "type_ids": agent_data._get_flat_type_ids(type_ids, total_steps),
+            "positions": agent_data._get_flat_values("positions", total_steps),
+            "rotations": agent_data._get_flat_values("rotations", total_steps),
+            "radii": agent_data._get_flat_values("radii", total_steps),
+            "n_subpoints": n_subpoints,
+            "subpoint_offsets": np.concatenate(([0], np.cumsum(n_subpoints))),
+            "subpoints": agent_data._get_flat_subpoints(total_steps),
+        }
+        fiber_point_agents = FrameEncoderPool._get_fiber_point_agents(trajectory_data)
+        if fiber_point_agents is not None:
+            arrays["fiber_point_agents"] = fiber_point_agents
+        try:
+            for array_name, array in arrays.items():
+                self._share_array(array_name, np.asarray(array))
+            self._pool = multiprocessing.Pool(
+                processes=workers,
+                initializer=_attach_shared_arrays,
+                initargs=(self._array_specs,),
+            )
+        except Exception:
+            self._release_shared_memory()
+            raise
+
+    @staticmethod
+    def _get_fiber_point_agents(trajectory_data: TrajectoryData) -> np.ndarray:
+        """
+        Get a mask of which agents, in frame then agent order,
+        have spheres drawn at their fiber points, or None if no agents do
+        """
+        agent_data = trajectory_data.agent_data
+        if not agent_data.draw_fiber_points:
+            return None
+        total_steps = agent_data.total_timesteps()
+        return Writer._get_fiber_type_codes(agent_data)[
+            agent_data._get_flat_type_codes(total_steps)
+        ] & (agent_data._get_flat_values("n_subpoints", total_steps) > 0)
+
+    def _share_array(self, array_name: str, array: np.ndarray) -> None:
+        """
+        Copy an array to a new block of shared memory
+        """
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._shared_memory_blocks.append(block)
+        shared_array = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        shared_array[...] = array
+        self._array_specs[array_name] = (block.name, array.shape, array.dtype.str)
+
+    def _release_shared_memory(self) -> None:
+        for block in self._shared_memory_blocks:
+            block.close()
+            block.unlink()
+        self._shared_memory_blocks = []
+
+    def _chunk_tasks(
+        self,
+        chunk: BinaryChunk,
+        frame_buffers_n_values: List[int],
+        frame_encoding: FrameEncoding,
+    ) -> Iterator[Tuple[int, int, int, List[int], FrameEncoding]]:
+        """
+        Split the frames in a chunk into ranges of about TASK_N_BYTES each,
+        starting at keyframes if frames are encoded as deltas
+        """
+        first_frame_index = chunk.first_frame_index
+        frame_n_bytes = BINARY_SETTINGS.BYTES_PER_VALUE * np.array(
+            chunk.frame_n_values, dtype=np.int64
+        )
+        cumulative_n_bytes = np.cumsum(frame_n_bytes)
+        chunk_frame_index = 0
+        while chunk_frame_index < chunk.n_frames:
+            previous_n_bytes = (
+                cumulative_n_bytes[chunk_frame_index - 1]
+                if chunk_frame_index > 0
+                else 0
+            )
+            end_index = int(
+                np.searchsorted(
+                    cumulative_n_bytes,
+                    previous_n_bytes + FrameEncoderPool.TASK_N_BYTES,
+                    side="right",
+                )
+            )
+            end_index = max(end_index, chunk_frame_index + 1)
+            if frame_encoding.keyframe_interval > 0:
+                end_index = min(
+                    frame_encoding.keyframe_interval
+                    * math.ceil(end_index / frame_encoding.keyframe_interval),
+                    chunk.n_frames,
+                )
+            global_start = first_frame_index + chunk_frame_index
+            global_end = first_frame_index + end_index
+            yield (
+                global_start,
+                chunk_frame_index,
+                end_index - chunk_frame_index,
+                list(frame_buffers_n_values[global_start:global_end]),
+                frame_encoding,
+            )
+            chunk_frame_index = end_index
+
+    def encode_chunk(
+        self,
+        chunk: BinaryChunk,
+        frame_buffers_n_values: List[int],
+        frame_encoding: FrameEncoding = None,
+    ) -> Iterator[bytes]:
+        """
+        Encode the frames in a chunk across the pool,
+        yielding the encoded bytes of each frame in frame order.
+        Only a few tasks per process are in flight at once
+        to bound the memory held by encoded frames
+        """
+        if frame_encoding is None:
+            frame_encoding = FrameEncoding()
+        max_pending = 2 * self.workers
+        pending: deque = deque()
+        for task in self._chunk_tasks(chunk, frame_buffers_n_values, frame_encoding):
+            pending.append(self._pool.apply_async(_encode_frames, (task,)))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+    def __enter__(self) -> Any:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._pool.terminate()
+        self._pool.join()
+        self._release_shared_memory()
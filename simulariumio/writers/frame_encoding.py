@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Callable
+
+import numpy as np
+
+from ..constants import BINARY_SETTINGS, BINARY_COMPRESSION, CURRENT_VERSION
+from ..exceptions import DataError
+from ..codecs import BinaryFrameCodec, KeyframeDeltaEncoder, QuantizedFrameCodec
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class FrameEncoding:
+    compression: BINARY_COMPRESSION
+    keyframe_interval: int
+    delta_precision: float
+    quantize: bool
+    quantize_precision: float
+    box_size: np.ndarray
+
+    def __init__(
+        self,
+        compression: BINARY_COMPRESSION = BINARY_COMPRESSION.NONE,
+        keyframe_interval: int = 0,
+        delta_precision: float = BINARY_SETTINGS.DEFAULT_DELTA_PRECISION,
+        quantize: bool = False,
+        quantize_precision: float = None,
+        box_size: np.ndarray = None,
+    ):
+        """
+        Settings for how frames of spatial data are encoded
+        in a .simularium binary file
+
+        Parameters
+        ----------
+        compression: BINARY_COMPRESSION (optional)
+            codec to compress each frame with
+            Default: BINARY_COMPRESSION.NONE
+        keyframe_interval: int (optional)
+            if more than 0, write a keyframe every keyframe_interval frames
+            and quantized deltas from the previous frame in between
+            Default: 0
+        delta_precision: float (optional)
+            maximum error of values in delta frames, in spatial units
+            Default: BINARY_SETTINGS.DEFAULT_DELTA_PRECISION
+        quantize: bool (optional)
+            store frames in the quantized layout, with integer fields
+            as integers and positions and subpoints as 16 bit fixed point
+            relative to the box size
+            Default: False
+        quantize_precision: float (optional)
+            maximum error of quantized positions and subpoints,
+            in spatial units
+            Default: None (no bound)
+        box_size: np.ndarray (optional)
+            size of the trajectory's bounding box, used to quantize frames
+            Default: None
+        """
+        if quantize and keyframe_interval > 0:
+            raise DataError(
+                "Quantized frames can't also be encoded as keyframes and deltas"
+            )
+        self.compression = compression
+        self.keyframe_interval = keyframe_interval
+        self.delta_precision = delta_precision
+        self.quantize = quantize
+        self.quantize_precision = quantize_precision
+        self.box_size = box_size
+
+    def is_compressed(self) -> bool:
+        """
+        Are frames written to a SPATIAL_DATA_BINARY_COMPRESSED block?
+        """
+        return (
+            self.compression != BINARY_COMPRESSION.NONE
+            or self.keyframe_interval > 0
+            or self.quantize
+        )
+
+    def spatial_data_version(self) -> int:
+        """
+        Get the version of the spatial data block
+        """
+        if self.keyframe_interval > 0:
+            return BINARY_SETTINGS.KEYFRAME_DELTA_SPATIAL_DATA_VERSION
+        if self.quantize:
+            return BINARY_SETTINGS.QUANTIZED_SPATIAL_DATA_VERSION
+        return CURRENT_VERSION.SPATIAL_DATA
+
+    def frame_header_n_values(self) -> int:
+        """
+        Get the number of values in each frame's header
+        """
+        if self.keyframe_interval > 0:
+            return BINARY_SETTINGS.DELTA_FRAME_HEADER_N_VALUES
+        if self.is_compressed():
+            return BINARY_SETTINGS.COMPRESSED_FRAME_HEADER_N_VALUES
+        return BINARY_SETTINGS.FRAME_HEADER_N_VALUES
+
+    def frame_encoder(self) -> Callable[[int, float, int, np.ndarray], bytes]:
+        """
+        Get a function that packs consecutive frames of a chunk into bytes,
+        given each frame's index in the chunk, time, number of agents,
+        and float32 buffer. Encoding must start at a multiple
+        of keyframe_interval if deltas are used
+        """
+        if self.keyframe_interval > 0:
+            return KeyframeDeltaEncoder(
+                self.keyframe_interval, self.delta_precision, self.compression
+            ).encode_frame
+        if self.quantize:
+            return lambda chunk_frame_index, time, n_agents, frame_buffer: (
+                QuantizedFrameCodec.encode_frame(
+                    chunk_frame_index,
+                    time,
+                    n_agents,
+                    frame_buffer,
+                    self.box_size,
+                    self.quantize_precision,
+                    self.compression,
+                )
+            )
+        return lambda chunk_frame_index, time, n_agents, frame_buffer: (
+            BinaryFrameCodec.encode_frame(
+                chunk_frame_index, time, n_agents, frame_buffer, self.compression
+            )
+        )
@@ -3,7 +3,7 @@
 
 import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, TextIO, Tuple
 
 import numpy as np
 
@@ -11,7 +11,13 @@ from ..data_objects import (
     AgentData,
     TrajectoryData,
 )
-from ..constants import V1_SPATIAL_BUFFER_STRUCT, CURRENT_VERSION, VALUES_PER_3D_POINT
+from ..constants import (
+    V1_SPATIAL_BUFFER_STRUCT,
+    CURRENT_VERSION,
+    VALUES_PER_3D_POINT,
+    VALIDATION_LEVEL,
+)
+from .trajectory_validator import TrajectoryValidator
 from .writer import Writer
 
 ###############################################################################
@@ -23,63 +29,64 @@ log = logging.getLogger(__name__)
 
 class JsonWriter(Writer):
     @staticmethod
-    def _get_spatial_bundle_data_subpoints(
+    def _iter_frame_buffers_subpoints(
         agent_data: AgentData,
         type_ids: np.ndarray,
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[np.ndarray]:
         """
-        Return the spatialData's bundleData for a simulation
-        of agents with subpoints, packing buffer with jagged data is slower
+        Yield the buffer of each frame for a simulation
+        of agents with subpoints, with per agent offsets
+        from the ragged number of subpoints of each agent.
+        Fiber point sphere IDs are mapped the same way in every frame
         """
-        bundle_data: List[Dict[str, Any]] = []
-        uids = {}
-        used_unique_IDs = list(np.unique(agent_data.unique_ids))
+        unique_id_allocator = Writer._fiber_point_unique_id_allocator(agent_data)
         total_steps = (
             agent_data.n_timesteps
             if agent_data.n_timesteps >= 0
             else len(agent_data.times)
         )
+        buffer_sizes = Writer._get_frame_buffer_sizes(agent_data)
         for time_index in range(total_steps):
-            # timestep
-            frame_data = {}
-            frame_data["frameNumber"] = time_index
-            frame_data["time"] = float(agent_data.times[time_index])
-            frame_data["data"], uids, used_unique_IDs = Writer._get_frame_buffer(
-                time_index, agent_data, type_ids, -1, uids, used_unique_IDs
+            yield Writer._get_frame_buffer_array(
+                time_index,
+                agent_data,
+                type_ids,
+                int(buffer_sizes[time_index]),
+                dtype=np.float64,
+                unique_id_allocator=unique_id_allocator,
             )
-            bundle_data.append(frame_data)
-        return bundle_data
 
     @staticmethod
-    def _get_spatial_bundle_data_no_subpoints(
+    def _iter_frame_buffers_no_subpoints(
         agent_data: AgentData,
         type_ids: np.ndarray,
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[np.ndarray]:
         """
-        Return the spatialData's bundleData for a simulation
-        of agents without subpoints, using list slicing for speed
+        Yield the buffer of each frame for a simulation
+        of agents without subpoints, using list slicing for speed.
+        The same array is reused for each frame,
+        so each buffer must be used before the next is requested
         """
-        bundle_data: List[Dict[str, Any]] = []
         max_n_agents = int(np.amax(agent_data.n_agents, 0))
         ix_positions = np.empty((VALUES_PER_3D_POINT * max_n_agents,), dtype=int)
         ix_rotations = np.empty((VALUES_PER_3D_POINT * max_n_agents,), dtype=int)
         buffer_struct = V1_SPATIAL_BUFFER_STRUCT
         for i in range(max_n_agents):
-            ix_positions[
-                VALUES_PER_3D_POINT * i : VALUES_PER_3D_POINT * (i + 1)
-            ] = np.arange(
-                i * (buffer_struct.MIN_VALUES_PER_AGENT) + buffer_struct.POSX_INDEX,
-                i * (buffer_struct.MIN_VALUES_PER_AGENT)
-                + buffer_struct.POSX_INDEX
-                + VALUES_PER_3D_POINT,
+            ix_positions[VALUES_PER_3D_POINT * i : VALUES_PER_3D_POINT * (i + 1)] = (
+                np.arange(
+                    i * (buffer_struct.MIN_VALUES_PER_AGENT) + buffer_struct.POSX_INDEX,
+                    i * (buffer_struct.MIN_VALUES_PER_AGENT)
+                    + buffer_struct.POSX_INDEX
+                    + VALUES_PER_3D_POINT,
+                )
             )
-            ix_rotations[
-                VALUES_PER_3D_POINT * i : VALUES_PER_3D_POINT * (i + 1)
-            ] = np.arange(
-                i * (buffer_struct.MIN_VALUES_PER_AGENT) + buffer_struct.ROTX_INDEX,
-                i * (buffer_struct.MIN_VALUES_PER_AGENT)
-                + buffer_struct.ROTX_INDEX
-                + VALUES_PER_3D_POINT,
+            ix_rotations[VALUES_PER_3D_POINT * i : VALUES_PER_3D_POINT * (i + 1)] = (
+                np.arange(
+                    i * (buffer_struct.MIN_VALUES_PER_AGENT) + buffer_struct.ROTX_INDEX,
+                    i * (buffer_struct.MIN_VALUES_PER_AGENT)
+                    + buffer_struct.ROTX_INDEX
+                    + VALUES_PER_3D_POINT,
+                )
             )
         frame_buf = np.zeros((buffer_struct.MIN_VALUES_PER_AGENT) * max_n_agents)
         total_steps = (
@@ -88,44 +95,84 @@ class JsonWriter(Writer):
             else len(agent_data.times)
         )
         for time_index in range(total_steps):
-            frame_data = {}
-            frame_data["frameNumber"] = time_index
-            frame_data["time"] = float(agent_data.times[time_index])
             n_agents = int(agent_data.n_agents[time_index])
             local_buf = frame_buf[: (buffer_struct.MIN_VALUES_PER_AGENT) * n_agents]
             local_buf[
                 buffer_struct.VIZ_TYPE_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT
-            ] = agent_data.viz_types[time_index, :n_agents]
-            local_buf[
-                buffer_struct.UID_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT
-            ] = agent_data.unique_ids[time_index, :n_agents]
-            local_buf[
-                buffer_struct.TID_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT
-            ] = type_ids[time_index, :n_agents]
-            local_buf[
-                ix_positions[: VALUES_PER_3D_POINT * n_agents]
-            ] = agent_data.positions[time_index, :n_agents].flatten()
-            local_buf[
-                ix_rotations[: VALUES_PER_3D_POINT * n_agents]
-            ] = agent_data.rotations[time_index, :n_agents].flatten()
-            local_buf[
-                buffer_struct.R_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT
-            ] = agent_data.radii[time_index, :n_agents]
-            frame_data["data"] = local_buf.tolist()
-            bundle_data.append(frame_data)
-        return bundle_data
+            ] = agent_data._get_frame_values("viz_types", time_index)
+            local_buf[buffer_struct.UID_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT] = (
+                agent_data._get_frame_values("unique_ids", time_index)
+            )
+            local_buf[buffer_struct.TID_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT] = (
+                agent_data._get_frame_type_ids(type_ids, time_index)
+            )
+            local_buf[ix_positions[: VALUES_PER_3D_POINT * n_agents]] = (
+                agent_data._get_frame_values("positions", time_index).flatten()
+            )
+            local_buf[ix_rotations[: VALUES_PER_3D_POINT * n_agents]] = (
+                agent_data._get_frame_values("rotations", time_index).flatten()
+            )
+            local_buf[buffer_struct.R_INDEX :: buffer_struct.MIN_VALUES_PER_AGENT] = (
+                agent_data._get_frame_values("radii", time_index)
+            )
+            yield local_buf
 
     @staticmethod
-    def format_trajectory_data(trajectory_data: TrajectoryData) -> Dict[str, Any]:
+    def _iter_frame_buffers(
+        agent_data: AgentData,
+        type_ids: np.ndarray,
+    ) -> Iterator[np.ndarray]:
         """
-        Return the data shaped for Simularium JSON
-        Parameters
-        ----------
-        trajectory_data: TrajectoryData
-            the data to format
+        Yield the buffer of each frame in the spatialData's bundleData
         """
-        log.info("Converting Trajectory Data to JSON -------------")
-        trajectory_data.agent_data._check_subpoints_match_display_type()
+        n_subpoints = agent_data._get_flat_values(
+            "n_subpoints", agent_data.total_timesteps()
+        )
+        if np.amax(n_subpoints, initial=0) > 0:
+            return JsonWriter._iter_frame_buffers_subpoints(agent_data, type_ids)
+        return JsonWriter._iter_frame_buffers_no_subpoints(agent_data, type_ids)
+
+    @staticmethod
+    def _get_spatial_bundle_data(
+        agent_data: AgentData,
+        type_ids: np.ndarray,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the spatialData's bundleData
+        """
+        return [
+            {
+                "frameNumber": time_index,
+                "time": float(agent_data.times[time_index]),
+                "data": frame_buffer.tolist(),
+            }
+            for time_index, frame_buffer in enumerate(
+                JsonWriter._iter_frame_buffers(agent_data, type_ids)
+            )
+        ]
+
+    @staticmethod
+    def _format_values(values: np.ndarray) -> str:
+        """
+        Format an array of floats as the items of a JSON array,
+        as json.dumps would format a list of them.
+        Finite values are formatted in one call with numpy,
+        which writes the same shortest round trip repr as Python
+        """
+        if not np.all(np.isfinite(values)):
+            # json writes NaN and Infinity, numpy writes nan and inf
+            return json.dumps(values.tolist())[1:-1]
+        return ", ".join(values.astype(np.float64).astype(str).tolist())
+
+    @staticmethod
+    def _get_simularium_data_header(
+        trajectory_data: TrajectoryData,
+    ) -> Tuple[Dict[str, Any], np.ndarray]:
+        """
+        Return the data shaped for Simularium JSON without the bundleData,
+        and the type ID of each agent
+        """
+        trajectory_data.agent_data._fill_default_display_data()
         simularium_data = {}
         # trajectory info
         total_steps = (
@@ -138,33 +185,81 @@ class JsonWriter(Writer):
             trajectory_data, total_steps, type_mapping
         )
         # spatial data
-        spatialData = {
+        simularium_data["spatialData"] = {
             "version": CURRENT_VERSION.SPATIAL_DATA,
             "msgType": 1,
             "bundleStart": 0,
             "bundleSize": total_steps,
         }
-        if np.amax(trajectory_data.agent_data.n_subpoints) > 0:
-            spatialData["bundleData"] = JsonWriter._get_spatial_bundle_data_subpoints(
-                trajectory_data.agent_data, type_ids
-            )
-        else:
-            spatialData[
-                "bundleData"
-            ] = JsonWriter._get_spatial_bundle_data_no_subpoints(
-                trajectory_data.agent_data, type_ids
-            )
-        simularium_data["spatialData"] = spatialData
         # plot data
         simularium_data["plotData"] = {
             "version": CURRENT_VERSION.PLOT_DATA,
             "data": trajectory_data.plots,
         }
+        return simularium_data, type_ids
+
+    @staticmethod
+    def format_trajectory_data(trajectory_data: TrajectoryData) -> Dict[str, Any]:
+        """
+        Return the data shaped for Simularium JSON
+        Parameters
+        ----------
+        trajectory_data: TrajectoryData
+            the data to format
+        """
+        log.info("Converting Trajectory Data to JSON -------------")
+        simularium_data, type_ids = JsonWriter._get_simularium_data_header(
+            trajectory_data
+        )
+        simularium_data["spatialData"]["bundleData"] = (
+            JsonWriter._get_spatial_bundle_data(trajectory_data.agent_data, type_ids)
+        )
         return simularium_data
 
+    @staticmethod
+    def write_trajectory_data(trajectory_data: TrajectoryData, outfile: TextIO) -> None:
+        """
+        Write the data as Simularium JSON to an open text file,
+        one frame at a time, without building the whole document in memory.
+        The result parses to the same data as format_trajectory_data
+        Parameters
+        ----------
+        trajectory_data: TrajectoryData
+            the data to write
+        outfile: TextIO
+            where to write it
+        """
+        log.info("Writing Trajectory Data as JSON -------------")
+        simularium_data, type_ids = JsonWriter._get_simularium_data_header(
+            trajectory_data
+        )
+        agent_data = trajectory_data.agent_data
+        outfile.write('{"trajectoryInfo": ')
+        json.dump(simularium_data["trajectoryInfo"], outfile)
+        # leave the spatialData object open to add bundleData
+        outfile.write(', "spatialData": ')
+        outfile.write(json.dumps(simularium_data["spatialData"])[:-1])
+        outfile.write(', "bundleData": [')
+        for time_index, frame_buffer in enumerate(
+            JsonWriter._iter_frame_buffers(agent_data, type_ids)
+        ):
+            if time_index > 0:
+                outfile.write(", ")
+            outfile.write(
+                f'{{"frameNumber": {time_index}, '
+                f'"time": {json.dumps(float(agent_data.times[time_index]))}, '
+                f'"data": [{JsonWriter._format_values(frame_buffer)}]}}'
+            )
+        outfile.write(']}, "plotData": ')
+        json.dump(simularium_data["plotData"], outfile)
+        outfile.write("}")
+
     @staticmethod
     def save(
-        trajectory_data: TrajectoryData, output_path: str, validate_ids: bool
+        trajectory_data: TrajectoryData,
+        output_path: str,
+        validate_ids: bool,
+        validation_level: VALIDATION_LEVEL = None,
     ) -> None:
         """
         Save the simularium data in .simularium JSON format
@@ -177,13 +272,16 @@ class JsonWriter(Writer):
             where to save the file
         validate_ids: bool (optional)
             additional validation to check agent ID size?
+        validation_level: VALIDATION_LEVEL (optional)
+            which checks to run before saving, see TrajectoryValidator.validate
+            Default: None (FAST if validate_ids, otherwise SUBPOINTS)
         """
-        if validate_ids:
-            Writer._validate_ids(trajectory_data)
-        json_data = JsonWriter.format_trajectory_data(trajectory_data)
-        log.info("Writing JSON -------------")
+        TrajectoryValidator.validate(
+            trajectory_data,
+            TrajectoryValidator.get_validation_level(validate_ids, validation_level),
+        )
         with open(f"{output_path}.simularium", "w+") as outfile:
-            json.dump(json_data, outfile)
+            JsonWriter.write_trajectory_data(trajectory_data, outfile)
         log.info(f"saved to {output_path}.simularium")
 
     @staticmethod
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from typing import Union
+
+import numpy as np
+
+from ..data_objects import AgentData, TrajectoryData
+from ..constants import DISPLAY_TYPE, MAX_AGENT_ID, VALIDATION_LEVEL, VIZ_TYPE
+from ..exceptions import DataError
+
+###############################################################################
+
+log = logging.getLogger(__name__)
+
+###############################################################################
+
+
+class TrajectoryValidator:
+    @staticmethod
+    def get_validation_level(
+        validate_ids: bool,
+        validation_level: Union[VALIDATION_LEVEL, str] = None,
+    ) -> VALIDATION_LEVEL:
+        """
+        Get the validation level to use, from a VALIDATION_LEVEL or its name,
+        or from validate_ids if no level is given.
+        Without validate_ids, numbers of subpoints are still checked,
+        only an explicit OFF level skips all checks
+        """
+        if validation_level is None:
+            return (
+                VALIDATION_LEVEL.FAST if validate_ids else VALIDATION_LEVEL.SUBPOINTS
+            )
+        if isinstance(validation_level, str):
+            return VALIDATION_LEVEL(validation_level.lower())
+        return validation_level
+
+    @staticmethod
+    def validate(
+        trajectory_data: TrajectoryData,
+        validation_level: VALIDATION_LEVEL = VALIDATION_LEVEL.FAST,
+    ) -> None:
+        """
+        Check the trajectory's agents with array operations
+        over all frames at once, and raise a DataError
+        naming the first offending frame and agent
+
+        Parameters
+        ----------
+        trajectory_data: TrajectoryData
+            the data to check
+        validation_level: VALIDATION_LEVEL (optional)
+            which checks to run.
+            OFF skips all checks, SUBPOINTS checks that numbers
+            of subpoints match display types, FAST also checks
+            that IDs fit in 32 bits, and FULL also checks that IDs
+            are unique in each frame and that fibers have
+            the fiber viz type and display type
+            Default: VALIDATION_LEVEL.FAST
+        """
+        if validation_level == VALIDATION_LEVEL.OFF:
+            return
+        agent_data = trajectory_data.agent_data
+        if validation_level != VALIDATION_LEVEL.SUBPOINTS:
+            TrajectoryValidator._check_id_range(agent_data)
+        agent_data._check_subpoints_match_display_type()
+        if validation_level == VALIDATION_LEVEL.FULL:
+            TrajectoryValidator._check_ids_unique_per_frame(agent_data)
+            TrajectoryValidator._check_fibers_match_display_types(agent_data)
+
+    @staticmethod
+    def _total_steps(agent_data: AgentData) -> int:
+        return (
+            agent_data.n_timesteps
+            if agent_data.n_timesteps >= 0
+            else len(agent_data.times)
+        )
+
+    @staticmethod
+    def _check_id_range(agent_data: AgentData) -> None:
+        """
+        Check that agent unique IDs are valid 32 bit integers
+        """
+        total_steps = TrajectoryValidator._total_steps(agent_data)
+        unique_ids = agent_data._get_flat_values("unique_ids", total_steps)
+        invalid = unique_ids > MAX_AGENT_ID
+        if np.any(invalid):
+            index = np.argmax(invalid)
+            time_indices, agent_indices = agent_data._get_flat_agent_indices(
+                total_steps
+            )
+            raise DataError(
+                "Agent ID is larger than a 32 bit integer: "
+                f"{unique_ids[index]} "
+                f"at index Time = {time_indices[index]}, "
+                f"Agent = {agent_indices[index]}"
+            )
+
+    @staticmethod
+    def _check_ids_unique_per_frame(agent_data: AgentData) -> None:
+        """
+        Check that no two agents in a frame have the same unique ID
+        """
+        total_steps = TrajectoryValidator._total_steps(agent_data)
+        time_indices, agent_indices = agent_data._get_flat_agent_indices(total_steps)
+        unique_ids = agent_data._get_flat_values("unique_ids", total_steps)
+        # sort by frame, then ID, then agent index
+        order = np.lexsort((agent_indices, unique_ids, time_indices))
+        time_indices = time_indices[order]
+        agent_indices = agent_indices[order]
+        unique_ids = unique_ids[order]
+        duplicate = (time_indices[1:] == time_indices[:-1]) & (
+            unique_ids[1:] == unique_ids[:-1]
+        )
+        if not np.any(duplicate):
+            return
+        # the first agent in any frame whose ID was used earlier in the frame
+        duplicate_times = time_indices[1:][duplicate]
+        duplicate_agents = agent_indices[1:][duplicate]
+        duplicate_ids = unique_ids[1:][duplicate]
+        first = np.lexsort((duplicate_agents, duplicate_times))[0]
+        raise DataError(
+            "Found duplicate agent ID "
+            f"{duplicate_ids[first]} "
+            f"at index Time = {duplicate_times[first]}, "
+            f"Agent = {duplicate_agents[first]}"
+        )
+
+    @staticmethod
+    def _check_fibers_match_display_types(agent_data: AgentData) -> None:
+        """
+        Check that agents have the fiber viz type if and only if
+        their type's display type is FIBER, and that agents
+        with subpoints have a display type that uses them.
+        Display types of NONE aren't checked
+        """
+        total_steps = TrajectoryValidator._total_steps(agent_data)
+        type_names, codes, _ = agent_data._get_flat_type_name_codes(total_steps)
+        if len(type_names) == 0:
+            return
+        display_types = [
+            (
+                agent_data.display_data[type_name].display_type
+                if type_name in agent_data.display_data
+                else DISPLAY_TYPE.NONE
+            )
+            for type_name in type_names
+        ]
+        is_checked = np.array(
+            [display_type != DISPLAY_TYPE.NONE for display_type in display_types]
+        )[codes]
+        is_fiber_type = np.array(
+            [display_type == DISPLAY_TYPE.FIBER for display_type in display_types]
+        )[codes]
+        has_subpoint_type = np.array(
+            [
+                display_type in [DISPLAY_TYPE.FIBER, DISPLAY_TYPE.SPHERE_GROUP]
+                for display_type in display_types
+            ]
+        )[codes]
+        viz_types = agent_data._get_flat_values("viz_types", total_steps)
+        n_subpoints = agent_data._get_flat_values("n_subpoints", total_steps)
+        invalid = is_checked & (
+            ((viz_types == VIZ_TYPE.FIBER) != is_fiber_type)
+            | ((n_subpoints > 0) & ~has_subpoint_type)
+        )
+        if np.any(invalid):
+            index = np.argmax(invalid)
+            time_indices, agent_indices = agent_data._get_flat_agent_indices(
+                total_steps
+            )
+            type_name = type_names[codes[index]]
+            raise DataError(
+                f"Agent at index Time = {time_indices[index]}, "
+                f"Agent = {agent_indices[index]}: "
+                f"Type {type_name} has display type "
+                f"{agent_data.display_data[type_name].display_type}, "
+                f"viz type {viz_types[index]} "
+                f"and {n_subpoints[index]} subpoints"
+            )
@@ -11,7 +11,8 @@ import numpy as np
 from ..data_objects import (
     TrajectoryData,
     AgentData,
-    DisplayData,
+    RaggedAgentData,
+    UniqueIDAllocator,
 )
 from ..constants import (
     V1_SPATIAL_BUFFER_STRUCT,
@@ -20,10 +21,10 @@ from ..constants import (
     CURRENT_VERSION,
     VALUES_PER_3D_POINT,
     SUBPOINT_VALUES_PER_ITEM,
-    MAX_AGENT_ID,
 )
 
 from ..exceptions import DataError
+from .trajectory_validator import TrajectoryValidator
 
 ###############################################################################
 
@@ -113,6 +114,23 @@ class Writer(ABC):
             result["modelInfo"] = dict(trajectory_data.meta_data.model_meta_data)
         return result
 
+    @staticmethod
+    def _get_agent_buffer_sizes(
+        n_subpoints: np.ndarray,
+        draw_fiber_points: bool,
+    ) -> np.ndarray:
+        """
+        Get the number of values each agent adds to a buffer
+        beyond the values every agent has
+        """
+        n_subpoints = np.maximum(np.asarray(n_subpoints).astype(int), 0)
+        result = np.copy(n_subpoints)
+        if draw_fiber_points:
+            # one sphere for every other fiber point
+            n_spheres = np.where(n_subpoints > 0, (n_subpoints + 5) // 6, 0)
+            result += V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT * n_spheres
+        return result
+
     @staticmethod
     def _get_frame_buffer_size(
         time_index: int,
@@ -121,17 +139,35 @@ class Writer(ABC):
         """
         Get the required size for a buffer to hold the given frame of AgentData
         """
-        n_agents = int(agent_data.n_agents[time_index])
-        buffer_size = (V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT) * n_agents
-        for agent_index in range(n_agents):
-            n_subpoints = int(agent_data.n_subpoints[time_index][agent_index])
-            if n_subpoints > 0:
-                buffer_size += n_subpoints
-                if agent_data.draw_fiber_points:
-                    buffer_size += (
-                        V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
-                    ) * max(math.ceil(n_subpoints / 6.0), 1)
-        return buffer_size
+        return int(
+            V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
+            * int(agent_data.n_agents[time_index])
+            + np.sum(
+                Writer._get_agent_buffer_sizes(
+                    agent_data._get_frame_values("n_subpoints", time_index),
+                    agent_data.draw_fiber_points,
+                )
+            )
+        )
+
+    @staticmethod
+    def _get_frame_buffer_sizes(agent_data: AgentData) -> np.ndarray:
+        """
+        Get the required buffer size for each frame of AgentData
+        """
+        total_steps = agent_data.total_timesteps()
+        time_indices, _ = agent_data._get_flat_agent_indices(total_steps)
+        agent_sizes = Writer._get_agent_buffer_sizes(
+            agent_data._get_flat_values("n_subpoints", total_steps),
+            agent_data.draw_fiber_points,
+        )
+        return V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT * np.asarray(
+            agent_data.n_agents[:total_steps]
+        ).astype(int) + np.bincount(
+            time_indices, weights=agent_sizes, minlength=total_steps
+        ).astype(
+            int
+        )
 
     @staticmethod
     def _get_frame_buffer(
@@ -139,18 +175,15 @@ class Writer(ABC):
         agent_data: AgentData,
         type_ids: np.ndarray,
         buffer_size: int = -1,
-        uids: Dict[int, int] = None,
-        used_unique_IDs: List[int] = None,
-    ) -> Tuple[List[float], Dict[int, int], List[int]]:
+        unique_id_allocator: UniqueIDAllocator = None,
+    ) -> Tuple[List[float], UniqueIDAllocator]:
         """
         Get a float buffer for one frame of AgentData
         """
         if buffer_size < 0:
             buffer_size = Writer._get_frame_buffer_size(time_index, agent_data)
-        if uids is None:
-            uids = {}
-        if used_unique_IDs is None:
-            used_unique_IDs = []
+        if unique_id_allocator is None:
+            unique_id_allocator = Writer._fiber_point_unique_id_allocator()
         result = np.zeros(buffer_size)
         n_agents = int(agent_data.n_agents[time_index])
         i = 0
@@ -207,20 +240,20 @@ class Writer(ABC):
                             continue
                         # unique instance ID
                         raw_uid = (
-                            100 * (agent_data.unique_ids[time_index, agent_index] + 1)
+                            100
+                            * (
+                                agent_data.unique_ids[time_index, agent_index].item()
+                                + 1
+                            )
                             + p
                         )
-                        if raw_uid not in uids:
-                            uid = raw_uid
-                            while uid in used_unique_IDs:
-                                uid += 100
-                            uids[raw_uid] = uid
-                            used_unique_IDs.append(uid)
                         # add sphere
                         result[
                             i + V1_SPATIAL_BUFFER_STRUCT.VIZ_TYPE_INDEX
                         ] = VIZ_TYPE.DEFAULT
-                        result[i + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX] = uids[raw_uid]
+                        result[
+                            i + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX
+                        ] = unique_id_allocator.allocate(raw_uid)
                         result[i + V1_SPATIAL_BUFFER_STRUCT.TID_INDEX] = type_ids[
                             time_index, agent_index
                         ]
@@ -238,105 +271,234 @@ class Writer(ABC):
                         i += V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
             else:
                 i += V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
-        return result.tolist(), uids, used_unique_IDs
+        return result.tolist(), unique_id_allocator
 
     @staticmethod
-    def _check_agent_ids_are_unique_per_frame(buffer_data: Dict[str, Any]) -> bool:
+    def _get_fiber_type_codes(agent_data: AgentData) -> np.ndarray:
         """
-        For each frame, check that none of the unique agent IDs overlap
+        Get a lookup of whether each type code is displayed as a fiber,
+        with index -1 (no type name) as the last entry
         """
-        bundle_data = buffer_data["spatialData"]["bundleData"]
-        for time_index in range(len(bundle_data)):
-            data = bundle_data[time_index]["data"]
-            agent_index = 1
-            uids = []
-            get_n_subpoints = False
-            while agent_index < len(data):
-                # get the number of subpoints
-                # in order to correctly increment index
-                if get_n_subpoints:
-                    agent_index += int(
-                        data[agent_index]
-                        + (
-                            V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
-                            + 1
-                            - V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX
-                        )
-                    )
-                    get_n_subpoints = False
-                    continue
-                # there should be a unique ID at this index, check for duplicate
-                uid = data[agent_index]
-                if uid in uids:
-                    raise Exception(
-                        f"found duplicate ID {uid} in frame {time_index} "
-                        f"at index {agent_index}"
-                    )
-                uids.append(uid)
-                agent_index += V1_SPATIAL_BUFFER_STRUCT.NSP_INDEX - 1
-                get_n_subpoints = True
-        return True
+        return np.array(
+            [
+                type_name in agent_data.display_data
+                and agent_data.display_data[type_name].display_type
+                == DISPLAY_TYPE.FIBER
+                for type_name in agent_data._get_type_name_table()
+            ]
+            + [False]
+        )
 
     @staticmethod
-    def _validate_ids(trajectory_data: TrajectoryData) -> None:
+    def _get_fiber_point_agents(
+        time_index: int,
+        agent_data: AgentData,
+        n_subpoints: np.ndarray,
+    ) -> np.ndarray:
         """
-        Check if agent unique IDs are valid 32 bit integers
-        returns a message identifying violating agent ID
+        Get a mask of the agents in the given frame
+        that should have spheres drawn at their fiber points
+        """
+        n_agents = n_subpoints.shape[0]
+        if not agent_data.draw_fiber_points or np.amax(n_subpoints, initial=0) < 1:
+            return np.zeros(n_agents, dtype=bool)
+        codes = agent_data._get_frame_type_codes(time_index, n_agents)
+        return Writer._get_fiber_type_codes(agent_data)[codes] & (n_subpoints > 0)
+
+    @staticmethod
+    def _get_frame_buffer_array(
+        time_index: int,
+        agent_data: AgentData,
+        type_ids: np.ndarray,
+        buffer_size: int = -1,
+        dtype: np.dtype = np.float32,
+        unique_id_allocator: UniqueIDAllocator = None,
+    ) -> np.ndarray:
+        """
+        Get a float32 buffer for one frame of AgentData,
+        packed with array operations instead of a loop over agents.
+        The values match Writer._get_frame_buffer for a frame
+        packed with a new unique ID mapping, or with the given
+        unique_id_allocator if it is passed,
+        which allocates any new fiber point sphere IDs
+        """
+        if buffer_size < 0:
+            buffer_size = Writer._get_frame_buffer_size(time_index, agent_data)
+        n_subpoints = agent_data._get_frame_values("n_subpoints", time_index).astype(
+            int
+        )
+        return Writer._pack_frame_buffer(
+            buffer_size,
+            agent_data._get_frame_values("viz_types", time_index),
+            agent_data._get_frame_values("unique_ids", time_index),
+            agent_data._get_frame_type_ids(type_ids, time_index),
+            agent_data._get_frame_values("positions", time_index),
+            agent_data._get_frame_values("rotations", time_index),
+            agent_data._get_frame_values("radii", time_index),
+            n_subpoints,
+            agent_data._get_frame_subpoints(time_index),
+            Writer._get_fiber_point_agents(time_index, agent_data, n_subpoints),
+            dtype,
+            unique_id_allocator,
+        )
+
+    @staticmethod
+    def _fiber_point_unique_id_allocator(
+        agent_data: AgentData = None,
+    ) -> UniqueIDAllocator:
+        """
+        Get an allocator for the unique IDs of spheres drawn at fiber points,
+        which don't collide with the agents' unique IDs
         """
-        agent_unique_ids = trajectory_data.agent_data.unique_ids
-        for uid in np.ndarray.flatten(agent_unique_ids):
-            if uid > MAX_AGENT_ID:
-                raise DataError(f"Agent IDs is larger than a 32 bit integer: {uid} ")
+        if agent_data is None:
+            return UniqueIDAllocator((), step=100)
+        return UniqueIDAllocator(
+            agent_data.flat_unique_ids
+            if isinstance(agent_data, RaggedAgentData)
+            else agent_data.unique_ids,
+            step=100,
+        )
 
     @staticmethod
-    def _check_type_matches_subpoints(
-        type_name: str,
-        n_subpoints: int,
-        viz_type: float,
-        display_data: DisplayData,
-        debug_name: str = "",
-    ) -> str:
+    def _pack_frame_buffer(
+        buffer_size: int,
+        viz_types: np.ndarray,
+        unique_ids: np.ndarray,
+        type_ids: np.ndarray,
+        positions: np.ndarray,
+        rotations: np.ndarray,
+        radii: np.ndarray,
+        n_subpoints: np.ndarray,
+        subpoints: np.ndarray,
+        fiber_point_agents: np.ndarray,
+        dtype: np.dtype = np.float32,
+        unique_id_allocator: UniqueIDAllocator = None,
+    ) -> np.ndarray:
         """
-        If the agent has subpoints, check that it
-        also has a display_type of "FIBER" and viz type of "FIBER", and vice versa.
-        return a message saying what is inconsistent
+        Pack the arrays for the agents in one frame into a float32 buffer,
+        or a buffer of the given dtype.
+        subpoints holds the agents' subpoint values concatenated.
+        Per agent offsets in the buffer are computed with a cumsum
+        over the number of values for each agent.
+        If unique_id_allocator is given, the fiber point spheres'
+        unique IDs are remapped with it
         """
-        has_subpoints = n_subpoints > 0
-        msg = (
-            f"Agent {debug_name}: Type {type_name} "
-            + ("has" if has_subpoints else "does not have")
-            + " subpoints and "
+        result = np.zeros(buffer_size, dtype=dtype)
+        n_agents = n_subpoints.shape[0]
+        if n_agents < 1:
+            return result
+        buffer_struct = V1_SPATIAL_BUFFER_STRUCT
+        agent_indices = np.arange(n_agents)
+        # fiber points get a sphere at every other point
+        n_spheres = np.where(
+            fiber_point_agents,
+            (n_subpoints // SUBPOINT_VALUES_PER_ITEM(DISPLAY_TYPE.FIBER) + 1) // 2,
+            0,
         )
-        if has_subpoints != (viz_type == VIZ_TYPE.FIBER):
-            return msg + f"viz type is {viz_type}"
-        if type_name in display_data:
-            display_type = display_data[type_name].display_type
-            if display_type is not DISPLAY_TYPE.NONE and has_subpoints != (
-                display_type == DISPLAY_TYPE.FIBER
-            ):
-                return msg + f"display type is {display_type}"
-        return ""
+        agent_n_values = (
+            buffer_struct.MIN_VALUES_PER_AGENT * (1 + n_spheres) + n_subpoints
+        )
+        agent_offsets = np.cumsum(agent_n_values) - agent_n_values
+        subpoint_offsets = np.cumsum(n_subpoints) - n_subpoints
+        # add agents
+        result[agent_offsets + buffer_struct.VIZ_TYPE_INDEX] = viz_types
+        result[agent_offsets + buffer_struct.UID_INDEX] = unique_ids
+        result[agent_offsets + buffer_struct.TID_INDEX] = type_ids
+        xyz = np.arange(VALUES_PER_3D_POINT)
+        result[
+            agent_offsets[:, np.newaxis] + buffer_struct.POSX_INDEX + xyz
+        ] = positions
+        result[
+            agent_offsets[:, np.newaxis] + buffer_struct.ROTX_INDEX + xyz
+        ] = rotations
+        result[agent_offsets + buffer_struct.R_INDEX] = radii
+        result[agent_offsets + buffer_struct.NSP_INDEX] = n_subpoints
+        # add subpoints
+        total_subpoints = int(np.sum(n_subpoints))
+        if total_subpoints > 0:
+            subpoint_agents = np.repeat(agent_indices, n_subpoints)
+            subpoint_indices = np.arange(total_subpoints) - np.repeat(
+                subpoint_offsets, n_subpoints
+            )
+            result[
+                agent_offsets[subpoint_agents]
+                + buffer_struct.SP_INDEX
+                + subpoint_indices
+            ] = subpoints[:total_subpoints]
+        # optionally add spheres at fiber points
+        total_spheres = int(np.sum(n_spheres))
+        if total_spheres > 0:
+            sphere_agents = np.repeat(agent_indices, n_spheres)
+            sphere_indices = np.arange(total_spheres) - np.repeat(
+                np.cumsum(n_spheres) - n_spheres, n_spheres
+            )
+            sphere_offsets = (
+                agent_offsets[sphere_agents]
+                + buffer_struct.MIN_VALUES_PER_AGENT * (1 + sphere_indices)
+                + n_subpoints[sphere_agents]
+            )
+            fiber_point_indices = 2 * sphere_indices
+            result[sphere_offsets + buffer_struct.VIZ_TYPE_INDEX] = VIZ_TYPE.DEFAULT
+            # unique instance ID, computed in 64 bits so that
+            # large IDs don't overflow compact int32 unique_ids
+            sphere_unique_ids = (
+                100
+                * (
+                    unique_ids[sphere_agents].astype(
+                        np.result_type(unique_ids.dtype, np.int64)
+                    )
+                    + 1
+                )
+                + fiber_point_indices
+            )
+            if unique_id_allocator is not None:
+                sphere_unique_ids = unique_id_allocator.remap(sphere_unique_ids)
+            result[sphere_offsets + buffer_struct.UID_INDEX] = sphere_unique_ids
+            result[sphere_offsets + buffer_struct.TID_INDEX] = type_ids[sphere_agents]
+            result[sphere_offsets[:, np.newaxis] + buffer_struct.POSX_INDEX + xyz] = (
+                subpoints[
+                    subpoint_offsets[sphere_agents][:, np.newaxis]
+                    + VALUES_PER_3D_POINT * fiber_point_indices[:, np.newaxis]
+                    + xyz
+                ]
+            )
+            result[sphere_offsets + buffer_struct.R_INDEX] = 0.5
+        return result
 
     @staticmethod
-    def _check_types_match_subpoints(trajectory_data: TrajectoryData) -> str:
+    def _check_agent_ids_are_unique_per_frame(buffer_data: Dict[str, Any]) -> bool:
         """
-        For each frame, check that agents that have subpoints
-        also have a display_type of "FIBER" and viz type of "FIBER", and vice versa.
-        return a message with the type name of the first agent that is inconsistent
+        For each frame, check that none of the unique agent IDs overlap
         """
-        n_subpoints = trajectory_data.agent_data.n_subpoints
-        display_data = trajectory_data.agent_data.display_data
-        for time_index in range(n_subpoints.shape[0]):
-            for agent_index in range(
-                int(trajectory_data.agent_data.n_agents[time_index])
-            ):
-                inconsistent_type = Writer._check_type_matches_subpoints(
-                    trajectory_data.agent_data.types[time_index][agent_index],
-                    n_subpoints[time_index][agent_index],
-                    trajectory_data.agent_data.viz_types[time_index][agent_index],
-                    display_data,
-                    f"at index Time = {time_index}, Agent = {agent_index}",
+        bundle_data = buffer_data["spatialData"]["bundleData"]
+        for time_index in range(len(bundle_data)):
+            data = np.asarray(bundle_data[time_index]["data"], dtype=float)
+            if AgentData._frame_has_subpoints(data):
+                _, _, agent_starts = AgentData._get_buffer_agent_starts(
+                    data, np.array([0]), np.array([len(data)])
+                )
+            else:
+                agent_starts = np.arange(
+                    0, len(data), V1_SPATIAL_BUFFER_STRUCT.MIN_VALUES_PER_AGENT
                 )
-                if inconsistent_type:
-                    return inconsistent_type
-        return ""
+            uid_indices = agent_starts + V1_SPATIAL_BUFFER_STRUCT.UID_INDEX
+            uids = data[uid_indices]
+            # the first agent whose ID is used by an earlier agent
+            _, first_indices = np.unique(uids, return_index=True)
+            is_duplicate = np.ones(len(uids), dtype=bool)
+            is_duplicate[first_indices] = False
+            if np.any(is_duplicate):
+                agent_index = int(np.argmax(is_duplicate))
+                raise DataError(
+                    f"found duplicate ID {uids[agent_index]} in frame {time_index} "
+                    f"at index {uid_indices[agent_index]}"
+                )
+        return True
+
+    @staticmethod
+    def _validate_ids(trajectory_data: TrajectoryData) -> None:
+        """
+        Check if agent unique IDs are valid 32 bit integers
+        returns a message identifying violating agent ID
+        """
+        TrajectoryValidator._check_id_range(trajectory_data.agent_data)